@@ -1,19 +1,39 @@
 import sys
 import os
-import json
-import asyncio
-import socket
-import subprocess
+import html
+import threading
 import time
+import uuid
+from collections import deque
 from functools import partial
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QPushButton, QTextEdit, QLabel, QLineEdit, QMessageBox, QDialog,
-                            QListWidget, QTabWidget, QSplitter, QFrame, QFileDialog, QCheckBox)
-from PyQt5.QtCore import Qt, QSize, QThread, pyqtSignal, QObject
-from PyQt5.QtGui import QFont
-from browser_use import Agent, Browser, BrowserConfig
-from langchain_openai import ChatOpenAI
-from tempfile import gettempdir
+from webmorpher.startup import StartupProfiler
+
+# Вимірювання часу запуску (виводиться з параметром --profile-startup)
+STARTUP = StartupProfiler(enabled="--profile-startup" in sys.argv)
+
+with STARTUP.phase("import PyQt5"):
+    from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+                                QPushButton, QTextEdit, QPlainTextEdit, QLabel, QLineEdit, QMessageBox, QDialog,
+                                QListView, QTabWidget, QSplitter, QFrame, QCheckBox, QSpinBox,
+                                QDoubleSpinBox, QGroupBox, QFormLayout, QInputDialog, QComboBox, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog)
+    from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QObject, QAbstractListModel, QModelIndex
+    from PyQt5.QtGui import QFont
+
+# browser-use та langchain імпортуються лише під час першого запуску
+# (або у фоні після показу вікна), див. webmorpher.runner
+with STARTUP.phase("import webmorpher"):
+    from webmorpher.batch import placeholders, render_task
+    from webmorpher.browser_pool import BrowserPool
+    from webmorpher.chrome import get_default_chrome_profile
+    from webmorpher.config import CONFIG_FILE
+    from webmorpher.store import open_store
+    from webmorpher.debug_browser import launch_debug_browser
+    from webmorpher.logbuffer import LogBatcher, RingLog
+    from webmorpher import metrics
+    from webmorpher.runner import STOP_TIMEOUT, AgentRun, preload_agent_stack
+    from webmorpher.llm import program_llm_settings, requires_api_key
+    from webmorpher.profiles import compact_profile, resolve_profile
+    from webmorpher.search_index import ProgramIndex
 
 # Определяем корневую директорию приложения
 if getattr(sys, 'frozen', False):
@@ -25,246 +45,123 @@ else:
     APP_ROOT = os.path.dirname(os.path.abspath(__file__))
     RESOURCES_ROOT = APP_ROOT
 
-# Шлях до файлу з налаштуваннями
-CONFIG_FILE = os.path.expanduser("~/.webmorpher_config.json")
 # Шлях до директорії профілю браузера
 BROWSER_PROFILE_DIR = os.path.expanduser("~/.webmorpher_browser_profile")
 
-def get_default_chrome_profile():
-    """Визначення шляху до стандартного профілю користувача Chrome/Chromium"""
-    user_profile_dir = None
-    
-    if sys.platform == 'darwin':  # macOS
-        # Шлях до стандартного профілю Chrome на macOS
-        chrome_profile_alt = os.path.expanduser("~/Library/Application Support/Google/Chrome")
-        
-        # Перевіряємо наявність каталогу
-        if os.path.exists(chrome_profile_alt) and os.path.isdir(chrome_profile_alt):
-            user_profile_dir = chrome_profile_alt
-    elif sys.platform.startswith('win'):  # Windows
-        # Шлях до стандартного профілю Chrome на Windows
-        chrome_profile = os.path.join(os.environ.get('LOCALAPPDATA', ''), 
-                                     "Google", "Chrome", "User Data")
-        if os.path.exists(chrome_profile) and os.path.isdir(chrome_profile):
-            user_profile_dir = chrome_profile
-    elif sys.platform.startswith('linux'):  # Linux
-        # Шлях до стандартного профілю Chrome на Linux
-        chrome_profile = os.path.expanduser("~/.config/google-chrome")
-        if os.path.exists(chrome_profile) and os.path.isdir(chrome_profile):
-            user_profile_dir = chrome_profile
-    
-    return user_profile_dir
-
 class BrowserUseRunner(QThread):
     """Клас для запуску browser-use у окремому потоці"""
-    log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
     error_signal = pyqtSignal(str)
     
-    def __init__(self, api_key, task, headless=False, debug_port=None, user_profile_dir=None):
+    def __init__(self, api_key, task, headless=False, debug_port=None, user_profile_dir=None, browser_pool=None,
+                 llm_cache=None, trace_store=None, cdp_pool=None, run_history=None, name=None, llm_settings=None,
+                 llm_factory=None, profile_snapshots=None, lite_mode=None, state_diff=None, profile=None,
+                 checkpoints=None, checkpoint_id=None, resume_checkpoint=False, process_pool=None):
         super().__init__()
-        self.api_key = api_key
-        self.task = task
-        self.headless = headless
-        self.debug_port = debug_port
-        self.user_profile_dir = user_profile_dir
-        self._is_paused = False
-        self._is_stopped = False
-        self.agent = None
+        # Контрольна точка цього запуску (див. webmorpher.checkpoint)
+        self.checkpoint_id = checkpoint_id
+        # Логи не передаються сигналом на кожне повідомлення: панель запуску
+        # забирає їх з черги пакетами
+        self.log_buffer = LogBatcher()
+        if process_pool is not None:
+            # Агент виконується в процесі-виконавці, який сам тримає теплий
+            # браузер і відкриває кеш та історію, тож передаються лише прапорці
+            self.agent_run = process_pool.create_run(
+                {
+                    'api_key': api_key,
+                    'task': task,
+                    'headless': headless,
+                    'debug_port': debug_port,
+                    'user_profile_dir': user_profile_dir,
+                    'llm_cache': llm_cache is not None,
+                    'replay': trace_store is not None,
+                    'run_history': run_history is not None,
+                    'profile_snapshots': profile_snapshots is not None,
+                    'checkpoints': checkpoints is not None,
+                    'checkpoint_id': checkpoint_id,
+                    'resume_checkpoint': resume_checkpoint,
+                    'name': name,
+                    'llm_settings': llm_settings,
+                    'lite_mode': lite_mode,
+                    'state_diff': state_diff,
+                    'profile': profile
+                },
+                on_log=self.log_buffer.push,
+                on_error=self.error_signal.emit
+            )
+            return
+        self.agent_run = AgentRun(
+            api_key=api_key,
+            task=task,
+            headless=headless,
+            debug_port=debug_port,
+            user_profile_dir=user_profile_dir,
+            browser_pool=browser_pool,
+            llm_cache=llm_cache,
+            trace_store=trace_store,
+            cdp_pool=cdp_pool,
+            run_history=run_history,
+            name=name,
+            llm_settings=llm_settings,
+            llm_factory=llm_factory,
+            profile_snapshots=profile_snapshots,
+            lite_mode=lite_mode,
+            state_diff=state_diff,
+            profile=profile,
+            checkpoints=checkpoints,
+            checkpoint_id=checkpoint_id,
+            resume_checkpoint=resume_checkpoint,
+            on_log=self.log_buffer.push,
+            on_error=self.error_signal.emit
+        )
     
     def run(self):
         """Запуск browser-use агента"""
         try:
-            os.environ["OPENAI_API_KEY"] = self.api_key
-            
-            # Ініціалізація ChatOpenAI моделі
-            llm = ChatOpenAI(model="gpt-4o")
-            
-            # Створення браузера з відповідними параметрами
-            if self.debug_port:
-                # Для режиму дебагу використовуємо cdp_url
-                browser_config = BrowserConfig(cdp_url=f"http://localhost:{self.debug_port}")
-            else:
-                # Шлях до Google Chrome на macOS
-                chrome_paths = [
-                    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",  # Стандартный путь
-                    os.path.expanduser("~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"),  # Пользовательские приложения
-                    "/Applications/Chromium.app/Contents/MacOS/Chromium",  # Chromium как запасной вариант
-                ]
-                
-                # Находим первый существующий браузер
-                chrome_path = None
-                for path in chrome_paths:
-                    if os.path.exists(path):
-                        chrome_path = path
-                        break
-                
-                if not chrome_path:
-                    raise Exception("Не знайдено Google Chrome або Chromium. Будь ласка, встановіть один з браузерів.")
-                
-                # Параметры конфигурации браузера
-                browser_config_params = {
-                    'headless': self.headless,
-                    'browser_binary_path': chrome_path,
-                }
-                
-                # Если задан каталог профиля пользователя, используем его
-                if self.user_profile_dir:
-                    browser_config_params['user_data_dir'] = self.user_profile_dir
-                
-                # Для звичайного режиму використовуємо browser_binary_path и user_data_dir
-                browser_config = BrowserConfig(**browser_config_params)
-                
-            browser = Browser(config=browser_config)
-            
-            # Створення агента з callback для логування
-            self.agent = Agent(
-                task=self.task,
-                llm=llm,
-                browser=browser,
-                register_new_step_callback=self._on_new_step
-            )
-            
-            # Запускаємо агента в асинхронному режимі
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            if not self._is_stopped:
-                self.log_signal.emit("Запуск браузера та ініціалізація агента...")
-                result = loop.run_until_complete(self._run_with_pause_check())
-                self.log_signal.emit("Виконання завершено!")
+            self.agent_run.execute()
+            # Якщо запуск скасовано ще до створення агента, звітувати нема про що
+            if self.agent_run.started:
+                self.log_buffer.push("Виконання завершено!")
                 self.finished_signal.emit()
-        
         except Exception as e:
             self.error_signal.emit(f"Помилка: {str(e)}")
     
-    async def _run_with_pause_check(self):
-        """Запуск агента з можливістю паузи"""
-        try:
-            # Запускаємо агента
-            result = await self.agent.run()
-            return result
-        except Exception as e:
-            self.error_signal.emit(f"Помилка під час виконання: {str(e)}")
-            return None
-    
-    async def _on_new_step(self, state, output, step_index):
-        """Колбек для логування кроків агента"""
-        # Додаємо інформацію з AgentBrain
-        if hasattr(output, 'current_state'):
-            brain = output.current_state
-            if brain.next_goal:
-                self.log_signal.emit(f"🎯 Наступна ціль: {brain.next_goal}")
-            if brain.evaluation_previous_goal:
-                self.log_signal.emit(f"✓ Результат: {brain.evaluation_previous_goal}")
-        
-        # Стандартні статуси
-        action_type = getattr(output, 'action_type', None)
-        content = getattr(output, 'content', None)
-        
-        if action_type == "thinking":
-            self.log_signal.emit(f"🤔 Модель думає: {content}")
-        elif action_type == "browser_action":
-            self.log_signal.emit(f"🌐 Браузер: {content}")
-        elif action_type == "agent_action":
-            self.log_signal.emit(f"🤖 Агент: {content}")
-        elif action_type == "error":
-            self.log_signal.emit(f"❌ Помилка: {content}")
-        elif content:
-            self.log_signal.emit(f"{action_type}: {content}")
-        
-        # Перевіряємо чи є пауза
-        while self._is_paused and not self._is_stopped:
-            await asyncio.sleep(0.1)  # Маленька затримка, щоб не навантажувати процесор
-        
-        # Якщо зупинено, піднімаємо виключення для зупинки агента
-        if self._is_stopped:
-            raise Exception("Виконання зупинено користувачем")
-    
     def pause(self):
         """Призупинення виконання"""
-        self._is_paused = True
-        self.log_signal.emit("⏸️ Виконання призупинено...")
+        self.agent_run.pause()
     
     def resume(self):
         """Відновлення виконання"""
-        self._is_paused = False
-        self.log_signal.emit("▶️ Виконання відновлено...")
+        self.agent_run.resume()
     
     def stop(self):
         """Зупинка виконання"""
-        self._is_stopped = True
-        self._is_paused = False
-        self.log_signal.emit("⏹️ Виконання зупинено!")
+        self.agent_run.stop()
 
-def find_free_port():
-    """Знайти вільний порт для запуску дебаг-сервера"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        return s.getsockname()[1]
-
-def launch_debug_browser(port=9222, use_user_profile=True, user_profile_dir=None):
-    """Запустити браузер у режимі дебагу на вказаному порті"""
-    # Шлях до Chrome на macOS
-    if sys.platform == 'darwin':  # macOS
-        chrome_paths = [
-            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",  # Стандартный путь
-            os.path.expanduser("~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"),  # Пользовательские приложения
-            "/Applications/Chromium.app/Contents/MacOS/Chromium",  # Chromium как запасной вариант
-        ]
-        
-        # Находим первый существующий браузер
-        chrome_path = None
-        for path in chrome_paths:
-            if os.path.exists(path):
-                chrome_path = path
-                break
-                
-        if not chrome_path:
-            raise Exception("Не знайдено Google Chrome або Chromium. Будь ласка, встановіть один з браузерів.")
-            
-        print(f"Використовуємо браузер за шляхом: {chrome_path}")
-    else:
-        # Для Linux та інших платформ
-        chrome_path = "google-chrome"
-    
-    # Визначаємо директорію для профілю Chrome
-    if use_user_profile and user_profile_dir:
-        # Використовуємо профіль користувача
-        debug_profile_dir = user_profile_dir
-        print(f"Використовуємо профіль користувача для дебагу: {debug_profile_dir}")
-    else:
-        # Використовуємо тимчасову директорію для профілю Chrome
-        debug_profile_dir = os.path.join(gettempdir(), f"chrome-debug-{port}")
-        os.makedirs(debug_profile_dir, exist_ok=True)
-    
-    cmd = [
-        chrome_path,
-        f"--remote-debugging-port={port}",
-        "--no-first-run",
-        "--no-default-browser-check",
-        f"--user-data-dir={debug_profile_dir}",
-        "--disable-application-cache",  # Відключаємо кеш для зменшення конфліктів
-        "about:blank"
-    ]
-    
-    print(f"Запускаємо команду: {' '.join(cmd)}")
-    
-    try:
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print(f"Браузер запущено з PID: {process.pid}")
-        
-        # Перевіряємо, що браузер справді працює
-        time.sleep(2)  # Чекаємо, щоб браузер встиг запуститися
-        
-        # Перевіряємо, що процес досі активний
-        if process.poll() is not None:
-            error = process.stderr.read().decode('utf-8', errors='ignore')
-            raise Exception(f"Браузер завершився з кодом {process.returncode}. Помилка: {error}")
-            
-        return process, port
-    except Exception as e:
-        raise Exception(f"Не вдалося запустити браузер: {str(e)}")
+class DebugBrowserLauncher(QThread):
+    """Запуск дебаг-браузера та очікування готовності CDP поза потоком GUI"""
+    launched_signal = pyqtSignal(object)
+    error_signal = pyqtSignal(str)
+    
+    def __init__(self, use_user_profile=False, user_profile_dir=None, log_file=None, profile_snapshots=None):
+        super().__init__()
+        self.use_user_profile = use_user_profile
+        self.user_profile_dir = user_profile_dir
+        self.log_file = log_file
+        self.profile_snapshots = profile_snapshots
+        self.browser = None
+    
+    def run(self):
+        try:
+            self.browser = launch_debug_browser(
+                use_user_profile=self.use_user_profile,
+                user_profile_dir=self.user_profile_dir,
+                log_file=self.log_file,
+                profile_snapshots=self.profile_snapshots
+            )
+            self.launched_signal.emit(self.browser)
+        except Exception as e:
+            self.error_signal.emit(str(e))
 
 class ApiKeyDialog(QDialog):
     def __init__(self, parent=None):
@@ -309,7 +206,8 @@ class ApiKeyDialog(QDialog):
         self.accept()
 
 class ProgramEditorDialog(QDialog):
-    def __init__(self, program_name="", program_code="", parent=None):
+    def __init__(self, program_name="", program_code="", llm_cache=False, replay=False, model="", routing=True,
+                 lite=False, state_diff=False, profile=None, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Редактор програми")
         self.setMinimumSize(600, 400)
@@ -331,6 +229,83 @@ class ProgramEditorDialog(QDialog):
         self.layout.addWidget(code_label)
         self.layout.addWidget(self.code_editor)
         
+        # Кеш відповідей моделі для повторних запусків
+        self.llm_cache_checkbox = QCheckBox("Кешувати відповіді моделі")
+        self.llm_cache_checkbox.setChecked(llm_cache)
+        self.llm_cache_checkbox.setToolTip("Повторний запуск на незмінній сторінці не звертається до моделі")
+        self.layout.addWidget(self.llm_cache_checkbox)
+        
+        # Відтворення записаних дій для програм з незмінним сценарієм
+        self.replay_checkbox = QCheckBox("Відтворювати записані дії без моделі")
+        self.replay_checkbox.setChecked(replay)
+        self.replay_checkbox.setToolTip("Перший успішний запуск записується, наступні повторюють його; "
+                                        "модель викликається, лише якщо сторінка змінилася")
+        self.layout.addWidget(self.replay_checkbox)
+        
+        # Полегшений режим для програм, яким достатньо тексту сторінки
+        self.lite_checkbox = QCheckBox("Полегшений режим (без зображень, відео, шрифтів і трекерів)")
+        self.lite_checkbox.setChecked(lite)
+        self.lite_checkbox.setToolTip("Сторінки завантажуються швидше; модель не отримує знімків екрана")
+        self.layout.addWidget(self.lite_checkbox)
+        
+        # Стиснення стану сторінки для довгих програм на великих сторінках
+        self.state_diff_checkbox = QCheckBox("Надсилати моделі лише зміни сторінки між кроками")
+        self.state_diff_checkbox.setChecked(state_diff)
+        self.state_diff_checkbox.setToolTip("Незмінені елементи передаються коротко; повний стан надсилається "
+                                            "після переходу на іншу сторінку, помилки або великих змін")
+        self.layout.addWidget(self.state_diff_checkbox)
+        
+        # Профіль виконання: модель, обмеження кроків і часу, очікування сторінки
+        profile = resolve_profile(profile)
+        profile_group = QGroupBox("Профіль виконання")
+        profile_layout = QFormLayout()
+        
+        # Модель програми замість типової з налаштувань
+        self.model_input = QLineEdit(model)
+        self.model_input.setPlaceholderText("типова з налаштувань")
+        profile_layout.addRow("Модель:", self.model_input)
+        
+        # Швидка модель для простих кроків, основна — після невдач
+        self.routing_checkbox = QCheckBox("Прості кроки виконувати швидкою моделлю")
+        self.routing_checkbox.setChecked(routing)
+        self.routing_checkbox.setToolTip("Діє, якщо в налаштуваннях задано fast_model; після невдалого кроку "
+                                         "та на складних сторінках використовується основна модель")
+        profile_layout.addRow(self.routing_checkbox)
+        
+        self.vision_checkbox = QCheckBox("Надсилати моделі знімки екрана")
+        self.vision_checkbox.setChecked(profile["vision"])
+        profile_layout.addRow(self.vision_checkbox)
+        
+        self.headless_combo = QComboBox()
+        for label, value in (("як у перемикачі", None), ("у фоновому режимі", True), ("з вікном", False)):
+            self.headless_combo.addItem(label, value)
+        self.headless_combo.setCurrentIndex(self.headless_combo.findData(profile["headless"]))
+        profile_layout.addRow("Браузер:", self.headless_combo)
+        
+        self.max_steps_input = self._spin_box(profile["max_steps"], 1, 1000)
+        profile_layout.addRow("Найбільше кроків:", self.max_steps_input)
+        self.max_actions_input = self._spin_box(profile["max_actions_per_step"], 1, 50)
+        profile_layout.addRow("Дій за крок:", self.max_actions_input)
+        
+        # 0 — без обмеження
+        self.step_timeout_input = self._spin_box(profile["step_timeout"] or 0, 0, 3600, " с", "без обмеження")
+        profile_layout.addRow("Тайм-аут кроку:", self.step_timeout_input)
+        self.timeout_input = self._spin_box(profile["timeout"] or 0, 0, 86400, " с", "без обмеження")
+        profile_layout.addRow("Тайм-аут запуску:", self.timeout_input)
+        
+        self.min_page_load_input = self._seconds_box(profile["min_page_load_wait"])
+        self.network_idle_input = self._seconds_box(profile["network_idle_wait"])
+        self.max_page_load_input = self._seconds_box(profile["max_page_load_wait"])
+        page_load_layout = QHBoxLayout()
+        for label, widget in (("від", self.min_page_load_input), ("тиша мережі", self.network_idle_input),
+                              ("до", self.max_page_load_input)):
+            page_load_layout.addWidget(QLabel(label))
+            page_load_layout.addWidget(widget)
+        profile_layout.addRow("Очікування сторінки:", page_load_layout)
+        
+        profile_group.setLayout(profile_layout)
+        self.layout.addWidget(profile_group)
+        
         # Кнопки
         button_layout = QHBoxLayout()
         self.save_button = QPushButton("Зберегти")
@@ -345,61 +320,797 @@ class ProgramEditorDialog(QDialog):
         self.layout.addLayout(button_layout)
         self.setLayout(self.layout)
     
+    @staticmethod
+    def _spin_box(value, minimum, maximum, suffix="", zero_text=""):
+        spin_box = QSpinBox()
+        spin_box.setRange(minimum, maximum)
+        spin_box.setValue(int(value))
+        spin_box.setSuffix(suffix)
+        spin_box.setSpecialValueText(zero_text)
+        return spin_box
+    
+    @staticmethod
+    def _seconds_box(value):
+        spin_box = QDoubleSpinBox()
+        spin_box.setRange(0, 60)
+        spin_box.setSingleStep(0.25)
+        spin_box.setValue(value)
+        spin_box.setSuffix(" с")
+        return spin_box
+    
+    def get_profile(self):
+        """Профіль виконання з полів діалогу"""
+        return resolve_profile({
+            "vision": self.vision_checkbox.isChecked(),
+            "headless": self.headless_combo.currentData(),
+            "max_steps": self.max_steps_input.value(),
+            "max_actions_per_step": self.max_actions_input.value(),
+            "step_timeout": self.step_timeout_input.value() or None,
+            "timeout": self.timeout_input.value() or None,
+            "min_page_load_wait": self.min_page_load_input.value(),
+            "network_idle_wait": self.network_idle_input.value(),
+            "max_page_load_wait": self.max_page_load_input.value(),
+        })
+    
     def get_program_data(self):
         return {
             "name": self.name_input.text().strip(),
-            "code": self.code_editor.toPlainText().strip()
+            "code": self.code_editor.toPlainText().strip(),
+            "llm_cache": self.llm_cache_checkbox.isChecked(),
+            "replay": self.replay_checkbox.isChecked(),
+            "lite": self.lite_checkbox.isChecked(),
+            "state_diff": self.state_diff_checkbox.isChecked(),
+            "model": self.model_input.text().strip(),
+            "routing": self.routing_checkbox.isChecked(),
+            "profile": compact_profile(self.get_profile())
         }
 
+# Назви результатів запуску в історії
+OUTCOME_LABELS = {
+    "success": "✓ Успішно",
+    "failed": "✗ Не виконано",
+    "stopped": "⏹ Зупинено",
+    "error": "❌ Помилка",
+}
+
+def format_duration(seconds):
+    if seconds is None:
+        return ""
+    if seconds < 60:
+        return f"{seconds:.1f} с"
+    return f"{int(seconds // 60)} хв {seconds % 60:.0f} с"
+
+class RunHistoryDialog(QDialog):
+    """Історія запусків: список запусків, кроки обраного запуску та експорт"""
+    
+    ALL_PROGRAMS = "Усі програми"
+    
+    def __init__(self, history, program_name=None, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.runs = []
+        self.setWindowTitle("Історія запусків")
+        self.setMinimumSize(900, 600)
+        
+        layout = QVBoxLayout(self)
+        
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Програма:"))
+        self.program_combo = QComboBox()
+        self.program_combo.addItem(self.ALL_PROGRAMS)
+        self.program_combo.addItems(history.programs())
+        if program_name and self.program_combo.findText(program_name) >= 0:
+            self.program_combo.setCurrentText(program_name)
+        self.program_combo.currentTextChanged.connect(self.load_runs)
+        filter_layout.addWidget(self.program_combo)
+        filter_layout.addStretch()
+        self.export_button = QPushButton("Експорт...")
+        self.export_button.clicked.connect(self.export)
+        filter_layout.addWidget(self.export_button)
+        layout.addLayout(filter_layout)
+        
+        # Середній час останніх запусків у порівнянні з попередніми
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        
+        self.runs_table = self._create_table(["Початок", "Програма", "Результат", "Тривалість", "Кроків"])
+        self.runs_table.currentCellChanged.connect(self.on_run_selected)
+        layout.addWidget(self.runs_table)
+        
+        self.steps_table = self._create_table(["№", "Тривалість", "Ціль", "Оцінка", "Дії", "Помилка"])
+        layout.addWidget(self.steps_table)
+        
+        self.load_runs()
+    
+    def _create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+    
+    def selected_program(self):
+        program = self.program_combo.currentText()
+        return None if program == self.ALL_PROGRAMS else program
+    
+    def load_runs(self):
+        """Запуски обраної програми, новіші першими"""
+        program = self.selected_program()
+        self.runs = self.history.runs(program=program)
+        self._fill(self.runs_table, [
+            [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started_at"])), run["program"],
+             OUTCOME_LABELS.get(run["outcome"], run["outcome"]), format_duration(run["duration"]),
+             str(run["step_count"])]
+            for run in self.runs
+        ])
+        self.steps_table.setRowCount(0)
+        self.summary_label.setText(self._summary_text(program))
+        if self.runs:
+            self.runs_table.setCurrentCell(0, 0)
+    
+    def _summary_text(self, program):
+        summary = [item for item in self.history.summary() if program is None or item["program"] == program]
+        if not summary:
+            return "Запусків ще немає"
+        lines = []
+        for item in summary:
+            line = (f"{item['program']}: {item['successes']}/{item['runs']} успішних, "
+                    f"в середньому {format_duration(item['avg_duration'])}")
+            if item["recent_avg"] is not None and item["previous_avg"]:
+                change = (item["recent_avg"] - item["previous_avg"]) / item["previous_avg"] * 100
+                line += f", останні запуски {change:+.0f}% до попередніх"
+            lines.append(line)
+        return "\n".join(lines[:5])
+    
+    def on_run_selected(self, row, *args):
+        if not 0 <= row < len(self.runs):
+            self.steps_table.setRowCount(0)
+            return
+        steps = self.history.steps(self.runs[row]["id"])
+        self._fill(self.steps_table, [
+            [str(step["number"] or ""), format_duration(step["duration"]), step["goal"] or "",
+             step["evaluation"] or "", ", ".join(step["actions"]), step["error"] or ""]
+            for step in steps
+        ])
+    
+    def _fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+    
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Експорт історії", "webmorpher-history.json",
+                                              "JSON (*.json);;CSV (*.csv)")
+        if not path:
+            return
+        try:
+            count = self.history.export(path, program=self.selected_program())
+            QMessageBox.information(self, "Експорт", f"Експортовано запусків: {count}")
+        except Exception as e:
+            QMessageBox.warning(self, "Помилка", f"Не вдалося експортувати історію: {e}")
+
+JOB_STATUS_LABELS = {
+    "queued": "⏳ У черзі",
+    "running": "▶ Виконується",
+    "succeeded": "✓ Успішно",
+    "failed": "✗ Не виконано",
+    "cancelled": "⏹ Скасовано",
+}
+
+class JobQueueDialog(QDialog):
+    """Спільна черга завдань: вузли-виконавці, завдання та лог обраного завдання"""
+    
+    REFRESH_INTERVAL_MS = 2000
+    
+    def __init__(self, queue, program=None, ask_values=None, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.program = program
+        # ask_values(code) повертає значення підстановок або None, якщо скасовано
+        self.ask_values = ask_values or (lambda code: {})
+        self.jobs = []
+        self.shown_job = None
+        self.shown_seq = 0
+        self.setWindowTitle("Черга завдань")
+        self.setMinimumSize(900, 600)
+        
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Черга: {queue.path}"))
+        
+        self.nodes_table = self._create_table(["Вузол", "Машина", "Стан", "Виконується", "Останній сигнал"])
+        layout.addWidget(self.nodes_table)
+        
+        buttons = QHBoxLayout()
+        self.submit_button = QPushButton(
+            f"Додати «{program.get('name', 'Без назви')}» в чергу" if program else "Додати в чергу"
+        )
+        self.submit_button.setEnabled(program is not None)
+        self.submit_button.clicked.connect(self.submit_program)
+        self.cancel_button = QPushButton("Скасувати завдання")
+        self.cancel_button.clicked.connect(self.cancel_job)
+        buttons.addWidget(self.submit_button)
+        buttons.addWidget(self.cancel_button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+        
+        self.jobs_table = self._create_table(["Створено", "Програма", "Стан", "Вузол", "Спроб", "Помилка"])
+        self.jobs_table.currentCellChanged.connect(self.on_job_selected)
+        layout.addWidget(self.jobs_table)
+        
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        layout.addWidget(self.log_view)
+        
+        self.refresh()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(self.REFRESH_INTERVAL_MS)
+    
+    _create_table = RunHistoryDialog._create_table
+    _fill = RunHistoryDialog._fill
+    
+    def refresh(self):
+        """Перечитати вузли та завдання (інші вузли змінюють чергу без сповіщень)"""
+        now = time.time()
+        self._fill(self.nodes_table, [
+            [node["node"], f"{node['host']} (pid {node['pid']})",
+             "Зупинено" if node["stopped"] else ("Працює" if node["online"] else "Не відповідає"),
+             f"{node['running']} з {node['capacity']}", f"{format_duration(now - node['heartbeat_at'])} тому"]
+            for node in self.queue.nodes()
+        ])
+        selected = self.selected_job()
+        self.jobs = self.queue.jobs()
+        self._fill(self.jobs_table, [
+            [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job["created_at"])), job["name"],
+             JOB_STATUS_LABELS.get(job["status"], job["status"]), job["node"] or "", str(job["attempts"]),
+             job["error"] or ""]
+            for job in self.jobs
+        ])
+        ids = [job["id"] for job in self.jobs]
+        if selected is not None and selected["id"] in ids:
+            self.jobs_table.setCurrentCell(ids.index(selected["id"]), 0)
+        self.show_events()
+    
+    def selected_job(self):
+        row = self.jobs_table.currentRow()
+        return self.jobs[row] if 0 <= row < len(self.jobs) else None
+    
+    def on_job_selected(self, *args):
+        self.show_events()
+    
+    def show_events(self):
+        """Дописати нові події обраного завдання в лог"""
+        job = self.selected_job()
+        job_id = job["id"] if job else None
+        if job_id != self.shown_job:
+            self.shown_job = job_id
+            self.shown_seq = 0
+            self.log_view.clear()
+        if job_id is None:
+            return
+        for event in self.queue.events(job_id, self.shown_seq):
+            data = event["data"]
+            if event["kind"] == "log":
+                line = data["message"]
+            elif event["kind"] == "status":
+                line = f"— {JOB_STATUS_LABELS.get(data['status'], data['status'])}"
+                if data.get("node"):
+                    line += f" ({data['node']})"
+            else:
+                line = f"Результат: {data.get('final_result') or ''}"
+            self.log_view.appendPlainText(f"{time.strftime('%H:%M:%S', time.localtime(event['time']))} {line}")
+            self.shown_seq = event["seq"]
+    
+    def submit_program(self):
+        values = self.ask_values(self.program.get("code", ""))
+        if values is None:
+            return
+        program = {key: value for key, value in self.program.items() if key != "id"}
+        program["code"] = render_task(program.get("code", ""), values)
+        self.queue.submit(program)
+        self.refresh()
+        self.jobs_table.setCurrentCell(0, 0)
+    
+    def cancel_job(self):
+        job = self.selected_job()
+        if job is None or job["status"] not in ("queued", "running"):
+            return
+        # Виконуване завдання зупиняє його вузол під час сигналу життя
+        self.queue.cancel(job["id"])
+        self.refresh()
+
+# Кольори повідомлень агента в лозі та статусі
+LOG_COLORS = [
+    ("🎯 Наступна ціль:", "#2196F3"),
+    ("✓ Результат:", "#4CAF50"),
+    ("🤔 Модель думає:", "#FF9800"),
+    ("🌐 Браузер:", "#9C27B0"),
+    ("❌ Помилка:", "#F44336"),
+]
+
+# Лог запуску оновлюється пакетами приблизно 30 разів на секунду
+LOG_FLUSH_INTERVAL_MS = 33
+LOG_BATCH_LIMIT = 500
+DEFAULT_LOG_MAX_LINES = 5000
+
+def log_color(message):
+    return next((color for prefix, color in LOG_COLORS if prefix in message), None)
+
+class RunPanel(QWidget):
+    """Панель одного запуску програми: власний статус, лог та керування"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    PAUSED = "paused"
+    FINISHED = "finished"
+    FAILED = "failed"
+    STOPPED = "stopped"
+    
+    state_changed = pyqtSignal()
+    
+    def __init__(self, program, runner, max_lines=DEFAULT_LOG_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.program = program
+        self.runner = runner
+        self.state = self.QUEUED
+        self.log = RingLog(max_lines, name=program.get('name', 'run'))
+        
+        layout = QVBoxLayout(self)
+        
+        # Панель статуса
+        status_frame = QFrame()
+        status_frame.setFrameStyle(QFrame.StyledPanel | QFrame.Raised)
+        status_layout = QHBoxLayout(status_frame)
+        
+        self.status_label = QLabel("У черзі...")
+        self.status_label.setFont(QFont("", 11))
+        self.status_label.setStyleSheet("padding: 10px;")
+        self.status_label.setWordWrap(True)
+        status_layout.addWidget(self.status_label, 1)
+        
+        self.pause_button = QPushButton("Пауза")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.pause_button.setEnabled(False)
+        status_layout.addWidget(self.pause_button)
+        
+        self.stop_button = QPushButton("Зупинити")
+        self.stop_button.clicked.connect(self.stop)
+        status_layout.addWidget(self.stop_button)
+        
+        layout.addWidget(status_frame)
+        
+        # Лог запуску: показуються лише останні max_lines рядків
+        self.result_view = QPlainTextEdit()
+        self.result_view.setReadOnly(True)
+        self.result_view.setMaximumBlockCount(self.log.max_lines)
+        layout.addWidget(self.result_view)
+        
+        # Шлях до файлу зі старішими рядками логу
+        self.spool_label = QLabel()
+        self.spool_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.spool_label.hide()
+        layout.addWidget(self.spool_label)
+        
+        self.append_log(f"Запуск програми: {program.get('name', 'Без назви')}")
+        
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_logs)
+        
+        self.runner.error_signal.connect(self.on_error)
+        self.runner.finished_signal.connect(self.on_finished)
+        self.runner.finished.connect(self.on_thread_done)
+    
+    def is_active(self):
+        """Чи запуск ще в черзі або виконується"""
+        return self.state in (self.QUEUED, self.RUNNING, self.PAUSED)
+    
+    def start(self):
+        """Запуск потоку виконання (викликається планувальником)"""
+        if self.state != self.QUEUED:
+            return
+        self._set_state(self.RUNNING)
+        self.set_status("Запущено програму...")
+        self.flush_timer.start()
+        self.runner.start()
+    
+    def set_status(self, message, color="black"):
+        self.status_label.setText(message)
+        self.status_label.setStyleSheet(f"padding: 10px; color: {color};")
+    
+    def flush_logs(self):
+        """Перенести накопичені логи від browser-use у вигляд одним пакетом"""
+        messages = self.runner.log_buffer.drain(LOG_BATCH_LIMIT)
+        if not messages:
+            return
+        entries = [(message, log_color(message)) for message in messages]
+        self._write_entries(entries)
+        
+        # Оновлюємо статус у верхньому полі лише останнім повідомленням пакета
+        message, color = entries[-1]
+        self.set_status(message, color or "black")
+    
+    def append_log(self, message, color=None):
+        """Додати рядок одразу після вже накопичених логів"""
+        self.flush_logs()
+        self._write_entries([(message, color)])
+    
+    def on_error(self, error_message):
+        """Обробник помилок від browser-use"""
+        self.append_log(error_message, "red")
+        if self.state != self.STOPPED:
+            self._set_state(self.FAILED)
+    
+    def on_finished(self):
+        """Обробник завершення виконання browser-use"""
+        self.append_log("Виконання програми завершено.")
+        if self.state != self.STOPPED:
+            self._set_state(self.FINISHED)
+    
+    def on_thread_done(self):
+        """Потік завершився: забрати залишок логів і зупинити таймер"""
+        self.flush_timer.stop()
+        while len(self.runner.log_buffer):
+            self.flush_logs()
+    
+    def _write_entries(self, entries):
+        scrollbar = self.result_view.verticalScrollBar()
+        # Прокручуємо донизу, лише якщо користувач не гортає лог вище
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        
+        self.result_view.setUpdatesEnabled(False)
+        for message, color in entries:
+            text = html.escape(message).replace("\n", "<br>")
+            if color:
+                text = f"<span style='color: {color};'>{text}</span>"
+            self.result_view.appendHtml(text)
+        self.result_view.setUpdatesEnabled(True)
+        
+        if self.log.add(message for message, _ in entries):
+            self.spool_label.setText(f"Старіші рядки логу ({self.log.spooled}) збережено у файл: {self.log.spool_path}")
+            self.spool_label.show()
+        
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+    
+    def toggle_pause(self):
+        """Призупинення або відновлення виконання"""
+        if self.state == self.RUNNING:
+            self.runner.pause()
+            self._set_state(self.PAUSED)
+            self.set_status("Програму призупинено...")
+        elif self.state == self.PAUSED:
+            self.runner.resume()
+            self._set_state(self.RUNNING)
+            self.set_status("Програму відновлено...")
+    
+    def stop(self):
+        """Зупинка виконання (або видалення з черги)"""
+        if not self.is_active():
+            return
+        was_queued = self.state == self.QUEUED
+        self.runner.stop()
+        self._set_state(self.STOPPED)
+        self.set_status("Програму зупинено..." if not was_queued else "Запуск скасовано")
+    
+    def _set_state(self, state):
+        self.state = state
+        self.pause_button.setEnabled(state in (self.RUNNING, self.PAUSED))
+        self.pause_button.setText("Продовжити" if state == self.PAUSED else "Пауза")
+        self.stop_button.setEnabled(self.is_active())
+        self.state_changed.emit()
+
+class RunScheduler(QObject):
+    """Черга запусків, що виконує не більше max_concurrent програм одночасно"""
+    changed = pyqtSignal()
+    
+    def __init__(self, max_concurrent=2, parent=None):
+        super().__init__(parent)
+        self.max_concurrent = max(1, max_concurrent)
+        self.pending = deque()
+        self.running = []
+    
+    def submit(self, run):
+        """Додати запуск у чергу"""
+        run.runner.finished.connect(partial(self._on_thread_finished, run))
+        run.queued_at = time.monotonic()
+        self.pending.append(run)
+        self._start_next()
+    
+    def set_max_concurrent(self, value):
+        self.max_concurrent = max(1, value)
+        self._start_next()
+    
+    def stop_all(self):
+        """Зупинити всі запуски та очистити чергу"""
+        for run in list(self.pending) + list(self.running):
+            run.stop()
+        self._start_next()
+    
+    def active_count(self):
+        return len(self.running)
+    
+    def queued_count(self):
+        return sum(1 for run in self.pending if run.is_active())
+    
+    def _start_next(self):
+        # Запуски, скасовані поки чекали в черзі, просто пропускаємо
+        self.pending = deque(run for run in self.pending if run.is_active())
+        while self.pending and len(self.running) < self.max_concurrent:
+            run = self.pending.popleft()
+            self.running.append(run)
+            metrics.RUN_QUEUE_WAIT.observe(time.monotonic() - run.queued_at)
+            run.start()
+        self.changed.emit()
+    
+    def _on_thread_finished(self, run):
+        if run in self.running:
+            self.running.remove(run)
+        self._start_next()
+
+class ProgramListModel(QAbstractListModel):
+    """Модель списку програм з фільтром пошуку.
+
+    programs — спільний зі сховищем список усіх програм; у списку
+    відображаються лише програми, що відповідають запиту. Зміна програми
+    оновлює один рядок, а не весь список.
+    """
+    
+    def __init__(self, programs, parent=None):
+        super().__init__(parent)
+        self.programs = programs
+        self.search_index = ProgramIndex(programs)
+        self.query = ""
+        self._rows = list(programs)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()].get("name", "Без назви")
+        return None
+    
+    def program_at(self, row):
+        """Програма у видимому рядку row або None"""
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+    
+    def row_of(self, program):
+        """Видимий рядок програми або -1"""
+        if program is not None:
+            for row, candidate in enumerate(self._rows):
+                if candidate["id"] == program["id"]:
+                    return row
+        return -1
+    
+    def set_filter(self, query):
+        """Показати лише програми, що містять усі слова запиту"""
+        self.query = query
+        ids = self.search_index.search(query)
+        self.beginResetModel()
+        self._rows = [program for program in self.programs if ids is None or program["id"] in ids]
+        self.endResetModel()
+    
+    def append(self, program):
+        self.programs.append(program)
+        self.search_index.add(program)
+        if self._matches(program):
+            row = len(self._rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._rows.append(program)
+            self.endInsertRows()
+    
+    def replace(self, old, new):
+        """Замінити програму old на new (з тим самим id)"""
+        self.programs[self._position(old)] = new
+        self.search_index.update(new)
+        row = self.row_of(old)
+        if row >= 0 and self._matches(new):
+            self._rows[row] = new
+            self.dataChanged.emit(self.index(row), self.index(row))
+        elif row >= 0:
+            self._remove_row(row)
+        elif self._matches(new):
+            # Після редагування програма почала відповідати запиту
+            visible = {program["id"] for program in self._rows}
+            row = sum(1 for program in self.programs[:self._position(new)] if program["id"] in visible)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._rows.insert(row, new)
+            self.endInsertRows()
+    
+    def remove(self, program):
+        del self.programs[self._position(program)]
+        self.search_index.remove(program["id"])
+        row = self.row_of(program)
+        if row >= 0:
+            self._remove_row(row)
+    
+    def _remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+    
+    def _position(self, program):
+        for position, candidate in enumerate(self.programs):
+            if candidate["id"] == program["id"]:
+                return position
+        raise ValueError(f"Програму не знайдено: {program.get('name')}")
+    
+    def _matches(self, program):
+        ids = self.search_index.search(self.query)
+        return ids is None or program["id"] in ids
+
+
+class ProgramListView(QListView):
+    """Список програм, що малює лише видимі рядки.
+    
+    Має ті самі методи, що й QListWidget (count, currentRow,
+    setCurrentRow, currentRowChanged).
+    """
+    currentRowChanged = pyqtSignal(int)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Однакова висота рядків: Qt не вимірює кожен рядок списку
+        self.setUniformItemSizes(True)
+    
+    def count(self):
+        return self.model().rowCount() if self.model() is not None else 0
+    
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+    
+    def setCurrentRow(self, row):
+        self.setCurrentIndex(self.model().index(row, 0) if row >= 0 else QModelIndex())
+    
+    def currentChanged(self, current, previous):
+        super().currentChanged(current, previous)
+        self.currentRowChanged.emit(current.row() if current.isValid() else -1)
+
+
 class WebMorpherApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.api_key = ""
+        self.store = None
         self.programs = []
         self.current_program = None
-        self.program_running = False
-        self.browser_runner = None
-        self.debug_browser_process = None
+        self.runs = []
+        self.max_concurrent_runs = 2
+        self.log_max_lines = DEFAULT_LOG_MAX_LINES
+        self.browser_pool = None
+        self.pool_settings = {}
+        self.llm_cache = None
+        self.llm_cache_settings = {}
+        self.llm_settings = {}
+        self.trace_store = None
+        self.profile_snapshots = None
+        self.profile_snapshot_settings = {}
+        self.checkpoints = None
+        self.checkpoint_settings = {}
+        self.lite_mode_settings = {}
+        self.state_diff_settings = {}
+        self.cdp_pool = None
+        self.cdp_settings = {}
+        self.process_pool = None
+        self.process_pool_settings = {}
+        self.run_history = None
+        self.history_settings = {}
+        self.job_queue = None
+        self.server_settings = {}
+        self.metrics_settings = {}
+        self.metrics_exporters = []
+        # Запущені дебаг-браузери; запуски підключаються до останнього
+        self.debug_browsers = []
+        self.debug_launcher = None
         self.debug_port = None
-        self.chrome_profile_path = get_default_chrome_profile()
+        # Профіль Chrome шукаємо вже після показу вікна
+        self.chrome_profile_path = None
         self.current_status = None
+        self._first_show_done = False
         
         self.setWindowTitle("WebMorpher")
         self.setGeometry(100, 100, 1000, 700)
         
         # Спочатку перевіряємо наявність API ключа
-        self.load_config()
+        with STARTUP.phase("load_config"):
+            self.load_config()
         if not self.check_api_key():
             sys.exit()
-            
-        self.setup_ui()
+        
+        with STARTUP.phase("setup_ui"):
+            self.setup_ui()
+        self.start_metrics_export()
+    
+    def showEvent(self, event):
+        """Відкладена ініціалізація після першого показу вікна"""
+        super().showEvent(event)
+        if not self._first_show_done:
+            self._first_show_done = True
+            QTimer.singleShot(0, self.on_first_show)
+    
+    def on_first_show(self):
+        """Пошук профілю Chrome та фонове завантаження агента"""
+        with STARTUP.phase("detect_chrome_profile"):
+            self.detect_chrome_profile()
+        # Імпорт browser-use та langchain займає секунди, тому робимо його
+        # у фоні, поки користувач обирає програму
+        if not STARTUP.enabled:
+            threading.Thread(target=preload_agent_stack, name="webmorpher-preload", daemon=True).start()
+    
+    def detect_chrome_profile(self):
+        """Визначення профілю Chrome та оновлення відповідної опції"""
+        self.chrome_profile_path = get_default_chrome_profile()
+        if not self.chrome_profile_path:
+            self.use_user_profile_checkbox.setEnabled(False)
+            self.use_user_profile_checkbox.setToolTip("Профіль Chrome не знайдено")
+        else:
+            self.use_user_profile_checkbox.setEnabled(True)
+            self.use_user_profile_checkbox.setToolTip("Запускати з профілем, де збережені паролі, історія та налаштування")
+            # Если профиль найден, активируем опцию по умолчанию
+            self.use_user_profile_checkbox.setChecked(True)
         
     def load_config(self):
-        """Завантаження конфігурації з файлу"""
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
-                    self.api_key = config.get('api_key', '')
-                    self.programs = config.get('programs', [])
-            except Exception as e:
-                print(f"Помилка завантаження конфігурації: {e}")
+        """Завантаження програм і налаштувань зі сховища"""
+        try:
+            # Під час першого запуску сховище імпортує ~/.webmorpher_config.json
+            self.store = open_store(CONFIG_FILE)
+            config = self.store.settings()
+            self.api_key = config.get('api_key', '')
+            self.programs = self.store.programs()
+            self.pool_settings = config.get('browser_pool', {})
+            self.llm_cache_settings = config.get('llm_cache', {})
+            self.llm_settings = config.get('llm', {})
+            self.profile_snapshot_settings = config.get('profile_snapshots', {})
+            self.checkpoint_settings = config.get('checkpoints', {})
+            self.lite_mode_settings = config.get('lite_mode', {})
+            self.state_diff_settings = config.get('state_diff', {})
+            self.cdp_settings = config.get('cdp_endpoints', {})
+            self.process_pool_settings = config.get('process_pool', {})
+            self.history_settings = config.get('run_history', {})
+            self.server_settings = config.get('server', {})
+            self.metrics_settings = config.get('metrics', {})
+            self.max_concurrent_runs = config.get('max_concurrent_runs', self.max_concurrent_runs)
+            self.log_max_lines = config.get('log_max_lines', self.log_max_lines)
+        except Exception as e:
+            print(f"Помилка завантаження конфігурації: {e}")
     
     def save_config(self):
-        """Збереження конфігурації у файл"""
+        """Збереження налаштувань (програми зберігаються окремо при кожній зміні)"""
+        if self.store is None:
+            return
         config = {
             'api_key': self.api_key,
-            'programs': self.programs
+            'browser_pool': self.pool_settings,
+            'llm_cache': self.llm_cache_settings,
+            'llm': self.llm_settings,
+            'profile_snapshots': self.profile_snapshot_settings,
+            'checkpoints': self.checkpoint_settings,
+            'lite_mode': self.lite_mode_settings,
+            'state_diff': self.state_diff_settings,
+            'cdp_endpoints': self.cdp_settings,
+            'process_pool': self.process_pool_settings,
+            'run_history': self.history_settings,
+            'server': self.server_settings,
+            'metrics': self.metrics_settings,
+            'max_concurrent_runs': self.max_concurrent_runs,
+            'log_max_lines': self.log_max_lines
         }
         try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(config, f)
+            self.store.set_settings(config)
         except Exception as e:
             print(f"Помилка збереження конфігурації: {e}")
     
     def check_api_key(self):
         """Перевірка наявності API ключа"""
-        if not self.api_key:
+        # Локальній моделі ключ OpenAI не потрібен
+        if not self.api_key and requires_api_key(self.llm_settings):
             dialog = ApiKeyDialog(self)
             # Убедиться, что поле ввода пустое
             dialog.key_input.setText("")  
@@ -444,6 +1155,12 @@ class WebMorpherApp(QMainWindow):
         self.debug_button = QPushButton("Режим дебагу")
         self.debug_button.clicked.connect(self.launch_debug_browser)
         
+        self.history_button = QPushButton("Історія запусків")
+        self.history_button.clicked.connect(self.show_run_history)
+        
+        self.queue_button = QPushButton("Черга завдань")
+        self.queue_button.clicked.connect(self.show_job_queue)
+        
         self.api_button = QPushButton("Змінити API ключ")
         self.api_button.clicked.connect(self.change_api_key)
         
@@ -454,6 +1171,8 @@ class WebMorpherApp(QMainWindow):
         control_layout.addWidget(self.pause_button)
         control_layout.addWidget(self.stop_button)
         control_layout.addWidget(self.debug_button)
+        control_layout.addWidget(self.history_button)
+        control_layout.addWidget(self.queue_button)
         control_layout.addWidget(self.api_button)
         
         main_layout.addLayout(control_layout)
@@ -465,16 +1184,20 @@ class WebMorpherApp(QMainWindow):
         
         # Опція використання профілю користувача
         self.use_user_profile_checkbox = QCheckBox("Використовувати поточний профіль браузера")
-        self.use_user_profile_checkbox.setToolTip("Запускати з профілем, де збережені паролі, історія та налаштування")
-        if not self.chrome_profile_path:
-            self.use_user_profile_checkbox.setEnabled(False)
-            self.use_user_profile_checkbox.setToolTip("Профіль Chrome не знайдено")
-        else:
-            # Если профиль найден, активируем опцию по умолчанию
-            self.use_user_profile_checkbox.setChecked(True)
+        # Стан опції оновлюється після пошуку профілю (detect_chrome_profile)
+        self.use_user_profile_checkbox.setEnabled(False)
+        self.use_user_profile_checkbox.setToolTip("Пошук профілю Chrome...")
         
         headless_layout.addWidget(self.use_user_profile_checkbox)
         headless_layout.addStretch()
+        
+        # Кількість програм, що виконуються одночасно
+        headless_layout.addWidget(QLabel("Паралельних запусків:"))
+        self.concurrency_spinbox = QSpinBox()
+        self.concurrency_spinbox.setRange(1, 32)
+        self.concurrency_spinbox.setValue(self.max_concurrent_runs)
+        self.concurrency_spinbox.valueChanged.connect(self.on_concurrency_changed)
+        headless_layout.addWidget(self.concurrency_spinbox)
         main_layout.addLayout(headless_layout)
         
         # Розділювач для списку програм та вкладок з результатами
@@ -485,10 +1208,17 @@ class WebMorpherApp(QMainWindow):
         program_layout = QVBoxLayout(program_frame)
         
         program_label = QLabel("Доступні програми:")
-        self.program_list = QListWidget()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Пошук за назвою або кодом...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.on_search_changed)
+        self.program_model = ProgramListModel(self.programs, self)
+        self.program_list = ProgramListView()
+        self.program_list.setModel(self.program_model)
         self.program_list.currentRowChanged.connect(self.on_program_selected)
         
         program_layout.addWidget(program_label)
+        program_layout.addWidget(self.search_input)
         program_layout.addWidget(self.program_list)
         
         splitter.addWidget(program_frame)
@@ -529,10 +1259,15 @@ class WebMorpherApp(QMainWindow):
         
         result_layout.addWidget(status_frame)
         
-        # Лог результатів
-        self.result_view = QTextEdit()
-        self.result_view.setReadOnly(True)
-        result_layout.addWidget(self.result_view)
+        # Окрема вкладка з логом для кожного запуску
+        self.run_tabs = QTabWidget()
+        self.run_tabs.setTabsClosable(True)
+        self.run_tabs.tabCloseRequested.connect(self.close_run_tab)
+        result_layout.addWidget(self.run_tabs)
+        
+        # Планувальник паралельних запусків
+        self.scheduler = RunScheduler(self.max_concurrent_runs, self)
+        self.scheduler.changed.connect(self.update_run_controls)
         
         self.tabs.addTab(self.view_tab, "Програма")
         self.tabs.addTab(self.result_tab, "Результати")
@@ -549,28 +1284,40 @@ class WebMorpherApp(QMainWindow):
         # Статус бар
         self.statusBar().showMessage("Готовий до роботи")
         
-        # Завантаження списку програм
-        self.load_program_list()
+        # Підсумок метрик запусків у рядку стану
+        self.metrics_label = QLabel()
+        self.statusBar().addPermanentWidget(self.metrics_label)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(1000)
+        self.metrics_timer.timeout.connect(self.update_metrics_summary)
+        self.metrics_timer.start()
+        self.update_metrics_summary()
     
-    def load_program_list(self):
-        """Завантаження списку програм"""
-        self.program_list.clear()
-        for program in self.programs:
-            self.program_list.addItem(program.get("name", "Без назви"))
+    def on_search_changed(self, text):
+        """Фільтрація списку програм; обрана програма лишається обраною, якщо видима"""
+        current = self.current_program
+        self.program_model.set_filter(text)
+        row = self.program_model.row_of(current)
+        self.program_list.setCurrentRow(row)
+        if row < 0:
+            self.on_program_selected(-1)
     
     def on_program_selected(self, index):
         """Обробка вибору програми в списку"""
-        if index >= 0 and index < len(self.programs):
-            program = self.programs[index]
+        program = self.program_model.program_at(index)
+        if program is not None:
             self.current_program = program
             self.code_view.setPlainText(program.get("code", ""))
-            self.result_view.clear()
+            # Показуємо останній запуск обраної програми, якщо він є
+            run = self.latest_run(program)
+            if run is not None:
+                self.run_tabs.setCurrentWidget(run)
             self.status_label.setText("Обрано програму...")
             self.status_label.setStyleSheet("padding: 10px; color: black;")
         else:
             self.current_program = None
             self.code_view.clear()
-            self.result_view.clear()
+        self.update_run_controls()
     
     def create_program(self):
         """Створення нової програми"""
@@ -581,9 +1328,8 @@ class WebMorpherApp(QMainWindow):
                 QMessageBox.warning(self, "Помилка", "Назва програми не може бути порожньою")
                 return
             
-            self.programs.append(program_data)
-            self.save_config()
-            self.load_program_list()
+            self.store.add_program(program_data)
+            self.program_model.append(program_data)
             self.status_label.setText("Створено нову програму...")
             self.status_label.setStyleSheet("padding: 10px; color: black;")
     
@@ -593,10 +1339,16 @@ class WebMorpherApp(QMainWindow):
             QMessageBox.warning(self, "Помилка", "Спочатку оберіть програму для редагування")
             return
         
-        index = self.program_list.currentRow()
         dialog = ProgramEditorDialog(
             program_name=self.current_program.get("name", ""),
             program_code=self.current_program.get("code", ""),
+            llm_cache=self.current_program.get("llm_cache", False),
+            replay=self.current_program.get("replay", False),
+            model=self.current_program.get("model", ""),
+            routing=self.current_program.get("routing", True),
+            lite=self.current_program.get("lite", False),
+            state_diff=self.current_program.get("state_diff", False),
+            profile=self.current_program.get("profile"),
             parent=self
         )
         
@@ -606,10 +1358,12 @@ class WebMorpherApp(QMainWindow):
                 QMessageBox.warning(self, "Помилка", "Назва програми не може бути порожньою")
                 return
             
-            self.programs[index] = program_data
-            self.save_config()
-            self.load_program_list()
-            self.program_list.setCurrentRow(index)
+            program_data["id"] = self.current_program["id"]
+            self.store.update_program(program_data)
+            self.program_model.replace(self.current_program, program_data)
+            row = self.program_model.row_of(program_data)
+            self.program_list.setCurrentRow(row)
+            self.on_program_selected(row)
             self.status_label.setText("Програму оновлено...")
             self.status_label.setStyleSheet("padding: 10px; color: black;")
     
@@ -619,7 +1373,6 @@ class WebMorpherApp(QMainWindow):
             QMessageBox.warning(self, "Помилка", "Спочатку оберіть програму для видалення")
             return
         
-        index = self.program_list.currentRow()
         program_name = self.current_program.get("name", "Без назви")
         
         reply = QMessageBox.question(
@@ -629,9 +1382,9 @@ class WebMorpherApp(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            self.programs.pop(index)
-            self.save_config()
-            self.load_program_list()
+            self.store.delete_program(self.current_program["id"])
+            self.program_model.remove(self.current_program)
+            self.on_program_selected(self.program_list.currentRow())
             self.status_label.setText("Програму видалено...")
             self.status_label.setStyleSheet("padding: 10px; color: black;")
     
@@ -647,224 +1400,357 @@ class WebMorpherApp(QMainWindow):
         if not program_code.strip():
             QMessageBox.warning(self, "Помилка", "Програма не містить коду для виконання")
             return
-            
-        self.program_running = True
-        self.pause_button.setEnabled(True)
-        self.stop_button.setEnabled(True)
-        self.run_button.setEnabled(False)
         
-        # Перемикаємося на вкладку результатів
-        self.tabs.setCurrentIndex(1)
-        
-        # Очищаємо вікно результатів і статус
-        self.result_view.clear()
-        self.status_label.setText("Запуск програми...")
-        self.status_label.setStyleSheet("padding: 10px; color: black;")
-        self.result_view.append(f"Запуск програми: {program_name}")
+        # Значення підстановок {{...}} для одного запуску (для таблиць — webmorpher batch)
+        values = self.ask_placeholder_values(program_code)
+        if values is None:
+            return
+        program_code = render_task(program_code, values)
+        
+        # Перерваний запуск цієї програми можна продовжити з останнього кроку;
+        # точки запусків, що ще виконуються, не пропонуються і не видаляються
+        checkpoints = self.get_checkpoints()
+        checkpoint_id = uuid.uuid4().hex
+        resume = False
+        if checkpoints is not None:
+            active = {run.runner.checkpoint_id for run in self.runs if run.is_active()}
+            checkpoint = checkpoints.load(program_code, exclude=active)
+            if checkpoint is not None:
+                reply = QMessageBox.question(
+                    self, "Перерваний запуск",
+                    f"Попередній запуск програми '{program_name}' перервано після кроку {checkpoint['steps']}. "
+                    f"Продовжити з кроку {checkpoint['steps'] + 1}?",
+                    QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+                )
+                if reply == QMessageBox.Cancel:
+                    return
+                resume = reply == QMessageBox.Yes
+                if resume:
+                    checkpoint_id = checkpoint['run_id']
+                else:
+                    checkpoints.delete(program_code, checkpoint['run_id'])
         
         # Визначаємо, який профіль використовувати
         use_user_profile = self.use_user_profile_checkbox.isChecked() and self.chrome_profile_path
         user_profile = self.chrome_profile_path if use_user_profile else None
         
-        # Повідомлення про профіль
-        if use_user_profile:
-            self.result_view.append(f"Використовуємо профіль користувача: {self.chrome_profile_path}")
-        
-        # Створюємо та запускаємо потік для browser-use
+        # Створюємо потік для browser-use
         headless = self.headless_checkbox.isChecked()
-        self.browser_runner = BrowserUseRunner(
+        process_pool = self.get_process_pool()
+        runner = BrowserUseRunner(
             api_key=self.api_key,
             task=program_code,
             headless=headless,
             debug_port=self.debug_port,
-            user_profile_dir=user_profile
+            user_profile_dir=user_profile,
+            browser_pool=self.get_browser_pool() if process_pool is None else None,
+            llm_cache=self.get_llm_cache() if self.current_program.get("llm_cache") else None,
+            trace_store=self.get_trace_store() if self.current_program.get("replay") else None,
+            cdp_pool=self.get_cdp_pool() if process_pool is None else None,
+            run_history=self.get_run_history(),
+            name=program_name,
+            llm_settings=program_llm_settings(self.llm_settings, self.current_program),
+            profile_snapshots=self.get_profile_snapshots() if use_user_profile else None,
+            lite_mode=self.lite_mode_settings if self.current_program.get("lite") else None,
+            state_diff=self.state_diff_settings if self.current_program.get("state_diff") else None,
+            profile=self.current_program.get("profile"),
+            checkpoints=checkpoints,
+            checkpoint_id=checkpoint_id,
+            resume_checkpoint=resume,
+            process_pool=process_pool
         )
         
-        # Підключаємо сигнали
-        self.browser_runner.log_signal.connect(self.on_browser_log)
-        self.browser_runner.error_signal.connect(self.on_browser_error)
-        self.browser_runner.finished_signal.connect(self.on_browser_finished)
+        # Окрема панель з логом та статусом для цього запуску
+        run = RunPanel(self.current_program, runner, max_lines=self.log_max_lines)
+        run.state_changed.connect(self.update_run_controls)
+        self.runs.append(run)
         
-        # Запускаємо виконання
-        self.browser_runner.start()
-        
-        self.status_label.setText("Запущено програму...")
-        self.status_label.setStyleSheet("padding: 10px; color: black;")
-    
-    def on_browser_log(self, message):
-        """Обробник логів від browser-use"""
-        # Додаємо повідомлення в лог з відповідним форматуванням
-        if "🎯 Наступна ціль:" in message:
-            self.result_view.append(f"<span style='color: #2196F3;'>{message}</span>")
-        elif "✓ Результат:" in message:
-            self.result_view.append(f"<span style='color: #4CAF50;'>{message}</span>")
-        elif "🤔 Модель думає:" in message:
-            self.result_view.append(f"<span style='color: #FF9800;'>{message}</span>")
-        elif "🌐 Браузер:" in message:
-            self.result_view.append(f"<span style='color: #9C27B0;'>{message}</span>")
-        elif "❌ Помилка:" in message:
-            self.result_view.append(f"<span style='color: #F44336;'>{message}</span>")
-        else:
-            self.result_view.append(message)
+        # Повідомлення про профіль
+        if use_user_profile:
+            run.append_log(f"Використовуємо профіль користувача: {self.chrome_profile_path}")
+        if process_pool is not None and self.cdp_settings.get('urls'):
+            # Облік зайнятості віддалених браузерів живе в головному процесі,
+            # тож виконавці запускають власний браузер
+            run.append_log("Запуск у процесі-виконавці: віддалені браузери (cdp_endpoints) у цьому режимі "
+                           "не використовуються", "orange")
         
-        # Оновлюємо статус у верхньому полі
-        self.status_label.setText(message)
-        if "🎯 Наступна ціль:" in message:
-            self.status_label.setStyleSheet("padding: 10px; color: #2196F3;")
-        elif "✓ Результат:" in message:
-            self.status_label.setStyleSheet("padding: 10px; color: #4CAF50;")
-        elif "🤔 Модель думає:" in message:
-            self.status_label.setStyleSheet("padding: 10px; color: #FF9800;")
-        elif "🌐 Браузер:" in message:
-            self.status_label.setStyleSheet("padding: 10px; color: #9C27B0;")
-        elif "❌ Помилка:" in message:
-            self.status_label.setStyleSheet("padding: 10px; color: #F44336;")
-        else:
-            self.status_label.setStyleSheet("padding: 10px; color: black;")
+        # Перемикаємося на вкладку результатів
+        self.tabs.setCurrentIndex(1)
+        self.run_tabs.addTab(run, f"{program_name} #{len(self.runs)}")
+        self.run_tabs.setCurrentWidget(run)
         
-        # Прокрутка до нижнього краю
-        self.result_view.verticalScrollBar().setValue(
-            self.result_view.verticalScrollBar().maximum()
+        # Запуск відбудеться, щойно звільниться місце в планувальнику
+        self.scheduler.submit(run)
+    
+    def ask_placeholder_values(self, code):
+        """Значення підстановок програми від користувача або None, якщо він відмовився"""
+        values = {}
+        for name in placeholders(code):
+            value, ok = QInputDialog.getText(self, "Параметри програми", f"Значення для {{{{{name}}}}}:")
+            if not ok:
+                return None
+            values[name] = value
+        return values
+    
+    def get_browser_pool(self):
+        """Пул теплих браузерів, створюється під час першого запуску"""
+        if self.browser_pool is None:
+            self.browser_pool = BrowserPool(**self.pool_settings).start()
+        return self.browser_pool
+    
+    def get_llm_cache(self):
+        """Сховище кешу відповідей моделі, відкривається під час першого запуску з кешем"""
+        if self.llm_cache is None:
+            from webmorpher.llm_cache import ResponseStore
+            self.llm_cache = ResponseStore(**self.llm_cache_settings)
+        return self.llm_cache
+    
+    def get_cdp_pool(self):
+        """Пул віддалених браузерів, якщо в конфігурації задано cdp_endpoints"""
+        if self.cdp_pool is None and self.cdp_settings.get('urls'):
+            from webmorpher.cdp_pool import CDPEndpointPool
+            self.cdp_pool = CDPEndpointPool(**self.cdp_settings).start()
+        return self.cdp_pool
+    
+    def get_process_pool(self):
+        """Пул процесів-виконавців, якщо в конфігурації увімкнено process_pool"""
+        settings = dict(self.process_pool_settings)
+        if not settings.pop('enabled', False):
+            return None
+        if self.process_pool is None:
+            from webmorpher.process_pool import ProcessPool
+            self.process_pool = ProcessPool(
+                size=settings.get('size', self.max_concurrent_runs),
+                max_memory_mb=settings.get('max_memory_mb'),
+                max_runs_per_worker=settings.get('max_runs_per_worker', 20),
+                settings={
+                    'browser_pool': self.pool_settings,
+                    'llm_cache': self.llm_cache_settings,
+                    'run_history': self.history_settings,
+                    'profile_snapshots': self.profile_snapshot_settings,
+                    'checkpoints': self.checkpoint_settings
+                }
+            ).start()
+        return self.process_pool
+    
+    def get_trace_store(self):
+        """Сховище записів дій для відтворення"""
+        if self.trace_store is None:
+            from webmorpher.replay import TraceStore
+            self.trace_store = TraceStore()
+        return self.trace_store
+    
+    def get_profile_snapshots(self):
+        """Знімки профілю Chrome для копій профілю; None, якщо вимкнено в налаштуваннях"""
+        settings = dict(self.profile_snapshot_settings)
+        if not settings.pop('enabled', True):
+            return None
+        if self.profile_snapshots is None:
+            from webmorpher.profile_snapshot import ProfileSnapshots
+            self.profile_snapshots = ProfileSnapshots(**settings)
+        return self.profile_snapshots
+    
+    def get_checkpoints(self):
+        """Контрольні точки запусків; None, якщо вимкнено в налаштуваннях"""
+        settings = dict(self.checkpoint_settings)
+        if not settings.pop('enabled', True):
+            return None
+        if self.checkpoints is None:
+            from webmorpher.checkpoint import CheckpointStore
+            self.checkpoints = CheckpointStore(**settings)
+        return self.checkpoints
+    
+    def start_metrics_export(self):
+        """Експорт метрик на локальний порт та/або у файл (ключ metrics у конфігурації)"""
+        try:
+            self.metrics_exporters = metrics.start_exporters(self.metrics_settings)
+        except Exception as e:
+            print(f"Не вдалося запустити експорт метрик: {e}")
+    
+    def update_metrics_summary(self):
+        """Короткий підсумок метрик у рядку стану"""
+        summary = metrics.summary()
+        parts = [f"Запусків: {summary['runs_started']}"]
+        if summary['runs_failed']:
+            parts[0] += f" (невдалих: {summary['runs_failed']})"
+        if summary['step_avg'] is not None:
+            parts.append(f"крок ~{summary['step_avg']:.1f} с")
+        if summary['llm_avg'] is not None:
+            parts.append(f"модель ~{summary['llm_avg']:.1f} с, {summary['llm_tokens']} токенів")
+        parts.append(f"браузерів: {summary['browsers_active']}")
+        self.metrics_label.setText(" · ".join(parts))
+    
+    def get_run_history(self):
+        """Історія запусків, відкривається під час першого звернення"""
+        if self.run_history is None:
+            try:
+                from webmorpher.history import RunHistory
+                self.run_history = RunHistory(**self.history_settings)
+            except Exception as e:
+                print(f"Не вдалося відкрити історію запусків: {e}")
+        return self.run_history
+    
+    def show_run_history(self):
+        """Вікно історії запусків (з обраною програмою, якщо є)"""
+        history = self.get_run_history()
+        if history is None:
+            QMessageBox.warning(self, "Помилка", "Історія запусків недоступна")
+            return
+        program_name = self.current_program.get("name") if self.current_program else None
+        RunHistoryDialog(history, program_name, self).exec_()
+    
+    def get_job_queue(self):
+        """Спільна черга завдань (секція server: path, shared), відкривається під час першого звернення"""
+        if self.job_queue is None:
+            from webmorpher.jobs import JobQueue
+            settings = {key: value for key, value in self.server_settings.items()
+                        if key in ("path", "max_jobs", "lease", "max_attempts", "shared")}
+            if "path" in settings:
+                settings["path"] = os.path.expanduser(settings["path"])
+            self.job_queue = JobQueue(**settings)
+        return self.job_queue
+    
+    def show_job_queue(self):
+        """Вікно черги завдань: надіслати обрану програму вузлам та стежити за виконанням"""
+        try:
+            queue = self.get_job_queue()
+        except Exception as e:
+            QMessageBox.warning(self, "Помилка", f"Не вдалося відкрити чергу завдань: {e}")
+            return
+        program = self.current_program if self.current_program and self.current_program.get("code", "").strip() \
+            else None
+        JobQueueDialog(queue, program, self.ask_placeholder_values, self).exec_()
+    
+    def latest_run(self, program):
+        """Останній запуск програми (активний має пріоритет)"""
+        runs = [run for run in self.runs if run.program is program]
+        active = [run for run in runs if run.is_active()]
+        if active:
+            return active[-1]
+        return runs[-1] if runs else None
+    
+    def has_active_runs(self):
+        """Чи є запуски, що виконуються або чекають у черзі"""
+        return any(run.is_active() for run in self.runs)
+    
+    def update_run_controls(self):
+        """Оновлення кнопок керування та загального статусу запусків"""
+        run = self.latest_run(self.current_program) if self.current_program else None
+        active = run is not None and run.is_active()
+        self.run_button.setEnabled(not active)
+        self.pause_button.setEnabled(active and run.state in (RunPanel.RUNNING, RunPanel.PAUSED))
+        self.pause_button.setText("Продовжити" if active and run.state == RunPanel.PAUSED else "Пауза")
+        self.stop_button.setEnabled(active)
+        
+        self.statusBar().showMessage(
+            f"Виконується: {self.scheduler.active_count()}, у черзі: {self.scheduler.queued_count()}"
         )
     
-    def on_browser_error(self, error_message):
-        """Обробник помилок від browser-use"""
-        self.result_view.append(f"<span style='color: red;'>{error_message}</span>")
-        # Оновлюємо стан інтерфейсу
-        self.program_running = False
-        self.pause_button.setEnabled(False)
-        self.stop_button.setEnabled(False)
-        self.run_button.setEnabled(True)
+    def on_concurrency_changed(self, value):
+        """Зміна кількості паралельних запусків"""
+        self.max_concurrent_runs = value
+        self.scheduler.set_max_concurrent(value)
     
-    def on_browser_finished(self):
-        """Обробник завершення виконання browser-use"""
-        self.result_view.append("Виконання програми завершено.")
-        # Оновлюємо стан інтерфейсу
-        self.program_running = False
-        self.pause_button.setEnabled(False)
-        self.stop_button.setEnabled(False)
-        self.run_button.setEnabled(True)
+    def close_run_tab(self, index):
+        """Закриття вкладки запуску (лише завершеного)"""
+        run = self.run_tabs.widget(index)
+        if run.is_active():
+            QMessageBox.warning(self, "Помилка", "Спочатку зупиніть цей запуск")
+            return
+        self.run_tabs.removeTab(index)
+        self.runs.remove(run)
+        self.update_run_controls()
     
     def pause_program(self):
-        """Призупинення виконання програми"""
-        if not self.program_running or not self.browser_runner:
+        """Призупинення виконання обраної програми"""
+        run = self.latest_run(self.current_program) if self.current_program else None
+        if run is None or not run.is_active():
             return
-            
-        if self.browser_runner._is_paused:
-            # Відновлення виконання
-            self.browser_runner.resume()
-            self.pause_button.setText("Пауза")
-        else:
-            # Призупинення виконання
-            self.browser_runner.pause()
-            self.pause_button.setText("Продовжити")
         
+        run.toggle_pause()
         self.status_label.setText("Програму призупинено/відновлено...")
         self.status_label.setStyleSheet("padding: 10px; color: black;")
     
     def stop_program(self):
-        """Зупинка виконання програми"""
-        if not self.program_running or not self.browser_runner:
+        """Зупинка виконання обраної програми"""
+        run = self.latest_run(self.current_program) if self.current_program else None
+        if run is None or not run.is_active():
             return
-            
-        # Зупиняємо виконання
-        self.browser_runner.stop()
         
-        # Оновлюємо стан інтерфейсу
-        self.program_running = False
-        self.pause_button.setEnabled(False)
-        self.stop_button.setEnabled(False)
-        self.run_button.setEnabled(True)
-        self.pause_button.setText("Пауза")
+        # Зупиняємо виконання
+        run.stop()
         
         self.status_label.setText("Програму зупинено...")
         self.status_label.setStyleSheet("padding: 10px; color: black;")
     
     def launch_debug_browser(self):
         """Запуск браузера в режимі дебагу"""
-        try:
-            # Якщо браузер вже запущено, просто показуємо інформацію
-            if self.debug_browser_process and self.debug_port:
-                QMessageBox.information(
-                    self, 
-                    "Браузер у режимі дебагу", 
-                    f"Браузер вже запущено на порту {self.debug_port}"
-                )
+        if self.debug_launcher is not None:
+            return
+        
+        # Якщо браузер вже запущено, пропонуємо запустити ще один на іншому порту
+        running = [browser for browser in self.debug_browsers if browser.is_running()]
+        if running:
+            ports = ", ".join(str(browser.port) for browser in running)
+            reply = QMessageBox.question(
+                self, "Браузер у режимі дебагу",
+                f"Браузер вже запущено на порту {ports}. Запустити ще один?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply == QMessageBox.No:
                 return
-                
-            # Використовуємо фіксований порт 9222
-            port = 9222
-            
-            # Перевіряємо, чи не зайнятий порт
-            try:
-                socket.create_connection(("localhost", port), timeout=1).close()
-                reply = QMessageBox.question(
-                    self, "Увага", 
-                    f"Порт {port} вже використовується. Можливо, Chrome вже запущено. Спробувати все одно?",
-                    QMessageBox.Yes | QMessageBox.No
-                )
-                if reply == QMessageBox.No:
-                    return
-            except (socket.timeout, socket.error):
-                # Порт вільний, продовжуємо
-                pass
-                
-            # Зберігаємо логи у тимчасовий файл
-            log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chrome_debug.log")
-            with open(log_file, "w") as f:
-                f.write(f"Запуск Chrome на порту {port} в {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                
-            # Визначаємо, який профіль використовувати
-            use_user_profile = self.use_user_profile_checkbox.isChecked() and self.chrome_profile_path
-            user_profile = self.chrome_profile_path if use_user_profile else None
-            
-            # Запускаємо браузер
-            process, port = launch_debug_browser(port, use_user_profile=use_user_profile, user_profile_dir=user_profile)
-            
-            # Зберігаємо процес і порт
-            self.debug_browser_process = process
-            self.debug_port = port
-            
-            # Перевіряємо, що запустився саме Chrome
-            try:
-                import requests
-                import json
-                response = requests.get(f"http://localhost:{port}/json/version")
-                browser_info = json.loads(response.text)
-                browser_name = browser_info.get("Browser", "")
-                
-                with open(log_file, "a") as f:
-                    f.write(f"Підключено до браузера: {browser_name}\n")
-                    
-                if "Chrome" in browser_name:
-                    QMessageBox.information(
-                        self, 
-                        "Браузер у режимі дебагу", 
-                        f"Google Chrome запущено на порту {port}\nІнформація про браузер: {browser_name}"
-                    )
-                else:
-                    QMessageBox.warning(
-                        self, 
-                        "Увага", 
-                        f"Запущено браузер, але це не Chrome: {browser_name}. Можливі проблеми з сумісністю."
-                    )
-            except Exception as e:
-                with open(log_file, "a") as f:
-                    f.write(f"Помилка перевірки браузера: {str(e)}\n")
-                QMessageBox.information(
-                    self, 
-                    "Браузер у режимі дебагу", 
-                    f"Браузер запущено на порту {port}, але не вдалося перевірити тип браузера."
-                )
-            
-            self.status_label.setText(f"Google Chrome у режимі дебагу запущено на порту {port}")
         
-        except Exception as e:
+        # Зберігаємо логи у тимчасовий файл
+        log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chrome_debug.log")
+        with open(log_file, "w") as f:
+            f.write(f"Запуск Chrome в {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        
+        # Визначаємо, який профіль використовувати
+        use_user_profile = bool(self.use_user_profile_checkbox.isChecked() and self.chrome_profile_path)
+        user_profile = self.chrome_profile_path if use_user_profile else None
+        
+        # Запуск і очікування готовності CDP виконуються у фоновому потоці
+        self.debug_launcher = DebugBrowserLauncher(use_user_profile, user_profile, log_file,
+                                                   self.get_profile_snapshots() if use_user_profile else None)
+        self.debug_launcher.launched_signal.connect(self.on_debug_browser_launched)
+        self.debug_launcher.error_signal.connect(self.on_debug_browser_failed)
+        self.debug_launcher.finished.connect(self.on_debug_launcher_done)
+        self.debug_button.setEnabled(False)
+        self.status_label.setText("Запуск Google Chrome у режимі дебагу...")
+        self.debug_launcher.start()
+    
+    def on_debug_browser_launched(self, browser):
+        """Дебаг-браузер відповідає на CDP"""
+        self.debug_browsers.append(browser)
+        self.debug_port = browser.port
+        
+        browser_name = browser.browser_name
+        launch_info = f"Google Chrome запущено на порту {browser.port} за {browser.launch_seconds:.1f} с"
+        if "Chrome" in browser_name:
+            QMessageBox.information(
+                self, 
+                "Браузер у режимі дебагу", 
+                f"{launch_info}\nІнформація про браузер: {browser_name}"
+            )
+        else:
             QMessageBox.warning(
                 self, 
-                "Помилка", 
-                f"Не вдалося запустити браузер у режимі дебагу: {str(e)}"
+                "Увага", 
+                f"Запущено браузер, але це не Chrome: {browser_name}. Можливі проблеми з сумісністю."
             )
+        self.status_label.setText(launch_info)
+    
+    def on_debug_browser_failed(self, error_message):
+        QMessageBox.warning(
+            self, 
+            "Помилка", 
+            f"Не вдалося запустити браузер у режимі дебагу: {error_message}"
+        )
+        self.status_label.setText("Не вдалося запустити браузер у режимі дебагу")
+    
+    def on_debug_launcher_done(self):
+        self.debug_launcher = None
+        self.debug_button.setEnabled(True)
     
     def change_api_key(self):
         """Зміна API ключа"""
@@ -879,7 +1765,7 @@ class WebMorpherApp(QMainWindow):
     def closeEvent(self, event):
         """Обробка закриття додатку"""
         # Перевіряємо, чи виконується програма
-        if self.program_running:
+        if self.has_active_runs():
             reply = QMessageBox.question(
                 self, "Підтвердження", 
                 "Програма все ще виконується. Ви впевнені, що хочете вийти?",
@@ -887,41 +1773,91 @@ class WebMorpherApp(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
-                self.stop_program()
+                self.scheduler.stop_all()
                 event.accept()
             else:
                 event.ignore()
                 return
         
-        # Закриваємо дебаг-браузер, якщо він запущений
-        if self.debug_browser_process:
-            try:
-                self.debug_browser_process.terminate()
-            except:
-                pass
+        # Спільні пули та сховища закриваються лише після завершення потоків
+        # запусків (зупинений запуск закриває браузер не довше 2 * STOP_TIMEOUT)
+        deadline = time.monotonic() + 2 * STOP_TIMEOUT
+        for run in self.runs:
+            if not run.runner.wait(max(0, int((deadline - time.monotonic()) * 1000))):
+                print(f"Запуск {run.program.get('name', 'Без назви')} не завершився до закриття додатку")
+        
+        # Закриваємо дебаг-браузери, якщо вони запущені
+        if self.debug_launcher is not None:
+            self.debug_launcher.wait()
+            if self.debug_launcher.browser and self.debug_launcher.browser not in self.debug_browsers:
+                self.debug_browsers.append(self.debug_launcher.browser)
+        for browser in self.debug_browsers:
+            browser.terminate()
+        
+        # Закриваємо браузери з пулу
+        if self.browser_pool:
+            self.browser_pool.shutdown()
+            self.browser_pool = None
+        
+        if self.llm_cache:
+            self.llm_cache.close()
+            self.llm_cache = None
+        
+        if self.cdp_pool:
+            self.cdp_pool.shutdown()
+            self.cdp_pool = None
+        
+        if self.process_pool:
+            self.process_pool.shutdown()
+            self.process_pool = None
+        
+        if self.run_history:
+            self.run_history.close()
+            self.run_history = None
+        
+        if self.job_queue:
+            self.job_queue.close()
+            self.job_queue = None
+        
+        for exporter in self.metrics_exporters:
+            exporter.shutdown()
+        self.metrics_exporters = []
                 
-        # Зберігаємо конфігурацію перед виходом
+        # Зберігаємо налаштування перед виходом
         self.save_config()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
         event.accept()
 
+def finish_startup_profile(app):
+    """Звіт режиму --profile-startup: час до першого вікна та імпорт агента"""
+    STARTUP.mark("перше вікно на екрані")
+    with STARTUP.phase("import browser_use + langchain_openai"):
+        preload_agent_stack()
+    STARTUP.report()
+    app.quit()
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    with STARTUP.phase("QApplication"):
+        app = QApplication(sys.argv)
     
     # Проверяем на наличие аргумента для сброса API ключа
     if len(sys.argv) > 1 and sys.argv[1] == "--reset-api-key":
-        # Если конфигурационный файл существует, удаляем API ключ
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    config = json.load(f)
-                    # Удаляем ключ API, сохраняя программы
-                    config['api_key'] = ""
-                with open(CONFIG_FILE, 'w') as f:
-                    json.dump(config, f)
-                print("API ключ сброшен!")
-            except Exception as e:
-                print(f"Ошибка при сбросе API ключа: {e}")
+        # Удаляем ключ API, сохраняя программы
+        try:
+            store = open_store(CONFIG_FILE)
+            store.set_settings({'api_key': ""})
+            store.close()
+            print("API ключ сброшен!")
+        except Exception as e:
+            print(f"Ошибка при сбросе API ключа: {e}")
+    
+    with STARTUP.phase("WebMorpherApp.__init__"):
+        window = WebMorpherApp()
+    with STARTUP.phase("window.show"):
+        window.show()
     
-    window = WebMorpherApp()
-    window.show()
-    sys.exit(app.exec_()) 
\ No newline at end of file
+    if STARTUP.enabled:
+        QTimer.singleShot(0, partial(finish_startup_profile, app))
+    sys.exit(app.exec_()) 
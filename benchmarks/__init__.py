@@ -0,0 +1 @@
+"""Офлайн-бенчмарки WebMorpher: локальні сторінки та сценарна модель"""
@@ -0,0 +1,46 @@
+"""Локальний HTTP сервер зі сторінками для бенчмарків"""
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Роздача директорії зі сторінками на 127.0.0.1 (порт 0 — будь-який вільний)"""
+
+    def __init__(self, directory=FIXTURES_DIR, port=0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), partial(_QuietHandler, directory=directory))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="webmorpher-fixtures",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self):
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
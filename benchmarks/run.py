@@ -0,0 +1,259 @@
+"""Офлайн-бенчмарк запусків: локальні сторінки, сценарна модель, BrowserUseRunner.
+
+Вимірює час запуску браузера, тривалість кроків агента, пропускну
+здатність за різної кількості паралельних запусків та пікову пам'ять
+(RSS процесу разом з браузерами). Результат порівнюється зі збереженим
+базовим рівнем, щоб помітити регресії.
+
+Приклади:
+    python -m benchmarks.run
+    python -m benchmarks.run --concurrency 1 2 4 --runs 6 --llm-latency 0.5
+    python -m benchmarks.run --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:  # без psutil вимірюється лише власний процес
+    psutil = None
+
+# Бенчмарк не повинен звертатися до мережі
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+
+# Показники, де менше — краще, та де більше — краще
+LOWER_IS_BETTER = ("launch_mean", "step_p50", "step_p95", "peak_rss_mb")
+HIGHER_IS_BETTER = ("throughput_per_min",)
+
+
+class RssSampler:
+    """Пікова пам'ять процесу та його дочірніх процесів (браузерів)"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="webmorpher-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss())
+            self._stop.wait(self.interval)
+
+
+def current_rss():
+    """RSS у байтах (без psutil — максимальний RSS власного процесу)"""
+    if psutil is None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def make_runner(scenario, base_url, args, browser_pool=None):
+    """BrowserUseRunner для сценарію зі сценарною моделлю замість ChatOpenAI"""
+    from PyQt5.QtCore import Qt
+
+    from app import BrowserUseRunner
+    from benchmarks.scripted_llm import ScriptedChatModel
+
+    def llm_factory(model, cache=None, callbacks=None):
+        return ScriptedChatModel(script=scenario["script"], base_url=base_url, latency=args.llm_latency,
+                                 cache=cache, callbacks=callbacks)
+
+    runner = BrowserUseRunner(
+        api_key="benchmark",
+        task=scenario["task"].replace("{base}", base_url),
+        headless=args.headless,
+        browser_pool=browser_pool,
+        name=scenario["name"],
+        llm_factory=llm_factory
+    )
+    runner.errors = []
+    # Цикл подій Qt не запущено, тому помилки забираємо в потоці запуску
+    runner.error_signal.connect(runner.errors.append, Qt.DirectConnection)
+    return runner
+
+
+def run_level(scenarios, concurrency, runs, base_url, args, browser_pool=None):
+    """Виконати runs запусків, не більше concurrency одночасно"""
+    from webmorpher import metrics
+
+    queue = deque(scenarios[i % len(scenarios)] for i in range(runs))
+    active, finished = [], []
+    launch_count, launch_sum = metrics.BROWSER_LAUNCH.totals()
+    sampler = RssSampler().start()
+    started = time.monotonic()
+    while queue or active:
+        while queue and len(active) < concurrency:
+            runner = make_runner(queue.popleft(), base_url, args, browser_pool)
+            runner.start()
+            active.append(runner)
+        for runner in list(active):
+            if runner.wait(50):
+                active.remove(runner)
+                finished.append(runner)
+    wall = time.monotonic() - started
+    peak_rss = sampler.stop()
+
+    count, total = metrics.BROWSER_LAUNCH.totals()
+    steps, successes, errors = [], 0, []
+    for runner in finished:
+        agent = runner.agent_run.agent
+        history = agent.state.history if agent is not None else None
+        if history is not None:
+            steps.extend(item.metadata.duration_seconds for item in history.history if item.metadata)
+        if history is not None and history.is_done() and history.is_successful() is not False and not runner.errors:
+            successes += 1
+        errors.extend(runner.errors)
+
+    launches = count - launch_count
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "successes": successes,
+        "errors": errors[:5],
+        "wall_seconds": round(wall, 3),
+        "throughput_per_min": round(runs / wall * 60, 2) if wall else None,
+        "launch_mean": round((total - launch_sum) / launches, 3) if launches else None,
+        "steps": len(steps),
+        "step_p50": _round(percentile(steps, 0.5)),
+        "step_p95": _round(percentile(steps, 0.95)),
+        "peak_rss_mb": round(peak_rss / 1024 / 1024, 1),
+    }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def compare_to_baseline(report, baseline, threshold=0.2):
+    """Регресії відносно базового рівня: список повідомлень"""
+    regressions = []
+    for level, result in report["levels"].items():
+        reference = baseline.get("levels", {}).get(level)
+        if reference is None:
+            continue
+        for key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            current, previous = result.get(key), reference.get(key)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            worse = change > threshold if key in LOWER_IS_BETTER else change < -threshold
+            if worse:
+                regressions.append(f"concurrency={level} {key}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description="Офлайн-бенчмарк запусків WebMorpher")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4],
+                        help="кількості паралельних запусків (типово 1 2 4)")
+    parser.add_argument("--runs", type=int, help="запусків на кожен рівень (типово вдвічі більше за сценарії)")
+    parser.add_argument("--scenario", action="append", help="лише вказані сценарії")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="штучна затримка відповіді моделі, с")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--pool", action="store_true", help="запускати через пул теплих браузерів")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="файл базового рівня")
+    parser.add_argument("--save-baseline", action="store_true", help="зберегти результат як базовий рівень")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустиме погіршення (0.2 = 20%%)")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from PyQt5.QtCore import QCoreApplication
+
+    from benchmarks.fixture_server import FixtureServer
+    from benchmarks.scenarios import SCENARIOS
+    from webmorpher.browser_pool import BrowserPool
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s["name"] in args.scenario]
+    if not scenarios:
+        print("Немає сценаріїв для запуску", file=sys.stderr)
+        return 2
+    runs = args.runs or len(scenarios) * 2
+    app = QCoreApplication.instance() or QCoreApplication([])  # noqa: F841 - потрібен для QThread
+
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "llm_latency": args.llm_latency, "pool": args.pool},
+        "levels": {},
+    }
+    with FixtureServer() as server:
+        for concurrency in args.concurrency:
+            pool = BrowserPool(size=concurrency).start() if args.pool else None
+            try:
+                result = run_level(scenarios, concurrency, runs, server.base_url, args, pool)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+            report["levels"][str(concurrency)] = result
+            if args.format == "text":
+                _print_level(result)
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Базовий рівень збережено: {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.threshold)
+    report["regressions"] = regressions
+
+    if args.format == "json":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for message in regressions:
+            print(f"РЕГРЕСІЯ: {message}")
+    failed = any(level["successes"] < level["runs"] for level in report["levels"].values())
+    return 1 if regressions or failed else 0
+
+
+def _print_level(result):
+    print(f"concurrency={result['concurrency']}: {result['successes']}/{result['runs']} успішних за "
+          f"{result['wall_seconds']} с ({result['throughput_per_min']} запусків/хв)")
+    print(f"  запуск браузера {result['launch_mean']} с, крок p50 {result['step_p50']} с, "
+          f"p95 {result['step_p95']} с, пікова пам'ять {result['peak_rss_mb']} МБ")
+    for message in result["errors"]:
+        print(f"  помилка: {message}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
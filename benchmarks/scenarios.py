@@ -0,0 +1,35 @@
+"""Типові програми для бенчмарків: текст завдання та сценарій моделі"""
+
+SCENARIOS = [
+    {
+        "name": "navigation",
+        "task": "Відкрий {base}/index.html, перейди до каталогу та відкрий Товар 7",
+        "script": [
+            {"goal": "Відкрити головну сторінку", "actions": [{"go_to_url": {"url": "{base}/index.html"}}]},
+            {"goal": "Перейти до каталогу", "actions": [{"click_element_by_index": {"element": {"text": "Каталог"}}}]},
+            {"goal": "Відкрити товар", "actions": [{"click_element_by_index": {"element": {"text": "Товар 7"}}}]},
+        ],
+    },
+    {
+        "name": "form",
+        "task": "Відкрий {base}/form.html, заповни ім'я та email і надішли форму",
+        "script": [
+            {"goal": "Відкрити форму", "actions": [{"go_to_url": {"url": "{base}/form.html"}}]},
+            {"goal": "Заповнити форму", "actions": [
+                {"input_text": {"element": {"attr": "name='name'"}, "text": "Тест"}},
+                {"input_text": {"element": {"attr": "name='email'"}, "text": "test@example.com"}},
+            ]},
+            {"goal": "Надіслати форму", "actions": [{"click_element_by_index": {"element": {"text": "Надіслати"}}}]},
+        ],
+    },
+    {
+        "name": "long-list",
+        "task": "Відкрий {base}/catalog.html, знайди Товар 150 і додай його в кошик",
+        "script": [
+            {"goal": "Відкрити каталог", "actions": [{"go_to_url": {"url": "{base}/catalog.html"}}]},
+            {"goal": "Прокрутити до товару", "actions": [{"scroll_to_text": {"text": "Товар 150"}}]},
+            {"goal": "Відкрити товар", "actions": [{"click_element_by_index": {"element": {"text": "Товар 150"}}}]},
+            {"goal": "Додати в кошик", "actions": [{"click_element_by_index": {"element": {"text": "Купити"}}}]},
+        ],
+    },
+]
@@ -0,0 +1,135 @@
+"""Детермінована модель для бенчмарків: відповідає кроками зі сценарію.
+
+Замість запитів до OpenAI модель повертає наступний крок сценарію у
+форматі AgentOutput browser-use. Елементи сторінки в сценарії задаються
+текстом або атрибутом ({"element": {"text": "Каталог"}}), а індекс
+підставляється з поточного стану сторінки, який агент надсилає моделі.
+"""
+import asyncio
+import json
+import re
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+# Рядок інтерактивного елемента у стані сторінки: [12]<a href='...'>Текст />
+_ELEMENT_LINE = re.compile(r'^\s*\*?\[(\d+)\]\*?<(\w+)(.*?) />\s*$')
+
+
+def parse_elements(text):
+    """Інтерактивні елементи зі стану сторінки: [(індекс, тег, атрибути, текст)]"""
+    elements = []
+    for line in text.splitlines():
+        match = _ELEMENT_LINE.match(line)
+        if not match:
+            continue
+        rest = match.group(3)
+        attributes, _, element_text = rest.partition('>') if '>' in rest else (rest, '', '')
+        elements.append((int(match.group(1)), match.group(2), attributes.strip(), element_text.strip()))
+    return elements
+
+
+def find_element(elements, selector):
+    """Індекс елемента за {"text": ...} (точний збіг) або {"attr": ...} (підрядок)"""
+    for index, tag, attributes, text in elements:
+        if 'text' in selector and text == selector['text']:
+            return index
+        if 'attr' in selector and selector['attr'] in attributes:
+            return index
+    return None
+
+
+def _message_text(message):
+    content = message.content
+    if isinstance(content, list):
+        return "\n".join(part.get('text', '') for part in content if isinstance(part, dict))
+    return str(content)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Модель, що виконує сценарій крок за кроком.
+
+    script — список кроків {"goal": ..., "actions": [{назва_дії: параметри}]}.
+    Після останнього кроку модель завершує завдання дією done. latency —
+    штучна затримка відповіді, щоб імітувати час роботи справжньої моделі.
+    """
+
+    script: list
+    base_url: str = ""
+    latency: float = 0.0
+    model_name: str = "scripted"
+    position: int = 0
+
+    @property
+    def _llm_type(self):
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+    def _result(self, messages):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages)))])
+
+    def respond(self, messages):
+        """Текст відповіді на повідомлення агента"""
+        last = _message_text(messages[-1]) if messages else ""
+        if "capital of France" in last:
+            # Перевірка з'єднання з моделлю під час створення агента
+            return "Paris"
+        if "Current url" not in last:
+            # Виклики поза кроком агента (наприклад, extract_content)
+            return "Вміст сторінки"
+        return json.dumps(self.next_step(last), ensure_ascii=False)
+
+    def next_step(self, state_text):
+        """Наступний крок сценарію з індексами елементів поточної сторінки"""
+        evaluation = "Success" if self.position else "Unknown"
+        if self.position >= len(self.script):
+            return self._output(evaluation, "Завершити", [{"done": {"text": "Сценарій виконано", "success": True}}])
+        step = self.script[self.position]
+        self.position += 1
+        elements = parse_elements(state_text)
+        actions = []
+        for action in step["actions"]:
+            (name, params), = action.items()
+            params = {key: self._format(value) for key, value in params.items()}
+            selector = params.pop("element", None)
+            if selector is not None:
+                index = find_element(elements, selector)
+                if index is None:
+                    return self._output("Failed", step["goal"],
+                                        [{"done": {"text": f"Елемент не знайдено: {selector}", "success": False}}])
+                params["index"] = index
+            actions.append({name: params})
+        return self._output(evaluation, step["goal"], actions)
+
+    def _format(self, value):
+        return value.replace("{base}", self.base_url) if isinstance(value, str) else value
+
+    def _output(self, evaluation, goal, actions):
+        return {
+            "current_state": {"evaluation_previous_goal": evaluation, "memory": "", "next_goal": goal},
+            "action": actions,
+        }
+
+    def with_structured_output(self, schema, *, include_raw=False, **kwargs):
+        """Відповідь, розібрана в схему агента (без підтримки tool calling)"""
+
+        def parse(message):
+            parsed = schema(**json.loads(message.content))
+            return {'raw': message, 'parsed': parsed, 'parsing_error': None} if include_raw else parsed
+
+        async def ainvoke(messages):
+            return parse(await self.ainvoke(messages))
+
+        return RunnableLambda(lambda messages: parse(self.invoke(messages)), afunc=ainvoke)
@@ -72,6 +72,17 @@ EOF
 # Делаем скрипт исполняемым
 chmod +x "$MACOS_DIR/webmorpher"
 
+# Скрипт для запуска программ из командной строки (без GUI)
+cat > "$MACOS_DIR/webmorpher-cli" << EOF
+#!/bin/bash
+DIR="\$(cd "\$(dirname "\${BASH_SOURCE[0]}")" && pwd)"
+RESOURCES_DIR="\$DIR/../Resources"
+source "\$RESOURCES_DIR/python_env/bin/activate"
+cd "\$RESOURCES_DIR"
+python -m webmorpher "\$@"
+EOF
+chmod +x "$MACOS_DIR/webmorpher-cli"
+
 # Создание виртуального окружения Python в Resources
 echo "Создание виртуального окружения Python 3.11..."
 python3.11 -m venv "$PYTHON_ENV_DIR"
@@ -87,6 +98,7 @@ playwright install chromium
 # Копирование исходных файлов приложения
 echo "Копирование исходных файлов..."
 cp app.py "$RESOURCES_DIR/"
+cp -R webmorpher "$RESOURCES_DIR/"
 cp README.md "$RESOURCES_DIR/"
 cp INSTALL.md "$RESOURCES_DIR/"
 cp requirements.txt "$RESOURCES_DIR/"
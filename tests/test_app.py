@@ -3,16 +3,21 @@ import sys
 import json
 import unittest
 import tempfile
+import time
 from unittest.mock import patch, MagicMock, PropertyMock
-from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtTest import QTest
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
 
 # Додаємо батьківську директорію до шляху, щоб імпортувати app.py
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Імпортуємо наш додаток
-from app import WebMorpherApp, ApiKeyDialog, ProgramEditorDialog
+from app import WebMorpherApp, ApiKeyDialog, ProgramEditorDialog, RunScheduler, RunPanel, JobQueueDialog
+from webmorpher.jobs import JobQueue
+from webmorpher.logbuffer import LogBatcher
+from webmorpher.replay import task_hash
+from webmorpher.store import store_path_for
 
 class TestApiKeyDialog(unittest.TestCase):
     """Тести для діалогу введення API ключа"""
@@ -83,6 +88,175 @@ class TestProgramEditorDialog(unittest.TestCase):
         
         self.assertEqual(data["name"], test_name)
         self.assertEqual(data["code"], test_code)
+        self.assertEqual(data["model"], "")
+        self.assertTrue(data["routing"])
+    
+    def test_program_model_options(self):
+        """Модель та вибір швидкої моделі зберігаються з програмою"""
+        dialog = ProgramEditorDialog(program_name="Тест", model="gpt-4.1", routing=False, state_diff=True)
+        data = dialog.get_program_data()
+        self.assertEqual(data["model"], "gpt-4.1")
+        self.assertFalse(data["routing"])
+        self.assertTrue(data["state_diff"])
+    
+    def test_program_profile(self):
+        """Профіль виконання зберігається лише зі зміненими значеннями"""
+        dialog = ProgramEditorDialog(program_name="Тест", profile={"max_steps": 20, "timeout": 300})
+        self.assertEqual(dialog.get_program_data()["profile"], {"max_steps": 20, "timeout": 300})
+        dialog.vision_checkbox.setChecked(False)
+        dialog.headless_combo.setCurrentIndex(dialog.headless_combo.findData(False))
+        dialog.timeout_input.setValue(0)
+        self.assertEqual(dialog.get_program_data()["profile"], {"max_steps": 20, "vision": False, "headless": False})
+
+class FakeRunner(QObject):
+    finished = pyqtSignal()
+
+class FakeRun:
+    """Замінник панелі запуску без справжнього браузера"""
+    
+    def __init__(self):
+        self.runner = FakeRunner()
+        self.started = False
+        self.stopped = False
+    
+    def is_active(self):
+        return not self.stopped
+    
+    def start(self):
+        self.started = True
+    
+    def stop(self):
+        self.stopped = True
+
+class TestRunScheduler(unittest.TestCase):
+    """Тести для планувальника паралельних запусків"""
+    
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+    
+    def test_concurrency_limit(self):
+        """Одночасно виконується не більше max_concurrent запусків"""
+        scheduler = RunScheduler(max_concurrent=2)
+        runs = [FakeRun() for _ in range(3)]
+        for run in runs:
+            scheduler.submit(run)
+        
+        self.assertEqual([run.started for run in runs], [True, True, False])
+        self.assertEqual(scheduler.active_count(), 2)
+        self.assertEqual(scheduler.queued_count(), 1)
+        
+        # Після завершення одного запуску стартує наступний з черги
+        runs[0].runner.finished.emit()
+        self.assertTrue(runs[2].started)
+        self.assertEqual(scheduler.queued_count(), 0)
+    
+    def test_cancelled_run_is_skipped(self):
+        """Запуск, зупинений у черзі, не стартує"""
+        scheduler = RunScheduler(max_concurrent=1)
+        first, second, third = FakeRun(), FakeRun(), FakeRun()
+        for run in (first, second, third):
+            scheduler.submit(run)
+        second.stop()
+        first.runner.finished.emit()
+        
+        self.assertFalse(second.started)
+        self.assertTrue(third.started)
+
+class TestJobQueueDialog(unittest.TestCase):
+    """Тести для вікна спільної черги завдань"""
+    
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.temp_dir.name, 'jobs.sqlite'))
+    
+    def tearDown(self):
+        self.queue.close()
+        self.temp_dir.cleanup()
+    
+    def test_submit_and_monitor(self):
+        """Програма з підстановками додається в чергу, вузли та лог завдання показуються"""
+        program = {'id': 3, 'name': 'Пошук', 'code': 'Знайди {{sku}}', 'lite': True}
+        dialog = JobQueueDialog(self.queue, program, ask_values=lambda code: {'sku': 'A-1'})
+        dialog.submit_button.click()
+        
+        job = self.queue.jobs()[0]
+        self.assertEqual((job['program']['code'], job['program']['lite']), ('Знайди A-1', True))
+        self.assertNotIn('id', job['program'])
+        self.assertEqual(dialog.jobs_table.rowCount(), 1)
+        
+        self.queue.heartbeat('node-a', capacity=2)
+        self.queue.claim('node-a')
+        dialog.refresh()
+        self.assertEqual(dialog.nodes_table.item(0, 0).text(), 'node-a')
+        self.assertEqual(dialog.nodes_table.item(0, 2).text(), 'Працює')
+        self.assertEqual(dialog.jobs_table.item(0, 3).text(), 'node-a')
+        self.assertIn("(node-a)", dialog.log_view.toPlainText())
+        
+        dialog.cancel_button.click()
+        self.assertTrue(self.queue.get(job['id'])['cancel_requested'])
+        dialog.refresh_timer.stop()
+
+class FakeLoggingRunner(QObject):
+    """Замінник BrowserUseRunner з чергою логів"""
+    finished = pyqtSignal()
+    finished_signal = pyqtSignal()
+    error_signal = pyqtSignal(str)
+    
+    def __init__(self):
+        super().__init__()
+        self.log_buffer = LogBatcher()
+
+class TestRunPanel(unittest.TestCase):
+    """Тести для пакетного виводу логів у панелі запуску"""
+    
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def make_panel(self, max_lines=100):
+        runner = FakeLoggingRunner()
+        panel = RunPanel({'name': 'Тест'}, runner, max_lines=max_lines)
+        panel.log.spool_dir = self.temp_dir.name
+        return panel, runner
+    
+    def test_logs_flushed_in_batch(self):
+        """Повідомлення з черги потрапляють у лог одним пакетом"""
+        panel, runner = self.make_panel()
+        for i in range(3):
+            runner.log_buffer.push(f"🎯 Наступна ціль: крок {i}")
+        panel.flush_logs()
+        
+        lines = panel.result_view.toPlainText().splitlines()
+        self.assertEqual(lines[-1], "🎯 Наступна ціль: крок 2")
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(panel.status_label.text(), "🎯 Наступна ціль: крок 2")
+        self.assertEqual(len(runner.log_buffer), 0)
+    
+    def test_line_cap_spools_to_disk(self):
+        """Старіші рядки витісняються з вигляду у файл"""
+        panel, runner = self.make_panel(max_lines=5)
+        for i in range(10):
+            runner.log_buffer.push(f"рядок {i}")
+        panel.flush_logs()
+        
+        self.assertEqual(panel.result_view.blockCount(), 5)
+        self.assertEqual(panel.result_view.toPlainText().splitlines()[-1], "рядок 9")
+        with open(panel.log.spool_path) as f:
+            spooled = f.read().splitlines()
+        self.assertEqual(spooled[0], "Запуск програми: Тест")
+        self.assertEqual(spooled[-1], "рядок 4")
+        self.assertFalse(panel.spool_label.isHidden())
+    
+    def test_error_keeps_order(self):
+        """Помилка з'являється після вже накопичених логів"""
+        panel, runner = self.make_panel()
+        runner.log_buffer.push("крок")
+        panel.on_error("збій")
+        self.assertEqual(panel.result_view.toPlainText().splitlines()[-2:], ["крок", "збій"])
 
 class TestWebMorpherApp(unittest.TestCase):
     """Тести для основного додатку"""
@@ -121,13 +295,24 @@ class TestWebMorpherApp(unittest.TestCase):
         # Підмінюємо метод перевірки API ключа, щоб уникнути діалогів
         with patch('app.WebMorpherApp.check_api_key', return_value=True):
             self.window = WebMorpherApp()
+        # Історія запусків у тимчасовій директорії
+        self.history_dir = tempfile.TemporaryDirectory()
+        self.window.history_settings = {'path': os.path.join(self.history_dir.name, 'history.sqlite')}
+        self.window.checkpoint_settings = {'directory': os.path.join(self.history_dir.name, 'checkpoints')}
     
     def tearDown(self):
-        self.window.close()
+        # Закриття вікна з незавершеними запусками не повинно показувати модальний діалог
+        with patch('app.QMessageBox.question', return_value=QMessageBox.Yes):
+            self.window.close()
         self._patch_config.stop()
+        self.history_dir.cleanup()
         
-        # Видаляємо тимчасовий файл
+        # Видаляємо тимчасовий файл і сховище, імпортоване з нього
         os.unlink(self.temp_config.name)
+        store_path = store_path_for(self.temp_config.name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(store_path + suffix):
+                os.unlink(store_path + suffix)
         
         # Відновлюємо оригінальний шлях конфігурації
         if self.original_config:
@@ -182,5 +367,132 @@ class TestWebMorpherApp(unittest.TestCase):
         self.assertFalse(self.window.pause_button.isEnabled())
         self.assertFalse(self.window.stop_button.isEnabled())
 
+    def test_process_pool_reports_disabled_cdp_endpoints(self):
+        """У режимі пулу процесів лог запуску повідомляє, що віддалені браузери не використовуються"""
+        self.window.program_list.setCurrentRow(0)
+        self.window.cdp_settings = {'urls': ['http://10.0.0.5:9222']}
+        process_pool = MagicMock()
+        with patch.object(self.window, 'get_process_pool', return_value=process_pool), \
+                patch.object(self.window, 'get_cdp_pool') as get_cdp_pool, \
+                patch.object(self.window.scheduler, 'submit'):
+            self.window.run_program()
+        get_cdp_pool.assert_not_called()
+        run = self.window.runs[-1]
+        self.assertIn("cdp_endpoints", run.result_view.toPlainText())
+        run.stop()
+
+    def test_close_waits_for_runs(self):
+        """Закриття додатку чекає на потоки запусків, перш ніж закрити спільні ресурси"""
+        self.window.program_list.setCurrentRow(0)
+        self.window.run_program()
+        runner = self.window.runs[-1].runner
+        with patch('app.QMessageBox.question', return_value=QMessageBox.Yes):
+            self.window.close()
+        self.assertTrue(runner.isFinished())
+
+    def test_interrupted_run_resume_prompt(self):
+        """Для перерваного запуску пропонується продовження з наступного кроку"""
+        self.window.program_list.setCurrentRow(0)
+        checkpoints = self.window.get_checkpoints()
+        checkpoints.save('print("Test 1")', "interrupted", {'version': 1, 'task': task_hash('print("Test 1")'),
+                                                           'saved_at': time.time(), 'steps': 2})
+        with patch('app.QMessageBox.question', return_value=QMessageBox.Yes) as question, \
+                patch.object(self.window.scheduler, 'submit'):
+            self.window.run_program()
+        self.assertIn("Продовжити з кроку 3?", question.call_args[0][2])
+        runner = self.window.runs[-1].runner
+        self.assertTrue(runner.agent_run.resume_checkpoint)
+        self.assertEqual(runner.agent_run.checkpoint_id, "interrupted")
+        self.assertIs(runner.agent_run.checkpoints, checkpoints)
+        self.window.runs[-1].stop()
+
+        # Відмова видаляє контрольну точку, і запуск починається спочатку
+        with patch('app.QMessageBox.question', return_value=QMessageBox.No), \
+                patch.object(self.window.scheduler, 'submit'):
+            self.window.run_program()
+        self.assertFalse(self.window.runs[-1].runner.agent_run.resume_checkpoint)
+        self.assertNotEqual(self.window.runs[-1].runner.checkpoint_id, "interrupted")
+        self.assertIsNone(checkpoints.load('print("Test 1")'))
+
+        # Запуски лишилися в черзі: скасовуємо їх, щоб закриття вікна не питало підтвердження
+        for run in self.window.runs:
+            run.stop()
+        self.assertFalse(self.window.has_active_runs())
+
+    def test_concurrent_runs_keep_checkpoints(self):
+        """Точка запуску, що ще виконується, не пропонується і не видаляється другим запуском"""
+        self.window.program_list.setCurrentRow(0)
+        checkpoints = self.window.get_checkpoints()
+        with patch.object(self.window.scheduler, 'submit'):
+            self.window.run_program()
+        first = self.window.runs[-1].runner
+        checkpoints.save('print("Test 1")', first.checkpoint_id, {'version': 1, 'task': task_hash('print("Test 1")'),
+                                                                 'saved_at': time.time(), 'steps': 2})
+
+        with patch('app.QMessageBox.question', return_value=QMessageBox.No) as question, \
+                patch.object(self.window.scheduler, 'submit'):
+            self.window.run_program()
+        question.assert_not_called()
+        second = self.window.runs[-1].runner
+        self.assertFalse(second.agent_run.resume_checkpoint)
+        self.assertNotEqual(second.checkpoint_id, first.checkpoint_id)
+        self.assertIsNotNone(checkpoints.load('print("Test 1")', first.checkpoint_id))
+
+        # Після завершення першого запуску його точку вже можна продовжити
+        self.window.runs[0].stop()
+        with patch('app.QMessageBox.question', return_value=QMessageBox.Yes) as question, \
+                patch.object(self.window.scheduler, 'submit'):
+            self.window.run_program()
+        question.assert_called_once()
+        self.assertEqual(self.window.runs[-1].runner.checkpoint_id, first.checkpoint_id)
+
+        for run in self.window.runs:
+            run.stop()
+        self.assertFalse(self.window.has_active_runs())
+
+    def edit_dialog(self, data):
+        """Замінник діалогу редагування, що одразу повертає data"""
+        dialog = MagicMock()
+        dialog.exec_.return_value = True
+        dialog.get_program_data.return_value = data
+        return patch('app.ProgramEditorDialog', return_value=dialog)
+
+    def test_search_filters_program_list(self):
+        """Пошук за словами назви та коду показує лише відповідні програми"""
+        self.window.program_list.setCurrentRow(1)
+        self.window.search_input.setText("test 2")
+        self.assertEqual(self.window.program_list.count(), 1)
+        self.assertEqual(self.window.current_program["name"], "Тестова програма 2")
+
+        self.window.search_input.setText("немає")
+        self.assertEqual(self.window.program_list.count(), 0)
+        self.assertIsNone(self.window.current_program)
+
+        self.window.search_input.clear()
+        self.assertEqual(self.window.program_list.count(), 2)
+
+    def test_program_edits_update_single_rows(self):
+        """Створення, редагування та видалення змінюють список без перебудови"""
+        model = self.window.program_model
+        with patch.object(model, 'beginResetModel') as reset:
+            with self.edit_dialog({'name': 'Третя', 'code': 'print("Test 3")'}):
+                self.window.create_program()
+            self.assertEqual(self.window.program_list.count(), 3)
+
+            self.window.program_list.setCurrentRow(0)
+            with self.edit_dialog({'name': 'Перейменована', 'code': 'print("Test 1")'}):
+                self.window.edit_program()
+            self.assertEqual(model.program_at(0)["name"], "Перейменована")
+            self.assertEqual(self.window.current_program["name"], "Перейменована")
+
+            with patch('app.QMessageBox.question', return_value=QMessageBox.Yes):
+                self.window.delete_program()
+            self.assertEqual(self.window.program_list.count(), 2)
+            reset.assert_not_called()
+
+        self.window.search_input.setText("test 3")
+        self.assertEqual(model.program_at(0)["name"], "Третя")
+        self.assertEqual([p["name"] for p in self.window.store.programs()], ["Тестова програма 2", "Третя"])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import unittest
+import tempfile
+import threading
+import time
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.batch import BatchResults, placeholders, read_rows, render_task, run_batch
+
+
+class TestBatch(unittest.TestCase):
+    """Тести для пакетних запусків"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name, content=None):
+        path = os.path.join(self.temp_dir.name, name)
+        if content is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return path
+
+    def test_placeholders(self):
+        """Підстановки {{стовпець}} замінюються значеннями рядка"""
+        code = "Знайди {{ sku }} на сайті {{shop}} і порівняй {{sku}}"
+        self.assertEqual(placeholders(code), ["sku", "shop"])
+        self.assertEqual(render_task(code, {"sku": "A-1", "shop": "shop.com"}),
+                         "Знайди A-1 на сайті shop.com і порівняй A-1")
+        with self.assertRaises(KeyError):
+            render_task(code, {"sku": "A-1"})
+
+    def test_read_rows(self):
+        """Рядки читаються з CSV (з BOM) та JSONL з номерами, порожні рядки JSONL пропускаються"""
+        csv_path = self.path("rows.csv", "﻿sku,qty\nA-1,2\nB-2,5\n")
+        self.assertEqual(list(read_rows(csv_path)), [(1, {"sku": "A-1", "qty": "2"}), (2, {"sku": "B-2", "qty": "5"})])
+        jsonl_path = self.path("rows.jsonl", '{"sku": "A-1"}\n\n{"sku": "B-2"}\n')
+        self.assertEqual(list(read_rows(jsonl_path)), [(1, {"sku": "A-1"}), (2, {"sku": "B-2"})])
+        with self.assertRaises(ValueError):
+            list(read_rows(self.path("rows.xlsx", "")))
+
+    def test_results_resume(self):
+        """Виконані рядки пропускаються, невдалі — лише без retry_failed, обірваний запис ігнорується"""
+        output = self.path("out.jsonl")
+        with BatchResults(output) as results:
+            results.write({"row": 1, "input": {"sku": "A"}, "success": True})
+            results.write({"row": 2, "input": {"sku": "B"}, "success": False})
+        with open(output, 'a', encoding='utf-8') as f:
+            f.write('{"row": 3, "inp')
+
+        results = BatchResults(output)
+        self.assertTrue(results.is_done(1, {"sku": "A"}))
+        self.assertFalse(results.is_done(1, {"sku": "змінено"}))
+        self.assertTrue(results.is_done(2, {"sku": "B"}))
+        self.assertFalse(results.is_done(3, {"sku": "C"}))
+        self.assertFalse(BatchResults(output, retry_failed=True).is_done(2, {"sku": "B"}))
+
+        results.write({"row": 3, "input": {"sku": "C"}, "success": True})
+        results.close()
+        with open(output, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(json.loads(lines[-1])["row"], 3)
+        self.assertEqual(len(lines), 4)
+
+    def test_run_batch_limits_concurrency(self):
+        """Рядки виконуються паралельно, але не більше concurrency одночасно, рядки читаються потоково"""
+        lock = threading.Lock()
+        active = []
+        peak = []
+        read = []
+
+        def rows():
+            for number in range(1, 21):
+                read.append(number)
+                yield number, {"n": number}
+
+        def run_row(number, row):
+            with lock:
+                active.append(number)
+                peak.append(len(active))
+                # Черга завдань не читає таблицю наперед
+                self.assertLessEqual(len(read) - number, 6)
+            time.sleep(0.01)
+            with lock:
+                active.remove(number)
+            return {"row": number}
+
+        results = []
+        run_batch(rows(), run_row, concurrency=3, on_result=results.append)
+        self.assertEqual(sorted(result["row"] for result in results), list(range(1, 21)))
+        self.assertLessEqual(max(peak), 3)
+        self.assertGreater(max(peak), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
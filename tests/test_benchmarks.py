@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import unittest
+from urllib.request import urlopen
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати бенчмарки
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.run import compare_to_baseline, percentile
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.scripted_llm import ScriptedChatModel, find_element, parse_elements
+
+PAGE_STATE = """Current url: http://127.0.0.1:8000/form.html
+Interactive elements from top layer of the current page inside the viewport:
+[0]<a href='index.html'>На головну />
+*[1]*<input name='name' type='text' placeholder='Ім'я'> />
+[2]<input name='email' type='email'> />
+[3]<button type='submit'>Надіслати />
+"""
+
+
+class TestScriptedModel(unittest.TestCase):
+    """Тести для сценарної моделі бенчмарків"""
+
+    def test_elements_are_found_by_text_and_attribute(self):
+        """Індекси елементів беруться зі стану сторінки"""
+        elements = parse_elements(PAGE_STATE)
+        self.assertEqual(len(elements), 4)
+        self.assertEqual(find_element(elements, {"text": "Надіслати"}), 3)
+        self.assertEqual(find_element(elements, {"attr": "name='email'"}), 2)
+        self.assertEqual(find_element(elements, {"attr": "name='name'"}), 1)
+        self.assertIsNone(find_element(elements, {"text": "Каталог"}))
+
+    def test_script_is_followed_and_finished(self):
+        """Кроки сценарію йдуть по черзі, після них — done"""
+        model = ScriptedChatModel(script=SCENARIOS[1]["script"], base_url="http://127.0.0.1:8000")
+        self.assertEqual(model.respond([HumanMessage(content="What is the capital of France?")]), "Paris")
+
+        first = json.loads(model.respond([HumanMessage(content=PAGE_STATE)]))
+        self.assertEqual(first["action"], [{"go_to_url": {"url": "http://127.0.0.1:8000/form.html"}}])
+        second = json.loads(model.respond([HumanMessage(content=PAGE_STATE)]))
+        self.assertEqual(second["action"][0], {"input_text": {"text": "Тест", "index": 1}})
+        self.assertEqual(second["action"][1]["input_text"]["index"], 2)
+        model.respond([HumanMessage(content=PAGE_STATE)])
+        last = json.loads(model.respond([HumanMessage(content=PAGE_STATE)]))
+        self.assertTrue(last["action"][0]["done"]["success"])
+
+    def test_missing_element_fails_the_run(self):
+        """Якщо елемента немає на сторінці, сценарій завершується невдачею"""
+        script = [{"goal": "Клік", "actions": [{"click_element_by_index": {"element": {"text": "Каталог"}}}]}]
+        model = ScriptedChatModel(script=script)
+        output = json.loads(model.respond([HumanMessage(content=PAGE_STATE)]))
+        self.assertFalse(output["action"][0]["done"]["success"])
+
+    def test_structured_output_matches_agent_schema(self):
+        """Відповідь розбирається у схему AgentOutput browser-use"""
+        from browser_use.agent.views import AgentOutput
+        from browser_use.controller.service import Controller
+
+        action_model = Controller().registry.create_action_model()
+        schema = AgentOutput.type_with_custom_actions(action_model)
+        model = ScriptedChatModel(script=SCENARIOS[0]["script"], base_url="http://127.0.0.1:8000")
+
+        result = model.with_structured_output(schema, include_raw=True).invoke(
+            [SystemMessage(content="system"), HumanMessage(content=PAGE_STATE)])
+        self.assertIsNone(result["parsing_error"])
+        action = result["parsed"].action[0].model_dump(exclude_unset=True)
+        self.assertEqual(action, {"go_to_url": {"url": "http://127.0.0.1:8000/index.html"}})
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Тести для сервера сторінок та порівняння з базовим рівнем"""
+
+    def test_fixture_server(self):
+        """Сторінки віддаються з локального сервера"""
+        with FixtureServer() as server:
+            with urlopen(f"{server.base_url}/index.html", timeout=5) as response:
+                self.assertIn("Каталог", response.read().decode("utf-8"))
+
+    def test_regressions_against_baseline(self):
+        """Погіршення понад поріг повідомляються, покращення — ні"""
+        baseline = {"levels": {"1": {"launch_mean": 1.0, "step_p95": 2.0, "throughput_per_min": 10.0}}}
+        report = {"levels": {"1": {"launch_mean": 1.5, "step_p95": 1.0, "throughput_per_min": 7.0},
+                             "4": {"launch_mean": 9.0}}}
+        regressions = compare_to_baseline(report, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("concurrency=1 launch_mean"))
+        self.assertIn("throughput_per_min", regressions[1])
+        self.assertEqual(compare_to_baseline(report, baseline, threshold=0.6), [])
+
+    def test_percentile(self):
+        self.assertIsNone(percentile([], 0.5))
+        self.assertEqual(percentile([3, 1, 2], 0.5), 2)
+        self.assertEqual(percentile(list(range(1, 101)), 0.95), 95)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import sys
+import asyncio
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.browser_pool import BrowserPool
+
+
+class FakePlaywrightBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakeBrowser:
+    """Замінник браузера browser-use без запуску Chrome"""
+
+    def __init__(self, params):
+        self.params = params
+        self.playwright_browser = None
+        self.closed = False
+
+    async def get_playwright_browser(self):
+        self.playwright_browser = FakePlaywrightBrowser()
+        return self.playwright_browser
+
+    async def close(self):
+        self.closed = True
+
+
+class TestBrowserPool(unittest.TestCase):
+    """Тести для пулу браузерів"""
+
+    def setUp(self):
+        self.launched = []
+
+        def factory(params):
+            browser = FakeBrowser(params)
+            self.launched.append(browser)
+            return browser
+
+        self.factory = factory
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    def test_browser_is_reused(self):
+        """Повернутий браузер видається наступному запуску"""
+        pool = BrowserPool(size=1, browser_factory=self.factory)
+
+        async def scenario():
+            first = await pool.acquire({'headless': True})
+            await pool.release(first)
+            second = await pool.acquire({'headless': True})
+            return first, second
+
+        first, second = self.run_async(scenario())
+        self.assertIs(first, second)
+        self.assertEqual(len(self.launched), 1)
+        self.assertEqual(second.uses, 2)
+
+    def test_different_configs_are_not_mixed(self):
+        """Браузери з різними налаштуваннями не змішуються"""
+        pool = BrowserPool(size=2, browser_factory=self.factory)
+
+        async def scenario():
+            first = await pool.acquire({'headless': True})
+            await pool.release(first)
+            second = await pool.acquire({'headless': False})
+            return first, second
+
+        first, second = self.run_async(scenario())
+        self.assertIsNot(first, second)
+        self.assertEqual(len(self.launched), 2)
+
+    def test_recycle_after_max_uses(self):
+        """Браузер закривається після max_uses запусків"""
+        pool = BrowserPool(size=1, max_uses=2, browser_factory=self.factory)
+
+        async def scenario():
+            for _ in range(3):
+                pooled = await pool.acquire({})
+                await pool.release(pooled)
+
+        self.run_async(scenario())
+        self.assertEqual(len(self.launched), 2)
+        self.assertTrue(self.launched[0].closed)
+        self.assertFalse(self.launched[1].closed)
+
+    def test_unhealthy_browser_is_replaced(self):
+        """Від'єднаний браузер не видається повторно"""
+        pool = BrowserPool(size=1, browser_factory=self.factory)
+
+        async def scenario():
+            first = await pool.acquire({})
+            await pool.release(first)
+            first.browser.playwright_browser.connected = False
+            second = await pool.acquire({})
+            return first, second
+
+        first, second = self.run_async(scenario())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.browser.closed)
+
+    def test_idle_eviction(self):
+        """Браузери, що простоюють, закриваються"""
+        pool = BrowserPool(size=2, idle_timeout=0, browser_factory=self.factory)
+
+        async def scenario():
+            await pool.warm({})
+            return await pool.evict_idle()
+
+        self.assertEqual(self.run_async(scenario()), 2)
+        self.assertTrue(all(browser.closed for browser in self.launched))
+        self.assertEqual(pool.stats(), {'idle': 0, 'in_use': 0})
+
+    def test_each_chrome_gets_own_profile(self):
+        """Кожен Chrome пулу запускається з власним тимчасовим профілем, який видаляється разом з ним"""
+        pool = BrowserPool(size=2, idle_timeout=0, browser_factory=self.factory)
+        params = {'browser_binary_path': '/usr/bin/google-chrome', 'extra_browser_args': ['--lang=uk']}
+
+        def user_data_dirs(browser):
+            return [arg.split('=', 1)[1] for arg in browser.params['extra_browser_args']
+                    if arg.startswith('--user-data-dir=')]
+
+        self.run_async(pool.warm(params))
+        profiles = [user_data_dirs(browser) for browser in self.launched]
+        self.assertEqual([len(dirs) for dirs in profiles], [1, 1])
+        self.assertNotEqual(profiles[0], profiles[1])
+        self.assertTrue(all(os.path.isdir(dirs[0]) for dirs in profiles))
+        self.assertTrue(all('--lang=uk' in browser.params['extra_browser_args'] for browser in self.launched))
+        self.assertEqual(params['extra_browser_args'], ['--lang=uk'])
+
+        self.assertEqual(self.run_async(pool.evict_idle()), 2)
+        self.assertFalse(any(os.path.exists(dirs[0]) for dirs in profiles))
+
+        # Профіль, заданий явно (копія профілю користувача), не замінюється
+        own = {'browser_binary_path': '/usr/bin/google-chrome', 'extra_browser_args': ['--user-data-dir=/tmp/клон']}
+        self.run_async(pool.warm(own, count=1))
+        self.assertEqual(user_data_dirs(self.launched[-1]), ['/tmp/клон'])
+
+    def test_background_loop(self):
+        """Пул працює у фоновому потоці та закриває браузери при зупинці"""
+        pool = BrowserPool(size=1, browser_factory=self.factory).start()
+        pooled = pool.run(pool.acquire({}))
+        pool.run(pool.release(pooled))
+        self.assertEqual(pool.stats(), {'idle': 1, 'in_use': 0})
+        pool.shutdown()
+        self.assertTrue(self.launched[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
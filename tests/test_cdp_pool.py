@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.cdp_pool import CDPEndpointPool, NoHealthyEndpoint
+
+
+class FakeProbe:
+    """Замінник перевірки /json/version з керованим станом браузерів"""
+
+    def __init__(self, *down):
+        self.down = set(down)
+        self.calls = []
+
+    def __call__(self, url, timeout):
+        self.calls.append(url)
+        return None if url in self.down else {'Browser': 'HeadlessChrome/120.0'}
+
+
+class TestCDPEndpointPool(unittest.TestCase):
+    """Тести для пулу віддалених браузерів"""
+
+    def make_pool(self, probe, **options):
+        return CDPEndpointPool(['http://a:9222', 'http://b:9222/', 'http://c:9222'], probe=probe, **options)
+
+    def test_least_loaded_routing(self):
+        """Запуски розподіляються на найменш завантажені браузери"""
+        pool = self.make_pool(FakeProbe())
+        first, second, third = pool.acquire(), pool.acquire(), pool.acquire()
+        self.assertEqual({first.url, second.url, third.url}, {'http://a:9222', 'http://b:9222', 'http://c:9222'})
+
+        pool.release(second)
+        self.assertIs(pool.acquire(), second)
+
+    def test_unhealthy_endpoint_skipped(self):
+        """Браузер, що не відповідає, не отримує запусків"""
+        pool = self.make_pool(FakeProbe('http://b:9222'))
+        urls = {pool.acquire().url for _ in range(4)}
+        self.assertNotIn('http://b:9222', urls)
+
+    def test_failure_threshold(self):
+        """Працюючий браузер виводиться з ротації після кількох невдалих перевірок"""
+        probe = FakeProbe()
+        pool = self.make_pool(probe, failure_threshold=2)
+        pool.check_health()
+        probe.down.add('http://a:9222')
+
+        self.assertEqual(pool.check_health(), 3)
+        self.assertEqual(pool.check_health(), 2)
+
+        probe.down.clear()
+        self.assertEqual(pool.check_health(), 3)
+
+    def test_failed_run_removes_endpoint(self):
+        """Після невдалого запуску на недоступному браузері він одразу виводиться з ротації"""
+        probe = FakeProbe()
+        pool = self.make_pool(probe)
+        endpoint = pool.acquire()
+        probe.down.add(endpoint.url)
+        pool.release(endpoint, failed=True)
+        self.assertFalse(endpoint.healthy)
+        self.assertEqual(endpoint.active, 0)
+
+    def test_no_healthy_endpoint(self):
+        """Без працюючих браузерів запуск отримує зрозумілу помилку"""
+        pool = self.make_pool(FakeProbe('http://a:9222', 'http://b:9222', 'http://c:9222'))
+        with self.assertRaises(NoHealthyEndpoint):
+            pool.acquire()
+
+    def test_lease_marks_failure(self):
+        """Виключення всередині lease перевіряє браузер"""
+        probe = FakeProbe()
+        pool = self.make_pool(probe)
+        with self.assertRaises(RuntimeError):
+            with pool.lease() as endpoint:
+                probe.down.add(endpoint.url)
+                raise RuntimeError()
+        self.assertFalse(endpoint.healthy)
+
+
+if __name__ == '__main__':
+    unittest.main()
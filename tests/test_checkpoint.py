@@ -0,0 +1,181 @@
+import os
+import sys
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('ANONYMIZED_TELEMETRY', 'false')
+
+from browser_use import Agent, Browser
+from browser_use.agent.views import ActionResult, AgentHistory
+from browser_use.browser.views import BrowserStateHistory
+from langchain_core.messages import AIMessage
+
+from benchmarks.scripted_llm import ScriptedChatModel
+from webmorpher.checkpoint import CHECKPOINT_VERSION, CheckpointStore, capture, fast_forward_trace, restore
+from webmorpher.runner import AgentRun
+
+TASK = "Відкрий сторінку та натисни кнопку"
+
+
+def make_agent():
+    """Агент browser-use без запуску браузера та без звернень до моделі"""
+    return Agent(task=TASK, llm=ScriptedChatModel(script=[]), browser=Browser())
+
+
+def add_step(agent, actions, results):
+    """Додати в історію агента завершений крок з діями actions"""
+    output = agent.AgentOutput.model_validate({
+        'current_state': {'evaluation_previous_goal': '', 'memory': '', 'next_goal': ''},
+        'action': actions,
+    })
+    state = BrowserStateHistory(url='http://example.com/', title='Тест', tabs=[], interacted_element=[None] * len(actions),
+                                screenshot='iVBORw0KGgo=')
+    agent.state.history.history.append(AgentHistory(model_output=output, result=results, state=state))
+    agent.state.n_steps += 1
+    agent.state.last_result = results
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """Тести для сховища контрольних точок"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.store = CheckpointStore(self.temp_dir.name)
+
+    def checkpoint(self, task, saved_at=None):
+        from webmorpher.replay import task_hash
+
+        return {'version': CHECKPOINT_VERSION, 'task': task_hash(task), 'saved_at': saved_at or time.time(),
+                'steps': 1}
+
+    def test_save_load_delete(self):
+        """Контрольна точка читається лише для тієї ж програми і видаляється"""
+        self.store.save(TASK, "run1", self.checkpoint(TASK))
+        self.assertEqual(self.store.load(TASK)['steps'], 1)
+        self.assertEqual(self.store.load(TASK)['run_id'], "run1")
+        self.assertIsNone(self.store.load("Інша програма"))
+        self.assertEqual(os.listdir(self.temp_dir.name), [os.path.basename(self.store.path_for(TASK, "run1"))])
+
+        self.store.delete(TASK, "run1")
+        self.store.delete(TASK, "run1")
+        self.assertIsNone(self.store.load(TASK))
+
+    def test_runs_of_same_program(self):
+        """Одночасні запуски пишуть у власні файли, пропонується найновіша точка неактивного запуску"""
+        self.store.save(TASK, "old", self.checkpoint(TASK, saved_at=time.time() - 60))
+        self.store.save(TASK, "new", self.checkpoint(TASK))
+        self.assertEqual(len(os.listdir(self.temp_dir.name)), 2)
+        self.assertEqual(self.store.load(TASK)['run_id'], "new")
+        self.assertEqual(self.store.load(TASK, exclude={"new"})['run_id'], "old")
+        self.assertEqual(self.store.load(TASK, "new")['run_id'], "new")
+
+        self.store.claim("old")
+        self.assertIsNone(self.store.load(TASK, exclude={"new"}))
+        self.store.release("old")
+        self.assertEqual(self.store.load(TASK, exclude={"new"})['run_id'], "old")
+
+    def test_expired(self):
+        """Застарілі контрольні точки не пропонуються і прибираються"""
+        self.store.save(TASK, "run1", self.checkpoint(TASK, saved_at=time.time() - 8 * 24 * 3600))
+        self.assertIsNone(self.store.load(TASK))
+
+        old = time.time() - 8 * 24 * 3600
+        os.utime(self.store.path_for(TASK, "run1"), (old, old))
+        self.assertEqual(self.store.prune(), 1)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+class TestCaptureRestore(unittest.TestCase):
+    """Тести для збереження та відновлення стану агента"""
+
+    def test_roundtrip(self):
+        """Новий агент отримує історію, лічильники та повідомлення перерваного"""
+        agent = make_agent()
+        agent._message_manager._add_message_with_tokens(AIMessage(content="Крок 1"))
+        add_step(agent, [{'go_to_url': {'url': 'http://example.com/'}}],
+                 [ActionResult(extracted_content="Відкрито http://example.com/")])
+        add_step(agent, [{'click_element_by_index': {'index': 3}}], [ActionResult(error="Елемент не знайдено")])
+        agent.state.consecutive_failures = 1
+        checkpoint = capture(agent, TASK)
+
+        # Знімки екрана не зберігаються
+        self.assertEqual(checkpoint['steps'], 2)
+        self.assertIsNone(checkpoint['history']['history'][0]['state']['screenshot'])
+
+        resumed = make_agent()
+        restore(resumed, checkpoint)
+        self.assertEqual(resumed.state.n_steps, agent.state.n_steps)
+        self.assertEqual(resumed.state.consecutive_failures, 1)
+        self.assertEqual(resumed.state.last_result[0].error, "Елемент не знайдено")
+        self.assertEqual(len(resumed.state.history.history), 2)
+        self.assertEqual(resumed.state.history.history[1].model_output.action[0].model_dump(exclude_unset=True),
+                         {'click_element_by_index': {'index': 3}})
+        self.assertIs(resumed._message_manager.state, resumed.state.message_manager_state)
+        self.assertEqual([m.message.content for m in resumed._message_manager.state.history.messages],
+                         [m.message.content for m in agent._message_manager.state.history.messages])
+
+    def test_fast_forward_trace(self):
+        """Для повторення лишаються дії без помилок, крім витягу вмісту та done"""
+        agent = make_agent()
+        add_step(agent, [{'go_to_url': {'url': 'http://example.com/'}}, {'extract_content': {'goal': 'ціни', 'should_strip_link_urls': True}}],
+                 [ActionResult(), ActionResult(extracted_content="10 грн")])
+        add_step(agent, [{'click_element_by_index': {'index': 3}}], [ActionResult(error="Елемент не знайдено")])
+        add_step(agent, [{'done': {'text': 'Готово', 'success': True}}], [ActionResult(is_done=True)])
+
+        trace = fast_forward_trace(TASK, agent.state.history)
+        actions = [list(action) for step in trace['steps'] for action in step['actions']]
+        self.assertEqual(actions, [['go_to_url']])
+
+
+class TestAgentRunResume(unittest.TestCase):
+    """Тести для контрольних точок у запуску AgentRun"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.store = CheckpointStore(self.temp_dir.name)
+
+    def agent_run(self, **options):
+        logs = []
+        agent_run = AgentRun(api_key="sk-test", task=TASK, checkpoints=self.store, on_log=logs.append, **options)
+        agent_run.agent = make_agent()
+        return agent_run, logs
+
+    def test_step_end_saves_and_resume_fast_forwards(self):
+        """Після кроку стан зберігається, продовжений запуск повторює дії без моделі"""
+        interrupted, _ = self.agent_run()
+        add_step(interrupted.agent, [{'go_to_url': {'url': 'http://example.com/'}}], [ActionResult()])
+        asyncio.run(interrupted._on_step_end(interrupted.agent))
+        self.assertEqual(self.store.load(TASK)['steps'], 1)
+        self.assertEqual(self.store.load(TASK)['run_id'], interrupted.checkpoint_id)
+
+        replayed = []
+
+        async def replay(replayer):
+            replayed.extend(replayer.trace['steps'])
+
+        resumed, logs = self.agent_run(resume_checkpoint=True)
+        with patch('webmorpher.replay.TraceReplayer.replay', autospec=True, side_effect=replay):
+            steps = asyncio.run(resumed._resume_from_checkpoint())
+        self.assertEqual(steps, 1)
+        self.assertEqual(len(resumed.agent.state.history.history), 1)
+        self.assertEqual([step['actions'] for step in replayed], [[{'go_to_url': {'url': 'http://example.com/'}}]])
+        self.assertIn("💾 Продовження з кроку 2", logs[0])
+        # Продовжений запуск оновлює точку перерваного, а не створює нову
+        self.assertEqual(resumed.checkpoint_id, interrupted.checkpoint_id)
+
+    def test_resume_without_checkpoint(self):
+        """Без контрольної точки запуск виконується з початку"""
+        resumed, logs = self.agent_run(resume_checkpoint=True)
+        self.assertEqual(asyncio.run(resumed._resume_from_checkpoint()), 0)
+        self.assertEqual(resumed.agent.state.history.history, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import unittest
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from webmorpher import cli
+from webmorpher.store import store_path_for
+
+
+class FakeHistory:
+    """Замінник AgentHistoryList"""
+
+    history = [object(), object()]
+
+    def is_done(self):
+        return True
+
+    def is_successful(self):
+        return True
+
+    def final_result(self):
+        return "Готово"
+
+    def errors(self):
+        return [None, None]
+
+
+class TestCli(unittest.TestCase):
+    """Тести для командного рядка"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history_path = os.path.join(self.temp_dir.name, 'history.sqlite')
+        self.temp_config = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        json.dump({
+            'api_key': 'sk-testkey123',
+            'run_history': {'path': self.history_path},
+            'programs': [
+                {'name': 'Перша', 'code': 'Відкрий example.com'},
+                {'name': 'Друга', 'code': 'Відкрий example.org'},
+            ]
+        }, self.temp_config)
+        self.temp_config.close()
+
+    def tearDown(self):
+        os.unlink(self.temp_config.name)
+        self.temp_dir.cleanup()
+        store_path = store_path_for(self.temp_config.name)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(store_path + suffix):
+                os.unlink(store_path + suffix)
+
+    def run_cli(self, *argv):
+        output = StringIO()
+        with redirect_stdout(output), patch('webmorpher.cli._route_logs_to_stderr'):
+            code = cli.main(['--config', self.temp_config.name, *argv])
+        return code, output.getvalue()
+
+    def test_cli_does_not_import_qt(self):
+        """Командний рядок не імпортує PyQt5"""
+        script = "import sys; import webmorpher.cli, webmorpher.runner; print('PyQt5' in sys.modules)"
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT, text=True)
+        self.assertEqual(output.strip(), 'False')
+
+    def test_list_programs(self):
+        """Команда list виводить назви програм"""
+        code, output = self.run_cli('list')
+        self.assertEqual(code, 0)
+        self.assertEqual(output.splitlines(), ['Перша', 'Друга'])
+
+    def test_unknown_program(self):
+        """Невідома програма завершується з кодом 2"""
+        code, _ = self.run_cli('run', 'Третя')
+        self.assertEqual(code, 2)
+
+    def test_run_json_output(self):
+        """Результат запуску виводиться у форматі JSON"""
+        with patch('webmorpher.runner.AgentRun.execute', return_value=FakeHistory()):
+            code, output = self.run_cli('run', 'Перша', '--format', 'json')
+        self.assertEqual(code, 0)
+        result = json.loads(output)
+        self.assertEqual(result['name'], 'Перша')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['final_result'], 'Готово')
+        self.assertEqual(result['steps'], 2)
+
+    def test_run_all_to_files(self):
+        """run-all записує результат кожної програми в окремий файл"""
+        with tempfile.TemporaryDirectory() as output_dir, \
+                patch('webmorpher.runner.AgentRun.execute', side_effect=[FakeHistory(), Exception("Немає браузера")]), \
+                patch('webmorpher.browser_pool.BrowserPool.start', lambda pool: pool), \
+                patch('webmorpher.browser_pool.BrowserPool.shutdown'):
+            code, _ = self.run_cli('run-all', '--output-dir', output_dir)
+            files = sorted(os.listdir(output_dir))
+            with open(os.path.join(output_dir, 'Друга.json')) as f:
+                failed = json.load(f)
+        self.assertEqual(code, 1)
+        self.assertEqual(files, ['Друга.json', 'Перша.json'])
+        self.assertFalse(failed['success'])
+        self.assertIn("Помилка: Немає браузера", failed['errors'])
+
+    def test_batch_resume(self):
+        """batch виконує програму для кожного рядка і після перезапуску пропускає виконані рядки"""
+        from webmorpher.runner import AgentRun
+        from webmorpher.store import open_store
+
+        store = open_store(self.temp_config.name)
+        store.add_program({'name': 'Пошук', 'code': 'Знайди {{sku}}'})
+        store.close()
+        rows = os.path.join(self.temp_dir.name, 'rows.csv')
+        with open(rows, 'w', encoding='utf-8') as f:
+            f.write("sku\nA-1\nB-2\nC-3\n")
+        output = os.path.join(self.temp_dir.name, 'out.jsonl')
+        tasks = []
+
+        def execute(agent_run):
+            tasks.append(agent_run.task)
+            if agent_run.task.endswith("B-2") and len(tasks) < 4:
+                raise Exception("Немає браузера")
+            return FakeHistory()
+
+        with patch.object(AgentRun, 'execute', autospec=True, side_effect=execute), \
+                patch('webmorpher.browser_pool.BrowserPool.start', lambda pool: pool), \
+                patch('webmorpher.browser_pool.BrowserPool.shutdown'):
+            code, output_text = self.run_cli('batch', 'Пошук', '--input', rows, '--output', output, '--format', 'json')
+            self.assertEqual(code, 1)
+            self.assertEqual(json.loads(output_text)['failed'], 1)
+            self.assertEqual(sorted(tasks), ['Знайди A-1', 'Знайди B-2', 'Знайди C-3'])
+
+            code, output_text = self.run_cli('batch', 'Пошук', '--input', rows, '--output', output, '--format', 'json',
+                                             '--retry-failed')
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(output_text)['skipped'], 2)
+        self.assertEqual(tasks[-1], 'Знайди B-2')
+        with open(output, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[-1]['input'], {'sku': 'B-2'})
+        self.assertTrue(records[-1]['success'])
+
+    def test_history_summary(self):
+        """Команда history --summary виводить статистику програм"""
+        from webmorpher.history import RunHistory, RunRecord, SUCCESS
+
+        history = RunHistory(self.history_path)
+        history.save(RunRecord('Перша', 'Відкрий example.com').finish(SUCCESS))
+        history.close()
+
+        code, output = self.run_cli('history', '--summary', '--format', 'json')
+        self.assertEqual(code, 0)
+        summary = json.loads(output)
+        self.assertEqual(summary[0]['program'], 'Перша')
+        self.assertEqual(summary[0]['successes'], 1)
+
+        code, output = self.run_cli('history', '--program', 'Перша')
+        self.assertIn('Перша: success', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
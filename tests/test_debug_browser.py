@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.chrome import find_free_port
+from webmorpher.debug_browser import launch_debug_browser, probe_cdp, wait_for_cdp
+
+# Замінник Chrome: відповідає на /json/version із затримкою, як браузер під час запуску
+FAKE_CHROME = '''#!{python}
+import sys, time, json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+port = int(next(arg.split("=")[1] for arg in sys.argv if arg.startswith("--remote-debugging-port=")))
+time.sleep(0.3)
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({{"Browser": "Chrome/120.0"}}).encode()
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+HTTPServer(("localhost", port), Handler).serve_forever()
+'''
+
+FAILING_CHROME = '''#!{python}
+import sys
+sys.exit(3)
+'''
+
+
+class TestDebugBrowser(unittest.TestCase):
+    """Тести для запуску дебаг-браузера"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fake_chrome(self, source):
+        path = os.path.join(self.temp_dir.name, 'chrome')
+        with open(path, 'w') as f:
+            f.write(source.format(python=sys.executable))
+        os.chmod(path, 0o755)
+        return path
+
+    def test_probe_unreachable(self):
+        """Порт без CDP повертає None"""
+        self.assertIsNone(probe_cdp(f"http://localhost:{find_free_port()}", timeout=0.2))
+
+    def test_wait_deadline(self):
+        """Очікування обмежене часом"""
+        started = time.monotonic()
+        with self.assertRaises(Exception):
+            wait_for_cdp(f"http://localhost:{find_free_port()}", deadline=0.3)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_launch_waits_for_cdp(self):
+        """Запуск повертається, щойно CDP відповідає, і повідомляє час запуску"""
+        chrome = self.fake_chrome(FAKE_CHROME)
+        with patch('webmorpher.debug_browser.find_chrome_binary', return_value=chrome):
+            first = launch_debug_browser(use_user_profile=False, ready_timeout=10)
+            second = launch_debug_browser(use_user_profile=False, ready_timeout=10)
+        try:
+            self.assertEqual(first.browser_name, "Chrome/120.0")
+            self.assertGreater(first.launch_seconds, 0.2)
+            # Другий браузер отримує інший порт
+            self.assertNotEqual(first.port, second.port)
+        finally:
+            first.terminate()
+            second.terminate()
+
+    def test_launch_reports_exit(self):
+        """Браузер, що одразу завершився, не чекає до кінця терміну"""
+        chrome = self.fake_chrome(FAILING_CHROME)
+        started = time.monotonic()
+        with patch('webmorpher.debug_browser.find_chrome_binary', return_value=chrome):
+            with self.assertRaises(Exception) as context:
+                launch_debug_browser(port=find_free_port(), use_user_profile=False, ready_timeout=10)
+        self.assertIn("кодом 3", str(context.exception))
+        self.assertLess(time.monotonic() - started, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import sys
+import csv
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.history import RunHistory, RunRecord, SUCCESS, STOPPED, FAILED
+from webmorpher.runner import AgentRun
+
+
+class FakeAction:
+    def __init__(self, **data):
+        self.data = data
+
+    def model_dump(self, exclude_none=False):
+        return self.data
+
+
+def fake_output(goal, evaluation="", actions=()):
+    """Замінник AgentOutput"""
+    return SimpleNamespace(
+        current_state=SimpleNamespace(next_goal=goal, evaluation_previous_goal=evaluation),
+        action=[FakeAction(**{name: {}}) for name in actions]
+    )
+
+
+def fake_item(number, start, duration, goal, error=None):
+    """Замінник AgentHistory з часом кроку"""
+    return SimpleNamespace(
+        model_output=fake_output(goal, actions=["go_to_url"]),
+        result=[SimpleNamespace(error=error)],
+        state=SimpleNamespace(url=f"https://example.com/{number}"),
+        metadata=SimpleNamespace(step_number=number, step_start_time=start, step_end_time=start + duration,
+                                 duration_seconds=duration, input_tokens=100)
+    )
+
+
+def make_record(program, duration, outcome=SUCCESS, started_at=1000.0, steps=(1.0,)):
+    record = RunRecord(program, f"код {program}")
+    record.finish(outcome, [fake_item(i + 1, started_at + i, step, f"ціль {i + 1}") for i, step in enumerate(steps)])
+    record.started_at = started_at
+    record.finished_at = started_at + duration
+    return record
+
+
+class TestRunRecord(unittest.TestCase):
+    """Тести для запису одного запуску"""
+
+    def test_history_timings_and_interrupted_step(self):
+        """Час кроків береться з історії агента, перерваний крок — з колбеку"""
+        record = RunRecord("Погода", "Відкрий sinoptik.ua")
+        record.on_step(2, "https://sinoptik.ua", fake_output("Відкрити сайт", actions=["go_to_url"]))
+        record.on_step(3, "https://sinoptik.ua", fake_output("Знайти прогноз", "Сайт відкрито", ["click_element"]))
+        record.finish(STOPPED, [fake_item(2, 10.0, 2.5, "Відкрити сайт", error="таймаут")])
+
+        self.assertEqual([step["number"] for step in record.steps], [2, 3])
+        self.assertEqual(record.steps[0]["duration"], 2.5)
+        self.assertEqual(record.steps[0]["error"], "таймаут")
+        self.assertEqual(record.steps[1]["goal"], "Знайти прогноз")
+        self.assertEqual(record.steps[1]["actions"], ["click_element"])
+        self.assertGreaterEqual(record.steps[1]["duration"], 0)
+        self.assertEqual(record.input_tokens(), 100)
+
+    def test_live_steps_without_history(self):
+        """Без історії агента тривалість кроку — час до наступного колбеку"""
+        record = RunRecord("Погода", "Відкрий sinoptik.ua")
+        record.on_step(2, None, fake_output("a"))
+        record.on_step(3, None, fake_output("b"))
+        record._live_steps[0]["started_at"] -= 4
+        record.finish(FAILED)
+        self.assertGreaterEqual(record.steps[0]["duration"], 4)
+        self.assertIsNone(record.input_tokens())
+
+
+class TestRunHistory(unittest.TestCase):
+    """Тести для сховища історії запусків"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history = RunHistory(os.path.join(self.temp_dir.name, 'history.sqlite'), max_runs=5)
+
+    def tearDown(self):
+        self.history.close()
+        self.temp_dir.cleanup()
+
+    def test_save_and_query(self):
+        """Запуски фільтруються за програмою та часом, новіші першими"""
+        self.history.save(make_record("Погода", 10, started_at=100))
+        run_id = self.history.save(make_record("Погода", 12, started_at=200, steps=(1.0, 5.0)))
+        self.history.save(make_record("Новини", 3, outcome=FAILED, started_at=300))
+
+        runs = self.history.runs(program="Погода")
+        self.assertEqual([run["id"] for run in runs][0], run_id)
+        self.assertEqual(len(self.history.runs(since=150)), 2)
+        self.assertEqual(self.history.programs(), ["Новини", "Погода"])
+
+        steps = self.history.steps(run_id)
+        self.assertEqual([step["goal"] for step in steps], ["ціль 1", "ціль 2"])
+        self.assertEqual(steps[1]["actions"], ["go_to_url"])
+        self.assertEqual(self.history.slowest_steps(limit=1)[0]["duration"], 5.0)
+        self.assertEqual(self.history.slowest_steps(program="Новини")[0]["program"], "Новини")
+
+    def test_summary_shows_regression(self):
+        """Середній час останніх запусків порівнюється з попередніми"""
+        for i, duration in enumerate([10, 10, 20, 20]):
+            self.history.save(make_record("Погода", duration, started_at=100 + i))
+        summary = self.history.summary(window=2)
+        self.assertEqual(summary[0]["runs"], 4)
+        self.assertEqual(summary[0]["successes"], 4)
+        self.assertEqual(summary[0]["recent_avg"], 20)
+        self.assertEqual(summary[0]["previous_avg"], 10)
+
+    def test_old_runs_are_evicted(self):
+        """Понад max_runs видаляються найстаріші запуски разом з кроками"""
+        first = self.history.save(make_record("Погода", 1, started_at=1))
+        for i in range(5):
+            self.history.save(make_record("Погода", 1, started_at=10 + i))
+        self.assertEqual(len(self.history.runs(limit=None)), 5)
+        self.assertEqual(self.history.steps(first), [])
+
+    def test_export(self):
+        """Експорт у JSON містить кроки, у CSV — рядок на кожен крок"""
+        self.history.save(make_record("Погода", 10, steps=(1.0, 2.0)))
+        json_path = os.path.join(self.temp_dir.name, 'history.json')
+        csv_path = os.path.join(self.temp_dir.name, 'history.csv')
+
+        self.assertEqual(self.history.export(json_path), 1)
+        with open(json_path) as f:
+            self.assertEqual(len(json.load(f)[0]["steps"]), 2)
+
+        self.history.export(csv_path, program="Погода")
+        with open(csv_path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["step_goal"] for row in rows], ["ціль 1", "ціль 2"])
+        self.assertEqual(rows[0]["program"], "Погода")
+
+
+class TestAgentRunHistory(unittest.TestCase):
+    """Запис запуску агента в історію"""
+
+    def test_stopped_run_is_recorded(self):
+        """Зупинений запуск зберігається з кроками, пройденими до зупинки"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = RunHistory(os.path.join(temp_dir, 'history.sqlite'))
+            agent_run = AgentRun(api_key="sk-test", task="тест", run_history=history, name="Тест")
+            agent_run.record = RunRecord(agent_run.name, agent_run.task)
+            agent_run.agent = SimpleNamespace(state=SimpleNamespace(history=SimpleNamespace(
+                history=[fake_item(2, 10.0, 1.5, "Відкрити сайт")])))
+            agent_run.stop()
+            agent_run._save_record(None, None)
+
+            run = history.runs()[0]
+            self.assertEqual(run["program"], "Тест")
+            self.assertEqual(run["outcome"], STOPPED)
+            self.assertEqual(run["step_count"], 1)
+            history.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher import metrics
+from webmorpher.lite_mode import DOMAIN, ResourceBlocker
+from webmorpher.runner import AgentRun
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.result = None
+
+    async def continue_(self):
+        self.result = "continue"
+
+    async def abort(self, error_code=None):
+        self.result = error_code
+
+
+class FakeContext:
+    """Замінник контексту Playwright, що пропускає запити через маршрути"""
+
+    def __init__(self):
+        self.routes = []
+        self.listeners = []
+
+    async def route(self, pattern, handler):
+        self.routes.append(handler)
+
+    async def unroute(self, pattern, handler):
+        self.routes.remove(handler)
+
+    def on(self, event, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, event, listener):
+        self.listeners.remove(listener)
+
+    async def request(self, url, resource_type, size=0):
+        route = FakeRoute(url, resource_type)
+        for handler in self.routes:
+            await handler(route)
+        if route.result == "continue":
+            for listener in self.listeners:
+                listener(SimpleNamespace(headers={"content-length": str(size)}))
+        return route.result
+
+
+class TestResourceBlocker(unittest.TestCase):
+    """Тести для полегшеного режиму"""
+
+    def test_block_reasons(self):
+        """Блокуються типи ресурсів та домени трекерів, документ — ніколи"""
+        blocker = ResourceBlocker(block_domains=["ads.example.com"], allow_domains=["cdn.shop.com/img"])
+        self.assertEqual(blocker.block_reason("https://shop.com/logo.png", "image"), "image")
+        self.assertEqual(blocker.block_reason("https://shop.com/a.woff2", "font"), "font")
+        self.assertIsNone(blocker.block_reason("https://shop.com/app.js", "script"))
+        self.assertEqual(blocker.block_reason("https://www.google-analytics.com/g/collect", "xhr"), DOMAIN)
+        self.assertEqual(blocker.block_reason("https://x.ads.example.com/banner.js", "script"), DOMAIN)
+        self.assertEqual(blocker.block_reason("https://www.facebook.com/tr?id=1", "image"), "image")
+        self.assertEqual(blocker.block_reason("https://www.facebook.com/tr/?id=1", "xhr"), DOMAIN)
+        self.assertIsNone(blocker.block_reason("https://www.facebook.com/travel", "xhr"))
+        self.assertIsNone(blocker.block_reason("https://doubleclick.net/", "document"))
+        self.assertIsNone(blocker.block_reason("https://cdn.shop.com/img/captcha.png", "image"))
+        self.assertIsNone(blocker.block_reason("data:image/png;base64,AAAA", "image"))
+
+    def test_requests_are_intercepted_and_counted(self):
+        """Заблоковані запити та завантажені байти рахуються, після зняття запити йдуть як раніше"""
+        context = FakeContext()
+        blocker = ResourceBlocker(block_types=["image", "media"], trackers=False)
+        before = metrics.BLOCKED_REQUESTS.value(kind="media")
+
+        async def scenario():
+            await blocker.install(context)
+            results = [
+                await context.request("https://shop.com/", "document", size=2048),
+                await context.request("https://shop.com/a.png", "image"),
+                await context.request("https://shop.com/b.png", "image"),
+                await context.request("https://shop.com/intro.mp4", "media"),
+            ]
+            await blocker.uninstall()
+            results.append(await context.request("https://shop.com/c.png", "image"))
+            return results
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, ["continue", "blockedbyclient", "blockedbyclient", "blockedbyclient", None])
+        self.assertEqual(blocker.blocked, {"image": 2, "media": 1})
+        self.assertEqual((blocker.loaded_requests, blocker.loaded_bytes), (1, 2048))
+        self.assertEqual(metrics.BLOCKED_REQUESTS.value(kind="media") - before, 1)
+        self.assertIn("заблоковано запитів 3", blocker.summary())
+
+    def test_run_installs_blocker(self):
+        """Запуск у полегшеному режимі перехоплює запити до першого кроку та звітує в лог"""
+        logs = []
+        context = FakeContext()
+        agent_run = AgentRun(api_key="sk-test", task="тест", lite_mode={'block_types': ["image"]},
+                             on_log=logs.append)
+
+        class Agent:
+            browser_context = SimpleNamespace(get_session=lambda: asyncio.sleep(0, SimpleNamespace(context=context)))
+
+            async def run(self, max_steps=100, on_step_start=None, on_step_end=None):
+                return await context.request("https://shop.com/a.png", "image")
+
+        agent_run.agent = Agent()
+        self.assertEqual(asyncio.run(agent_run._run_agent()), "blockedbyclient")
+        self.assertEqual(context.routes, [])
+        self.assertIn("заблоковано запитів 1", logs[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
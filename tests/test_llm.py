@@ -0,0 +1,100 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.llm import (build_router, create_chat_model, program_llm_settings, requires_api_key,
+                            COMPLEX_PAGE, FAILURES, FAST)
+
+
+def fake_agent(failures=0, error=None, evaluation="Success", elements=10):
+    """Агент зі станом, який перевіряє вибір моделі"""
+    output = SimpleNamespace(current_state=SimpleNamespace(evaluation_previous_goal=evaluation))
+    state = SimpleNamespace(
+        consecutive_failures=failures,
+        last_result=[SimpleNamespace(error=error)],
+        history=SimpleNamespace(history=[SimpleNamespace(model_output=output)])
+    )
+    cached_state = SimpleNamespace(selector_map={i: None for i in range(elements)})
+    return SimpleNamespace(state=state, llm=None,
+                           browser_context=SimpleNamespace(session=SimpleNamespace(cached_state=cached_state)))
+
+
+class TestModelRouter(unittest.TestCase):
+    """Тести для вибору моделі кроку"""
+
+    def setUp(self):
+        self.created = []
+
+        def factory(model, cache=None, callbacks=None):
+            self.created.append(model)
+            return f"llm:{model}"
+
+        self.factory = factory
+
+    def test_without_fast_model_primary_is_used(self):
+        """Без fast_model усі кроки виконує основна модель"""
+        router = build_router({'model': "gpt-4o"}, factory=self.factory)
+        agent = fake_agent()
+        self.assertEqual(router.route(agent), ("gpt-4o", "primary"))
+        self.assertEqual(agent.llm, "llm:gpt-4o")
+        self.assertEqual(self.created, ["gpt-4o"])
+        self.assertEqual(router.extraction_llm, "llm:gpt-4o")
+
+    def test_easy_steps_go_to_fast_model(self):
+        """Прості кроки — швидкою моделлю, після невдачі та на складній сторінці — основною"""
+        router = build_router({'model': "gpt-4o", 'fast_model': "gpt-4o-mini", 'complex_page_elements': 100},
+                              factory=self.factory)
+        self.assertEqual(router.choose(fake_agent())[1:], ("gpt-4o-mini", FAST))
+        self.assertEqual(router.choose(fake_agent(failures=1))[2], FAILURES)
+        self.assertEqual(router.choose(fake_agent(error="Element not found"))[2], FAILURES)
+        self.assertEqual(router.choose(fake_agent(evaluation="Failed - форма не відкрилась"))[2], FAILURES)
+        self.assertEqual(router.choose(fake_agent(elements=250))[2], COMPLEX_PAGE)
+        self.assertEqual(router.extraction_llm, "llm:gpt-4o-mini")
+
+    def test_escalation_threshold_and_switch_log(self):
+        """escalate_after_failures задає кількість невдач поспіль; route повідомляє лише про зміну"""
+        router = build_router({'fast_model': "mini", 'escalate_after_failures': 2}, factory=self.factory)
+        self.assertEqual(router.choose(fake_agent(failures=1))[2], FAST)
+        self.assertEqual(router.choose(fake_agent(failures=2))[2], FAILURES)
+
+        agent = fake_agent()
+        self.assertEqual(router.route(agent), ("mini", FAST))
+        self.assertIsNone(router.route(agent))
+        self.assertEqual(router.route(fake_agent(failures=3)), ("gpt-4o", FAILURES))
+        self.assertEqual(router.steps, {"mini": 2, "gpt-4o": 1})
+
+
+class TestLLMSettings(unittest.TestCase):
+    """Тести для налаштувань постачальника та програми"""
+
+    def test_program_overrides(self):
+        """Програма замінює основну модель або вимикає швидку"""
+        settings = {'model': "gpt-4o", 'fast_model': "gpt-4o-mini"}
+        self.assertEqual(program_llm_settings(settings, {'model': "gpt-4.1"})['model'], "gpt-4.1")
+        self.assertIsNone(program_llm_settings(settings, {'routing': False})['fast_model'])
+        self.assertEqual(program_llm_settings(settings, {'model': ""}), settings)
+        self.assertEqual(settings['fast_model'], "gpt-4o-mini")
+
+    def test_local_provider(self):
+        """Локальний сервер не потребує ключа OpenAI"""
+        self.assertTrue(requires_api_key({}))
+        self.assertFalse(requires_api_key({'provider': "local"}))
+        self.assertFalse(requires_api_key({'api_key': "sk-local"}))
+
+        llm = create_chat_model("llama3.1", {'provider': "local"})
+        self.assertEqual(llm.model_name, "llama3.1")
+        self.assertEqual(llm.openai_api_base, "http://127.0.0.1:11434/v1")
+
+        llm = create_chat_model("qwen", {'provider': "local", 'base_url': "http://gpu-box:8000/v1"})
+        self.assertEqual(llm.openai_api_base, "http://gpu-box:8000/v1")
+
+        with self.assertRaises(ValueError):
+            create_chat_model("gpt-4o", {'provider': "невідомий"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import sqlite3
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from webmorpher.llm_cache import LLMResponseCache, ResponseStore, cache_key
+
+
+def generation(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+class TestLLMCache(unittest.TestCase):
+    """Тести для кешу відповідей моделі"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'cache.sqlite')
+        self.store = ResponseStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_hit_after_update(self):
+        """Збережена відповідь повертається для того самого запиту"""
+        cache = LLMResponseCache(self.store)
+        self.assertIsNone(cache.lookup('prompt', 'gpt-4o'))
+        cache.update('prompt', 'gpt-4o', generation('відповідь'))
+
+        cached = cache.lookup('prompt', 'gpt-4o')
+        self.assertEqual(cached[0].message.content, 'відповідь')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(self.store.stats(), {'entries': 1, 'hits': 1, 'misses': 1})
+
+    def test_key_ignores_screenshots_and_time(self):
+        """Скриншот і поточний час не впливають на ключ, модель впливає"""
+        first = 'Current date and time: 2025-01-01 10:00 data:image/png;base64,AAAA'
+        second = 'Current date and time: 2025-01-02 03:15 data:image/png;base64,BBBB'
+        self.assertEqual(cache_key(first, 'gpt-4o'), cache_key(second, 'gpt-4o'))
+        self.assertNotEqual(cache_key(first, 'gpt-4o'), cache_key(first, 'gpt-4o-mini'))
+        self.assertNotEqual(cache_key('Current url: a', 'm'), cache_key('Current url: b', 'm'))
+
+    def test_ttl_expiry(self):
+        """Застарілі записи не повертаються"""
+        store = ResponseStore(self.path, ttl=60)
+        cache = LLMResponseCache(store)
+        cache.update('prompt', 'llm', generation('стара'))
+        with patch('webmorpher.llm_cache.time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.lookup('prompt', 'llm'))
+        store.close()
+
+    def test_size_limit_evicts_least_recently_used(self):
+        """При переповненні видаляються записи, які найдовше не використовувалися"""
+        store = ResponseStore(self.path, max_entries=2)
+        cache = LLMResponseCache(store)
+        cache.update('a', 'llm', generation('a'))
+        cache.update('b', 'llm', generation('b'))
+        cache.lookup('a', 'llm')
+        cache.update('c', 'llm', generation('c'))
+
+        self.assertEqual(store.stats()['entries'], 2)
+        self.assertIsNotNone(cache.lookup('a', 'llm'))
+        self.assertIsNone(cache.lookup('b', 'llm'))
+        store.close()
+
+    def test_discard_written(self):
+        """Відповіді невдалого запуску видаляються"""
+        cache = LLMResponseCache(self.store)
+        cache.update('prompt', 'llm', generation('невдала'))
+        cache.discard_written()
+        self.assertEqual(self.store.stats()['entries'], 0)
+
+    def test_discard_keeps_entries_of_other_runs(self):
+        """Відповіді, які інший запуск перезаписав або прочитав, не видаляються"""
+        failed = LLMResponseCache(self.store)
+        other = LLMResponseCache(self.store)
+        failed.update('перезаписаний', 'llm', generation('невдала'))
+        other.update('перезаписаний', 'llm', generation('інша'))
+        failed.update('прочитаний', 'llm', generation('невдала'))
+        self.assertIsNotNone(other.lookup('прочитаний', 'llm'))
+        failed.update('лише свій', 'llm', generation('невдала'))
+
+        failed.discard_written()
+        self.assertEqual(other.lookup('перезаписаний', 'llm')[0].message.content, 'інша')
+        self.assertIsNotNone(other.lookup('прочитаний', 'llm'))
+        self.assertIsNone(other.lookup('лише свій', 'llm'))
+
+    def test_old_cache_file_is_migrated(self):
+        """Кеш без позначки запуску отримує нову колонку"""
+        path = os.path.join(self.temp_dir.name, 'old.sqlite')
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                     "created_at REAL NOT NULL, last_used REAL NOT NULL)")
+        conn.close()
+        store = ResponseStore(path)
+        cache = LLMResponseCache(store)
+        cache.update('prompt', 'llm', generation('відповідь'))
+        cache.discard_written()
+        self.assertEqual(store.stats()['entries'], 0)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
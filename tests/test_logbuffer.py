@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.logbuffer import LogBatcher, RingLog
+
+
+class TestLogBatcher(unittest.TestCase):
+    """Тести для черги логів"""
+
+    def test_drain_with_limit(self):
+        """drain повертає повідомлення в порядку надходження"""
+        batcher = LogBatcher()
+        for i in range(5):
+            batcher.push(i)
+        self.assertEqual(batcher.drain(limit=2), [0, 1])
+        self.assertEqual(batcher.drain(), [2, 3, 4])
+        self.assertEqual(batcher.drain(), [])
+
+    def test_concurrent_push(self):
+        """Повідомлення з кількох потоків не губляться"""
+        batcher = LogBatcher()
+        threads = [threading.Thread(target=lambda: [batcher.push(i) for i in range(1000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(batcher.drain()), 4000)
+
+
+class TestRingLog(unittest.TestCase):
+    """Тести для обмеженого логу"""
+
+    def test_overflow_is_spooled(self):
+        """Рядки понад max_lines дописуються у файл"""
+        with tempfile.TemporaryDirectory() as directory:
+            log = RingLog(max_lines=3, name="Моя програма / 1", spool_dir=directory)
+            self.assertEqual(log.add(["a", "b"]), 0)
+            self.assertIsNone(log.spool_path)
+            self.assertEqual(log.add(["c", "d", "e"]), 2)
+            self.assertEqual(list(log.lines), ["c", "d", "e"])
+            with open(log.spool_path) as f:
+                self.assertEqual(f.read(), "a\nb\n")
+            self.assertEqual(log.spooled, 2)
+            self.assertTrue(os.path.basename(log.spool_path).startswith("Моя_програма_1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+from urllib.request import urlopen
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from webmorpher import metrics
+from webmorpher.llm_metrics import LLMMetricsCallback
+from webmorpher.metrics import MetricsRegistry, MetricsServer, write_metrics_file
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Тести для реєстру метрик"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_prometheus_text_format(self):
+        """Лічильники та гістограми виводяться у форматі Prometheus"""
+        runs = self.registry.counter("test_runs_total", "Запуски", ["outcome"])
+        latency = self.registry.histogram("test_latency_seconds", "Тривалість", buckets=(1, 5))
+        runs.inc(outcome="success")
+        runs.inc(2, outcome="error")
+        latency.observe(0.5)
+        latency.observe(3)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE test_runs_total counter", text)
+        self.assertIn('test_runs_total{outcome="error"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="5"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn("test_latency_seconds_sum 3.5", text)
+        self.assertEqual(latency.mean(), 1.75)
+        self.assertEqual(runs.total(), 3)
+
+    def test_labels_are_checked(self):
+        """Неправильні мітки піднімають помилку"""
+        runs = self.registry.counter("test_runs_total", "Запуски", ["outcome"])
+        with self.assertRaises(ValueError):
+            runs.inc()
+        # Повторна реєстрація повертає ту саму метрику
+        self.assertIs(self.registry.counter("test_runs_total", "Запуски", ["outcome"]), runs)
+
+    def test_file_and_http_export(self):
+        """Метрики записуються у файл та віддаються на /metrics"""
+        gauge = self.registry.gauge("test_browsers", "Браузери")
+        gauge.inc(2)
+        gauge.dec()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "metrics.prom")
+            write_metrics_file(path, self.registry)
+            with open(path) as f:
+                self.assertIn("test_browsers 1", f.read())
+
+        server = MetricsServer(port=0, registry=self.registry).start()
+        try:
+            with urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                self.assertIn("test_browsers 1", response.read().decode('utf-8'))
+        finally:
+            server.shutdown()
+
+
+class TestLLMMetricsCallback(unittest.TestCase):
+    """Тести для метрик викликів моделі"""
+
+    def test_latency_and_tokens(self):
+        """Виклик моделі додає тривалість та токени"""
+        model = f"test-{uuid.uuid4().hex[:8]}"
+        callback = LLMMetricsCallback(model)
+        run_id = uuid.uuid4()
+        message = AIMessage(content="ok", usage_metadata={'input_tokens': 120, 'output_tokens': 30,
+                                                           'total_tokens': 150})
+        callback.on_chat_model_start({}, [[]], run_id=run_id)
+        callback.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+        self.assertEqual(metrics.LLM_TOKENS.value(model=model, kind="input"), 120)
+        self.assertEqual(metrics.LLM_TOKENS.value(model=model, kind="output"), 30)
+        self.assertIn(f'webmorpher_llm_call_duration_seconds_count{{model="{model}"}} 1',
+                      metrics.REGISTRY.render())
+
+        callback.on_llm_start({}, [""], run_id=run_id)
+        callback.on_llm_error(Exception("збій"), run_id=run_id)
+        self.assertEqual(metrics.LLM_ERRORS.value(model=model), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
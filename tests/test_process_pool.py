@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.process_pool import CRASH_MESSAGE, ProcessPool
+
+
+class FakeHistory:
+    """Замінник історії агента з результатом — ідентифікатором процесу"""
+
+    def __init__(self):
+        self.history = [None, None]
+
+    def is_done(self):
+        return True
+
+    def is_successful(self):
+        return True
+
+    def final_result(self):
+        return str(os.getpid())
+
+    def errors(self):
+        return [None]
+
+
+class FakeRun:
+    """Замінник AgentRun у процесі-виконавці; поведінку задає params['mode']"""
+
+    started = True
+
+    def __init__(self, params, on_log, on_error):
+        self.mode = params['mode']
+        self.on_log = on_log
+        self.on_error = on_error
+        self.stopped = threading.Event()
+
+    def execute(self):
+        self.on_log(f"🎯 Режим {self.mode}")
+        if self.mode == 'crash':
+            os._exit(3)
+        if self.mode == 'error':
+            self.on_error("Помилка агента")
+            return None
+        if self.mode == 'wait':
+            self.stopped.wait(10)
+            return None
+        return FakeHistory()
+
+    def pause(self):
+        self.on_log("⏸️ Виконання призупинено...")
+
+    def resume(self):
+        self.on_log("▶️ Виконання відновлено...")
+
+    def stop(self):
+        self.on_log("⏹️ Виконання зупинено!")
+        self.stopped.set()
+
+
+def fake_factory(params, resources, on_log, on_error):
+    return FakeRun(params, on_log, on_error)
+
+
+class TestProcessPool(unittest.TestCase):
+    """Тести для пулу процесів-виконавців"""
+
+    def start_pool(self, **options):
+        pool = ProcessPool(factory=fake_factory, check_interval=0.05, **options).start()
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def run_in_pool(self, pool, mode):
+        logs = []
+        errors = []
+        run = pool.create_run({'mode': mode}, on_log=logs.append, on_error=errors.append)
+        return run, run.execute(), logs, errors
+
+    def test_logs_errors_and_result(self):
+        """Лог, помилки та підсумок запуску передаються з процесу-виконавця"""
+        pool = self.start_pool(size=1)
+        run, summary, logs, errors = self.run_in_pool(pool, 'ok')
+        self.assertTrue(run.started)
+        self.assertTrue(summary['success'])
+        self.assertNotEqual(summary['final_result'], str(os.getpid()))
+        self.assertEqual(summary['steps'], 2)
+        self.assertEqual(logs, ["🎯 Режим ok"])
+
+        _, summary, _, errors = self.run_in_pool(pool, 'error')
+        self.assertFalse(summary['success'])
+        self.assertEqual(errors, ["Помилка агента"])
+        self.assertEqual(summary['errors'], ["Помилка агента"])
+
+    def test_pause_and_stop(self):
+        """Команди паузи та зупинки доходять до запуску в іншому процесі"""
+        pool = self.start_pool(size=1)
+        logs = []
+        run = pool.create_run({'mode': 'wait'}, on_log=logs.append)
+        thread = threading.Thread(target=run.execute)
+        thread.start()
+        deadline = time.monotonic() + 30
+        while not logs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        run.pause()
+        run.resume()
+        run.stop()
+        thread.join(30)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(logs, ["🎯 Режим wait", "⏸️ Виконання призупинено...", "▶️ Виконання відновлено...",
+                                "⏹️ Виконання зупинено!"])
+
+        # Зупинений ще в черзі запуск не потрапляє до виконавця
+        queued = pool.create_run({'mode': 'ok'})
+        queued.stop()
+        self.assertFalse(queued.execute()['started'])
+
+    def test_crash_and_recycling(self):
+        """Аварія виконавця не зачіпає пул, виконавці перезапускаються після ліміту запусків"""
+        pool = self.start_pool(size=1, max_runs_per_worker=2)
+        _, summary, _, errors = self.run_in_pool(pool, 'crash')
+        self.assertFalse(summary['success'])
+        self.assertTrue(errors[0].startswith(CRASH_MESSAGE))
+
+        pids = [self.run_in_pool(pool, 'ok')[1]['final_result'] for _ in range(3)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertEqual(pool.recycled, {'crash': 1, 'runs': 1})
+
+    def test_memory_limit(self):
+        """Виконавець понад ліміт пам'яті зупиняє запуск і перезапускається"""
+        pool = self.start_pool(size=1, max_memory_mb=1)
+        _, summary, logs, _ = self.run_in_pool(pool, 'wait')
+        self.assertTrue(any("ліміт 1 МБ" in message for message in logs))
+        self.assertIn("⏹️ Виконання зупинено!", logs)
+        # Виконавець перезапускається вже після того, як запуск отримав підсумок
+        deadline = time.monotonic() + 30
+        while not pool.recycled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pool.recycled, {'memory': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import sys
+import asyncio
+import contextlib
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('ANONYMIZED_TELEMETRY', 'false')
+
+from browser_use import Browser, BrowserConfig
+
+from webmorpher.profile_snapshot import ProfileSnapshots
+from webmorpher.runner import AgentRun
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def chrome_launch_args(config):
+    """Аргументи, з якими browser-use запустив би Chrome за цією конфігурацією"""
+    launched = []
+
+    async def create_subprocess_exec(binary, *args, **kwargs):
+        launched.extend(args)
+        raise RuntimeError("Chrome не запускається в тестах")
+
+    async def launch():
+        with patch('asyncio.create_subprocess_exec', create_subprocess_exec), \
+                patch('httpx.AsyncClient.get', side_effect=httpx.RequestError("немає браузера")):
+            with contextlib.suppress(RuntimeError):
+                await Browser(config=config)._setup_user_provided_browser(None)
+
+    asyncio.run(launch())
+    return launched
+
+
+class TestProfileSnapshots(unittest.TestCase):
+    """Тести для знімків профілю Chrome"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "Chrome")
+        profile = os.path.join(self.source, "Default")
+        write(os.path.join(self.source, "Local State"), '{"os_crypt": {}}')
+        write(os.path.join(profile, "Preferences"), '{"v": 1}')
+        write(os.path.join(profile, "Local Storage", "leveldb", "000003.ldb"), "таблиця")
+        write(os.path.join(profile, "Local Storage", "leveldb", "LOG"), "журнал")
+        # Кеш та історія в знімок не потрапляють
+        write(os.path.join(profile, "Cache", "Cache_Data", "data_0"), "x" * 1000)
+        write(os.path.join(profile, "History"), "історія")
+        os.makedirs(os.path.join(profile, "Network"))
+        with sqlite3.connect(os.path.join(profile, "Network", "Cookies")) as conn:
+            conn.execute("CREATE TABLE cookies (name TEXT)")
+            conn.execute("INSERT INTO cookies VALUES ('session')")
+        self.snapshots = ProfileSnapshots(path=os.path.join(self.temp_dir.name, "cache"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_clone_contains_only_essential_parts(self):
+        """Копія містить cookies, Local Storage та налаштування, але не кеш"""
+        with self.snapshots.clone(self.source) as clone:
+            profile = os.path.join(clone.path, "Default")
+            self.assertEqual(read(os.path.join(clone.path, "Local State")), '{"os_crypt": {}}')
+            self.assertEqual(read(os.path.join(profile, "Local Storage", "leveldb", "LOG")), "журнал")
+            self.assertFalse(os.path.exists(os.path.join(profile, "Cache")))
+            self.assertFalse(os.path.exists(os.path.join(profile, "History")))
+            with sqlite3.connect(os.path.join(profile, "Network", "Cookies")) as conn:
+                self.assertEqual(conn.execute("SELECT name FROM cookies").fetchall(), [("session",)])
+            path = clone.path
+        self.assertFalse(os.path.exists(path))
+
+    def test_clones_are_independent(self):
+        """Незмінні файли спільні, зміни в копії не потрапляють у знімок"""
+        first = self.snapshots.clone(self.source)
+        second = self.snapshots.clone(self.source)
+        self.assertNotEqual(first.path, second.path)
+
+        table = os.path.join("Default", "Local Storage", "leveldb", "000003.ldb")
+        snapshot = self.snapshots.snapshot_dir(self.source)
+        self.assertEqual(os.stat(os.path.join(first.path, table)).st_ino,
+                         os.stat(os.path.join(snapshot, table)).st_ino)
+
+        write(os.path.join(first.path, "Default", "Preferences"), '{"v": "копія"}')
+        self.assertEqual(read(os.path.join(second.path, "Default", "Preferences")), '{"v": 1}')
+        self.assertEqual(read(os.path.join(self.source, "Default", "Preferences")), '{"v": 1}')
+        first.release()
+        second.release()
+
+    def test_incremental_refresh(self):
+        """Знімок оновлює лише змінені файли, старі копії не змінюються"""
+        old_clone = self.snapshots.clone(self.source)
+        self.assertEqual(self.snapshots.last_refresh['copied'], 5)
+
+        self.snapshots.refresh(self.source)
+        self.assertEqual(self.snapshots.last_refresh['copied'], 0)
+
+        preferences = os.path.join(self.source, "Default", "Preferences")
+        write(preferences, '{"v": 2, "новий": true}')
+        os.unlink(os.path.join(self.source, "Default", "Local Storage", "leveldb", "000003.ldb"))
+        with self.snapshots.clone(self.source) as clone:
+            self.assertEqual(self.snapshots.last_refresh, {'files': 4, 'copied': 1, 'removed': 1})
+            self.assertEqual(read(os.path.join(clone.path, "Default", "Preferences")), '{"v": 2, "новий": true}')
+            self.assertFalse(os.path.exists(os.path.join(clone.path, "Default", "Local Storage", "leveldb",
+                                                         "000003.ldb")))
+        self.assertEqual(read(os.path.join(old_clone.path, "Default", "Preferences")), '{"v": 1}')
+        old_clone.release()
+
+    def test_run_uses_clone_instead_of_profile(self):
+        """Запуск з профілем користувача отримує власну копію профілю"""
+        agent_run = AgentRun(api_key="sk-test", task="тест", user_profile_dir=self.source,
+                             profile_snapshots=self.snapshots)
+        agent_run._clone_profile()
+        try:
+            params = agent_run.browser_config_params()
+            params['browser_binary_path'] = "/usr/bin/google-chrome"
+            launch_args = chrome_launch_args(BrowserConfig(**params))
+            self.assertIn(f"--user-data-dir={agent_run.profile_clone.path}", launch_args)
+            self.assertNotIn(f"--user-data-dir={self.source}", launch_args)
+            self.assertEqual([arg for arg in launch_args if arg.startswith("--user-data-dir=")],
+                             [f"--user-data-dir={agent_run.profile_clone.path}"])
+        finally:
+            agent_run.profile_clone.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.profiles import DEFAULT_PROFILE, compact_profile, page_load_params, program_profile
+from webmorpher.runner import AgentRun
+
+
+class SlowAgent:
+    """Замінник агента, кроки якого тривають steps_duration секунд"""
+
+    def __init__(self, step_duration):
+        self.step_duration = step_duration
+        self.state = SimpleNamespace(consecutive_failures=0, last_result=None)
+        self.steps = 0
+
+    async def step(self, step_info=None):
+        self.steps += 1
+        await asyncio.sleep(self.step_duration)
+
+    async def run(self, max_steps=100, on_step_start=None, on_step_end=None):
+        for _ in range(max_steps):
+            await self.step()
+            if self.state.consecutive_failures >= 2:
+                break
+        return self.steps
+
+
+class TestProfiles(unittest.TestCase):
+    """Тести для профілів виконання"""
+
+    def test_program_profile(self):
+        """Профіль програми доповнює типовий, параметри командного рядка мають пріоритет"""
+        program = {"name": "Тест", "profile": {"max_steps": 15, "vision": False, "headless": False}}
+        profile = program_profile(program, {"headless": None, "max_steps": None, "timeout": 120})
+        self.assertEqual((profile["max_steps"], profile["vision"], profile["headless"]), (15, False, False))
+        self.assertEqual(profile["timeout"], 120)
+        self.assertEqual(profile["max_actions_per_step"], DEFAULT_PROFILE["max_actions_per_step"])
+        self.assertEqual(compact_profile(profile), {"max_steps": 15, "vision": False, "headless": False,
+                                                    "timeout": 120})
+        self.assertEqual(program_profile({}), DEFAULT_PROFILE)
+
+    def test_page_load_bounds(self):
+        """Найбільше очікування сторінки не менше найменшого"""
+        params = page_load_params(program_profile({"profile": {"min_page_load_wait": 2, "max_page_load_wait": 1}}))
+        self.assertEqual(params["minimum_wait_page_load_time"], 2)
+        self.assertEqual(params["maximum_wait_page_load_time"], 2)
+
+    def test_profile_headless_overrides_switch(self):
+        """headless профілю замінює загальний перемикач, None залишає його"""
+        self.assertFalse(AgentRun(api_key="sk-test", task="т", headless=True, profile={"headless": False}).headless)
+        self.assertTrue(AgentRun(api_key="sk-test", task="т", headless=True, profile={"headless": None}).headless)
+
+    def test_step_timeout(self):
+        """Задовгий крок переривається і зараховується як невдалий"""
+        logs = []
+        agent_run = AgentRun(api_key="sk-test", task="т", profile={"step_timeout": 0.05, "max_steps": 5},
+                             on_log=logs.append)
+        agent = SlowAgent(step_duration=1)
+        agent_run._limit_step_time(agent, 0.05)
+        agent_run.agent = agent
+
+        self.assertEqual(asyncio.run(agent_run._run_with_pause_check()), 2)
+        self.assertEqual(agent.state.consecutive_failures, 2)
+        self.assertIn("timed out", agent.state.last_result[0].error)
+        self.assertIn("Крок перервано", logs[-1])
+
+    def test_run_timeout(self):
+        """Запуск переривається після тайм-ауту профілю"""
+        errors = []
+        agent_run = AgentRun(api_key="sk-test", task="т", profile={"timeout": 0.1}, on_error=errors.append)
+        agent_run.agent = SlowAgent(step_duration=0.05)
+
+        self.assertIsNone(asyncio.run(agent_run._run_with_pause_check()))
+        self.assertTrue(agent_run._timed_out)
+        self.assertIn("перевищено час виконання", errors[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from browser_use import Controller
+from browser_use.agent.views import ActionResult
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.views import DOMElementNode
+
+from webmorpher.replay import ReplayDiverged, TraceReplayer, TraceStore, page_fingerprint, record_trace
+
+ActionModel = Controller().registry.create_action_model()
+
+
+def page(button_index):
+    """Сторінка з однією кнопкою, індекс якої змінюється між завантаженнями"""
+    body = DOMElementNode(is_visible=True, parent=None, tag_name='body', xpath='/body', attributes={}, children=[])
+    button = DOMElementNode(is_visible=True, parent=body, tag_name='button', xpath='/body/button',
+                            attributes={'id': 'send'}, children=[], highlight_index=button_index)
+    body.children.append(button)
+    return body, button
+
+
+class FakeBrowserContext:
+    def __init__(self, url, tree):
+        self.url = url
+        self.tree = tree
+
+    async def get_state(self):
+        return SimpleNamespace(url=self.url, title='Тест', tabs=[], element_tree=self.tree)
+
+
+class FakeAgent:
+    """Замінник агента: записує дії замість виконання в браузері"""
+
+    ActionModel = ActionModel
+
+    def __init__(self, url, tree):
+        self.browser_context = FakeBrowserContext(url, tree)
+        self.executed = []
+
+    async def multi_act(self, actions, check_for_new_elements=True):
+        self.executed.extend(action.model_dump(exclude_none=True) for action in actions)
+        action = actions[0].model_dump(exclude_none=True)
+        if 'done' in action:
+            return [ActionResult(is_done=True, success=True, extracted_content=action['done']['text'])]
+        return [ActionResult()]
+
+
+def make_history(button, answer=''):
+    """Історія успішного запуску: клік по кнопці та завершення з відповіддю answer"""
+    element = HistoryTreeProcessor.convert_dom_element_to_history_element(button)
+    url = 'https://example.com/form?session=1'
+    items = [
+        ([ActionModel(click_element_by_index={'index': button.highlight_index})], [element]),
+        ([ActionModel(done={'text': answer, 'success': True})], [None]),
+    ]
+    return SimpleNamespace(history=[
+        SimpleNamespace(
+            model_output=SimpleNamespace(action=actions),
+            state=SimpleNamespace(url=url, interacted_element=elements)
+        )
+        for actions, elements in items
+    ])
+
+
+class TestReplay(unittest.TestCase):
+    """Тести для запису та відтворення дій"""
+
+    def setUp(self):
+        _, button = page(3)
+        self.trace = record_trace('Надішли форму', make_history(button))
+
+    def test_fingerprint_ignores_query(self):
+        """Відбиток сторінки не залежить від параметрів запиту"""
+        self.assertEqual(page_fingerprint('https://example.com/form/?a=1#top'), 'example.com/form')
+
+    def test_store_roundtrip(self):
+        """Запис зберігається для тексту програми"""
+        with tempfile.TemporaryDirectory() as directory:
+            store = TraceStore(directory)
+            store.save('Надішли форму', self.trace)
+            self.assertEqual(store.load('Надішли форму')['steps'], self.trace['steps'])
+            self.assertIsNone(store.load('Інша програма'))
+
+    def test_replay_rebinds_element_index(self):
+        """Відтворення знаходить елемент за новим індексом"""
+        tree, _ = page(7)
+        agent = FakeAgent('https://example.com/form?session=2', tree)
+        history = asyncio.run(TraceReplayer(agent, self.trace, delay=0).replay())
+
+        self.assertEqual(agent.executed[0], {'click_element_by_index': {'index': 7}})
+        self.assertTrue(history.is_done())
+        self.assertTrue(history.is_successful())
+
+    def test_replay_leaves_answer_to_model(self):
+        """Відповідь done із запису не повторюється: сторінка могла змінитися після запису"""
+        _, button = page(3)
+        # Під час запису сторінка повідомляла "Заявку прийнято", тепер там може бути інший статус
+        trace = record_trace('Надішли форму та перевір статус', make_history(button, answer='Заявку прийнято'))
+        tree, _ = page(3)
+        agent = FakeAgent('https://example.com/form', tree)
+        replayer = TraceReplayer(agent, trace, delay=0)
+        history = asyncio.run(replayer.replay())
+
+        self.assertEqual(agent.executed, [{'click_element_by_index': {'index': 3}}])
+        self.assertEqual(replayer.completed, 1)
+        self.assertFalse(history.is_done())
+        self.assertIsNone(history.final_result())
+
+    def test_replay_diverges_on_other_page(self):
+        """Інша сторінка зупиняє відтворення до виконання дій"""
+        tree, _ = page(3)
+        agent = FakeAgent('https://example.com/login', tree)
+        replayer = TraceReplayer(agent, self.trace, delay=0)
+        with self.assertRaises(ReplayDiverged) as context:
+            asyncio.run(replayer.replay())
+        self.assertEqual(context.exception.step, 0)
+        self.assertEqual(agent.executed, [])
+
+    def test_replay_diverges_on_missing_element(self):
+        """Відсутній елемент передає керування моделі"""
+        tree = DOMElementNode(is_visible=True, parent=None, tag_name='body', xpath='/body', attributes={}, children=[])
+        agent = FakeAgent('https://example.com/form', tree)
+        replayer = TraceReplayer(agent, self.trace, delay=0)
+        with self.assertRaises(ReplayDiverged):
+            asyncio.run(replayer.replay())
+        self.assertEqual(replayer.completed, 0)
+
+    def test_replay_stops_before_data_extraction(self):
+        """Витяг даних і підсумкову відповідь після нього відтворення лишає моделі"""
+        tree, button = page(3)
+        element = HistoryTreeProcessor.convert_dom_element_to_history_element(button)
+        items = [
+            ([ActionModel(click_element_by_index={'index': 3})], [element]),
+            ([ActionModel(extract_content={'goal': 'ціни', 'should_strip_link_urls': True})], [None]),
+            ([ActionModel(done={'text': 'Ціна: 10 грн', 'success': True})], [None]),
+        ]
+        history = SimpleNamespace(history=[
+            SimpleNamespace(model_output=SimpleNamespace(action=actions),
+                            state=SimpleNamespace(url='https://example.com/prices', interacted_element=elements))
+            for actions, elements in items
+        ])
+        trace = record_trace('Знайди ціну', history)
+
+        agent = FakeAgent('https://example.com/prices', tree)
+        replayer = TraceReplayer(agent, trace, delay=0)
+        replayed = asyncio.run(replayer.replay())
+        self.assertEqual(agent.executed, [{'click_element_by_index': {'index': 3}}])
+        self.assertEqual(replayer.completed, 1)
+        self.assertFalse(replayed.is_done())
+        self.assertIsNone(replayed.final_result())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher import metrics
+from webmorpher.runner import AgentRun
+
+
+class FakeAgent:
+    """Замінник агента: кроки чекають на "модель", яку можна скасувати"""
+
+    def __init__(self, agent_run, step_seconds=0.01, steps=1000, swallow_cancel=False):
+        self.agent_run = agent_run
+        self.step_seconds = step_seconds
+        self.steps = steps
+        self.swallow_cancel = swallow_cancel
+        self.state = SimpleNamespace(stopped=False)
+        self.completed_steps = 0
+        self.cancelled = False
+
+    async def run(self, max_steps=100, on_step_start=None, on_step_end=None):
+        for _ in range(self.steps):
+            if self.state.stopped:
+                return None
+            if on_step_start is not None:
+                await on_step_start(self)
+            try:
+                await asyncio.sleep(self.step_seconds)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                if not self.swallow_cancel:
+                    raise
+                # browser-use перетворює скасування запиту до моделі на помилку кроку
+                continue
+            self.completed_steps += 1
+            await self.agent_run._wait_if_paused()
+            if on_step_end is not None:
+                await on_step_end(self)
+        return "готово"
+
+
+class TestAgentRunControl(unittest.TestCase):
+    """Тести для паузи та зупинки запуску"""
+
+    def start(self, **agent_options):
+        self.errors = []
+        agent_run = AgentRun(api_key="sk-test", task="тест", on_error=self.errors.append)
+        agent_run.agent = FakeAgent(agent_run, **agent_options)
+        result = {}
+
+        def target():
+            result['value'] = asyncio.run(agent_run._run_with_pause_check())
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        while agent_run._loop is None:
+            time.sleep(0.01)
+        return agent_run, thread, result
+
+    def test_stop_cancels_inflight_call(self):
+        """Зупинка перериває довгий виклик, не чекаючи кінця кроку"""
+        agent_run, thread, result = self.start(step_seconds=30)
+        time.sleep(0.1)
+        started = time.monotonic()
+        agent_run.stop()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertTrue(agent_run.agent.cancelled)
+        self.assertIsNone(result['value'])
+        self.assertIn("зупинено", self.errors[-1])
+
+    def test_stop_when_agent_swallows_cancel(self):
+        """Агент, що перехоплює скасування, зупиняється за прапорцем"""
+        agent_run, thread, result = self.start(step_seconds=30, swallow_cancel=True)
+        time.sleep(0.1)
+        agent_run.stop()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(result['value'])
+
+    def test_pause_and_resume(self):
+        """Під час паузи кроки не виконуються, після відновлення продовжуються"""
+        agent_run, thread, result = self.start(step_seconds=0.01, steps=30)
+        agent_run.pause()
+        time.sleep(0.1)
+        paused_at = agent_run.agent.completed_steps
+        time.sleep(0.1)
+        self.assertEqual(agent_run.agent.completed_steps, paused_at)
+
+        agent_run.resume()
+        thread.join(5)
+        self.assertEqual(result['value'], "готово")
+        self.assertEqual(agent_run.agent.completed_steps, 30)
+
+    def test_step_durations_are_measured(self):
+        """Кожен крок агента потрапляє в гістограму тривалості кроків"""
+        before = metrics.STEP_DURATION.count()
+        agent_run, thread, result = self.start(step_seconds=0.01, steps=3)
+        thread.join(5)
+        self.assertEqual(result['value'], "готово")
+        self.assertEqual(metrics.STEP_DURATION.count() - before, 3)
+
+    def test_stop_while_paused(self):
+        """Зупинка під час паузи завершує запуск"""
+        agent_run, thread, result = self.start(step_seconds=0.01)
+        agent_run.pause()
+        time.sleep(0.1)
+        agent_run.stop()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(result['value'])
+
+
+if __name__ == '__main__':
+    unittest.main()
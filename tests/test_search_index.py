@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.search_index import ProgramIndex, tokenize
+
+
+class TestProgramIndex(unittest.TestCase):
+    """Тести для індексу пошуку програм"""
+
+    def setUp(self):
+        self.index = ProgramIndex([
+            {'id': 1, 'name': 'Погода', 'code': 'Відкрий sinoptik.ua і знайди прогноз'},
+            {'id': 2, 'name': 'Новини', 'code': 'Відкрий news.example.com'},
+        ])
+
+    def test_tokenize_is_case_insensitive(self):
+        """Слова розбиваються без урахування регістру"""
+        self.assertEqual(tokenize("Відкрий Example.COM"), {"відкрий", "example", "com"})
+
+    def test_search_by_prefix_of_all_terms(self):
+        """Програма відповідає, якщо містить префікси всіх слів запиту"""
+        self.assertEqual(self.index.search("відкр"), {1, 2})
+        self.assertEqual(self.index.search("ВІДКРИЙ прог"), {1})
+        self.assertEqual(self.index.search("новини sinoptik"), set())
+        self.assertIsNone(self.index.search("  "))
+
+    def test_update_and_remove_reindex_single_program(self):
+        """Оновлення та видалення змінюють лише слова своєї програми"""
+        self.index.update({'id': 1, 'name': 'Курс валют', 'code': 'Відкрий minfin'})
+        self.assertEqual(self.index.search("прогноз"), set())
+        self.assertEqual(self.index.search("курс"), {1})
+
+        self.index.remove(2)
+        self.assertEqual(self.index.search("відкрий"), {1})
+        self.assertEqual(self.index.search("news"), set())
+        self.assertEqual(len(self.index), 1)
+        # Слова, що більше не зустрічаються, видаляються з індексу
+        self.assertNotIn("news", self.index._words)
+
+
+if __name__ == '__main__':
+    unittest.main()
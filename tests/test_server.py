@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import unittest
+import tempfile
+import threading
+import time
+import urllib.request
+from unittest.mock import patch
+from urllib.error import HTTPError
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.jobs import CANCELLED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from webmorpher.server import JobServer
+
+
+class FakeAgentRun:
+    """Замінник AgentRun: виконується, доки його не зупинять"""
+
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class TestJobQueue(unittest.TestCase):
+    """Тести для постійної черги завдань"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'jobs.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_queue_survives_restart(self):
+        """Завдання виконуються по черзі, перерване виконання повертається в чергу після перезапуску"""
+        queue = JobQueue(self.path)
+        first = queue.submit({'name': 'Перша', 'code': 'Відкрий example.com'}, {'lite': True})
+        second = queue.submit({'name': 'Друга', 'code': 'Відкрий example.org'})
+        self.assertEqual(queue.claim()['id'], first['id'])
+        queue.close()
+
+        queue = JobQueue(self.path)
+        self.assertEqual(queue.get(first['id'])['status'], RUNNING)
+        self.assertEqual(queue.requeue_interrupted(), 1)
+        claimed = queue.claim()
+        self.assertEqual((claimed['id'], claimed['options']), (first['id'], {'lite': True}))
+        queue.finish(first['id'], SUCCEEDED, {'success': True, 'final_result': 'Готово'})
+
+        self.assertEqual(queue.cancel(second['id'])['status'], CANCELLED)
+        self.assertIsNone(queue.claim())
+        self.assertEqual([event['kind'] for event in queue.events(first['id'])],
+                         ['status', 'status', 'status', 'status', 'result', 'status'])
+        self.assertEqual(queue.events(first['id'], after=5)[0]['data'], {'status': SUCCEEDED})
+        self.assertEqual(queue.counts(), {SUCCEEDED: 1, CANCELLED: 1})
+        queue.close()
+
+
+class TestJobServer(unittest.TestCase):
+    """Тести для HTTP API завдань"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.temp_dir.name, 'jobs.sqlite'))
+        self.runs = []
+        programs = {'Пошук': {'id': 7, 'name': 'Пошук', 'code': 'Знайди {{sku}}', 'lite': True}}
+        self.server = JobServer(self.queue, self.run_job, programs.get, port=0, token="test-token",
+                                poll_interval=0.05).start()
+
+    def tearDown(self):
+        for agent_run in self.runs:
+            agent_run.stop()
+        self.server.shutdown()
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def run_job(self, program, options, on_log, on_agent_run):
+        agent_run = FakeAgentRun()
+        self.runs.append(agent_run)
+        on_agent_run(agent_run)
+        on_log(f"🎯 Наступна ціль: {program['code']}")
+        if options.get('max_steps') == 0:
+            # Довге завдання, яке скасовує клієнт
+            agent_run.stopped.wait(5)
+            return {'success': False, 'errors': ["Виконання зупинено користувачем"]}
+        return {'success': True, 'final_result': program['code'], 'lite': program.get('lite')}
+
+    def request(self, method, path, payload=None, token="test-token"):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(f"http://127.0.0.1:{self.server.port}{path}", data=data, method=method)
+        if token:
+            request.add_header('Authorization', f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                body = response.read().decode('utf-8')
+                status = response.status
+        except HTTPError as e:
+            body = e.read().decode('utf-8')
+            status = e.code
+        if path.endswith('/events'):
+            return status, body
+        return status, json.loads(body)
+
+    def test_submit_and_stream_events(self):
+        """Завдання з програми виконується, а його події читаються як Server-Sent Events"""
+        status, job = self.request('POST', '/jobs', {'program': 'Пошук', 'values': {'sku': 'A-1'}})
+        self.assertEqual(status, 201)
+        self.assertEqual(job['status'], QUEUED)
+        self.assertEqual(job['program']['code'], 'Знайди A-1')
+
+        # Потік подій завершується разом із завданням
+        status, stream = self.request('GET', f"/jobs/{job['id']}/events")
+        self.assertEqual(status, 200)
+        self.assertIn("event: log\ndata: {\"message\": \"🎯 Наступна ціль: Знайди A-1\"}", stream)
+        self.assertIn("event: result", stream)
+        self.assertTrue(stream.rstrip().endswith('data: {"status": "succeeded"}'))
+
+        status, finished = self.request('GET', f"/jobs/{job['id']}")
+        self.assertEqual(finished['status'], SUCCEEDED)
+        self.assertEqual(finished['result']['lite'], True)
+        status, jobs = self.request('GET', '/jobs?status=succeeded')
+        self.assertEqual([item['id'] for item in jobs], [job['id']])
+
+    def test_cancel_running_job(self):
+        """Скасування зупиняє виконуване завдання"""
+        _, job = self.request('POST', '/jobs', {'task': 'Довге завдання', 'options': {'max_steps': 0}})
+        deadline = time.monotonic() + 5
+        while not self.runs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status, cancelled = self.request('POST', f"/jobs/{job['id']}/cancel")
+        self.assertEqual(status, 200)
+        self.assertTrue(cancelled['cancel_requested'])
+        self.assertTrue(self.runs[0].stopped.wait(5))
+        self.request('GET', f"/jobs/{job['id']}/events")
+        self.assertEqual(self.queue.get(job['id'])['status'], CANCELLED)
+        status, _ = self.request('DELETE', f"/jobs/{job['id']}")
+        self.assertEqual(status, 409)
+
+    def test_errors_and_auth(self):
+        """Без токена запити відхиляються, некоректні завдання — з поясненням"""
+        self.assertEqual(self.request('GET', '/jobs', token=None)[0], 401)
+        self.assertEqual(self.request('GET', '/health', token=None)[0], 200)
+        self.assertEqual(self.request('POST', '/jobs', {'program': 'Немає'})[0], 404)
+        status, error = self.request('POST', '/jobs', {'program': 'Пошук'})
+        self.assertEqual(status, 400)
+        self.assertIn('{{sku}}', error['error'])
+        self.assertEqual(self.request('POST', '/jobs', {'task': 'т', 'options': {'api_key': 'x'}})[0], 400)
+        self.assertEqual(self.request('GET', '/jobs/unknown')[0], 404)
+
+    def test_rejects_wrong_types(self):
+        """Значення неправильного типу відхиляються до додавання в чергу"""
+        for payload in ({'program': 'Пошук', 'values': ['A-1']},
+                        {'program': ['Пошук']},
+                        {'task': 5},
+                        {'task': 'т', 'options': {'headless': 'no'}},
+                        {'task': 'т', 'options': {'max_steps': True}},
+                        {'task': 'т', 'options': {'max_steps': '10'}},
+                        {'task': 'т', 'options': {'timeout': '60'}},
+                        {'task': 'т', 'options': {'model': 1}}):
+            status, error = self.request('POST', '/jobs', payload)
+            self.assertEqual(status, 400, payload)
+            self.assertIn('error', error)
+        self.assertEqual(self.queue.counts(), {})
+
+        status, job = self.request('POST', '/jobs', {'task': 'т', 'options': {
+            'headless': False, 'max_steps': 3, 'timeout': 1.5, 'model': 'gpt-4.1'}})
+        self.assertEqual(status, 201)
+        self.assertEqual(job['options']['timeout'], 1.5)
+
+    def test_internal_error_returns_json(self):
+        """Непередбачена помилка повертає 500 з JSON тілом"""
+        with patch.object(self.queue, 'counts', side_effect=RuntimeError("база недоступна")):
+            status, error = self.request('GET', '/health')
+        self.assertEqual(status, 500)
+        self.assertIn("база недоступна", error['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
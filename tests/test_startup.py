@@ -0,0 +1,38 @@
+import io
+import os
+import sys
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.startup import StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """Тести для профілювання запуску"""
+
+    def test_phases_are_recorded(self):
+        """Фази та позначки потрапляють у звіт"""
+        profiler = StartupProfiler(enabled=True)
+        with profiler.phase("імпорт"):
+            pass
+        profiler.mark("вікно")
+
+        self.assertEqual([name for name, _ in profiler.phases], ["імпорт", "[вікно]"])
+        stream = io.StringIO()
+        profiler.report(stream)
+        self.assertIn("імпорт", stream.getvalue())
+        self.assertIn("[загалом]", stream.getvalue())
+
+    def test_phase_recorded_on_error(self):
+        """Фаза записується, навіть якщо всередині виникла помилка"""
+        profiler = StartupProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.phase("збій"):
+                raise ValueError()
+        self.assertEqual(profiler.phases[0][0], "збій")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher import metrics
+from webmorpher.state_diff import StateCompressor, parse_state
+
+
+def page(*extra, query=""):
+    """Серіалізований стан сторінки у форматі browser-use"""
+    lines = [
+        "Каталог товарів",
+        "[0]<a href='/'>Головна />",
+        "[1]<input name='q' placeholder='Пошук' value='" + query + "' />",
+        "[2]<button type='submit' class='btn btn-primary search-button'>Знайти />",
+    ]
+    for i in range(3, 13):
+        lines.append(f"[{i}]<a href='/product/{i}' class='product-card__link'>Товар номер {i} з довгою назвою />")
+        lines.append(f"\tОпис товару {i}: характеристики, ціна, наявність у магазинах та умови доставки")
+    return "\n".join(lines + list(extra))
+
+
+def state(text, url="https://shop.com/"):
+    element_tree = SimpleNamespace(clickable_elements_to_string=lambda include_attributes=None: text)
+    return SimpleNamespace(element_tree=element_tree, url=url, tabs=[], pixels_above=0, pixels_below=0,
+                           screenshot=None)
+
+
+def message_manager():
+    """MessageManager browser-use з власною історією (типовий стан спільний для всіх екземплярів)"""
+    from langchain_core.messages import SystemMessage
+    from browser_use.agent.message_manager.service import MessageManager
+    from browser_use.agent.message_manager.views import MessageManagerState
+
+    return MessageManager(task="тест", system_message=SystemMessage(content="system"), state=MessageManagerState())
+
+
+class TestStateCompressor(unittest.TestCase):
+    """Тести для стиснення стану сторінки"""
+
+    def test_parse_multiline_element(self):
+        """Текст елемента може займати кілька рядків"""
+        entries = parse_state("Заголовок\n\t*[4]*<button>Купити\nзараз />\n[5]<a>Далі />")
+        self.assertEqual([entry.index for entry in entries], [None, 4, 5])
+        self.assertEqual(entries[1].signature, "\t<button>Купити\nзараз />")
+
+    def test_only_changed_elements_are_sent_in_full(self):
+        """Змінені елементи передаються повністю, решта — коротко з тими ж індексами"""
+        compressor = StateCompressor()
+        first = page()
+        self.assertIs(compressor.compress("https://shop.com/", first), first)
+
+        second = page(query="ноутбук")
+        compressed = compressor.compress("https://shop.com/", second)
+        self.assertIn("*[1]*<input name='q' placeholder='Пошук' value='ноутбук' />", compressed)
+        self.assertIn("[2]<button>Знайти />", compressed)
+        self.assertIn("[7]<a>Товар номер 7 з довгою назвою />", compressed)
+        self.assertNotIn("product-card__link", compressed)
+        self.assertLess(len(compressed), len(second) * 0.8)
+        self.assertEqual((compressor.full_states, compressor.diff_states), (1, 1))
+        self.assertIn("кроків зі змінами", compressor.summary())
+
+    def test_unchanged_text_stays_visible(self):
+        """Незмінений текст поза елементами передається, довгий — скороченим"""
+        compressor = StateCompressor()
+        long_text = "Доставка по всій країні протягом двох днів, самовивіз з магазинів у кожному місті"
+        compressor.compress("https://shop.com/", page(long_text))
+        compressed = compressor.compress("https://shop.com/", page(long_text, query="ноутбук"))
+        self.assertIn("Каталог товарів", compressed)
+        self.assertIn("\tОпис товару 7: характеристики, ціна, наявність у магазинах…", compressed)
+        self.assertIn(long_text[:40], compressed)
+        self.assertNotIn(long_text, compressed)
+
+    def test_diff_against_last_full_state(self):
+        """Стан стискається відносно останнього повного, а не попереднього кроку"""
+        compressor = StateCompressor()
+        compressor.compress("https://shop.com/", page())
+        compressor.compress("https://shop.com/", page(query="a"))
+        compressed = compressor.compress("https://shop.com/", page(query="a"))
+        self.assertIn("*[1]*<input name='q' placeholder='Пошук' value='a' />", compressed)
+
+    def test_full_snapshot_fallbacks(self):
+        """Повний стан після переходу, помилки, великих змін та кожні full_every кроків"""
+        compressor = StateCompressor(full_every=3)
+        before = metrics.STATE_CHARS.value(kind="original")
+        compressor.compress("https://shop.com/", page())
+        self.assertIsNot(compressor.compress("https://shop.com/", page(query="a")), page(query="a"))
+
+        other = page(query="b")
+        self.assertIs(compressor.compress("https://shop.com/cart", other), other)
+        self.assertIs(compressor.compress("https://shop.com/cart", other, failed=True), other)
+
+        changed = other.replace("Товар номер", "Знижка на товар")
+        self.assertIs(compressor.compress("https://shop.com/cart", changed), changed)
+
+        self.assertIsNot(compressor.compress("https://shop.com/cart", changed), changed)
+        self.assertIsNot(compressor.compress("https://shop.com/cart", changed), changed)
+        self.assertIs(compressor.compress("https://shop.com/cart", changed), changed)
+        self.assertGreater(metrics.STATE_CHARS.value(kind="original") - before, 0)
+
+    def test_attached_to_message_manager(self):
+        """Стиснений стан замінює список елементів у повідомленні агента, токени перераховуються"""
+        manager = message_manager()
+        compressor = StateCompressor()
+        compressor.attach(SimpleNamespace(_message_manager=manager))
+        output = SimpleNamespace(model_dump=lambda **kwargs: {})
+
+        manager.add_state_message(state(page()))
+        full = manager.state.history.messages[-1]
+        full_tokens = full.metadata.tokens
+        manager._remove_last_state_message()
+        manager.add_model_output(output)
+
+        manager.add_state_message(state(page(query="ноутбук")))
+        message = manager.state.history.messages[-1]
+        self.assertIn("Current url: https://shop.com/", message.message.content)
+        self.assertIn("*[1]*<input", message.message.content)
+        self.assertNotIn("product-card__link", message.message.content)
+        self.assertEqual(message.metadata.tokens, manager._count_tokens(message.message))
+        self.assertLess(message.metadata.tokens, full_tokens)
+
+    def test_full_state_stays_in_conversation(self):
+        """browser-use прибирає стан після кроку, але повний стан лишається для наступних стиснутих"""
+        manager = message_manager()
+        compressor = StateCompressor()
+        compressor.attach(SimpleNamespace(_message_manager=manager))
+        output = SimpleNamespace(model_dump=lambda **kwargs: {})
+
+        manager.add_state_message(state(page()))
+        full = manager.state.history.messages[-1]
+        manager._remove_last_state_message()
+        manager.add_model_output(output)
+        self.assertIn(full, manager.state.history.messages)
+
+        # Стиснутий стан прибирається як звичайно, повний лишається
+        manager.add_state_message(state(page(query="ноутбук")))
+        compressed = manager.state.history.messages[-1]
+        manager._remove_last_state_message()
+        manager.add_model_output(output)
+        messages = manager.state.history.messages
+        self.assertNotIn(compressed, messages)
+        self.assertEqual(sum(1 for m in messages if m is full), 1)
+        self.assertEqual(manager.state.history.current_tokens, sum(m.metadata.tokens for m in messages))
+
+        # Модель не відповіла на новий повний стан: наступний теж повний
+        manager.add_state_message(state(page(), url="https://shop.com/cart"))
+        manager._remove_last_state_message()
+        manager.add_state_message(state(page(), url="https://shop.com/cart"))
+        self.assertNotIn("compressed", manager.state.history.messages[-1].message.content)
+
+
+if __name__ == '__main__':
+    unittest.main()
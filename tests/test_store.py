@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.store import ConfigStore, open_store, store_path_for
+
+
+class TestConfigStore(unittest.TestCase):
+    """Тести для сховища програм і налаштувань"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, 'config.json')
+        with open(self.config_path, 'w') as f:
+            json.dump({
+                'api_key': 'sk-testkey123',
+                'max_concurrent_runs': 3,
+                'programs': [
+                    {'name': 'Перша', 'code': 'Відкрий example.com', 'llm_cache': True},
+                    {'name': 'Друга', 'code': 'Відкрий example.org'},
+                ]
+            }, f)
+        self.store = open_store(self.config_path)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_migrates_json_config(self):
+        """Налаштування і програми імпортуються з JSON у порядку файлу"""
+        self.assertEqual(self.store.path, store_path_for(self.config_path))
+        self.assertEqual(self.store.settings(), {'api_key': 'sk-testkey123', 'max_concurrent_runs': 3})
+        programs = self.store.programs()
+        self.assertEqual([program['name'] for program in programs], ['Перша', 'Друга'])
+        self.assertTrue(programs[0]['llm_cache'])
+        self.assertNotIn('llm_cache', programs[1])
+
+    def test_migration_runs_once(self):
+        """Повторне відкриття не імпортує JSON вдруге"""
+        self.store.delete_program(self.store.find_program('Друга')['id'])
+        self.store.close()
+        self.store = open_store(self.config_path)
+        self.assertEqual([program['name'] for program in self.store.programs()], ['Перша'])
+
+    def test_edited_json_updates_settings_only(self):
+        """Змінений вручну JSON оновлює налаштування, але не програми"""
+        with open(self.config_path, 'w') as f:
+            json.dump({'api_key': 'sk-testkey123', 'cdp_endpoints': ['http://a:9222'],
+                       'programs': [{'name': 'Нова', 'code': ''}]}, f)
+        os.utime(self.config_path, (0, 0))
+        self.store.close()
+        self.store = open_store(self.config_path)
+        self.assertEqual(self.store.get_setting('cdp_endpoints'), ['http://a:9222'])
+        self.assertIsNone(self.store.find_program('Нова'))
+        self.assertEqual(self.store.program_count(), 2)
+
+    def test_gui_change_survives_later_json_edit(self):
+        """Налаштування, змінене в GUI, не повертається до значення з JSON після редагування іншого ключа"""
+        self.store.set_settings({'api_key': 'sk-new'})
+        with open(self.config_path, 'w') as f:
+            json.dump({'api_key': 'sk-testkey123', 'max_concurrent_runs': 5,
+                       'browser_pool': {'size': 4}}, f)
+        os.utime(self.config_path, (0, 0))
+        self.store.close()
+        self.store = open_store(self.config_path)
+        self.assertEqual(self.store.get_setting('api_key'), 'sk-new')
+        self.assertEqual(self.store.get_setting('max_concurrent_runs'), 5)
+        self.assertEqual(self.store.get_setting('browser_pool'), {'size': 4})
+
+    def test_store_migrated_without_json_snapshot(self):
+        """Сховище старої версії без знімка JSON отримує лише нові ключі"""
+        with self.store._conn:
+            self.store._conn.execute("DELETE FROM meta WHERE name = 'json_settings'")
+        self.store.set_settings({'api_key': 'sk-new'})
+        with open(self.config_path, 'w') as f:
+            json.dump({'api_key': 'sk-testkey123', 'cdp_endpoints': {'urls': ['http://a:9222']}}, f)
+        os.utime(self.config_path, (0, 0))
+        self.store.close()
+        self.store = open_store(self.config_path)
+        self.assertEqual(self.store.get_setting('api_key'), 'sk-new')
+        self.assertEqual(self.store.get_setting('cdp_endpoints'), {'urls': ['http://a:9222']})
+
+    def test_program_changes_touch_single_rows(self):
+        """Додавання, редагування та видалення змінюють лише свій рядок"""
+        program = self.store.add_program({'name': 'Третя', 'code': 'Знайди погоду', 'replay': True})
+        self.assertIn('id', program)
+        self.assertEqual(self.store.program_count(), 3)
+
+        program['code'] = 'Знайди новини'
+        self.store.update_program(program)
+        first = self.store.find_program('Перша')
+        self.store.delete_program(first['id'])
+
+        self.store.close()
+        self.store = ConfigStore(store_path_for(self.config_path))
+        self.assertEqual([p['name'] for p in self.store.programs()], ['Друга', 'Третя'])
+        self.assertEqual(self.store.find_program('Третя'),
+                         {'id': program['id'], 'name': 'Третя', 'code': 'Знайди новини', 'replay': True})
+
+    def test_settings_round_trip(self):
+        """Налаштування зберігаються як JSON значення"""
+        self.store.set_settings({'api_key': 'sk-new', 'browser_pool': {'max_size': 2}})
+        self.assertEqual(self.store.get_setting('api_key'), 'sk-new')
+        self.assertEqual(self.store.get_setting('browser_pool'), {'max_size': 2})
+        self.assertIsNone(self.store.get_setting('missing'))
+        self.assertIsNone(self.store.find_program('Немає такої'))
+
+    def test_missing_json_gives_empty_store(self):
+        """Без файлу конфігурації сховище порожнє"""
+        store = open_store(os.path.join(self.temp_dir.name, 'absent.json'))
+        try:
+            self.assertEqual(store.settings(), {})
+            self.assertEqual(store.programs(), [])
+        finally:
+            store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import sqlite3
+import unittest
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Додаємо батьківську директорію до шляху, щоб імпортувати пакет webmorpher
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webmorpher.jobs import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from webmorpher.worker import JobWorker
+
+
+class FakeAgentRun:
+    """Замінник AgentRun: виконується, доки його не зупинять"""
+
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class TestSharedQueue(unittest.TestCase):
+    """Тести для спільної черги кількох вузлів"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'jobs.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_expired_lease_moves_job_to_another_node(self):
+        """Завдання вузла, що перестав надсилати сигнали життя, виконує інший вузол"""
+        first = JobQueue(self.path, lease=0.05, max_attempts=2, shared=True)
+        second = JobQueue(self.path, lease=0.05, max_attempts=2, shared=True)
+        job = second.submit({'name': 'Пошук', 'code': 'Відкрий example.com'})
+        self.assertEqual(first.claim('node-a')['node'], 'node-a')
+        self.assertIsNone(second.claim('node-b'))
+
+        first.heartbeat('node-a', capacity=2, running=[job['id']])
+        self.assertEqual(second.nodes()[0]['running'], 1)
+        time.sleep(0.1)
+        self.assertFalse(second.nodes()[0]['online'])
+        self.assertEqual(second.requeue_expired(), 1)
+        self.assertEqual(second.get(job['id'])['status'], QUEUED)
+
+        claimed = second.claim('node-b')
+        self.assertEqual((claimed['node'], claimed['attempts']), ('node-b', 2))
+        # Вузол, що втратив оренду, не може завершити чуже завдання
+        self.assertFalse(first.finish(job['id'], SUCCEEDED, {'success': True}, node='node-a'))
+        self.assertFalse(first.requeue(job['id'], node='node-a'))
+
+        # Після max_attempts втрачених оренд завдання завершується помилкою
+        time.sleep(0.1)
+        first.requeue_expired()
+        finished = first.get(job['id'])
+        self.assertEqual(finished['status'], FAILED)
+        self.assertIn("node-b", finished['error'])
+        first.close()
+        second.close()
+
+    def test_heartbeat_renews_only_running_jobs(self):
+        """Сигнал життя не продовжує оренду завдання, яке вузол уже не виконує"""
+        queue = JobQueue(self.path, lease=60)
+        queue.submit({'name': 'Перше', 'code': 'Знайди A-1'})
+        queue.submit({'name': 'Друге', 'code': 'Знайди B-2'})
+        running = queue.claim('node-a')
+        lost = queue.claim('node-a')
+        time.sleep(0.01)
+
+        queue.heartbeat('node-a', capacity=2, running=[running['id']])
+        self.assertGreater(queue.get(running['id'])['lease_expires'], running['lease_expires'])
+        self.assertEqual(queue.get(lost['id'])['lease_expires'], lost['lease_expires'])
+        queue.close()
+
+
+class TestJobWorker(unittest.TestCase):
+    """Тести для вузла-виконавця"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'jobs.sqlite')
+        self.queue = JobQueue(self.path)
+        self.runs = []
+        self.worker = JobWorker(self.queue, self.run_job, node='node-a', workers=2, poll_interval=0.05,
+                                heartbeat_interval=0.05).start()
+
+    def tearDown(self):
+        self.worker.shutdown()
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def run_job(self, program, options, on_log, on_agent_run):
+        agent_run = FakeAgentRun()
+        self.runs.append(agent_run)
+        on_agent_run(agent_run)
+        on_log(f"🎯 Наступна ціль: {program['code']}")
+        if program['code'] == 'wait':
+            agent_run.stopped.wait(5)
+            return {'success': False, 'errors': ["Виконання зупинено користувачем"]}
+        return {'success': True, 'final_result': program['code']}
+
+    def wait_for(self, queue, job_id, statuses):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            job = queue.get(job_id)
+            if job['status'] in statuses:
+                return job
+            time.sleep(0.02)
+        self.fail(f"Завдання не перейшло в стан {statuses}")
+
+    def test_jobs_from_another_process(self):
+        """Вузол виконує завдання, додані через інше з'єднання, і зупиняє скасовані там"""
+        client = JobQueue(self.path)
+        done = client.submit({'name': 'Пошук', 'code': 'Знайди A-1'})
+        waiting = client.submit({'name': 'Довге', 'code': 'wait'})
+
+        finished = self.wait_for(client, done['id'], (SUCCEEDED,))
+        self.assertEqual((finished['node'], finished['result']['final_result']), ('node-a', 'Знайди A-1'))
+        self.assertIn("🎯 Наступна ціль: Знайди A-1",
+                      [event['data'].get('message') for event in client.events(done['id'])])
+
+        self.wait_for(client, waiting['id'], (RUNNING,))
+        node = client.nodes()[0]
+        self.assertEqual((node['node'], node['capacity'], node['online']), ('node-a', 2, True))
+        # Скасування на іншому з'єднанні вузол помічає під час сигналу життя
+        client.cancel(waiting['id'])
+        self.assertEqual(self.wait_for(client, waiting['id'], (CANCELLED,))['status'], CANCELLED)
+        client.close()
+
+    def test_queue_error_does_not_stop_worker(self):
+        """Помилка черги після запуску не зупиняє потоки вузла"""
+        finish = self.queue.finish
+        failures = []
+
+        def flaky_finish(job_id, *args, **kwargs):
+            if not failures:
+                failures.append(job_id)
+                raise sqlite3.OperationalError("database is locked")
+            return finish(job_id, *args, **kwargs)
+
+        with patch.object(self.queue, 'finish', side_effect=flaky_finish):
+            lost = self.queue.submit({'name': 'Перше', 'code': 'Знайди A-1'})
+            self.wait_for(self.queue, lost['id'], (RUNNING,))
+            deadline = time.monotonic() + 5
+            while not failures and time.monotonic() < deadline:
+                time.sleep(0.02)
+            job = self.queue.submit({'name': 'Друге', 'code': 'Знайди B-2'})
+            self.assertEqual(self.wait_for(self.queue, job['id'], (SUCCEEDED,))['status'], SUCCEEDED)
+        self.assertEqual(failures, [lost['id']])
+        self.assertTrue(all(thread.is_alive() for thread in self.worker._threads))
+        # Завдання, яке не вдалося завершити, вузол більше не вважає своїм
+        self.assertNotIn(lost['id'], self.worker.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
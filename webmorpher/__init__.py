@@ -0,0 +1 @@
+"""Ядро WebMorpher, яке не залежить від графічного інтерфейсу"""
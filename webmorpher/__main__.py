@@ -0,0 +1,5 @@
+import sys
+
+from webmorpher.cli import main
+
+sys.exit(main())
@@ -0,0 +1,140 @@
+"""Пакетні запуски: одна програма для кожного рядка таблиці вхідних даних.
+
+Код програми може містити підстановки {{назва_стовпця}}. Рядки читаються
+потоково з CSV (TSV) або JSONL, тому таблиця може бути будь-якого розміру.
+Результат кожного рядка одразу дописується у JSONL файл; повторний запуск
+з тим самим файлом результатів пропускає вже виконані рядки.
+"""
+import csv
+import json
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PLACEHOLDER = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+
+
+def placeholders(code):
+    """Назви підстановок у коді програми в порядку появи"""
+    names = []
+    for name in PLACEHOLDER.findall(code or ""):
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def render_task(code, values):
+    """Код програми з підставленими значеннями; KeyError, якщо значення немає"""
+    def substitute(match):
+        name = match.group(1)
+        if name not in values:
+            raise KeyError(name)
+        value = values[name]
+        return "" if value is None else str(value)
+
+    return PLACEHOLDER.sub(substitute, code)
+
+
+def read_rows(path):
+    """(номер рядка, словник значень) з CSV, TSV або JSONL; номери даних починаються з 1"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                number += 1
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path}: рядок {number} не є JSON об'єктом")
+                yield number, row
+    elif extension in (".csv", ".tsv"):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f, delimiter="\t" if extension == ".tsv" else ",")
+            for number, row in enumerate(reader, 1):
+                yield number, row
+    else:
+        raise ValueError(f"Невідомий формат вхідних даних: {path} (підтримуються .csv, .tsv, .jsonl)")
+
+
+class BatchResults:
+    """Файл результатів JSONL, що дописується після кожного рядка"""
+
+    def __init__(self, path, retry_failed=False):
+        self.path = path
+        self.retry_failed = retry_failed
+        # Номер рядка -> останній записаний результат
+        self.completed = {}
+        self.written = 0
+        self.failed = 0
+        self._file = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Рядок, який не встигли дописати до переривання
+                    continue
+                self.completed[record.get("row")] = record
+
+    def is_done(self, number, row):
+        """Чи виконано рядок у попередньому запуску з тими самими значеннями"""
+        record = self.completed.get(number)
+        if record is None or record.get("input") != row:
+            return False
+        return record.get("success") or not self.retry_failed
+
+    def write(self, record):
+        if self._file is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a+", encoding="utf-8")
+            # Обірваний останній рядок не повинен злитися з новим записом
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.completed[record["row"]] = record
+        self.written += 1
+        if not record.get("success"):
+            self.failed += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_batch(rows, run_row, concurrency=1, on_result=None):
+    """Виконати run_row(номер, рядок) для рядків паралельно, тримаючи в черзі не більше 2 × concurrency.
+
+    on_result викликається в потоці, що викликав run_batch, у порядку завершення.
+    """
+    concurrency = max(1, concurrency)
+    on_result = on_result or (lambda result: None)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        for number, row in rows:
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    on_result(future.result())
+            pending.add(executor.submit(run_row, number, row))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_result(future.result())
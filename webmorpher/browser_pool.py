@@ -0,0 +1,279 @@
+"""Пул попередньо запущених браузерів, які повторно використовуються між запусками"""
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from webmorpher import metrics
+from webmorpher.chrome import find_free_port
+
+
+class PooledBrowser:
+    """Браузер з пулу разом з обліковою інформацією про використання"""
+
+    def __init__(self, browser, key, user_data_dir=None):
+        self.browser = browser
+        self.key = key
+        # Тимчасовий профіль Chrome, який видаляється разом з браузером
+        self.user_data_dir = user_data_dir
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+def _config_key(params):
+    """Ключ пулу: браузери з різними налаштуваннями не змішуються"""
+    return tuple(sorted((name, repr(value)) for name, value in params.items()))
+
+
+def _has_user_data_dir(params):
+    return any(arg.startswith("--user-data-dir=") for arg in params.get('extra_browser_args', []))
+
+
+def default_browser_factory(params):
+    """Створення браузера browser-use за параметрами BrowserConfig"""
+    from browser_use import Browser, BrowserConfig
+
+    params = dict(params)
+    if params.get('browser_binary_path') and 'chrome_remote_debugging_port' not in params:
+        # Кожен Chrome у пулі отримує власний порт, інакше browser-use
+        # підключиться до вже запущеного екземпляра
+        params['chrome_remote_debugging_port'] = find_free_port()
+    return Browser(config=BrowserConfig(**params))
+
+
+class BrowserPool:
+    """Пул теплих браузерів.
+
+    Запуски беруть браузер з пулу (acquire) і повертають його (release),
+    кожен запуск працює у власному контексті браузера. Браузери, що
+    простоюють довше за idle_timeout або відпрацювали max_uses запусків,
+    закриваються. Усі корутини пулу виконуються у власному циклі asyncio
+    у фоновому потоці, тому об'єкти Playwright живуть в одному циклі.
+    """
+
+    def __init__(self, size=2, idle_timeout=300, max_uses=20, browser_factory=None):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.browser_factory = browser_factory or default_browser_factory
+        self._idle = {}
+        self._in_use = set()
+        self._lock = None
+        self._closed = False
+        self.loop = None
+        self._thread = None
+        self._evict_task = None
+
+    # --- Керування фоновим циклом ---
+
+    def start(self):
+        """Запуск фонового потоку з циклом asyncio пулу"""
+        if self._thread is not None:
+            return self
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, name="webmorpher-browser-pool", daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._evict_task = self.run_soon(self._evict_periodically())
+        return self
+
+    def run_soon(self, coro):
+        """Запланувати корутину в циклі пулу, повертає concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Виконати корутину в циклі пулу та дочекатися результату (з іншого потоку)"""
+        return self.run_soon(coro).result(timeout)
+
+    def shutdown(self, timeout=10):
+        """Закрити всі браузери та зупинити фоновий потік"""
+        if self._thread is None:
+            return
+        if self._evict_task is not None:
+            self._evict_task.cancel()
+        try:
+            self.run(self._cancel_pending(timeout), timeout=timeout + 1)
+            self.run(self.close(), timeout=timeout)
+        except Exception as e:
+            print(f"Помилка закриття пулу браузерів: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # --- Асинхронний API (викликається в циклі пулу) ---
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def acquire(self, params):
+        """Отримати здоровий браузер для заданих параметрів"""
+        key = _config_key(params)
+        pooled = None
+        stale = []
+        async with self._get_lock():
+            idle = self._idle.setdefault(key, [])
+            while idle and pooled is None:
+                candidate = idle.pop()
+                if self._is_healthy(candidate):
+                    pooled = candidate
+                else:
+                    stale.append(candidate)
+        for candidate in stale:
+            await self._close_browser(candidate)
+        if pooled is None:
+            # Запуск Chrome виконується поза блокуванням, щоб паралельні
+            # запуски не чекали один на одного
+            pooled = await self._launch(params, key)
+        pooled.uses += 1
+        pooled.last_used = time.monotonic()
+        self._in_use.add(pooled)
+        return pooled
+
+    async def release(self, pooled, healthy=True):
+        """Повернути браузер у пул або закрити його, якщо він вже не придатний"""
+        async with self._get_lock():
+            self._in_use.discard(pooled)
+            pooled.last_used = time.monotonic()
+            idle = self._idle.setdefault(pooled.key, [])
+            keep = (
+                healthy
+                and not self._closed
+                and pooled.uses < self.max_uses
+                and len(idle) < self.size
+                and self._is_healthy(pooled)
+            )
+            if keep:
+                idle.append(pooled)
+                return
+        await self._close_browser(pooled)
+
+    @asynccontextmanager
+    async def lease(self, params):
+        """Контекстний менеджер: взяти браузер і гарантовано повернути його"""
+        pooled = await self.acquire(params)
+        healthy = True
+        try:
+            yield pooled.browser
+        except BaseException:
+            healthy = self._is_healthy(pooled)
+            raise
+        finally:
+            await self.release(pooled, healthy=healthy)
+
+    async def warm(self, params, count=None):
+        """Попередній запуск браузерів, щоб перший запуск не чекав на Chrome"""
+        key = _config_key(params)
+        count = self.size if count is None else min(count, self.size)
+        missing = count - len(self._idle.get(key, []))
+        launched = [await self._launch(params, key) for _ in range(max(0, missing))]
+        extra = []
+        async with self._get_lock():
+            idle = self._idle.setdefault(key, [])
+            for pooled in launched:
+                if len(idle) < self.size and not self._closed:
+                    idle.append(pooled)
+                else:
+                    extra.append(pooled)
+        for pooled in extra:
+            await self._close_browser(pooled)
+
+    async def evict_idle(self):
+        """Закрити браузери, що простоюють довше за idle_timeout, або нездорові"""
+        now = time.monotonic()
+        evicted = []
+        async with self._get_lock():
+            for idle in self._idle.values():
+                for pooled in list(idle):
+                    if now - pooled.last_used >= self.idle_timeout or not self._is_healthy(pooled):
+                        idle.remove(pooled)
+                        evicted.append(pooled)
+        for pooled in evicted:
+            await self._close_browser(pooled)
+        return len(evicted)
+
+    async def close(self):
+        """Закрити всі браузери пулу"""
+        async with self._get_lock():
+            self._closed = True
+            browsers = [pooled for idle in self._idle.values() for pooled in idle]
+            browsers.extend(self._in_use)
+            self._idle.clear()
+            self._in_use.clear()
+        for pooled in browsers:
+            await self._close_browser(pooled)
+
+    def stats(self):
+        """Кількість вільних та зайнятих браузерів"""
+        return {
+            'idle': sum(len(idle) for idle in self._idle.values()),
+            'in_use': len(self._in_use),
+        }
+
+    # --- Внутрішні методи ---
+
+    async def _launch(self, params, key):
+        started = time.monotonic()
+        user_data_dir = None
+        if params.get('browser_binary_path') and not _has_user_data_dir(params):
+            # Інакше всі браузери пулу відкривають стандартний профіль
+            # browser-use, і другий Chrome упирається в блокування профілю
+            # першого. Вбудований Chromium Playwright і так отримує
+            # тимчасовий профіль.
+            user_data_dir = tempfile.mkdtemp(prefix="webmorpher-pool-")
+            params = dict(params, extra_browser_args=[*params.get('extra_browser_args', []),
+                                                      f"--user-data-dir={user_data_dir}"])
+        try:
+            browser = self.browser_factory(params)
+            # Запускаємо Chrome одразу, а не під час першого кроку агента
+            await browser.get_playwright_browser()
+        except BaseException:
+            if user_data_dir is not None:
+                shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        metrics.BROWSER_LAUNCH.observe(time.monotonic() - started, source="pool")
+        metrics.ACTIVE_BROWSERS.inc(source="pool")
+        return PooledBrowser(browser, key, user_data_dir)
+
+    def _is_healthy(self, pooled):
+        playwright_browser = getattr(pooled.browser, 'playwright_browser', None)
+        if playwright_browser is None:
+            return False
+        try:
+            return playwright_browser.is_connected()
+        except Exception:
+            return False
+
+    async def _close_browser(self, pooled):
+        metrics.ACTIVE_BROWSERS.dec(source="pool")
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            print(f"Помилка закриття браузера з пулу: {e}")
+        if pooled.user_data_dir is not None:
+            shutil.rmtree(pooled.user_data_dir, ignore_errors=True)
+
+    async def _cancel_pending(self, timeout):
+        """Скасувати незавершені запуски, щоб потоки, які їх чекають, не зависли"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    async def _evict_periodically(self):
+        interval = max(1, min(self.idle_timeout, 30))
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
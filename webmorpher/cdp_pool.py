@@ -0,0 +1,181 @@
+"""Пул віддалених браузерів (CDP endpoints) з перевіркою стану.
+
+Запуски підключаються до найменш завантаженого працюючого браузера зі
+списку (локальні Chrome, headless Chromium у контейнерах тощо). Браузер,
+що не відповідає на /json/version, виводиться з ротації і повертається,
+щойно перевірка знову проходить.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from webmorpher.debug_browser import probe_cdp
+
+
+class NoHealthyEndpoint(Exception):
+    """Немає жодного працюючого браузера"""
+
+
+class CDPEndpoint:
+    """Один віддалений браузер та його стан"""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        # None — ще не перевірявся
+        self.healthy = None
+        self.failures = 0
+        self.active = 0
+        self.total_runs = 0
+        self.last_checked = None
+        self.info = {}
+
+    def as_dict(self):
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'active': self.active,
+            'total_runs': self.total_runs,
+            'failures': self.failures,
+            'browser': self.info.get('Browser', ''),
+        }
+
+
+class CDPEndpointPool:
+    """Маршрутизація запусків між кількома CDP endpoints.
+
+    Методи викликаються з потоків запусків, тому стан захищений
+    блокуванням. Перевірки виконуються у фоновому потоці кожні
+    check_interval секунд; після failure_threshold невдалих перевірок
+    поспіль браузер виводиться з ротації.
+    """
+
+    def __init__(self, urls=(), check_interval=15, failure_threshold=2, probe_timeout=2.0, probe=None):
+        self.check_interval = check_interval
+        self.failure_threshold = max(1, failure_threshold)
+        self.probe_timeout = probe_timeout
+        self.probe = probe or probe_cdp
+        self._endpoints = [CDPEndpoint(url) for url in urls]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Керування фоновими перевірками ---
+
+    def start(self):
+        """Запуск фонових перевірок стану"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._check_periodically, name="webmorpher-cdp-health",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self, timeout=5):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _check_periodically(self):
+        while not self._stop.is_set():
+            self.check_health()
+            self._stop.wait(self.check_interval)
+
+    # --- Список браузерів ---
+
+    def add(self, url):
+        """Додати браузер (стан визначиться під час наступної перевірки)"""
+        with self._lock:
+            if all(endpoint.url != url.rstrip('/') for endpoint in self._endpoints):
+                self._endpoints.append(CDPEndpoint(url))
+
+    def remove(self, url):
+        with self._lock:
+            self._endpoints = [endpoint for endpoint in self._endpoints if endpoint.url != url.rstrip('/')]
+
+    def endpoints(self):
+        with self._lock:
+            return list(self._endpoints)
+
+    # --- Перевірка стану ---
+
+    def check_health(self, endpoints=None):
+        """Перевірити браузери паралельно; повертає кількість працюючих"""
+        endpoints = self.endpoints() if endpoints is None else endpoints
+        if not endpoints:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(8, len(endpoints))) as executor:
+            results = list(executor.map(lambda endpoint: self.probe(endpoint.url, self.probe_timeout), endpoints))
+        with self._lock:
+            for endpoint, info in zip(endpoints, results):
+                self._record_check(endpoint, info)
+            return sum(1 for endpoint in self._endpoints if endpoint.healthy)
+
+    def _record_check(self, endpoint, info):
+        endpoint.last_checked = time.monotonic()
+        if info is not None:
+            endpoint.info = info
+            endpoint.failures = 0
+            endpoint.healthy = True
+            return
+        endpoint.failures += 1
+        if endpoint.healthy is None or endpoint.failures >= self.failure_threshold:
+            endpoint.healthy = False
+
+    # --- Маршрутизація ---
+
+    def acquire(self):
+        """Найменш завантажений працюючий браузер"""
+        endpoint = self._pick()
+        if endpoint is None:
+            # Браузери ще не перевірялися або всі виведені з ротації
+            self.check_health()
+            endpoint = self._pick()
+        if endpoint is None:
+            raise NoHealthyEndpoint("Немає доступних браузерів: жоден CDP endpoint не відповідає")
+        return endpoint
+
+    def _pick(self):
+        with self._lock:
+            candidates = [endpoint for endpoint in self._endpoints if endpoint.healthy]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda endpoint: (endpoint.active, endpoint.total_runs))
+            endpoint.active += 1
+            endpoint.total_runs += 1
+            return endpoint
+
+    def release(self, endpoint, failed=False):
+        """Повернути браузер; після невдалого запуску його стан перевіряється одразу"""
+        with self._lock:
+            endpoint.active = max(0, endpoint.active - 1)
+        if failed:
+            info = self.probe(endpoint.url, self.probe_timeout)
+            with self._lock:
+                if info is None:
+                    # Браузер, на якому впав запуск і який не відповідає,
+                    # виводиться з ротації без очікування порогу
+                    endpoint.failures = max(endpoint.failures + 1, self.failure_threshold)
+                    endpoint.healthy = False
+                    endpoint.last_checked = time.monotonic()
+                else:
+                    self._record_check(endpoint, info)
+
+    @contextmanager
+    def lease(self):
+        """Контекстний менеджер: взяти браузер і гарантовано повернути його"""
+        endpoint = self.acquire()
+        failed = False
+        try:
+            yield endpoint
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(endpoint, failed=failed)
+
+    def stats(self):
+        with self._lock:
+            return [endpoint.as_dict() for endpoint in self._endpoints]
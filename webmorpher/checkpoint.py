@@ -0,0 +1,174 @@
+"""Контрольні точки запуску: стан агента після кожного завершеного кроку.
+
+Якщо запуск перервано (закрито додаток, впав Chrome, натиснуто "Зупинити"),
+наступний запуск тієї ж програми може продовжити з останнього завершеного
+кроку. Агент отримує збережену історію та повідомлення моделі, а дії
+виконаних кроків повторюються в браузері без звернення до моделі (так само,
+як записи дій, див. webmorpher.replay), щоб сторінка стала такою, якою її
+залишив перерваний запуск.
+"""
+import copy
+import json
+import os
+import time
+
+from webmorpher.replay import record_trace, task_hash
+
+DEFAULT_CHECKPOINT_DIR = os.path.expanduser("~/.webmorpher_checkpoints")
+CHECKPOINT_VERSION = 1
+
+# Дії, які під час відтворення не повторюються: витяг вмісту звертається до
+# моделі (його результат уже є в історії), а done завершує запуск
+_SKIPPED_ACTIONS = ("extract_content", "done")
+
+
+class CheckpointStore:
+    """Контрольні точки у вигляді JSON файлів, по одній на запуск.
+
+    Кожен запуск має власний ідентифікатор (run_id) і пише лише у свій файл,
+    тож кілька одночасних запусків тієї ж програми не перезаписують точки
+    один одного.
+    """
+
+    def __init__(self, directory=DEFAULT_CHECKPOINT_DIR, max_age=7 * 24 * 3600):
+        self.directory = directory
+        # Старіші контрольні точки не пропонуються і видаляються
+        self.max_age = max_age
+        # Точки запусків, що зараз виконуються в цьому процесі: їх не продовжують
+        self._active = set()
+
+    def path_for(self, task, run_id):
+        return os.path.join(self.directory, f"{task_hash(task)}-{run_id}.json")
+
+    def load(self, task, run_id=None, exclude=()):
+        """Контрольна точка запуску run_id або None.
+
+        Без run_id повертається найновіша точка програми, чий запуск не
+        виконується: ні в цьому процесі, ні серед exclude.
+        """
+        if run_id is not None:
+            names = [os.path.basename(self.path_for(task, run_id))]
+        else:
+            prefix = f"{task_hash(task)}-"
+            try:
+                names = [name for name in os.listdir(self.directory)
+                         if name.startswith(prefix) and name.endswith(".json")]
+            except OSError:
+                return None
+        newest = None
+        for name in names:
+            checkpoint = self._read(task, os.path.join(self.directory, name))
+            if checkpoint is None:
+                continue
+            if run_id is None and (checkpoint['run_id'] in exclude or checkpoint['run_id'] in self._active):
+                continue
+            if newest is None or checkpoint['saved_at'] > newest['saved_at']:
+                newest = checkpoint
+        return newest
+
+    def _read(self, task, path):
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get('version') != CHECKPOINT_VERSION or checkpoint.get('task') != task_hash(task):
+            return None
+        if self.max_age and time.time() - checkpoint.get('saved_at', 0) > self.max_age:
+            return None
+        # Ідентифікатор запуску береться з імені файлу
+        checkpoint['run_id'] = os.path.basename(path)[len(task_hash(task)) + 1:-len(".json")]
+        return checkpoint
+
+    def save(self, task, run_id, checkpoint):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(task, run_id)
+        if not os.path.exists(path):
+            # Перший крок нового запуску: заодно прибираємо покинуті точки
+            self.prune()
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+    def delete(self, task, run_id):
+        try:
+            os.remove(self.path_for(task, run_id))
+        except FileNotFoundError:
+            pass
+
+    def claim(self, run_id):
+        """Позначити точку запуску, що виконується: load() її не запропонує"""
+        self._active.add(run_id)
+
+    def release(self, run_id):
+        self._active.discard(run_id)
+
+    def prune(self):
+        """Видалити застарілі контрольні точки; повертає їх кількість"""
+        if not self.max_age or not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def capture(agent, task):
+    """Контрольна точка зі стану агента (AgentState) після кроку"""
+    state = agent.state
+    history = state.history.model_dump()
+    for item in history['history']:
+        # Знімки екрана займають мегабайти, а для продовження не потрібні
+        item['state']['screenshot'] = None
+    return {
+        'version': CHECKPOINT_VERSION,
+        'task': task_hash(task),
+        'saved_at': time.time(),
+        'steps': len(state.history.history),
+        'n_steps': state.n_steps,
+        'consecutive_failures': state.consecutive_failures,
+        'last_result': [result.model_dump() for result in state.last_result or []],
+        'last_plan': state.last_plan,
+        'history': history,
+        'messages': state.message_manager_state.model_dump(mode='json'),
+    }
+
+
+def restore(agent, checkpoint):
+    """Передати агенту збережений стан (до першого кроку)"""
+    from browser_use.agent.message_manager.views import MessageManagerState
+    from browser_use.agent.views import ActionResult, AgentHistoryList, AgentState
+
+    history = copy.deepcopy(checkpoint['history'])
+    for item in history['history']:
+        if item['model_output']:
+            item['model_output'] = agent.AgentOutput.model_validate(item['model_output'])
+        item['state'].setdefault('interacted_element', None)
+
+    state = AgentState(
+        agent_id=agent.state.agent_id,
+        n_steps=checkpoint['n_steps'],
+        consecutive_failures=checkpoint['consecutive_failures'],
+        last_result=[ActionResult.model_validate(result) for result in checkpoint['last_result']] or None,
+        history=AgentHistoryList.model_validate(history),
+        last_plan=checkpoint['last_plan'],
+        message_manager_state=MessageManagerState.model_validate(copy.deepcopy(checkpoint['messages'])),
+    )
+    agent.state = state
+    agent._message_manager.state = state.message_manager_state
+
+
+def fast_forward_trace(task, history):
+    """Запис дій виконаних кроків для відтворення: лише дії, що завершились без помилки"""
+    def keep(action, result):
+        if any(name in action for name in _SKIPPED_ACTIONS):
+            return False
+        return result is None or not result.error
+
+    return record_trace(task, history, keep=keep)
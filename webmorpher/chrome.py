@@ -0,0 +1,62 @@
+"""Допоміжні функції для роботи з Chrome/Chromium"""
+import os
+import shutil
+import socket
+import sys
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_default_chrome_profile():
+    """Визначення шляху до стандартного профілю користувача Chrome/Chromium"""
+    user_profile_dir = None
+    
+    if sys.platform == 'darwin':  # macOS
+        # Шлях до стандартного профілю Chrome на macOS
+        chrome_profile_alt = os.path.expanduser("~/Library/Application Support/Google/Chrome")
+        
+        # Перевіряємо наявність каталогу
+        if os.path.exists(chrome_profile_alt) and os.path.isdir(chrome_profile_alt):
+            user_profile_dir = chrome_profile_alt
+    elif sys.platform.startswith('win'):  # Windows
+        # Шлях до стандартного профілю Chrome на Windows
+        chrome_profile = os.path.join(os.environ.get('LOCALAPPDATA', ''), 
+                                     "Google", "Chrome", "User Data")
+        if os.path.exists(chrome_profile) and os.path.isdir(chrome_profile):
+            user_profile_dir = chrome_profile
+    elif sys.platform.startswith('linux'):  # Linux
+        # Шлях до стандартного профілю Chrome на Linux
+        chrome_profile = os.path.expanduser("~/.config/google-chrome")
+        if os.path.exists(chrome_profile) and os.path.isdir(chrome_profile):
+            user_profile_dir = chrome_profile
+    
+    return user_profile_dir
+
+
+@lru_cache(maxsize=None)
+def find_chrome_binary():
+    """Пошук встановленого Google Chrome або Chromium, None якщо не знайдено"""
+    if sys.platform == 'darwin':  # macOS
+        chrome_paths = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",  # Стандартный путь
+            os.path.expanduser("~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"),  # Пользовательские приложения
+            "/Applications/Chromium.app/Contents/MacOS/Chromium",  # Chromium как запасной вариант
+        ]
+        for path in chrome_paths:
+            if os.path.exists(path):
+                return path
+        return None
+    
+    # Linux та інші платформи: шукаємо браузер у PATH
+    for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def find_free_port():
+    """Знайти вільний порт для запуску дебаг-сервера"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('', 0))
+        return s.getsockname()[1]
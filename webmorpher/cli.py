@@ -0,0 +1,596 @@
+"""Командний рядок WebMorpher: запуск програм без графічного інтерфейсу.
+
+Приклади:
+    python -m webmorpher list
+    python -m webmorpher run "Моя програма" --format json
+    python -m webmorpher run-all --concurrency 4 --output-dir results/
+    python -m webmorpher batch "Пошук товару" --input skus.csv --concurrency 8
+    python -m webmorpher serve --port 8765 --concurrency 2
+    python -m webmorpher worker --queue /mnt/shared/jobs.sqlite --node node-1 --concurrency 4
+    python -m webmorpher history --summary --days 30
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from webmorpher.config import CONFIG_FILE
+from webmorpher.llm import program_llm_settings, requires_api_key
+from webmorpher.profiles import program_profile
+from webmorpher.store import open_store
+
+
+def build_parser():
+    """Опис аргументів командного рядка"""
+    parser = argparse.ArgumentParser(prog="webmorpher", description="Запуск програм WebMorpher без GUI")
+    parser.add_argument("--config", default=CONFIG_FILE, help="шлях до файлу конфігурації")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="показати список програм")
+
+    run_parser = subparsers.add_parser("run", help="запустити вказані програми")
+    run_parser.add_argument("programs", nargs="+", help="назви програм")
+    _add_run_options(run_parser)
+
+    run_all_parser = subparsers.add_parser("run-all", help="запустити всі програми")
+    _add_run_options(run_all_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="HTTP сервер завдань для інших сервісів")
+    serve_parser.add_argument("--host", help="адреса сервера (типово 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, help="порт сервера (типово 8765)")
+    serve_parser.add_argument("--token", help="вимагати заголовок Authorization: Bearer TOKEN")
+    _add_queue_options(serve_parser)
+    _add_run_options(serve_parser)
+
+    worker_parser = subparsers.add_parser("worker", help="вузол, що виконує завдання зі спільної черги")
+    _add_queue_options(worker_parser)
+    _add_run_options(worker_parser)
+
+    batch_parser = subparsers.add_parser("batch", help="запустити програму для кожного рядка CSV або JSONL")
+    batch_parser.add_argument("program", help="назва програми з підстановками {{стовпець}}")
+    batch_parser.add_argument("--input", required=True, help="вхідні дані: .csv, .tsv або .jsonl")
+    batch_parser.add_argument("--output",
+                              help="файл результатів JSONL (типово <вхідний файл>.results.jsonl); "
+                                   "виконані рядки з нього пропускаються")
+    batch_parser.add_argument("--retry-failed", action="store_true", help="повторити рядки, що завершились помилкою")
+    _add_run_options(batch_parser)
+
+    history_parser = subparsers.add_parser("history", help="історія запусків")
+    history_parser.add_argument("--program", help="лише запуски цієї програми")
+    history_parser.add_argument("--days", type=float, help="лише запуски за останні N днів")
+    history_parser.add_argument("--limit", type=int, default=20, help="скільки запусків показати")
+    view = history_parser.add_mutually_exclusive_group()
+    view.add_argument("--summary", action="store_true",
+                      help="статистика за програмами: середній час, успішність, зміна часу останніх запусків")
+    view.add_argument("--slow-steps", action="store_true", help="найдовші кроки")
+    view.add_argument("--export", metavar="PATH", help="експорт у JSON або CSV (за розширенням файлу)")
+    history_parser.add_argument("--format", choices=("text", "json"), default="text", help="формат виводу в stdout")
+
+    return parser
+
+
+def _add_run_options(parser):
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=None,
+                        help="запускати браузер у фоновому режимі (типово як у профілі програми, інакше так)")
+    parser.add_argument("--cdp-port", type=int, help="підключитися до Chrome в режимі дебагу на цьому порту")
+    parser.add_argument("--cdp-endpoint", action="append", metavar="URL",
+                        help="віддалений браузер (можна вказати кілька); запуски розподіляються між ними")
+    parser.add_argument("--user-profile", nargs="?", const="", metavar="PATH",
+                        help="запускати з копією профілю Chrome (типово стандартного профілю користувача)")
+    parser.add_argument("--concurrency", type=int, default=1, help="скільки програм виконувати одночасно")
+    parser.add_argument("--output-dir", help="записувати результат кожної програми в окремий JSON файл")
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="формат виводу в stdout")
+    parser.add_argument("--llm-cache", action=argparse.BooleanOptionalAction, default=None,
+                        help="кешувати відповіді моделі для всіх програм (типово як у налаштуваннях програми)")
+    parser.add_argument("--replay", action=argparse.BooleanOptionalAction, default=None,
+                        help="відтворювати записані дії для всіх програм (типово як у налаштуваннях програми)")
+    parser.add_argument("--lite", action=argparse.BooleanOptionalAction, default=None,
+                        help="полегшений режим без зображень, відео, шрифтів і трекерів (типово — як у програмі)")
+    parser.add_argument("--state-diff", action=argparse.BooleanOptionalAction, default=None,
+                        help="надсилати моделі лише зміни сторінки між кроками (типово — як у програмі)")
+    parser.add_argument("--resume", action="store_true",
+                        help="продовжити перервані запуски програм з останнього завершеного кроку")
+    parser.add_argument("--max-steps", type=int, help="найбільша кількість кроків агента замість заданої в програмі")
+    parser.add_argument("--timeout", type=float, help="найбільша тривалість запуску програми, с")
+    parser.add_argument("--model", help="основна модель замість заданої в програмі та налаштуваннях")
+    parser.add_argument("--fast-model", help="швидка модель для простих кроків (порожнє значення вимикає)")
+    parser.add_argument("--history", action=argparse.BooleanOptionalAction, default=True,
+                        help="записувати запуски в історію (типово так)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="записувати метрики у форматі Prometheus у файл (оновлюється під час виконання)")
+    parser.add_argument("--metrics-port", type=int, help="віддавати метрики на http://127.0.0.1:PORT/metrics")
+
+
+def _add_queue_options(parser):
+    parser.add_argument("--queue", help="файл черги завдань, наприклад, на спільному диску "
+                                        "(типово ~/.webmorpher_jobs.sqlite)")
+    parser.add_argument("--node", help="назва вузла в черзі (типово ім'я машини)")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        store = open_store(args.config)
+    except Exception as e:
+        print(f"Помилка завантаження конфігурації: {e}", file=sys.stderr)
+        return 2
+    try:
+        return _run_command(args, store)
+    finally:
+        store.close()
+
+
+def _run_command(args, store):
+    config = store.settings()
+
+    if args.command == "list":
+        for program in store.programs():
+            print(program.get("name", "Без назви"))
+        return 0
+
+    if args.command == "history":
+        return show_history(args, config.get("run_history", {}))
+
+    if args.command == "batch":
+        selected = [store.find_program(args.program)]
+        if selected[0] is None:
+            print(f"Програму не знайдено: {args.program}", file=sys.stderr)
+            return 2
+    elif args.command in ("serve", "worker"):
+        # Програми завдань стануть відомі лише з запитів
+        selected = None
+    elif args.command == "run":
+        selected = []
+        for name in args.programs:
+            program = store.find_program(name)
+            if program is None:
+                print(f"Програму не знайдено: {name}", file=sys.stderr)
+                return 2
+            selected.append(program)
+    else:
+        selected = store.programs()
+
+    llm_settings = dict(config.get("llm", {}))
+    if args.fast_model is not None:
+        llm_settings["fast_model"] = args.fast_model or None
+    api_key = config.get("api_key") or os.environ.get("OPENAI_API_KEY", "")
+    if not api_key and requires_api_key(llm_settings):
+        print("Не задано API ключ: додайте його в конфігурацію або в OPENAI_API_KEY", file=sys.stderr)
+        return 2
+
+    cdp_settings = dict(config.get("cdp_endpoints", {}))
+    if args.cdp_endpoint:
+        cdp_settings["urls"] = args.cdp_endpoint
+    metrics_settings = dict(config.get("metrics", {}))
+    if args.metrics_file:
+        metrics_settings["file"] = args.metrics_file
+    if args.metrics_port is not None:
+        metrics_settings["port"] = args.metrics_port
+    if args.user_profile is not None and not args.user_profile:
+        from webmorpher.chrome import get_default_chrome_profile
+
+        args.user_profile = get_default_chrome_profile()
+        if not args.user_profile:
+            print("Профіль Chrome не знайдено: вкажіть шлях у --user-profile", file=sys.stderr)
+            return 2
+    config = dict(config, llm=llm_settings, cdp_endpoints=cdp_settings, metrics=metrics_settings)
+    if args.command == "serve":
+        return serve(api_key, args, config)
+    if args.command == "worker":
+        return work(api_key, args, config)
+    if args.command == "batch":
+        try:
+            summary = run_batch_program(selected[0], api_key, args, config)
+        except (OSError, ValueError) as e:
+            print(f"Помилка читання вхідних даних: {e}", file=sys.stderr)
+            return 2
+        return 0 if not summary["failed"] else 1
+    results = run_programs(selected, api_key, args, config)
+    return 0 if all(result["success"] for result in results) else 1
+
+
+def run_programs(programs, api_key, args, config=None):
+    """Виконати програми (паралельно, якщо concurrency > 1) та вивести результати"""
+    concurrency = max(1, args.concurrency)
+    with RunResources(api_key, args, config, programs, pooled=len(programs) > 1) as resources:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(resources.run, program, time.monotonic()) for program in programs]
+            results = []
+            for future in futures:
+                result = future.result()
+                _report(result, args)
+                results.append(result)
+    return results
+
+
+def run_batch_program(program, api_key, args, config=None):
+    """Виконати програму для кожного рядка вхідної таблиці, дописуючи результати у файл"""
+    from webmorpher.batch import BatchResults, read_rows, render_task, run_batch
+
+    name = program.get("name", "Без назви")
+    output = args.output or f"{os.path.splitext(args.input)[0]}.results.jsonl"
+    skipped = 0
+
+    def pending_rows():
+        nonlocal skipped
+        for number, row in read_rows(args.input):
+            if results.is_done(number, row):
+                skipped += 1
+                continue
+            yield number, row
+
+    def run_row(number, row):
+        queued_at = time.monotonic()
+        try:
+            code = render_task(program.get("code", ""), row)
+        except KeyError as e:
+            result = {"name": name, "success": False, "final_result": None,
+                      "errors": [f"У рядку немає значення для {{{{{e.args[0]}}}}}"], "steps": 0, "duration": 0}
+        else:
+            result = resources.run(dict(program, code=code, name=f"{name} #{number}"), queued_at)
+        result.pop("name", None)
+        return dict({"row": number, "input": row}, **result)
+
+    def on_result(record):
+        results.write(record)
+        status = "OK" if record["success"] else "ПОМИЛКА"
+        print(f"[{name}] рядок {record['row']}: {status} ({record['duration']} с)", file=sys.stderr)
+
+    with BatchResults(output, retry_failed=args.retry_failed) as results, \
+            RunResources(api_key, args, config, [program], pooled=True) as resources:
+        run_batch(pending_rows(), run_row, args.concurrency, on_result)
+
+    summary = {"name": name, "output": output, "rows": results.written, "failed": results.failed,
+               "skipped": skipped}
+    if args.format == "json":
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        print(f"{name}: виконано рядків {results.written}, з помилкою {results.failed}, "
+              f"пропущено виконаних раніше {skipped}. Результати: {output}")
+    return summary
+
+
+def _server_settings(config, args):
+    """Секція "server" конфігурації з параметрами командного рядка"""
+    settings = dict((config or {}).get("server", {}))
+    for name, key in (("host", "host"), ("port", "port"), ("token", "token"), ("queue", "path"), ("node", "node")):
+        if getattr(args, name, None) is not None:
+            settings[key] = getattr(args, name)
+    return settings
+
+
+def _open_job_queue(settings):
+    from webmorpher.jobs import JobQueue
+
+    return JobQueue(**{key: os.path.expanduser(value) if key == "path" else value
+                       for key, value in settings.items() if key in ("path", "max_jobs", "lease", "max_attempts",
+                                                                     "shared")})
+
+
+def _job_runner(resources, args):
+    def run_job(program, options, on_log, on_agent_run):
+        job_args = argparse.Namespace(**dict(vars(args), **options))
+        return resources.run(program, time.monotonic(), job_args, on_log, on_agent_run)
+
+    return run_job
+
+
+def serve(api_key, args, config=None):
+    """HTTP сервер завдань (див. webmorpher.server) до Ctrl+C.
+
+    З --concurrency 0 сервер лише приймає завдання для вузлів webmorpher worker.
+    """
+    from webmorpher.server import JobServer
+
+    settings = _server_settings(config, args)
+
+    def find_program(name):
+        # Сховище відкривається для кожного запиту: програми можуть змінюватися в GUI
+        store = open_store(args.config)
+        try:
+            return store.find_program(name)
+        finally:
+            store.close()
+
+    queue = _open_job_queue(settings)
+    resources = None
+    try:
+        if args.concurrency > 0:
+            resources = RunResources(api_key, args, config, None, pooled=True)
+        server = JobServer(queue, _job_runner(resources, args), find_program, settings.get("host", "127.0.0.1"),
+                           settings.get("port", 8765), args.concurrency, settings.get("token"),
+                           node=settings.get("node")).start()
+        print(f"Сервер завдань: http://{settings.get('host', '127.0.0.1')}:{server.port} "
+              f"(виконавців: {server.workers})", file=sys.stderr)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            print("Зупинка сервера: виконувані завдання повернуться в чергу", file=sys.stderr)
+        finally:
+            server.shutdown()
+    finally:
+        if resources is not None:
+            resources.close()
+        queue.close()
+    return 0
+
+
+def work(api_key, args, config=None):
+    """Вузол виконавців спільної черги завдань (див. webmorpher.worker) до Ctrl+C"""
+    from webmorpher.worker import HEARTBEAT_INTERVAL, JobWorker
+
+    settings = _server_settings(config, args)
+    queue = _open_job_queue(settings)
+    try:
+        with RunResources(api_key, args, config, None, pooled=True) as resources:
+            worker = JobWorker(queue, _job_runner(resources, args), settings.get("node"), max(1, args.concurrency),
+                               heartbeat_interval=settings.get("heartbeat_interval", HEARTBEAT_INTERVAL)).start()
+            print(f"Вузол {worker.node}: черга {queue.path} (виконавців: {worker.workers})", file=sys.stderr)
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                print("Зупинка вузла: виконувані завдання повернуться в чергу", file=sys.stderr)
+            finally:
+                worker.shutdown()
+    finally:
+        queue.close()
+    return 0
+
+
+class RunResources:
+    """Спільні ресурси запусків командного рядка: історія, кеш моделі, браузери, метрики.
+
+    programs None означає, що програми наперед невідомі (сервер завдань):
+    тоді ресурси, потрібні лише деяким програмам, відкриваються завжди.
+    """
+
+    def __init__(self, api_key, args, config, programs, pooled=False):
+        from webmorpher.metrics import start_exporters
+
+        config = config or {}
+        self.api_key = api_key
+        self.args = args
+        self.llm_settings = config.get("llm", {})
+        self.lite_mode_settings = config.get("lite_mode", {})
+        self.state_diff_settings = config.get("state_diff", {})
+        self.run_history = None
+        self.llm_cache = None
+        self.profile_snapshots = None
+        self.checkpoints = None
+        self.cdp_pool = None
+        self.pool = None
+
+        _route_logs_to_stderr()
+        self.exporters = start_exporters(config.get("metrics", {}))
+        try:
+            self._open(config, programs, pooled)
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self, config, programs, pooled):
+        args = self.args
+        if args.history:
+            from webmorpher.history import RunHistory
+
+            self.run_history = RunHistory(**config.get("run_history", {}))
+
+        if programs is None or any(_program_flag(program, args, "llm_cache") for program in programs):
+            from webmorpher.llm_cache import ResponseStore
+
+            self.llm_cache = ResponseStore(**config.get("llm_cache", {}))
+
+        snapshot_settings = dict(config.get("profile_snapshots", {}))
+        if getattr(args, "user_profile", None) and snapshot_settings.pop("enabled", True):
+            from webmorpher.profile_snapshot import ProfileSnapshots
+
+            # Кожен запуск отримує власну копію профілю, тому програми можна виконувати паралельно
+            self.profile_snapshots = ProfileSnapshots(**snapshot_settings)
+
+        checkpoint_settings = dict(config.get("checkpoints", {}))
+        if checkpoint_settings.pop("enabled", True):
+            from webmorpher.checkpoint import CheckpointStore
+
+            self.checkpoints = CheckpointStore(**checkpoint_settings)
+
+        cdp_settings = config.get("cdp_endpoints", {})
+        if cdp_settings.get("urls") and not args.cdp_port:
+            from webmorpher.cdp_pool import CDPEndpointPool
+
+            self.cdp_pool = CDPEndpointPool(**cdp_settings).start()
+
+        if pooled:
+            from webmorpher.browser_pool import BrowserPool
+
+            settings = dict(config.get("browser_pool", {}))
+            settings["size"] = max(settings.get("size", 1), max(1, args.concurrency))
+            self.pool = BrowserPool(**settings).start()
+
+    def run(self, program, queued_at=None, args=None, on_log=None, on_agent_run=None):
+        """Виконати одну програму зі спільними ресурсами (args замінює параметри командного рядка)"""
+        args = args or self.args
+        return run_program(program, self.api_key, args, self.pool,
+                           self.llm_cache if _program_flag(program, args, "llm_cache") else None, self.cdp_pool,
+                           self.run_history, queued_at, self.llm_settings, self.profile_snapshots,
+                           self.lite_mode_settings if _program_flag(program, args, "lite") else None,
+                           self.state_diff_settings if _program_flag(program, args, "state_diff") else None,
+                           on_log, on_agent_run, self.checkpoints)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.llm_cache is not None:
+            self.llm_cache.close()
+        if self.cdp_pool is not None:
+            self.cdp_pool.shutdown()
+        if self.run_history is not None:
+            self.run_history.close()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _program_flag(program, args, name):
+    """Прапорець командного рядка має пріоритет над налаштуванням програми"""
+    if getattr(args, name) is not None:
+        return getattr(args, name)
+    return bool(program.get(name))
+
+
+def run_program(program, api_key, args, browser_pool=None, llm_cache=None, cdp_pool=None, run_history=None,
+                queued_at=None, llm_settings=None, profile_snapshots=None, lite_mode=None, state_diff=None,
+                on_log=None, on_agent_run=None, checkpoints=None):
+    """Виконати одну програму та повернути словник з результатом.
+
+    on_log отримує повідомлення запуску (крім виводу в stderr), on_agent_run —
+    створений AgentRun, наприклад, щоб зупинити його з іншого потоку.
+    З --resume запуск продовжується з контрольної точки checkpoints.
+    """
+    from webmorpher.metrics import RUN_QUEUE_WAIT
+    from webmorpher.replay import TraceStore
+    from webmorpher.runner import AgentRun
+
+    if queued_at is not None:
+        RUN_QUEUE_WAIT.observe(time.monotonic() - queued_at)
+
+    name = program.get("name", "Без назви")
+    errors = []
+    llm_settings = program_llm_settings(llm_settings, program)
+    if getattr(args, "model", None):
+        llm_settings["model"] = args.model
+
+    def log(message):
+        print(f"[{name}] {message}", file=sys.stderr)
+        if on_log is not None:
+            on_log(message)
+
+    def error(message):
+        errors.append(message)
+        log(message)
+
+    agent_run = AgentRun(
+        api_key=api_key,
+        task=program.get("code", ""),
+        headless=True,
+        profile=program_profile(program, {"headless": args.headless, "max_steps": args.max_steps,
+                                          "timeout": args.timeout}),
+        debug_port=args.cdp_port,
+        user_profile_dir=getattr(args, "user_profile", None),
+        profile_snapshots=profile_snapshots,
+        lite_mode=lite_mode,
+        state_diff=state_diff,
+        browser_pool=browser_pool,
+        llm_cache=llm_cache,
+        trace_store=TraceStore() if _program_flag(program, args, "replay") else None,
+        cdp_pool=cdp_pool,
+        run_history=run_history,
+        name=name,
+        llm_settings=llm_settings,
+        checkpoints=checkpoints,
+        resume_checkpoint=getattr(args, "resume", False),
+        on_log=log,
+        on_error=error
+    )
+
+    if on_agent_run is not None:
+        on_agent_run(agent_run)
+
+    started = time.time()
+    history = None
+    try:
+        history = agent_run.execute()
+    except Exception as e:
+        error(f"Помилка: {str(e)}")
+
+    success = bool(history is not None and history.is_done() and history.is_successful() is not False and not errors)
+    return {
+        "name": name,
+        "success": success,
+        "final_result": history.final_result() if history is not None else None,
+        "errors": errors + ([e for e in history.errors() if e] if history is not None else []),
+        "steps": len(history.history) if history is not None else 0,
+        "duration": round(time.time() - started, 3),
+    }
+
+
+def show_history(args, history_settings=None):
+    """Вивести історію запусків, статистику або експортувати її"""
+    from webmorpher.history import RunHistory
+
+    since = time.time() - args.days * 24 * 3600 if args.days else None
+    history = RunHistory(**(history_settings or {}))
+    try:
+        if args.export:
+            count = history.export(args.export, program=args.program, since=since)
+            print(f"Експортовано запусків: {count} ({args.export})")
+            return 0
+        if args.summary:
+            rows = [item for item in history.summary(since=since) if args.program in (None, item["program"])]
+        elif args.slow_steps:
+            rows = history.slowest_steps(program=args.program, since=since, limit=args.limit)
+        else:
+            rows = history.runs(program=args.program, since=since, limit=args.limit)
+    finally:
+        history.close()
+
+    if args.format == "json":
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+    for row in rows:
+        if args.summary:
+            trend = ""
+            if row["recent_avg"] is not None and row["previous_avg"]:
+                trend = f", зміна {(row['recent_avg'] / row['previous_avg'] - 1) * 100:+.0f}%"
+            print(f"{row['program']}: {row['successes']}/{row['runs']} успішних, "
+                  f"середній час {row['avg_duration']:.1f} с, максимальний {row['max_duration']:.1f} с{trend}")
+        elif args.slow_steps:
+            print(f"{row['duration']:.1f} с  {row['program']} крок {row['number']}: {row['goal'] or ''}")
+        else:
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["started_at"]))
+            print(f"{started}  {row['program']}: {row['outcome']} за {row['duration']:.1f} с, "
+                  f"кроків {row['step_count']}")
+    return 0
+
+
+def _report(result, args):
+    """Вивести результат у stdout або записати у файл"""
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        path = os.path.join(args.output_dir, f"{_safe_filename(result['name'])}.json")
+        with open(path, "w") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(path)
+    elif args.format == "json":
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    else:
+        status = "OK" if result["success"] else "ПОМИЛКА"
+        print(f"{result['name']}: {status} ({result['duration']} с)")
+        if result["final_result"]:
+            print(result["final_result"])
+        for message in result["errors"]:
+            print(f"  {message}")
+
+
+def _safe_filename(name):
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or "program"
+
+
+def _route_logs_to_stderr():
+    """browser-use пише логи в stdout; переносимо їх у stderr, щоб не змішувати з результатами"""
+    import browser_use  # noqa: F401 - налаштовує логування під час імпорту
+
+    handlers = logging.getLogger().handlers + logging.getLogger('browser_use').handlers
+    for handler in handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
@@ -0,0 +1,14 @@
+"""Файл конфігурації WebMorpher (JSON), з якого імпортується сховище"""
+import json
+import os
+
+# Шлях до файлу з налаштуваннями
+CONFIG_FILE = os.path.expanduser("~/.webmorpher_config.json")
+
+
+def read_config(path=CONFIG_FILE):
+    """Прочитати конфігурацію; порожній словник, якщо файлу немає"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
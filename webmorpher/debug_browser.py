@@ -0,0 +1,160 @@
+"""Запуск Chrome у режимі дебагу та перевірка готовності CDP"""
+import json
+import os
+import socket
+import subprocess
+import time
+from tempfile import gettempdir
+from urllib.request import urlopen
+
+from webmorpher import metrics
+from webmorpher.chrome import find_chrome_binary, find_free_port
+
+DEFAULT_DEBUG_PORT = 9222
+
+
+class DebugBrowser:
+    """Запущений дебаг-браузер"""
+
+    def __init__(self, process, port, info, launch_seconds, profile_clone=None):
+        self.process = process
+        self.port = port
+        self.info = info
+        self.launch_seconds = launch_seconds
+        # Копія профілю користувача (ProfileClone), видаляється після закриття
+        self.profile_clone = profile_clone
+
+    @property
+    def cdp_url(self):
+        return f"http://localhost:{self.port}"
+
+    @property
+    def browser_name(self):
+        return self.info.get("Browser", "")
+
+    def is_running(self):
+        return self.process.poll() is None
+
+    def terminate(self):
+        try:
+            self.process.terminate()
+        except Exception:
+            pass
+        if self.profile_clone is not None:
+            try:
+                self.process.wait(5)
+            except Exception:
+                pass
+            self.profile_clone.release()
+            self.profile_clone = None
+
+
+def probe_cdp(cdp_url, timeout=1.0):
+    """Відповідь /json/version або None, якщо CDP ще не відповідає"""
+    try:
+        with urlopen(f"{cdp_url.rstrip('/')}/json/version", timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def wait_for_cdp(cdp_url, process=None, deadline=15.0, initial_delay=0.05, max_delay=1.0):
+    """Чекати готовності CDP з експоненційною затримкою між спробами.
+
+    Повертає відповідь /json/version. Піднімає виключення, якщо процес
+    браузера завершився або CDP не відповів до deadline секунд.
+    """
+    started = time.monotonic()
+    delay = initial_delay
+    while True:
+        info = probe_cdp(cdp_url, timeout=min(1.0, max_delay))
+        if info is not None:
+            return info
+        if process is not None and process.poll() is not None:
+            raise Exception(f"Браузер завершився з кодом {process.returncode}")
+        elapsed = time.monotonic() - started
+        if elapsed >= deadline:
+            raise Exception(f"Браузер не відповів на {cdp_url} за {deadline:.0f} с")
+        time.sleep(min(delay, deadline - elapsed))
+        delay = min(delay * 2, max_delay)
+
+
+def is_port_free(port):
+    """Чи ніхто не слухає порт на localhost"""
+    try:
+        socket.create_connection(("localhost", port), timeout=0.2).close()
+        return False
+    except OSError:
+        return True
+
+
+def launch_debug_browser(port=None, use_user_profile=True, user_profile_dir=None, ready_timeout=15.0,
+                         log_file=None, profile_snapshots=None):
+    """Запустити браузер у режимі дебагу та дочекатися готовності CDP.
+
+    Без port використовується 9222, а якщо він зайнятий, то вільний порт,
+    тому кілька дебаг-браузерів можна запускати одночасно. Вивід Chrome
+    дописується в log_file (якщо задано). З profile_snapshots браузер
+    отримує копію профілю користувача, а не сам профіль.
+    """
+    chrome_path = find_chrome_binary()
+    if not chrome_path:
+        raise Exception("Не знайдено Google Chrome або Chromium. Будь ласка, встановіть один з браузерів.")
+    print(f"Використовуємо браузер за шляхом: {chrome_path}")
+
+    if port is None:
+        port = DEFAULT_DEBUG_PORT if is_port_free(DEFAULT_DEBUG_PORT) else find_free_port()
+
+    # Визначаємо директорію для профілю Chrome
+    profile_clone = None
+    if use_user_profile and user_profile_dir and profile_snapshots is not None:
+        profile_clone = profile_snapshots.clone(user_profile_dir)
+        debug_profile_dir = profile_clone.path
+        print(f"Використовуємо копію профілю користувача для дебагу: {debug_profile_dir}")
+    elif use_user_profile and user_profile_dir:
+        # Використовуємо профіль користувача
+        debug_profile_dir = user_profile_dir
+        print(f"Використовуємо профіль користувача для дебагу: {debug_profile_dir}")
+    else:
+        # Використовуємо тимчасову директорію для профілю Chrome
+        debug_profile_dir = os.path.join(gettempdir(), f"chrome-debug-{port}")
+        os.makedirs(debug_profile_dir, exist_ok=True)
+
+    cmd = [
+        chrome_path,
+        f"--remote-debugging-port={port}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        f"--user-data-dir={debug_profile_dir}",
+        "--disable-application-cache",  # Відключаємо кеш для зменшення конфліктів
+        "about:blank"
+    ]
+
+    print(f"Запускаємо команду: {' '.join(cmd)}")
+
+    started = time.monotonic()
+    # Вивід Chrome не читається через PIPE: заповнений буфер зупинив би браузер
+    output = open(log_file, "a") if log_file else subprocess.DEVNULL
+    try:
+        process = subprocess.Popen(cmd, stdout=output, stderr=subprocess.STDOUT)
+        print(f"Браузер запущено з PID: {process.pid}")
+    except Exception as e:
+        if profile_clone is not None:
+            profile_clone.release()
+        raise Exception(f"Не вдалося запустити браузер: {str(e)}")
+    finally:
+        if log_file:
+            output.close()
+
+    try:
+        info = wait_for_cdp(f"http://localhost:{port}", process, deadline=ready_timeout)
+    except Exception as e:
+        if process.poll() is None:
+            process.terminate()
+        if profile_clone is not None:
+            profile_clone.release()
+        details = f" Деталі у {log_file}" if log_file else ""
+        raise Exception(f"Не вдалося запустити браузер: {str(e)}.{details}")
+    launch_seconds = time.monotonic() - started
+    metrics.BROWSER_LAUNCH.observe(launch_seconds, source="debug")
+    return DebugBrowser(process, port, info, launch_seconds, profile_clone)
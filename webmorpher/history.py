@@ -0,0 +1,304 @@
+"""Історія запусків програм з часом виконання кожного кроку (SQLite).
+
+Кожен запуск зберігається з часом початку й завершення, результатом,
+помилкою та кроками агента (ціль, оцінка попередньої цілі, дії, URL,
+тривалість). Запити за програмою та часом використовують індекси, тому
+історію можна переглядати й порівнювати, щоб знаходити повільні програми
+та кроки, що стали виконуватися довше.
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from webmorpher.replay import task_hash
+
+DEFAULT_HISTORY_FILE = os.path.expanduser("~/.webmorpher_history.sqlite")
+
+# Результати запуску
+SUCCESS = "success"
+FAILED = "failed"
+STOPPED = "stopped"
+ERROR = "error"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    program TEXT NOT NULL,
+    task_hash TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    step_count INTEGER NOT NULL,
+    input_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_program_started ON runs(program, started_at);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started_at);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    number INTEGER,
+    started_at REAL,
+    duration REAL,
+    goal TEXT,
+    evaluation TEXT,
+    actions TEXT NOT NULL DEFAULT '[]',
+    url TEXT,
+    error TEXT,
+    input_tokens INTEGER,
+    PRIMARY KEY (run_id, position)
+);
+"""
+
+_RUN_FIELDS = ('id', 'program', 'task_hash', 'started_at', 'finished_at', 'duration', 'outcome', 'result', 'error',
+               'step_count', 'input_tokens')
+_STEP_FIELDS = ('number', 'started_at', 'duration', 'goal', 'evaluation', 'actions', 'url', 'error', 'input_tokens')
+
+
+def _action_names(model_output):
+    if model_output is None or not model_output.action:
+        return []
+    return [name for action in model_output.action if action is not None
+            for name in action.model_dump(exclude_none=True)]
+
+
+def step_from_history(item, position):
+    """Крок з елемента історії агента (AgentHistory)"""
+    metadata = item.metadata
+    brain = item.model_output.current_state if item.model_output is not None else None
+    errors = [result.error for result in item.result if result.error]
+    return {
+        'number': metadata.step_number if metadata else position + 1,
+        'started_at': metadata.step_start_time if metadata else None,
+        'duration': metadata.duration_seconds if metadata else None,
+        'goal': brain.next_goal if brain else None,
+        'evaluation': brain.evaluation_previous_goal if brain else None,
+        'actions': _action_names(item.model_output),
+        'url': item.state.url if item.state else None,
+        'error': "\n".join(errors) or None,
+        'input_tokens': metadata.input_tokens if metadata else None,
+    }
+
+
+class RunRecord:
+    """Хід одного запуску.
+
+    Кроки фіксуються під час виконання (колбек агента), тож навіть
+    зупинений запуск зберігає пройдені кроки. Після завершення точний час
+    кроків береться з історії агента.
+    """
+
+    def __init__(self, program, task):
+        self.program = program
+        self.task_hash = task_hash(task)
+        self.started_at = time.time()
+        self.finished_at = None
+        self.outcome = None
+        self.result = None
+        self.error = None
+        self.steps = []
+        self._live_steps = []
+
+    def on_step(self, number, url, model_output):
+        """Крок, про який агент повідомив під час виконання"""
+        brain = getattr(model_output, 'current_state', None)
+        self._live_steps.append({
+            'number': number,
+            'started_at': time.time(),
+            'duration': None,
+            'goal': getattr(brain, 'next_goal', None),
+            'evaluation': getattr(brain, 'evaluation_previous_goal', None),
+            'actions': _action_names(model_output) if hasattr(model_output, 'action') else [],
+            'url': url,
+            'error': None,
+            'input_tokens': None,
+        })
+
+    def finish(self, outcome, history_items=(), result=None, error=None):
+        """Завершити запис; history_items — елементи історії агента (якщо є)"""
+        self.finished_at = time.time()
+        self.outcome = outcome
+        self.result = result
+        self.error = error
+
+        steps = [step_from_history(item, position) for position, item in enumerate(history_items)]
+        last_number = max((step['number'] for step in steps), default=0)
+        # Кроки, що не потрапили в історію (наприклад, перервані зупинкою)
+        live = [dict(step) for step in self._live_steps if step['number'] > last_number]
+        for step, following in zip(live, live[1:] + [None]):
+            ended = following['started_at'] if following else self.finished_at
+            step['duration'] = ended - step['started_at']
+        if not steps:
+            # Без історії агента тривалість кроку — час до наступного колбеку
+            steps = live
+        else:
+            steps.extend(live)
+        self.steps = steps
+        return self
+
+    @property
+    def duration(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    def input_tokens(self):
+        tokens = [step['input_tokens'] for step in self.steps if step['input_tokens'] is not None]
+        return sum(tokens) if tokens else None
+
+
+class RunHistory:
+    """Сховище історії запусків.
+
+    Записи додаються з потоків запусків, а читаються з GUI чи командного
+    рядка, тому доступ до з'єднання захищений блокуванням. Понад max_runs
+    найстаріші запуски видаляються.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_FILE, max_runs=10000):
+        self.path = path
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def save(self, record):
+        """Зберегти завершений запуск; повертає його id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (program, task_hash, started_at, finished_at, duration, outcome, result, error, "
+                "step_count, input_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.program, record.task_hash, record.started_at, record.finished_at, record.duration,
+                 record.outcome, record.result, record.error, len(record.steps), record.input_tokens())
+            )
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO steps (run_id, position, number, started_at, duration, goal, evaluation, actions, url, "
+                "error, input_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, position, step['number'], step['started_at'], step['duration'], step['goal'],
+                  step['evaluation'], json.dumps(step['actions'], ensure_ascii=False), step['url'], step['error'],
+                  step['input_tokens'])
+                 for position, step in enumerate(record.steps)]
+            )
+            if self.max_runs:
+                self._conn.execute(
+                    "DELETE FROM runs WHERE id IN (SELECT id FROM runs ORDER BY started_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_runs,)
+                )
+        return run_id
+
+    def runs(self, program=None, since=None, until=None, outcome=None, limit=200):
+        """Запуски, новіші першими"""
+        where, params = self._filters(program, since, until, outcome)
+        query = f"SELECT {', '.join(_RUN_FIELDS)} FROM runs {where} ORDER BY started_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def steps(self, run_id):
+        """Кроки запуску в порядку виконання"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_STEP_FIELDS)} FROM steps WHERE run_id = ? ORDER BY position", (run_id,)
+            ).fetchall()
+        return [self._step_from_row(row) for row in rows]
+
+    def programs(self):
+        """Назви програм, для яких є історія"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT program FROM runs ORDER BY program")]
+
+    def summary(self, since=None, window=10):
+        """Статистика за програмами.
+
+        recent_avg — середня тривалість останніх window успішних запусків,
+        previous_avg — попередніх window; їх порівняння показує регресії.
+        """
+        where, params = self._filters(None, since, None, None)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT program, COUNT(*) AS runs, SUM(outcome = ?) AS successes, AVG(duration) AS avg_duration, "
+                f"MAX(duration) AS max_duration, MAX(started_at) AS last_run FROM runs {where} "
+                "GROUP BY program ORDER BY avg_duration DESC",
+                [SUCCESS, *params]
+            ).fetchall()
+            summary = []
+            for row in rows:
+                durations = [r[0] for r in self._conn.execute(
+                    "SELECT duration FROM runs WHERE program = ? AND outcome = ? ORDER BY started_at DESC LIMIT ?",
+                    (row['program'], SUCCESS, window * 2)
+                )]
+                item = dict(row)
+                item['recent_avg'] = _mean(durations[:window])
+                item['previous_avg'] = _mean(durations[window:])
+                summary.append(item)
+        return summary
+
+    def slowest_steps(self, program=None, since=None, limit=20):
+        """Найдовші кроки з назвою програми та часом запуску"""
+        where, params = self._filters(program, since, None, None, prefix="runs.")
+        where = f"{where} AND" if where else "WHERE"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT runs.id AS run_id, runs.program, runs.started_at AS run_started_at, "
+                f"{', '.join(f'steps.{field}' for field in _STEP_FIELDS)} "
+                f"FROM steps JOIN runs ON runs.id = steps.run_id {where} steps.duration IS NOT NULL "
+                "ORDER BY steps.duration DESC LIMIT ?",
+                [*params, limit]
+            ).fetchall()
+        return [self._step_from_row(row) for row in rows]
+
+    def export(self, path, program=None, since=None, until=None):
+        """Експорт у JSON (запуски з вкладеними кроками) або CSV (рядок на крок)"""
+        runs = self.runs(program, since, until, limit=None)
+        for run in runs:
+            run['steps'] = self.steps(run['id'])
+        if path.lower().endswith('.csv'):
+            run_fields = list(_RUN_FIELDS)
+            step_fields = [f"step_{field}" for field in _STEP_FIELDS]
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(run_fields + step_fields)
+                for run in runs:
+                    values = [run[field] for field in run_fields]
+                    for step in run['steps'] or [None]:
+                        step_values = [
+                            json.dumps(step[field], ensure_ascii=False) if field == 'actions' else step[field]
+                            for field in _STEP_FIELDS
+                        ] if step else [''] * len(_STEP_FIELDS)
+                        writer.writerow(values + step_values)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(runs, f, ensure_ascii=False, indent=2)
+        return len(runs)
+
+    def _filters(self, program, since, until, outcome, prefix=""):
+        conditions, params = [], []
+        for column, operator, value in (('program', '=', program), ('started_at', '>=', since),
+                                        ('started_at', '<', until), ('outcome', '=', outcome)):
+            if value is not None:
+                conditions.append(f"{prefix}{column} {operator} ?")
+                params.append(value)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    def _step_from_row(self, row):
+        step = dict(row)
+        step['actions'] = json.loads(step['actions'])
+        return step
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
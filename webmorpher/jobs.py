@@ -0,0 +1,370 @@
+"""Черга завдань сервера WebMorpher з журналом подій кожного завдання (SQLite).
+
+Завдання — програма (або довільний текст завдання) з параметрами запуску.
+Черга зберігається на диску, тому завдання, що стояли в черзі або
+виконувались під час зупинки сервера, виконуються після його перезапуску.
+Події завдання (зміна стану, рядки логу, результат) нумеруються, щоб клієнт
+міг продовжити читання потоку подій з місця, де зупинився.
+
+Файл черги може лежати на спільному диску, і тоді з нею працюють виконавці
+на кількох машинах (вузлах). Вузол бере завдання в оренду (lease) і
+продовжує її сигналами життя; завдання вузла, що перестав їх надсилати,
+повертається в чергу для інших вузлів.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_JOBS_FILE = os.path.expanduser("~/.webmorpher_jobs.sqlite")
+
+# Стани завдання
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Події завдання
+STATUS_EVENT = "status"
+LOG_EVENT = "log"
+RESULT_EVENT = "result"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    program TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    node TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs(status, created_at);
+CREATE TABLE IF NOT EXISTS nodes (
+    node TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    capacity INTEGER NOT NULL,
+    running INTEGER NOT NULL DEFAULT 0,
+    started_at REAL NOT NULL,
+    heartbeat_at REAL NOT NULL,
+    stopped INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    time REAL NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+_JOB_FIELDS = ('id', 'name', 'program', 'options', 'status', 'created_at', 'started_at', 'finished_at', 'result',
+               'error', 'cancel_requested', 'node', 'lease_expires', 'attempts')
+
+# Колонки, додані до таблиці jobs після першої версії черги
+_ADDED_COLUMNS = {'node': "TEXT", 'lease_expires': "REAL", 'attempts': "INTEGER NOT NULL DEFAULT 0"}
+
+
+def default_node():
+    """Назва вузла за замовчуванням — ім'я машини; кілька виконавців на одній машині мають задати власні"""
+    return socket.gethostname()
+
+
+def _job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job['program'] = json.loads(job['program'])
+    job['options'] = json.loads(job['options'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    return job
+
+
+class JobQueue:
+    """Постійна черга завдань.
+
+    Завдання додаються з потоків HTTP сервера, а виконуються потоками
+    виконавців, тому з'єднання захищене блокуванням. Умова changed
+    сповіщає виконавців про нові завдання, а потоки подій — про нові події;
+    інші процеси та вузли помічають зміни опитуванням.
+    Понад max_jobs найстаріші завершені завдання видаляються.
+
+    lease — на скільки секунд вузол бере завдання (продовжується сигналами
+    життя); після max_attempts втрачених оренд завдання вважається невдалим.
+    shared — файл на мережевому диску: WAL там не працює, тому
+    використовується звичайний журнал.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_FILE, max_jobs=10000, lease=60, max_attempts=3, shared=False):
+        self.path = path
+        self.max_jobs = max_jobs
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.changed = threading.Condition(self._lock)
+        # Інші вузли можуть тримати блокування файлу, поки записують; зміни
+        # одразу беруть блокування на запис, щоб нумерація подій не розходилась
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level="IMMEDIATE", check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def submit(self, program, options=None):
+        """Додати завдання в чергу; program — словник програми з кодом для виконання"""
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, name, program, options, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, program.get('name') or "Без назви", json.dumps(program, ensure_ascii=False),
+                 json.dumps(options or {}, ensure_ascii=False), QUEUED, time.time())
+            )
+            self._add_event(job_id, STATUS_EVENT, {'status': QUEUED})
+            self._trim()
+            # Стан на момент додавання: виконавець може взяти завдання одразу
+            row = self._conn.execute(f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            self.changed.notify_all()
+        return _job(row)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row)
+
+    def jobs(self, status=None, limit=100):
+        """Завдання, новіші першими"""
+        query = f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [_job(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def counts(self):
+        """Кількість завдань за станом"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def claim(self, node=None):
+        """Взяти найстаріше завдання з черги для вузла та позначити його виконуваним (або None)"""
+        node = node or default_node()
+        while True:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                # Інший вузол міг взяти це завдання між запитами
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, node = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE id = ? AND status = ?",
+                    (RUNNING, now, node, now + self.lease, row['id'], QUEUED)
+                ).rowcount
+                if not claimed:
+                    continue
+                self._add_event(row['id'], STATUS_EVENT, {'status': RUNNING, 'node': node})
+                self.changed.notify_all()
+            job = _job(row)
+            job.update(status=RUNNING, started_at=now, node=node, lease_expires=now + self.lease,
+                       attempts=row['attempts'] + 1)
+            return job
+
+    def finish(self, job_id, status, result=None, error=None, node=None):
+        """Завершити завдання з результатом run_program.
+
+        Якщо задано node, завдання завершується лише тоді, коли його досі
+        виконує цей вузол (оренду не втрачено); повертає, чи завершено.
+        """
+        with self._lock, self._conn:
+            if not self._update_running(
+                    job_id, node, "status = ?, finished_at = ?, result = ?, error = ?, lease_expires = NULL",
+                    (status, time.time(), json.dumps(result, ensure_ascii=False) if result is not None else None,
+                     error)):
+                return False
+            if result is not None:
+                self._add_event(job_id, RESULT_EVENT, result)
+            self._add_event(job_id, STATUS_EVENT, {'status': status})
+            self.changed.notify_all()
+        return True
+
+    def requeue(self, job_id, node=None):
+        """Повернути завдання в чергу (сервер зупинено під час виконання)"""
+        with self._lock, self._conn:
+            if not self._update_running(job_id, node, "status = ?, started_at = NULL, node = NULL, "
+                                                      "lease_expires = NULL", (QUEUED,)):
+                return False
+            self._add_event(job_id, STATUS_EVENT, {'status': QUEUED})
+            self.changed.notify_all()
+        return True
+
+    def _update_running(self, job_id, node, assignments, params):
+        if node is None:
+            return self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*params, job_id)).rowcount > 0
+        return self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ? AND status = ? AND node = ?",
+                                  (*params, job_id, RUNNING, node)).rowcount > 0
+
+    def requeue_interrupted(self, node=None):
+        """Повернути в чергу завдання, що виконувались під час аварійної зупинки; повертає їх кількість.
+
+        З node повертаються лише завдання цього вузла: виконувані іншими
+        вузлами не чіпаються.
+        """
+        query = "SELECT id FROM jobs WHERE status = ?"
+        params = [RUNNING]
+        if node is not None:
+            query += " AND node = ?"
+            params.append(node)
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(query, params)]
+        return sum(self.requeue(job_id, node) for job_id in ids)
+
+    # Вузли
+
+    def heartbeat(self, node, capacity, running=()):
+        """Сигнал життя вузла: продовжує оренду завдань running, які вузол справді виконує.
+
+        Оренда інших завдань вузла (наприклад, потік виконавця аварійно
+        завершився) спливає, і їх повертає в чергу requeue_expired.
+        Повертає id виконуваних вузлом завдань, які просили скасувати.
+        """
+        now = time.time()
+        running = list(running)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO nodes (node, host, pid, capacity, running, started_at, heartbeat_at, stopped) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0) ON CONFLICT(node) DO UPDATE SET host = excluded.host, "
+                "pid = excluded.pid, capacity = excluded.capacity, running = excluded.running, "
+                "heartbeat_at = excluded.heartbeat_at, stopped = 0, "
+                "started_at = CASE WHEN nodes.stopped OR nodes.pid != excluded.pid THEN excluded.started_at "
+                "ELSE nodes.started_at END",
+                (node, socket.gethostname(), os.getpid(), capacity, len(running), now, now)
+            )
+            if running:
+                self._conn.execute(
+                    f"UPDATE jobs SET lease_expires = ? WHERE status = ? AND node = ? "
+                    f"AND id IN ({', '.join('?' * len(running))})",
+                    (now + self.lease, RUNNING, node, *running)
+                )
+            rows = self._conn.execute("SELECT id FROM jobs WHERE status = ? AND node = ? AND cancel_requested = 1",
+                                      (RUNNING, node)).fetchall()
+        return [row[0] for row in rows]
+
+    def node_stopped(self, node):
+        """Вузол зупинено штатно"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE nodes SET stopped = 1, running = 0 WHERE node = ?", (node,))
+
+    def nodes(self):
+        """Вузли з ознакою online: сигнал життя не старший за оренду"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM nodes ORDER BY node").fetchall()
+        return [dict(row, stopped=bool(row['stopped']),
+                     online=not row['stopped'] and now - row['heartbeat_at'] < self.lease) for row in rows]
+
+    def requeue_expired(self):
+        """Повернути в чергу завдання вузлів, що перестали надсилати сигнали життя.
+
+        Завдання, яке вже max_attempts разів втрачало вузол, завершується
+        помилкою. Повертає кількість оброблених завдань.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id, node, attempts, cancel_requested FROM jobs "
+                                      "WHERE status = ? AND lease_expires < ?", (RUNNING, time.time())).fetchall()
+        for row in rows:
+            message = f"Вузол {row['node']} не відповідає"
+            if row['cancel_requested']:
+                self.finish(row['id'], CANCELLED, error=message, node=row['node'])
+            elif self.max_attempts and row['attempts'] >= self.max_attempts:
+                self.finish(row['id'], FAILED, error=f"{message} (спроб: {row['attempts']})", node=row['node'])
+            elif self.requeue(row['id'], row['node']):
+                self.add_event(row['id'], LOG_EVENT, {'message': f"{message}, завдання повернуто в чергу"})
+        return len(rows)
+
+    def cancel(self, job_id):
+        """Скасувати завдання: з черги — одразу, виконуване — після зупинки агента.
+
+        Повертає оновлене завдання або None, якщо його немає.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row['status'] == QUEUED:
+                self._conn.execute("UPDATE jobs SET status = ?, finished_at = ?, cancel_requested = 1 WHERE id = ?",
+                                   (CANCELLED, time.time(), job_id))
+                self._add_event(job_id, STATUS_EVENT, {'status': CANCELLED})
+            elif row['status'] == RUNNING:
+                self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            self.changed.notify_all()
+        return self.get(job_id)
+
+    def add_event(self, job_id, kind, data):
+        with self._lock, self._conn:
+            seq = self._add_event(job_id, kind, data)
+            self.changed.notify_all()
+        return seq
+
+    def _add_event(self, job_id, kind, data):
+        self._conn.execute(
+            "INSERT INTO job_events (job_id, seq, time, kind, data) "
+            "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM job_events WHERE job_id = ?",
+            (job_id, time.time(), kind, json.dumps(data, ensure_ascii=False), job_id)
+        )
+        return self._conn.execute("SELECT MAX(seq) FROM job_events WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def events(self, job_id, after=0):
+        """Події завдання з номером більше after"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, time, kind, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after)
+            ).fetchall()
+        return [{'seq': seq, 'time': at, 'kind': kind, 'data': json.loads(data)} for seq, at, kind, data in rows]
+
+    def wait(self, timeout):
+        """Чекати на зміну в черзі (нове завдання чи подію) не довше timeout секунд"""
+        with self.changed:
+            self.changed.wait(timeout)
+
+    def _trim(self):
+        if not self.max_jobs:
+            return
+        self._conn.execute(
+            f"DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) "
+            "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (*FINISHED, self.max_jobs)
+        )
@@ -0,0 +1,135 @@
+"""Полегшений режим: блокування важких ресурсів сторінки.
+
+Програмам, що лише читають текст і заповнюють форми, не потрібні
+зображення, відео, шрифти та сторонні трекери. ResourceBlocker
+перехоплює запити контексту Playwright і відхиляє їх за типом ресурсу
+або доменом, тому сторінки завантажуються швидше, а DOM менший.
+
+Налаштування задаються секцією "lite_mode" конфігурації:
+
+    {"block_types": ["image", "media", "font"],
+     "block_domains": ["ads.example.com"], "allow_domains": ["cdn.example.com"]}
+
+block_domains доповнює вбудований список трекерів TRACKER_DOMAINS.
+Сам документ сторінки (resource_type "document") не блокується ніколи.
+"""
+from urllib.parse import urlsplit
+
+from webmorpher import metrics
+
+DEFAULT_BLOCK_TYPES = ("image", "media", "font")
+
+# Поширені домени аналітики та реклами
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "facebook.com/tr",
+    "hotjar.com",
+    "mc.yandex.ru",
+    "top-fwz1.mail.ru",
+    "clarity.ms",
+    "segment.io",
+    "cdn.segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "adnxs.com",
+)
+
+# Причина блокування запиту за доменом (для метрик)
+DOMAIN = "domain"
+
+
+def _matches(host, path, rule):
+    """Правило "домен" або "домен/шлях"; піддомени теж підходять"""
+    domain, _, prefix = rule.partition('/')
+    if host != domain and not host.endswith("." + domain):
+        return False
+    path = path.lstrip('/')
+    return not prefix or path == prefix or path.startswith(prefix + '/')
+
+
+class ResourceBlocker:
+    """Блокування запитів за типом ресурсу та доменом з лічильниками"""
+
+    def __init__(self, block_types=DEFAULT_BLOCK_TYPES, block_domains=(), allow_domains=(), trackers=True):
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(block_domains) + (TRACKER_DOMAINS if trackers else ())
+        self.allow_domains = tuple(allow_domains)
+        # Заблоковані запити за типом ресурсу або DOMAIN
+        self.blocked = {}
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self._context = None
+
+    def block_reason(self, url, resource_type):
+        """Причина блокування (тип ресурсу або DOMAIN) чи None"""
+        if resource_type == "document":
+            return None
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return None
+        host = (parts.hostname or "").lower()
+        if any(_matches(host, parts.path, rule) for rule in self.allow_domains):
+            return None
+        if resource_type in self.block_types:
+            return resource_type
+        if any(_matches(host, parts.path, rule) for rule in self.block_domains):
+            return DOMAIN
+        return None
+
+    async def install(self, context):
+        """Перехоплювати запити контексту Playwright"""
+        self._context = context
+        await context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    async def uninstall(self):
+        """Зняти перехоплення (контекст дебаг-браузера живе після запуску)"""
+        context, self._context = self._context, None
+        if context is None:
+            return
+        context.remove_listener("response", self._on_response)
+        try:
+            await context.unroute("**/*", self._handle)
+        except Exception:
+            # Контекст вже закрито
+            pass
+
+    async def _handle(self, route):
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason is None:
+            await route.continue_()
+            return
+        self.blocked[reason] = self.blocked.get(reason, 0) + 1
+        metrics.BLOCKED_REQUESTS.inc(kind=reason)
+        await route.abort("blockedbyclient")
+
+    def _on_response(self, response):
+        self.loaded_requests += 1
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except ValueError:
+            size = 0
+        self.loaded_bytes += size
+        metrics.PAGE_BYTES.inc(size)
+
+    @property
+    def blocked_total(self):
+        return sum(self.blocked.values())
+
+    def summary(self):
+        """Рядок для логу запуску"""
+        details = ", ".join(f"{kind}: {count}" for kind, count in sorted(self.blocked.items()))
+        loaded = self.loaded_bytes / 1024 / 1024
+        return (f"🪶 Полегшений режим: заблоковано запитів {self.blocked_total}"
+                f"{f' ({details})' if details else ''}, завантажено {self.loaded_requests} запитів, {loaded:.1f} МБ")
@@ -0,0 +1,167 @@
+"""Моделі агента: постачальники з OpenAI-сумісним API та вибір моделі для кроку.
+
+Налаштування задаються секцією "llm" конфігурації:
+
+    {"provider": "openai", "model": "gpt-4o", "fast_model": "gpt-4o-mini",
+     "base_url": null, "api_key": null,
+     "escalate_after_failures": 1, "complex_page_elements": 150}
+
+provider "local" — локальний сервер з OpenAI-сумісним API (Ollama,
+llama.cpp, vLLM), для нього ключ не потрібен. Якщо задано fast_model,
+прості кроки (кліки, прокрутка на невеликих сторінках) виконує швидка
+модель, а основна модель береться після невдалих кроків та на складних
+сторінках. Програма може замінити основну модель ("model") або вимкнути
+вибір моделі ("routing": false).
+"""
+from webmorpher.metrics import LLM_ROUTED_STEPS
+
+DEFAULT_MODEL = "gpt-4o"
+
+# Типові параметри постачальників
+PROVIDERS = {
+    "openai": {"base_url": None, "api_key_required": True},
+    "local": {"base_url": "http://127.0.0.1:11434/v1", "api_key_required": False},
+}
+
+# Причини вибору моделі для кроку
+FAST = "fast"
+PRIMARY = "primary"
+FAILURES = "failures"
+COMPLEX_PAGE = "complex_page"
+
+# Пояснення вибору моделі для логу запуску
+REASON_LABELS = {
+    FAST: "простий крок",
+    PRIMARY: "основна модель",
+    FAILURES: "попередній крок не вдався",
+    COMPLEX_PAGE: "складна сторінка",
+}
+
+
+def _provider(settings):
+    name = settings.get('provider', "openai")
+    if name not in PROVIDERS:
+        raise ValueError(f"Невідомий постачальник моделі: {name} (доступні: {', '.join(PROVIDERS)})")
+    return PROVIDERS[name]
+
+
+def requires_api_key(settings):
+    """Чи потрібен ключ OpenAI для цих налаштувань"""
+    settings = settings or {}
+    provider = PROVIDERS.get(settings.get('provider', "openai"), PROVIDERS["openai"])
+    return provider['api_key_required'] and not settings.get('api_key')
+
+
+def program_llm_settings(settings, program):
+    """Налаштування моделі з урахуванням параметрів програми"""
+    merged = dict(settings or {})
+    if program.get('model'):
+        merged['model'] = program['model']
+    if program.get('routing') is False:
+        merged['fast_model'] = None
+    return merged
+
+
+def create_chat_model(model, settings=None, api_key=None, cache=None, callbacks=None):
+    """ChatOpenAI для OpenAI або іншого сервера з сумісним API"""
+    from langchain_openai import ChatOpenAI
+
+    settings = settings or {}
+    provider = _provider(settings)
+    params = {'model': model, 'cache': cache, 'callbacks': callbacks}
+    base_url = settings.get('base_url') or provider['base_url']
+    if base_url:
+        params['base_url'] = base_url
+    # Локальні сервери ключ не перевіряють, але клієнт OpenAI його вимагає
+    params['api_key'] = settings.get('api_key') or api_key or (None if provider['api_key_required'] else "local")
+    if settings.get('timeout'):
+        params['timeout'] = settings['timeout']
+    return ChatOpenAI(**params)
+
+
+def _page_elements(agent):
+    """Кількість інтерактивних елементів на останній побаченій сторінці"""
+    session = getattr(getattr(agent, 'browser_context', None), 'session', None)
+    state = getattr(session, 'cached_state', None)
+    selector_map = getattr(state, 'selector_map', None)
+    return len(selector_map) if selector_map else 0
+
+
+def _last_step_failed(agent):
+    """Остання дія з помилкою або модель сама оцінила попередню ціль як невдалу"""
+    if any(getattr(result, 'error', None) for result in agent.state.last_result or []):
+        return True
+    history = agent.state.history.history
+    output = history[-1].model_output if history else None
+    evaluation = output.current_state.evaluation_previous_goal if output is not None else ""
+    return evaluation.lower().startswith("failed")
+
+
+class ModelRouter:
+    """Вибір моделі для кожного кроку агента.
+
+    Без швидкої моделі всі кроки виконує основна. Зі швидкою — основна
+    модель береться після escalate_after_failures невдалих кроків поспіль
+    (помилка дії або модель сама оцінила попередню ціль як невдалу) та на
+    сторінках щонайменше з complex_page_elements інтерактивними елементами.
+    """
+
+    def __init__(self, primary, primary_name, fast=None, fast_name=None, escalate_after_failures=1,
+                 complex_page_elements=150):
+        self.primary = primary
+        self.primary_name = primary_name
+        self.fast = fast
+        self.fast_name = fast_name
+        self.escalate_after_failures = escalate_after_failures
+        self.complex_page_elements = complex_page_elements
+        self.current_name = None
+        # Скільки кроків виконала кожна модель
+        self.steps = {}
+
+    @property
+    def extraction_llm(self):
+        """Модель для витягання вмісту сторінки (extract_content)"""
+        return self.fast or self.primary
+
+    def choose(self, agent):
+        """(модель, назва, причина) для наступного кроку"""
+        if self.fast is None:
+            return self.primary, self.primary_name, PRIMARY
+        failures = max(agent.state.consecutive_failures, 1 if _last_step_failed(agent) else 0)
+        if failures >= max(1, self.escalate_after_failures):
+            return self.primary, self.primary_name, FAILURES
+        if self.complex_page_elements and _page_elements(agent) >= self.complex_page_elements:
+            return self.primary, self.primary_name, COMPLEX_PAGE
+        return self.fast, self.fast_name, FAST
+
+    def route(self, agent):
+        """Встановити модель кроку; повертає (назва, причина), якщо модель змінилась"""
+        llm, name, reason = self.choose(agent)
+        agent.llm = llm
+        self.steps[name] = self.steps.get(name, 0) + 1
+        LLM_ROUTED_STEPS.inc(model=name, reason=reason)
+        changed = name != self.current_name
+        self.current_name = name
+        return (name, reason) if changed else None
+
+
+def build_router(settings, api_key=None, cache=None, factory=None):
+    """ModelRouter за налаштуваннями; factory(model, cache, callbacks) замінює ChatOpenAI"""
+    from webmorpher.llm_metrics import LLMMetricsCallback
+
+    settings = settings or {}
+    if factory is None:
+        def factory(model, cache=None, callbacks=None):
+            return create_chat_model(model, settings, api_key, cache, callbacks)
+
+    primary_name = settings.get('model') or DEFAULT_MODEL
+    primary = factory(primary_name, cache=cache, callbacks=[LLMMetricsCallback(primary_name)])
+    fast_name = settings.get('fast_model')
+    fast = None
+    if fast_name and fast_name != primary_name:
+        fast = factory(fast_name, cache=cache, callbacks=[LLMMetricsCallback(fast_name)])
+    return ModelRouter(
+        primary, primary_name, fast, fast_name if fast is not None else None,
+        escalate_after_failures=settings.get('escalate_after_failures', 1),
+        complex_page_elements=settings.get('complex_page_elements', 150)
+    )
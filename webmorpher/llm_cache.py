@@ -0,0 +1,175 @@
+"""Кеш відповідей моделі на диску (SQLite).
+
+Ключ кешу складається з моделі та її параметрів (llm_string) і повідомлень,
+які агент надсилає моделі. Повідомлення browser-use містять текстовий стан
+сторінки (URL, вкладки, інтерактивні елементи), тому повторний запуск тієї
+ж програми на незмінній сторінці отримує відповідь з кешу. Скриншоти та
+поточний час, які змінюються між запусками, з ключа виключаються.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import warnings
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+DEFAULT_CACHE_FILE = os.path.expanduser("~/.webmorpher_llm_cache.sqlite")
+
+_IMAGE_DATA = re.compile(r'data:image/[\w.+-]+;base64,[A-Za-z0-9+/=]+')
+_CURRENT_TIME = re.compile(r'Current date and time: \d{4}-\d{2}-\d{2} \d{2}:\d{2}')
+
+
+def cache_key(prompt, llm_string):
+    """Хеш нормалізованого запиту до моделі"""
+    prompt = _IMAGE_DATA.sub('data:image', prompt)
+    prompt = _CURRENT_TIME.sub('', prompt)
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(prompt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResponseStore:
+    """Сховище відповідей з обмеженням розміру та часу життя записів.
+
+    Одне сховище спільне для всіх запусків, тому доступ до з'єднання
+    SQLite захищений блокуванням. Кожен запис позначений запуском, що його
+    записав (writer), поки ним не скористався інший запуск.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=5000, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL, writer TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "writer" not in columns:
+            # Кеш, створений попередньою версією
+            self._conn.execute("ALTER TABLE responses ADD COLUMN writer TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._conn.commit()
+
+    def get(self, key, reader=None):
+        """Серіалізована відповідь або None.
+
+        Відповідь, прочитана іншим запуском, ніж той, що її записав, вже не
+        відкидається разом з відповідями запуску-автора.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_used = ?, writer = CASE WHEN writer IS ? THEN writer END WHERE key = ?",
+                (now, reader, key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, value, writer=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_used, writer) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, writer)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, keys, writer=None):
+        """Видалити записи; з writer — лише ті, що досі належать цьому запуску"""
+        with self._lock:
+            if writer is None:
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+            else:
+                self._conn.executemany("DELETE FROM responses WHERE key = ? AND writer = ?",
+                                       [(key, writer) for key in keys])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        """Кількість записів, влучань та промахів"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {'entries': entries, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        if self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        if self.max_entries:
+            # Видаляємо записи, які найдовше не використовувалися
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+
+class LLMResponseCache(BaseCache):
+    """Кеш langchain для одного запуску поверх спільного ResponseStore.
+
+    Рахує влучання та промахи саме цього запуску і запам'ятовує записані
+    ключі, щоб відповіді з невдалого запуску можна було відкинути.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Позначка записів цього запуску в спільному сховищі
+        self.run_id = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self.written = []
+
+    def lookup(self, prompt, llm_string):
+        value = self.store.get(cache_key(prompt, llm_string), reader=self.run_id)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', LangChainBetaWarning)
+            return loads(value)
+
+    def update(self, prompt, llm_string, return_val):
+        key = cache_key(prompt, llm_string)
+        self.store.put(key, dumps(list(return_val)), writer=self.run_id)
+        self.written.append(key)
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+    def discard_written(self):
+        """Видалити відповіді цього запуску, які не перезаписав і не прочитав інший запуск"""
+        if self.written:
+            self.store.delete(self.written, writer=self.run_id)
+            self.written = []
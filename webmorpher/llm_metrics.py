@@ -0,0 +1,55 @@
+"""Метрики викликів моделі через колбеки langchain"""
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from webmorpher.metrics import LLM_ERRORS, LLM_LATENCY, LLM_TOKENS
+
+
+def _token_usage(response):
+    """(вхідні, вихідні) токени відповіді LLMResult"""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+            if usage:
+                return usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+    usage = (response.llm_output or {}).get('token_usage') or {}
+    return usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Тривалість, помилки та токени кожного виклику моделі"""
+
+    def __init__(self, model):
+        self.model = model
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._finish(run_id)
+        if started is not None:
+            LLM_LATENCY.observe(time.monotonic() - started, model=self.model)
+        input_tokens, output_tokens = _token_usage(response)
+        if input_tokens:
+            LLM_TOKENS.inc(input_tokens, model=self.model, kind="input")
+        if output_tokens:
+            LLM_TOKENS.inc(output_tokens, model=self.model, kind="output")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+        LLM_ERRORS.inc(model=self.model)
+
+    def _start(self, run_id):
+        with self._lock:
+            self._started[run_id] = time.monotonic()
+
+    def _finish(self, run_id):
+        with self._lock:
+            return self._started.pop(run_id, None)
@@ -0,0 +1,70 @@
+"""Буферизація логів запуску: пакетна передача в GUI та обмежений вигляд"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from tempfile import gettempdir
+
+LOG_SPOOL_DIR = os.path.join(gettempdir(), "webmorpher-logs")
+
+
+class LogBatcher:
+    """Потокобезпечна черга повідомлень.
+
+    Потік агента лише додає рядки (push), а GUI забирає їх пакетами з
+    частотою кадрів (drain), тому кожне повідомлення не потребує окремої
+    події в циклі Qt.
+    """
+
+    def __init__(self):
+        self._messages = deque()
+        self._lock = threading.Lock()
+
+    def push(self, message):
+        with self._lock:
+            self._messages.append(message)
+
+    def drain(self, limit=None):
+        """Забрати накопичені повідомлення (не більше limit)"""
+        with self._lock:
+            if limit is None or limit >= len(self._messages):
+                batch = list(self._messages)
+                self._messages.clear()
+            else:
+                batch = [self._messages.popleft() for _ in range(limit)]
+        return batch
+
+    def __len__(self):
+        return len(self._messages)
+
+
+class RingLog:
+    """Останні max_lines рядків логу; старіші рядки дописуються у файл на диску"""
+
+    def __init__(self, max_lines=5000, name="run", spool_dir=LOG_SPOOL_DIR):
+        self.max_lines = max(1, max_lines)
+        self.lines = deque()
+        self.name = re.sub(r'[^\w.-]+', '_', name).strip('_') or "run"
+        self.spool_dir = spool_dir
+        self.spool_path = None
+        self.spooled = 0
+
+    def add(self, lines):
+        """Додати рядки; повертає кількість рядків, витіснених у файл"""
+        self.lines.extend(lines)
+        overflow = len(self.lines) - self.max_lines
+        if overflow <= 0:
+            return 0
+        evicted = [self.lines.popleft() for _ in range(overflow)]
+        self._spool(evicted)
+        return overflow
+
+    def _spool(self, lines):
+        if self.spool_path is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self.spool_path = os.path.join(self.spool_dir, f"{self.name}-{stamp}-{id(self):x}.log")
+        with open(self.spool_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in lines)
+        self.spooled += len(lines)
@@ -0,0 +1,335 @@
+"""Метрики запусків: лічильники, гістограми та експорт у форматі Prometheus.
+
+Запуски, кроки агента, виклики моделі та браузери оновлюють метрики
+глобального реєстру REGISTRY. Реєстр можна віддавати на локальному порту
+(MetricsServer, GET /metrics), періодично записувати у файл
+(MetricsFileWriter) або показувати коротким підсумком у GUI.
+"""
+import math
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Межі гістограм тривалості, с
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: очікувались мітки {', '.join(self.labelnames) or 'без міток'}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Лічильник, що лише зростає"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        """Сума за всіма мітками"""
+        with self._lock:
+            return sum(self._values.values())
+
+
+class Gauge(_Metric):
+    """Значення, що може зростати та зменшуватися"""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Розподіл значень (тривалість, кількість токенів) за кошиками"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = _HistogramValue(self.buckets)
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def count(self):
+        """Кількість спостережень за всіма мітками"""
+        with self._lock:
+            return sum(histogram.count for histogram in self._values.values())
+
+    def totals(self):
+        """(кількість, сума) спостережень за всіма мітками"""
+        with self._lock:
+            return (sum(histogram.count for histogram in self._values.values()),
+                    sum(histogram.sum for histogram in self._values.values()))
+
+    def mean(self):
+        """Середнє значення за всіма мітками або None"""
+        count, total = self.totals()
+        return total / count if count else None
+
+    def _render_value(self, key, histogram):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), histogram.counts):
+            cumulative += count
+            labels = key + (('le', _format_value(bound)),)
+            lines.append(f"{self.name}_bucket{_format_labels(labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(key)} {histogram.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набір метрик, що експортуються разом"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Метрика {metric.name} вже зареєстрована з іншим типом")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Усі метрики у текстовому форматі Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+RUNS_STARTED = REGISTRY.counter("webmorpher_runs_started_total", "Запуски програм")
+RUNS_FINISHED = REGISTRY.counter("webmorpher_runs_finished_total", "Завершені запуски за результатом", ["outcome"])
+RUN_DURATION = REGISTRY.histogram("webmorpher_run_duration_seconds", "Тривалість запуску", ["outcome"])
+RUN_QUEUE_WAIT = REGISTRY.histogram("webmorpher_run_queue_wait_seconds", "Очікування запуску в черзі")
+STEP_DURATION = REGISTRY.histogram("webmorpher_step_duration_seconds", "Тривалість кроку агента")
+LLM_LATENCY = REGISTRY.histogram("webmorpher_llm_call_duration_seconds", "Тривалість виклику моделі", ["model"])
+LLM_ERRORS = REGISTRY.counter("webmorpher_llm_call_errors_total", "Невдалі виклики моделі", ["model"])
+LLM_TOKENS = REGISTRY.counter("webmorpher_llm_tokens_total", "Токени викликів моделі", ["model", "kind"])
+LLM_ROUTED_STEPS = REGISTRY.counter("webmorpher_llm_routed_steps_total", "Кроки агента за обраною моделлю",
+                                    ["model", "reason"])
+BROWSER_LAUNCH = REGISTRY.histogram("webmorpher_browser_launch_seconds", "Запуск або підключення браузера",
+                                    ["source"])
+BLOCKED_REQUESTS = REGISTRY.counter("webmorpher_blocked_requests_total",
+                                    "Запити, заблоковані полегшеним режимом, за типом ресурсу", ["kind"])
+PAGE_BYTES = REGISTRY.counter("webmorpher_lite_page_bytes_total",
+                              "Байти відповідей у полегшеному режимі (за Content-Length)")
+STATE_CHARS = REGISTRY.counter("webmorpher_page_state_chars_total",
+                               "Символи стану сторінки: original — повний, sent — надісланий моделі", ["kind"])
+PROFILE_CLONE = REGISTRY.histogram("webmorpher_profile_clone_seconds", "Оновлення знімка та копія профілю")
+ACTIVE_BROWSERS = REGISTRY.gauge("webmorpher_browsers_active", "Відкриті браузери", ["source"])
+
+
+def summary():
+    """Короткий підсумок для рядка стану GUI"""
+    failed = RUNS_FINISHED.value(outcome="error") + RUNS_FINISHED.value(outcome="failed")
+    return {
+        'runs_started': RUNS_STARTED.total(),
+        'runs_failed': failed,
+        'step_avg': STEP_DURATION.mean(),
+        'llm_calls': LLM_LATENCY.count(),
+        'llm_avg': LLM_LATENCY.mean(),
+        'llm_tokens': LLM_TOKENS.total(),
+        'browsers_active': ACTIVE_BROWSERS.total(),
+    }
+
+
+def write_metrics_file(path, registry=REGISTRY):
+    """Атомарно записати метрики у файл (наприклад, для textfile collector)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(f"{path}.tmp", path)
+
+
+class MetricsFileWriter:
+    """Періодичний запис метрик у файл у фоновому потоці"""
+
+    def __init__(self, path, interval=15, registry=REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._write_periodically, name="webmorpher-metrics-file",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self, timeout=5):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        # Останній знімок після завершення запусків
+        self._write()
+
+    def _write_periodically(self):
+        while not self._stop.is_set():
+            self._write()
+            self._stop.wait(self.interval)
+
+    def _write(self):
+        try:
+            write_metrics_file(self.path, self.registry)
+        except OSError as e:
+            print(f"Не вдалося записати метрики у {self.path}: {e}")
+
+
+class MetricsServer:
+    """HTTP сервер, що віддає метрики на /metrics (типово лише на localhost)"""
+
+    def __init__(self, port=9464, host="127.0.0.1", registry=REGISTRY):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="webmorpher-metrics-http",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self):
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._thread = None
+
+
+def start_exporters(settings):
+    """Експортери за налаштуваннями {"port": ..., "host": ..., "file": ..., "interval": ...}"""
+    exporters = []
+    if settings.get('port') is not None:
+        exporters.append(MetricsServer(settings['port'], settings.get('host', "127.0.0.1")).start())
+    if settings.get('file'):
+        exporters.append(MetricsFileWriter(os.path.expanduser(settings['file']), settings.get('interval', 15)).start())
+    return exporters
@@ -0,0 +1,488 @@
+"""Пул процесів-виконавців: кожен запуск агента в окремому процесі.
+
+Агент, браузер і Playwright працюють у процесі-виконавці, тому аварія чи
+витік пам'яті в них не зачіпає головний процес, а кілька запусків
+використовують різні ядра замість одного GIL. Головний процес спілкується з
+виконавцем через Pipe: надсилає запуск і команди (pause, resume, stop),
+отримує рядки логу, помилки та підсумок.
+
+Виконавець перезапускається після max_runs_per_worker запусків, після
+перевищення max_memory_mb (пам'ять процесу разом із браузерами) та після
+аварійного завершення. Ресурси, які не можна передати між процесами (теплі
+браузери, кеш моделі, історія), кожен виконавець відкриває сам за
+налаштуваннями з конфігурації.
+"""
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # без psutil пам'ять рахується лише для самого процесу (Linux)
+    psutil = None
+
+from webmorpher.runner import STOP_TIMEOUT
+
+# Перевірка пам'яті та стану виконавця під час запуску, с
+CHECK_INTERVAL = 1.0
+CRASH_MESSAGE = "Процес виконавця завершився аварійно"
+
+_run_ids = itertools.count(1)
+
+
+def process_memory_mb(pid):
+    """Пам'ять процесу та його дочірніх процесів (браузерів) у МБ або None, якщо її не виміряти"""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return rss / (1024 * 1024)
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class WorkerResources:
+    """Ресурси одного процесу-виконавця, що відкриваються під час першого запуску, який їх потребує"""
+
+    def __init__(self, settings):
+        self.settings = settings or {}
+        self._opened = {}
+
+    def get(self, name):
+        if name not in self._opened:
+            self._opened[name] = self._open(name)
+        return self._opened[name]
+
+    def _open(self, name):
+        settings = dict(self.settings.get(name, {}))
+        if name == "browser_pool":
+            from webmorpher.browser_pool import BrowserPool
+
+            # Виконавець виконує один запуск за раз
+            settings["size"] = 1
+            return BrowserPool(**settings).start()
+        if name == "llm_cache":
+            from webmorpher.llm_cache import ResponseStore
+
+            return ResponseStore(**settings)
+        if name == "run_history":
+            from webmorpher.history import RunHistory
+
+            return RunHistory(**settings)
+        if name == "profile_snapshots":
+            from webmorpher.profile_snapshot import ProfileSnapshots
+
+            settings.pop("enabled", None)
+            return ProfileSnapshots(**settings)
+        if name == "trace_store":
+            from webmorpher.replay import TraceStore
+
+            return TraceStore()
+        if name == "checkpoints":
+            from webmorpher.checkpoint import CheckpointStore
+
+            settings.pop("enabled", None)
+            return CheckpointStore(**settings)
+        raise KeyError(name)
+
+    def close(self):
+        for name, resource in self._opened.items():
+            if name == "browser_pool":
+                resource.shutdown()
+            elif hasattr(resource, "close"):
+                resource.close()
+        self._opened = {}
+
+
+def create_agent_run(params, resources, on_log, on_error):
+    """AgentRun у процесі-виконавці.
+
+    params — аргументи AgentRun, які можна передати між процесами; прапорці
+    llm_cache, replay, run_history, profile_snapshots та checkpoints вмикають
+    відповідні ресурси виконавця.
+    """
+    from webmorpher.runner import AgentRun
+
+    params = dict(params)
+    shared = {
+        "browser_pool": resources.get("browser_pool") if params.pop("browser_pool", True) else None,
+        "llm_cache": resources.get("llm_cache") if params.pop("llm_cache", False) else None,
+        "trace_store": resources.get("trace_store") if params.pop("replay", False) else None,
+        "run_history": resources.get("run_history") if params.pop("run_history", False) else None,
+        "profile_snapshots": resources.get("profile_snapshots") if params.pop("profile_snapshots", False) else None,
+        "checkpoints": resources.get("checkpoints") if params.pop("checkpoints", False) else None,
+    }
+    return AgentRun(**params, **shared, on_log=on_log, on_error=on_error)
+
+
+def run_summary(agent_run, history, errors):
+    """Підсумок запуску, який можна передати в головний процес (історію агента не передаємо)"""
+    errors = errors + ([e for e in history.errors() if e] if history is not None else [])
+    return {
+        "started": agent_run.started,
+        "success": bool(history is not None and history.is_done() and history.is_successful() is not False
+                        and not errors),
+        "final_result": history.final_result() if history is not None else None,
+        "errors": errors,
+        "steps": len(history.history) if history is not None else 0,
+    }
+
+
+def _worker_main(conn, settings, factory):
+    """Головний цикл процесу-виконавця: запуски виконуються в окремому потоці, команди приймаються тут"""
+    resources = WorkerResources(settings)
+    send_lock = threading.Lock()
+    current = {}
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                # Головний процес уже закрив з'єднання
+                pass
+
+    def execute(run_id, agent_run, errors):
+        history = None
+        try:
+            history = agent_run.execute()
+        except Exception as e:
+            errors.append(f"Помилка: {str(e)}")
+            send(("error", run_id, errors[-1]))
+        try:
+            summary = run_summary(agent_run, history, errors)
+        except Exception as e:
+            summary = {"started": True, "success": False, "final_result": None, "errors": errors + [str(e)],
+                       "steps": 0}
+        current.pop(run_id, None)
+        send(("done", run_id, summary))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind, run_id = message[0], message[1]
+            if kind == "run":
+                errors = []
+
+                def on_error(text, run_id=run_id, errors=errors):
+                    errors.append(text)
+                    send(("error", run_id, text))
+
+                try:
+                    agent_run = factory(message[2], resources,
+                                        lambda text, run_id=run_id: send(("log", run_id, text)), on_error)
+                except Exception as e:
+                    send(("done", run_id, {"started": False, "success": False, "final_result": None,
+                                           "errors": [f"Помилка: {str(e)}"], "steps": 0}))
+                    continue
+                current[run_id] = agent_run
+                threading.Thread(target=execute, args=(run_id, agent_run, errors),
+                                 name=f"webmorpher-run-{run_id}", daemon=True).start()
+            elif kind in ("pause", "resume", "stop"):
+                agent_run = current.get(run_id)
+                if agent_run is not None:
+                    getattr(agent_run, kind)()
+            elif kind == "exit":
+                break
+    finally:
+        for agent_run in list(current.values()):
+            agent_run.stop()
+        resources.close()
+
+
+class _Worker:
+    """Процес-виконавець з боку головного процесу"""
+
+    def __init__(self, context, number, settings, factory):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, settings, factory),
+                                       name=f"webmorpher-worker-{number}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+        self.over_memory = False
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        with self._send_lock:
+            try:
+                self.conn.send(message)
+                return True
+            except (OSError, EOFError):
+                return False
+
+    def memory_mb(self):
+        return process_memory_mb(self.process.pid)
+
+    def close(self, timeout=STOP_TIMEOUT):
+        """Завершити процес: спочатку попросити, потім примусово"""
+        if self.process.is_alive():
+            self.send(("exit", None))
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ProcessRun:
+    """Запуск у пулі процесів з тим самим інтерфейсом, що й AgentRun (execute, pause, resume, stop)"""
+
+    def __init__(self, pool, params, on_log=None, on_error=None):
+        self.id = next(_run_ids)
+        self.pool = pool
+        self.params = params
+        self.on_log = on_log or (lambda message: None)
+        self.on_error = on_error or (lambda message: None)
+        # Підсумок запуску (див. run_summary) після завершення
+        self.summary = None
+        self._lock = threading.Lock()
+        self._worker = None
+        self._is_paused = False
+        self._is_stopped = False
+        self._stop_requested_at = None
+        self._done = threading.Event()
+
+    @property
+    def started(self):
+        """Чи встиг виконавець створити агента"""
+        return bool(self.summary and self.summary.get("started"))
+
+    def execute(self):
+        """Поставити запуск у чергу пулу та чекати на підсумок"""
+        self.pool.submit(self)
+        self._done.wait()
+        return self.summary
+
+    def pause(self):
+        self._control("pause", paused=True)
+
+    def resume(self):
+        self._control("resume", paused=False)
+
+    def stop(self):
+        with self._lock:
+            self._is_stopped = True
+            if self._stop_requested_at is None:
+                self._stop_requested_at = time.monotonic()
+        self._control("stop")
+
+    def _control(self, command, paused=None):
+        with self._lock:
+            if paused is not None:
+                self._is_paused = paused
+            worker = self._worker
+        if worker is not None:
+            worker.send((command, self.id))
+
+    def _dispatch(self, worker):
+        """Надіслати запуск виконавцю разом із командами, що надійшли до цього"""
+        with self._lock:
+            worker.send(("run", self.id, self.params))
+            self._worker = worker
+            if self._is_paused:
+                worker.send(("pause", self.id))
+            if self._is_stopped:
+                worker.send(("stop", self.id))
+
+    def _finish(self, summary):
+        with self._lock:
+            self._worker = None
+        self.summary = summary
+        self._done.set()
+
+
+class ProcessPool:
+    """Фіксована кількість процесів-виконавців, які по черзі беруть запуски.
+
+    settings — секції конфігурації для ресурсів виконавця (browser_pool,
+    llm_cache, run_history, profile_snapshots, checkpoints); factory(params, resources,
+    on_log, on_error) створює запуск у виконавці (типово create_agent_run) і
+    має бути функцією рівня модуля, щоб її можна було передати в процес.
+    """
+
+    def __init__(self, size=2, max_memory_mb=None, max_runs_per_worker=20, settings=None, factory=None,
+                 check_interval=CHECK_INTERVAL):
+        self.size = max(1, size)
+        self.max_memory_mb = max_memory_mb
+        self.max_runs_per_worker = max_runs_per_worker
+        self.settings = settings or {}
+        self.factory = factory or create_agent_run
+        self.check_interval = check_interval
+        # spawn: дочірній процес не успадковує потоки та стан Qt головного процесу
+        self._context = multiprocessing.get_context("spawn")
+        self._queue = queue.Queue()
+        self._threads = []
+        self._stopping = threading.Event()
+        self._active = set()
+        self._active_lock = threading.Lock()
+        # Скільки разів виконавців перезапущено: причина -> кількість
+        self.recycled = {}
+
+    def start(self):
+        """Запустити виконавців заздалегідь, щоб перший запуск не чекав на старт процесу"""
+        for number in range(self.size):
+            thread = threading.Thread(target=self._serve, args=(number,), name=f"webmorpher-worker-slot-{number}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def create_run(self, params, on_log=None, on_error=None):
+        """Запуск, який стає в чергу пулу під час execute()"""
+        return ProcessRun(self, params, on_log, on_error)
+
+    def submit(self, run):
+        if self._stopping.is_set():
+            run._finish({"started": False, "success": False, "final_result": None,
+                         "errors": ["Пул процесів зупинено"], "steps": 0})
+            return
+        self._queue.put(run)
+
+    def shutdown(self):
+        """Зупинити виконувані запуски та завершити процеси"""
+        self._stopping.set()
+        with self._active_lock:
+            active = list(self._active)
+        for run in active:
+            run.stop()
+        # Запуски, що ще стоять у черзі, не виконуються
+        while True:
+            try:
+                run = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if run is not None:
+                run._finish({"started": False, "success": False, "final_result": None,
+                             "errors": ["Пул процесів зупинено"], "steps": 0})
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _start_worker(self, number):
+        try:
+            return _Worker(self._context, number, self.settings, self.factory)
+        except Exception as e:
+            print(f"Не вдалося запустити процес виконавця: {e}")
+            return None
+
+    def _recycle(self, worker, reason):
+        self.recycled[reason] = self.recycled.get(reason, 0) + 1
+        worker.close()
+
+    def _serve(self, number):
+        worker = self._start_worker(number)
+        try:
+            while True:
+                run = self._queue.get()
+                if run is None or self._stopping.is_set():
+                    if run is not None:
+                        run._finish({"started": False, "success": False, "final_result": None,
+                                     "errors": ["Пул процесів зупинено"], "steps": 0})
+                    break
+                if run._is_stopped:
+                    # Зупинено ще в черзі
+                    run._finish({"started": False, "success": False, "final_result": None, "errors": [], "steps": 0})
+                    continue
+                if worker is not None and not worker.process.is_alive():
+                    self._recycle(worker, "crash")
+                    worker = None
+                if worker is None:
+                    worker = self._start_worker(number)
+                if worker is None:
+                    message = "Не вдалося запустити процес виконавця"
+                    run.on_error(message)
+                    run._finish({"started": False, "success": False, "final_result": None, "errors": [message],
+                                 "steps": 0})
+                    continue
+                with self._active_lock:
+                    self._active.add(run)
+                try:
+                    self._execute(worker, run)
+                finally:
+                    with self._active_lock:
+                        self._active.discard(run)
+                if not worker.process.is_alive():
+                    self._recycle(worker, "crash")
+                    worker = None
+                elif worker.over_memory:
+                    self._recycle(worker, "memory")
+                    worker = None
+                elif self.max_runs_per_worker and worker.runs >= self.max_runs_per_worker:
+                    self._recycle(worker, "runs")
+                    worker = None
+        finally:
+            if worker is not None:
+                worker.close()
+
+    def _execute(self, worker, run):
+        """Передати запуск виконавцю та пересилати його події до завершення"""
+        worker.runs += 1
+        run._dispatch(worker)
+        while True:
+            try:
+                ready = worker.conn.poll(self.check_interval)
+                message = worker.conn.recv() if ready else None
+            except (EOFError, OSError):
+                message = None
+                ready = True
+            if message is not None:
+                kind, run_id = message[0], message[1]
+                if run_id != run.id:
+                    # Запізніле повідомлення попереднього запуску
+                    continue
+                if kind == "log":
+                    run.on_log(message[2])
+                elif kind == "error":
+                    run.on_error(message[2])
+                elif kind == "done":
+                    run._finish(message[2])
+                    return
+                continue
+
+            if ready or not worker.process.is_alive():
+                # З'єднання закрито: процес завершився, не надіславши підсумку
+                worker.process.join(STOP_TIMEOUT)
+                self._crashed(worker, run, f"{CRASH_MESSAGE} (код {worker.process.exitcode})")
+                return
+
+            if self.max_memory_mb and not worker.over_memory:
+                memory = worker.memory_mb()
+                if memory is not None and memory > self.max_memory_mb:
+                    worker.over_memory = True
+                    run.on_log(f"⚠️ Виконавець використовує {memory:.0f} МБ (ліміт {self.max_memory_mb} МБ), "
+                               f"запуск зупиняється")
+                    run.stop()
+
+            # Зупинений запуск, що не завершився вчасно, завершується разом із процесом
+            stop_requested_at = run._stop_requested_at
+            if stop_requested_at is not None and time.monotonic() - stop_requested_at > STOP_TIMEOUT * 2:
+                worker.process.kill()
+                worker.process.join()
+                self._crashed(worker, run, "Виконавець не зупинився вчасно, процес завершено примусово")
+                return
+
+    def _crashed(self, worker, run, message):
+        run.on_error(message)
+        run._finish({"started": True, "success": False, "final_result": None, "errors": [message], "steps": 0})
@@ -0,0 +1,265 @@
+"""Знімки профілю Chrome та дешеві копії профілю для кожного запуску.
+
+Chrome блокує каталог профілю, тому з реальним профілем користувача
+одночасно може працювати лише один браузер, а великий профіль повільно
+відкривається. ProfileSnapshots один раз копіює лише потрібні частини
+профілю (cookies, збережені паролі, Local Storage, налаштування) у знімок,
+а кожен запуск отримує власну копію знімка:
+
+- незмінні файли (таблиці LevelDB *.ldb) — жорсткими посиланнями;
+- решта — копіюванням із записом при зміні (APFS clonefile, FICLONE на
+  btrfs/xfs), а якщо файлова система цього не вміє — звичайною копією.
+
+Перед кожною копією знімок оновлюється інкрементально: копіюються лише
+файли, розмір або час зміни яких відрізняється від попереднього знімка.
+Бази SQLite копіюються через backup API, щоб отримати цілісну копію навіть
+під час роботи Chrome. Файли знімка ніколи не змінюються на місці (новий
+файл замінює старий), тому оновлення не зачіпає вже створені копії.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+# Частини каталогу профілю, які потрібні для входу на сайти
+LOCAL_STATE = "Local State"
+PROFILE_ITEMS = (
+    "Cookies",
+    os.path.join("Network", "Cookies"),
+    "Login Data",
+    "Login Data For Account",
+    "Web Data",
+    "Preferences",
+    "Secure Preferences",
+    "Local Storage",
+)
+# Бази SQLite, що копіюються через backup API
+SQLITE_FILES = {"Cookies", "Login Data", "Login Data For Account", "Web Data"}
+# Службові файли SQLite та блокування, які не потрібні в копії
+_SKIPPED_SUFFIXES = ("-journal", "-wal", "-shm")
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.webmorpher_profiles")
+# Копії запусків, які старші за цей час, вважаються залишками аварійних запусків
+STALE_CLONE_SECONDS = 24 * 3600
+
+_FICLONE = 0x40049409
+
+
+def _reflink(source, target):
+    """Копія із записом при зміні; OSError, якщо файлова система не підтримує"""
+    if sys.platform == 'darwin':
+        import ctypes
+
+        libc = ctypes.CDLL("libc.dylib", use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(target), 0) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return
+    if sys.platform.startswith('linux'):
+        import fcntl
+
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                os.unlink(target)
+                raise
+        shutil.copystat(source, target)
+        return
+    raise OSError("Копіювання із записом при зміні не підтримується")
+
+
+class ProfileClone:
+    """Копія профілю для одного запуску; видаляється через release()"""
+
+    def __init__(self, path, snapshots):
+        self.path = path
+        self.snapshots = snapshots
+
+    def release(self):
+        self.snapshots.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class ProfileSnapshots:
+    """Кеш знімків профілів Chrome та копії для запусків.
+
+    source_dir у clone() — каталог даних Chrome (наприклад,
+    ~/Library/Application Support/Google/Chrome), profile — підкаталог
+    профілю в ньому. extra — додаткові шляхи профілю (наприклад,
+    "IndexedDB"), які треба копіювати разом з основними.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, profile="Default", extra=()):
+        self.path = os.path.expanduser(path)
+        self.profile = profile
+        self.items = PROFILE_ITEMS + tuple(extra)
+        self._lock = threading.Lock()
+        self._reflink_supported = True
+        # Статистика останнього оновлення знімка
+        self.last_refresh = {}
+        self.remove_stale_clones()
+
+    def snapshot_dir(self, source_dir):
+        digest = hashlib.sha1(os.path.abspath(source_dir).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.path, "snapshots", digest)
+
+    def clone(self, source_dir):
+        """Оновити знімок source_dir та створити з нього копію для запуску"""
+        with self._lock:
+            snapshot = self._refresh(source_dir)
+            target = os.path.join(self.path, "runs", uuid.uuid4().hex)
+            for relative in self._read_manifest(snapshot):
+                self._clone_file(os.path.join(snapshot, relative), os.path.join(target, relative))
+            os.makedirs(os.path.join(target, self.profile), exist_ok=True)
+        return ProfileClone(target, self)
+
+    def release(self, clone):
+        shutil.rmtree(clone.path, ignore_errors=True)
+
+    def refresh(self, source_dir):
+        """Оновити знімок; повертає його каталог"""
+        with self._lock:
+            return self._refresh(source_dir)
+
+    def remove_stale_clones(self, max_age=STALE_CLONE_SECONDS):
+        """Видалити копії, що залишилися після аварійно завершених запусків"""
+        runs = os.path.join(self.path, "runs")
+        if not os.path.isdir(runs):
+            return
+        deadline = time.time() - max_age
+        for name in os.listdir(runs):
+            path = os.path.join(runs, name)
+            try:
+                if os.path.getmtime(path) < deadline:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    # --- Знімок ---
+
+    def _source_files(self, source_dir):
+        """(відносний шлях, stat) файлів профілю, які входять у знімок"""
+        files = []
+        local_state = os.path.join(source_dir, LOCAL_STATE)
+        if os.path.isfile(local_state):
+            files.append((LOCAL_STATE, os.stat(local_state)))
+        for item in self.items:
+            relative = os.path.join(self.profile, item)
+            path = os.path.join(source_dir, relative)
+            if os.path.isfile(path):
+                files.append((relative, os.stat(path)))
+            elif os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    for name in names:
+                        if name.endswith(_SKIPPED_SUFFIXES):
+                            continue
+                        full = os.path.join(root, name)
+                        try:
+                            files.append((os.path.relpath(full, source_dir), os.stat(full)))
+                        except OSError:
+                            # Chrome видалив файл під час обходу
+                            pass
+        return files
+
+    def _read_manifest(self, snapshot):
+        try:
+            with open(os.path.join(snapshot, "manifest.json"), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _refresh(self, source_dir):
+        snapshot = self.snapshot_dir(source_dir)
+        manifest = self._read_manifest(snapshot)
+        copied = 0
+        current = {}
+        for relative, stat in self._source_files(source_dir):
+            signature = [stat.st_size, stat.st_mtime_ns]
+            target = os.path.join(snapshot, relative)
+            if manifest.get(relative) != signature or not os.path.exists(target):
+                try:
+                    self._copy_into_snapshot(os.path.join(source_dir, relative), target)
+                except OSError:
+                    # Файл зник або заблокований: лишаємо попередню версію, якщо вона є
+                    if relative in manifest and os.path.exists(target):
+                        current[relative] = manifest[relative]
+                    continue
+                copied += 1
+            current[relative] = signature
+
+        removed = 0
+        for relative in set(manifest) - set(current):
+            try:
+                os.unlink(os.path.join(snapshot, relative))
+                removed += 1
+            except OSError:
+                pass
+
+        os.makedirs(snapshot, exist_ok=True)
+        with open(os.path.join(snapshot, "manifest.json.tmp"), "w", encoding='utf-8') as f:
+            json.dump(current, f)
+        os.replace(os.path.join(snapshot, "manifest.json.tmp"), os.path.join(snapshot, "manifest.json"))
+        self.last_refresh = {'files': len(current), 'copied': copied, 'removed': removed}
+        return snapshot
+
+    def _copy_into_snapshot(self, source, target):
+        """Скопіювати файл у знімок через тимчасовий файл та атомарну заміну"""
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            if os.path.basename(source) in SQLITE_FILES:
+                self._backup_sqlite(source, temporary)
+            else:
+                shutil.copy2(source, temporary)
+            os.replace(temporary, target)
+        finally:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+
+    def _backup_sqlite(self, source, target):
+        try:
+            src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+            try:
+                dst = sqlite3.connect(target)
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+        except sqlite3.Error:
+            # Базу заблоковано (Windows) або вона пошкоджена: копіюємо як файл
+            if os.path.exists(target):
+                os.unlink(target)
+            shutil.copy2(source, target)
+
+    # --- Копія для запуску ---
+
+    def _clone_file(self, source, target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if source.endswith(".ldb"):
+            # Таблиці LevelDB після запису не змінюються, тож їх можна спільно використовувати
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        if self._reflink_supported:
+            try:
+                _reflink(source, target)
+                return
+            except OSError:
+                self._reflink_supported = False
+        shutil.copy2(source, target)
@@ -0,0 +1,63 @@
+"""Профілі виконання програм: обмеження кроків, часу та очікування сторінки.
+
+Профіль зберігається з програмою (ключ "profile") і містить лише значення,
+що відрізняються від DEFAULT_PROFILE:
+
+    {"vision": false, "max_steps": 15, "max_actions_per_step": 3,
+     "step_timeout": 60, "timeout": 300,
+     "min_page_load_wait": 0.1, "network_idle_wait": 0.2, "max_page_load_wait": 3,
+     "headless": true}
+
+Тайм-аути в секундах, None — без обмеження. headless None означає
+"як у загальному перемикачі". Модель програми задається окремим ключем
+"model" (див. webmorpher.llm).
+"""
+
+DEFAULT_PROFILE = {
+    # Знімки екрана для моделі
+    "vision": True,
+    "max_steps": 100,
+    "max_actions_per_step": 10,
+    # Тривалість одного кроку та всього запуску, с
+    "step_timeout": None,
+    "timeout": None,
+    # Очікування завантаження сторінки після дії, с (як у BrowserContextConfig)
+    "min_page_load_wait": 0.25,
+    "network_idle_wait": 0.5,
+    "max_page_load_wait": 5,
+    "headless": None,
+}
+
+# Параметри BrowserContextConfig для очікування сторінки
+_PAGE_LOAD_PARAMS = {
+    "min_page_load_wait": "minimum_wait_page_load_time",
+    "network_idle_wait": "wait_for_network_idle_page_load_time",
+    "max_page_load_wait": "maximum_wait_page_load_time",
+}
+
+
+def resolve_profile(*sources):
+    """Профіль з типових значень та джерел за зростанням пріоритету; None у джерелі пропускається"""
+    profile = dict(DEFAULT_PROFILE)
+    for source in sources:
+        profile.update({key: value for key, value in (source or {}).items()
+                        if key in DEFAULT_PROFILE and value is not None})
+    if profile["max_page_load_wait"] < profile["min_page_load_wait"]:
+        profile["max_page_load_wait"] = profile["min_page_load_wait"]
+    return profile
+
+
+def program_profile(program, overrides=None):
+    """Профіль програми; overrides (наприклад, з командного рядка) мають пріоритет"""
+    return resolve_profile(program.get("profile"), overrides)
+
+
+def compact_profile(profile):
+    """Лише значення, що відрізняються від типових (для збереження з програмою)"""
+    return {key: value for key, value in profile.items()
+            if key in DEFAULT_PROFILE and value != DEFAULT_PROFILE[key]}
+
+
+def page_load_params(profile):
+    """Параметри BrowserContextConfig для очікування завантаження сторінки"""
+    return {param: profile[key] for key, param in _PAGE_LOAD_PARAMS.items()}
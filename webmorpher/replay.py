@@ -0,0 +1,218 @@
+"""Запис дій агента та їх відтворення без звернення до моделі.
+
+Після успішного запуску кроки агента (дії, елементи, на які вони
+спрямовані, та URL сторінки) зберігаються як компактний запис. Наступні
+запуски тієї ж програми виконують ці дії безпосередньо в браузері; щойно
+сторінка перестає відповідати запису, керування передається моделі.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_TRACE_DIR = os.path.expanduser("~/.webmorpher_traces")
+TRACE_VERSION = 1
+
+# Дії, що беруть дані зі сторінки: їх і підсумкову відповідь після них
+# виконує модель, інакше відтворений запуск повернув би застарілі дані.
+# done з текстом теж зупиняє відтворення: відповідь пише модель з поточної сторінки
+_PAGE_DATA_ACTIONS = ("extract_content",)
+
+# Поля DOMHistoryElement, за якими browser-use знаходить елемент на сторінці
+_ELEMENT_FIELDS = ('tag_name', 'xpath', 'highlight_index', 'entire_parent_branch_path',
+                   'attributes', 'shadow_root', 'css_selector')
+
+
+class ReplayDiverged(Exception):
+    """Сторінка не відповідає запису"""
+
+    def __init__(self, step, reason):
+        super().__init__(f"крок {step + 1}: {reason}")
+        self.step = step
+        self.reason = reason
+
+
+def task_hash(task):
+    """Запис прив'язаний до тексту програми: змінений код потребує нового запису"""
+    return hashlib.sha256(task.encode('utf-8')).hexdigest()[:16]
+
+
+def page_fingerprint(url):
+    """Відбиток сторінки: хост і шлях без параметрів запиту та якоря"""
+    parts = urlsplit(url or '')
+    return f"{parts.netloc}{parts.path.rstrip('/')}"
+
+
+def trace_step(item, keep=None):
+    """Крок запису з кроку історії (AgentHistory) або None, якщо дій немає.
+
+    keep(action, result) відбирає дії, які потрібно відтворювати.
+    """
+    model_output = item.model_output
+    if not model_output or not model_output.action or model_output.action == [None]:
+        return None
+    interacted = list(item.state.interacted_element or [])
+    actions = []
+    elements = []
+    for position, action in enumerate(model_output.action):
+        action_data = action.model_dump(exclude_none=True)
+        if keep is not None:
+            result = item.result[position] if position < len(item.result) else None
+            if not keep(action_data, result):
+                continue
+        element = interacted[position] if position < len(interacted) else None
+        actions.append(action_data)
+        elements.append({field: element.to_dict()[field] for field in _ELEMENT_FIELDS} if element else None)
+    if not actions:
+        return None
+    return {
+        'url': item.state.url,
+        'fingerprint': page_fingerprint(item.state.url),
+        'actions': actions,
+        'elements': elements,
+    }
+
+
+def record_trace(task, history, prefix=None, keep=None):
+    """Запис з історії успішного запуску (AgentHistoryList).
+
+    prefix — кроки попереднього запису, які вже були відтворені до того,
+    як сторінка змінилася.
+    """
+    steps = list(prefix or [])
+    for item in history.history:
+        step = trace_step(item, keep)
+        if step is not None:
+            steps.append(step)
+    return {
+        'version': TRACE_VERSION,
+        'task': task_hash(task),
+        'recorded_at': time.time(),
+        'steps': steps,
+    }
+
+
+class TraceStore:
+    """Записи програм у вигляді JSON файлів, по одному на текст програми"""
+
+    def __init__(self, directory=DEFAULT_TRACE_DIR):
+        self.directory = directory
+
+    def path_for(self, task):
+        return os.path.join(self.directory, f"{task_hash(task)}.json")
+
+    def load(self, task):
+        """Запис для програми або None"""
+        try:
+            with open(self.path_for(task)) as f:
+                trace = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if trace.get('version') != TRACE_VERSION or not trace.get('steps'):
+            return None
+        return trace
+
+    def save(self, task, trace):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(task)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(trace, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+    def delete(self, task):
+        try:
+            os.remove(self.path_for(task))
+        except FileNotFoundError:
+            pass
+
+
+class TraceReplayer:
+    """Відтворення запису через агента browser-use без виклику моделі.
+
+    Кожна дія перед виконанням прив'язується до елемента поточної сторінки
+    (індекси елементів змінюються між завантаженнями). Якщо сторінка має
+    інший відбиток, елемент не знайдено або дія завершилася помилкою,
+    піднімається ReplayDiverged. Відтворення зупиняється перед кроком, що
+    витягує дані сторінки: цей крок і підсумкову відповідь (done) з даними
+    поточної сторінки виконує модель.
+    """
+
+    def __init__(self, agent, trace, before_step=None, on_log=None, delay=0.5):
+        self.agent = agent
+        self.trace = trace
+        self.before_step = before_step
+        self.on_log = on_log or (lambda message: None)
+        self.delay = delay
+        # Кількість повністю відтворених кроків
+        self.completed = 0
+
+    async def replay(self):
+        """Виконати кроки запису до першого витягу даних та повернути AgentHistoryList"""
+        from browser_use.agent.views import AgentHistory, AgentHistoryList
+        from browser_use.browser.views import BrowserStateHistory
+
+        history = []
+        steps = self.trace['steps']
+        for index, step in enumerate(steps):
+            if self._reads_page_data(step):
+                self.on_log(f"⏹️ Крок {index + 1}/{len(steps)} бере дані зі сторінки: його виконає модель")
+                break
+            if self.before_step is not None:
+                await self.before_step()
+
+            state = await self.agent.browser_context.get_state()
+            if page_fingerprint(state.url) != step['fingerprint']:
+                raise ReplayDiverged(index, f"очікувалась сторінка {step['url']}, відкрито {state.url}")
+
+            self.on_log(f"⏩ Крок {index + 1}/{len(steps)}: {', '.join(self._action_names(step))}")
+            results = []
+            for action_data, element in zip(step['actions'], self._elements(step)):
+                action = await self._bind_action(index, action_data, element)
+                result = (await self.agent.multi_act([action], check_for_new_elements=False))[-1]
+                if result.error:
+                    raise ReplayDiverged(index, result.error)
+                results.append(result)
+                await asyncio.sleep(self.delay)
+
+            history.append(AgentHistory(
+                model_output=None,
+                result=results,
+                state=BrowserStateHistory(url=state.url, title=state.title, tabs=state.tabs, interacted_element=[])
+            ))
+            self.completed = index + 1
+
+        return AgentHistoryList(history=history)
+
+    async def _bind_action(self, index, action_data, element):
+        """Дія з індексом елемента на поточній сторінці"""
+        from browser_use.dom.history_tree_processor.service import DOMHistoryElement, HistoryTreeProcessor
+
+        action = self.agent.ActionModel(**action_data)
+        if not action.model_dump(exclude_none=True):
+            raise ReplayDiverged(index, f"невідома дія {', '.join(action_data)}")
+        if element is None or action.get_index() is None:
+            return action
+
+        state = await self.agent.browser_context.get_state()
+        current = HistoryTreeProcessor.find_history_element_in_tree(DOMHistoryElement(**element), state.element_tree)
+        if current is None or current.highlight_index is None:
+            raise ReplayDiverged(index, f"елемент <{element['tag_name']}> не знайдено на сторінці")
+        action.set_index(current.highlight_index)
+        return action
+
+    def _elements(self, step):
+        elements = list(step.get('elements') or [])
+        return elements + [None] * (len(step['actions']) - len(elements))
+
+    def _reads_page_data(self, step):
+        for action in step['actions']:
+            if any(name in _PAGE_DATA_ACTIONS for name in action):
+                return True
+            if (action.get('done') or {}).get('text', "").strip():
+                return True
+        return False
+
+    def _action_names(self, step):
+        return [name for action in step['actions'] for name in action]
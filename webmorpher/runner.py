@@ -0,0 +1,621 @@
+"""Запуск агента browser-use без залежності від графічного інтерфейсу"""
+import asyncio
+import os
+import time
+import uuid
+
+from webmorpher import metrics
+from webmorpher.chrome import find_chrome_binary
+from webmorpher.llm import REASON_LABELS, build_router, requires_api_key
+from webmorpher.profiles import page_load_params, resolve_profile
+
+# Скільки секунд чекати завершення агента після зупинки
+STOP_TIMEOUT = 5
+STOPPED_MESSAGE = "Виконання зупинено користувачем"
+
+
+def preload_agent_stack():
+    """Імпорт browser-use та langchain заздалегідь (наприклад, у фоновому потоці)"""
+    import browser_use  # noqa: F401
+    import langchain_openai  # noqa: F401
+
+
+class AgentRun:
+    """Один запуск агента browser-use.
+
+    Повідомлення про хід виконання передаються через on_log, помилки агента
+    через on_error, тому клас використовується і потоком GUI, і командним
+    рядком.
+    """
+
+    def __init__(self, api_key, task, headless=False, debug_port=None, user_profile_dir=None,
+                 browser_pool=None, llm_cache=None, trace_store=None, cdp_pool=None, run_history=None, name=None,
+                 llm_settings=None, llm_factory=None, profile_snapshots=None, lite_mode=None, state_diff=None,
+                 profile=None, checkpoints=None, checkpoint_id=None, resume_checkpoint=False, on_log=None,
+                 on_error=None):
+        self.api_key = api_key
+        self.task = task
+        self.name = name or "Без назви"
+        # Профіль виконання програми (див. webmorpher.profiles)
+        self.profile = resolve_profile(profile)
+        self.headless = headless if self.profile['headless'] is None else self.profile['headless']
+        self._timed_out = False
+        self.debug_port = debug_port
+        self.user_profile_dir = user_profile_dir
+        # Знімки профілю (ProfileSnapshots): запуск отримує власну копію
+        # профілю замість реального, який Chrome заблокував би
+        self.profile_snapshots = profile_snapshots
+        self.profile_clone = None
+        # Полегшений режим: налаштування блокування ресурсів (секція "lite_mode") або None
+        self.lite_mode = lite_mode
+        self.resource_blocker = None
+        # Стиснення стану сторінки: пороги (секція "state_diff") або None
+        self.state_diff = state_diff
+        self.state_compressor = None
+        self.browser_pool = browser_pool
+        # Спільне сховище відповідей моделі (ResponseStore) або None
+        self.llm_cache = llm_cache
+        # Записи дій для відтворення без моделі (TraceStore) або None
+        self.trace_store = trace_store
+        # Контрольні точки після кожного кроку (CheckpointStore) або None;
+        # resume_checkpoint — продовжити перерваний запуск з останньої точки;
+        # checkpoint_id — точка цього запуску (при продовженні — перерваного,
+        # без нього береться найновіша точка програми)
+        self.checkpoints = checkpoints
+        self.checkpoint_id = checkpoint_id
+        self.resume_checkpoint = resume_checkpoint
+        # Пул віддалених браузерів (CDPEndpointPool) або None
+        self.cdp_pool = cdp_pool
+        self.cdp_url = None
+        # Історія запусків (RunHistory) або None; record — запис поточного запуску
+        self.run_history = run_history
+        self.record = None
+        self.error = None
+        # Постачальник і моделі (секція "llm" конфігурації, див. webmorpher.llm)
+        self.llm_settings = llm_settings or {}
+        # Фабрика моделі llm_factory(model, cache, callbacks); типово ChatOpenAI
+        self.llm_factory = llm_factory
+        self.router = None
+        self._step_started = None
+        self.on_log = on_log or (lambda message: None)
+        self.on_error = on_error or (lambda message: None)
+        self._is_paused = False
+        self._is_stopped = False
+        self.agent = None
+        # Цикл asyncio, у якому виконується агент, та його події паузи й зупинки
+        self._loop = None
+        self._resume_event = None
+        self._stop_event = None
+
+    def browser_config_params(self):
+        """Параметри BrowserConfig для поточного запуску"""
+        if self.debug_port:
+            # Для режиму дебагу використовуємо cdp_url
+            return {'cdp_url': f"http://localhost:{self.debug_port}"}
+        if self.cdp_url:
+            # Браузер, обраний з пулу CDP endpoints
+            return {'cdp_url': self.cdp_url}
+
+        # Параметры конфигурации браузера
+        browser_config_params = {'headless': self.headless}
+
+        # Без встановленого Chrome використовуємо Chromium, який ставить Playwright
+        chrome_path = find_chrome_binary()
+        if chrome_path:
+            browser_config_params['browser_binary_path'] = chrome_path
+
+        # Если задан каталог профиля пользователя, используем его. BrowserConfig
+        # не має окремого параметра профілю: browser-use бере його з аргументів Chrome
+        user_data_dir = self.profile_clone.path if self.profile_clone is not None else self.user_profile_dir
+        if user_data_dir:
+            browser_config_params['extra_browser_args'] = [
+                *browser_config_params.get('extra_browser_args', []),
+                f"--user-data-dir={user_data_dir}",
+            ]
+
+        return browser_config_params
+
+    @property
+    def started(self):
+        """Чи встиг запуск створити агента (зупинений у черзі запуск звітувати не повинен)"""
+        return self.agent is not None
+
+    def execute(self):
+        """Виконати завдання та повернути історію агента (блокуючий виклик)"""
+        cache = None
+        if self.llm_cache is not None:
+            from webmorpher.llm_cache import LLMResponseCache
+            cache = LLMResponseCache(self.llm_cache)
+
+        if self.llm_factory is None and requires_api_key(self.llm_settings):
+            os.environ["OPENAI_API_KEY"] = self.api_key
+        # Основна модель та, якщо задана, швидка модель для простих кроків
+        self.router = build_router(self.llm_settings, self.api_key, cache, self.llm_factory)
+        llm = self.router.primary
+
+        if self._is_stopped:
+            return None
+
+        metrics.RUNS_STARTED.inc()
+        started = time.monotonic()
+
+        if self.run_history is not None:
+            from webmorpher.history import RunRecord
+            self.record = RunRecord(self.name, self.task)
+
+        endpoint = None
+        history = None
+        error = None
+        try:
+            if self.cdp_pool is not None and not self.debug_port:
+                endpoint = self.cdp_pool.acquire()
+                self.cdp_url = endpoint.url
+                self.on_log(f"🖥️ Підключення до браузера {endpoint.url}")
+
+            if self.user_profile_dir and self.profile_snapshots is not None and not self.cdp_url \
+                    and not self.debug_port:
+                self._clone_profile()
+
+            # Параметри браузера для цього запуску
+            browser_config_params = self.browser_config_params()
+
+            self.on_log("Запуск браузера та ініціалізація агента...")
+            # Копія профілю живе лише один запуск, тому теплий браузер з пулу не підходить
+            if self.browser_pool is not None and self.profile_clone is None:
+                history = self._run_in_pool(llm, browser_config_params)
+            else:
+                history = self._run_standalone(llm, browser_config_params)
+            return history
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            outcome = self._outcome(history)
+            metrics.RUNS_FINISHED.inc(outcome=outcome)
+            metrics.RUN_DURATION.observe(time.monotonic() - started, outcome=outcome)
+            if self.record is not None:
+                self._save_record(history, error)
+            if endpoint is not None:
+                # Невдалий запуск може означати, що браузер недоступний
+                self.cdp_pool.release(endpoint, failed=history is None and not self._is_stopped)
+            if cache is not None:
+                self._finish_cache(cache, history)
+            if self.checkpoints is not None and self.checkpoint_id is not None:
+                self.checkpoints.release(self.checkpoint_id)
+                if history is not None and history.is_done():
+                    # Завершеному запуску продовжувати нічого
+                    self.checkpoints.delete(self.task, self.checkpoint_id)
+            if self.profile_clone is not None:
+                self.profile_clone.release()
+                self.profile_clone = None
+
+    def _clone_profile(self):
+        """Копія профілю користувача з інкрементально оновленого знімка"""
+        started = time.monotonic()
+        self.profile_clone = self.profile_snapshots.clone(self.user_profile_dir)
+        elapsed = time.monotonic() - started
+        metrics.PROFILE_CLONE.observe(elapsed)
+        refreshed = self.profile_snapshots.last_refresh
+        self.on_log(f"📁 Копія профілю за {elapsed:.1f} с (оновлено файлів знімка: "
+                    f"{refreshed.get('copied', 0)} з {refreshed.get('files', 0)})")
+
+    def _finish_cache(self, cache, history):
+        """Звіт про кеш моделі; відповіді невдалого запуску не зберігаються"""
+        successful = history is not None and history.is_done() and history.is_successful() is not False
+        if not successful:
+            cache.discard_written()
+        self.on_log(f"💾 Кеш моделі: {cache.hits} з кешу, {cache.misses} запитів до моделі")
+
+    def _outcome(self, history):
+        """Результат запуску: success, failed, stopped або error"""
+        if self._is_stopped:
+            return "stopped"
+        if history is None:
+            return "error"
+        if history.is_done() and history.is_successful() is not False:
+            return "success"
+        return "failed"
+
+    def _save_record(self, history, error):
+        """Записати запуск в історію з кроками та їх тривалістю"""
+        outcome = self._outcome(history)
+
+        # Історія агента містить і кроки запуску, що завершився помилкою
+        agent_history = getattr(getattr(self.agent, 'state', None), 'history', None)
+        items = agent_history.history if agent_history is not None and agent_history.history else []
+        if not items and history is not None:
+            items = history.history
+        self.record.finish(
+            outcome,
+            items,
+            result=history.final_result() if history is not None else None,
+            error=error or self.error
+        )
+        try:
+            self.run_history.save(self.record)
+        except Exception as e:
+            self.on_log(f"Не вдалося зберегти історію запуску: {e}")
+
+    def _create_agent(self, llm, browser, browser_context=None):
+        from browser_use import Agent
+
+        # Створення агента з callback для логування
+        self.agent = Agent(
+            task=self.task,
+            llm=llm,
+            browser=browser,
+            browser_context=browser_context,
+            page_extraction_llm=self.router.extraction_llm if self.router is not None else None,
+            # Без зображень знімки екрана мало що дають моделі
+            use_vision=self.profile['vision'] and self.lite_mode is None,
+            max_actions_per_step=self.profile['max_actions_per_step'],
+            register_new_step_callback=self._on_new_step
+        )
+        if self.profile['step_timeout']:
+            self._limit_step_time(self.agent, self.profile['step_timeout'])
+        if self.state_diff is not None:
+            from webmorpher.state_diff import StateCompressor
+
+            self.state_compressor = StateCompressor(**self.state_diff)
+            self.state_compressor.attach(self.agent)
+        return self.agent
+
+    def _run_standalone(self, llm, browser_config_params):
+        """Запуск агента з власним браузером, який закривається після виконання"""
+        from browser_use import Browser, BrowserConfig, BrowserContextConfig
+
+        browser = Browser(config=BrowserConfig(
+            new_context_config=BrowserContextConfig(**page_load_params(self.profile)),
+            **browser_config_params
+        ))
+        self._create_agent(llm, browser)
+        source = "cdp" if browser_config_params.get('cdp_url') else "standalone"
+
+        # Запускаємо агента в асинхронному режимі
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            # Браузер запускається до першого кроку, щоб виміряти час запуску
+            launch_started = time.monotonic()
+            loop.run_until_complete(browser.get_playwright_browser())
+            metrics.BROWSER_LAUNCH.observe(time.monotonic() - launch_started, source=source)
+            metrics.ACTIVE_BROWSERS.inc(source=source)
+            try:
+                return loop.run_until_complete(self._run_with_pause_check())
+            finally:
+                metrics.ACTIVE_BROWSERS.dec(source=source)
+        finally:
+            loop.run_until_complete(self._close_browser(browser))
+            loop.close()
+
+    async def _close_browser(self, browser):
+        try:
+            await asyncio.wait_for(browser.close(), STOP_TIMEOUT)
+        except Exception as e:
+            self.on_log(f"Не вдалося закрити браузер: {e}")
+
+    def _run_in_pool(self, llm, browser_config_params):
+        """Запуск агента на теплому браузері з пулу"""
+        from browser_use import BrowserContextConfig
+        from browser_use.browser.context import BrowserContext
+
+        pool = self.browser_pool
+        pooled = pool.run(pool.acquire(browser_config_params))
+        browser_context = None
+        try:
+            # Кожен запуск отримує новий контекст, щоб cookies та вкладки не
+            # переходили між програмами. Профіль користувача та дебаг-браузер
+            # навпаки використовують свій стандартний контекст.
+            force_new_context = not (self.user_profile_dir or self.debug_port)
+            browser_context = BrowserContext(
+                browser=pooled.browser,
+                config=BrowserContextConfig(force_new_context=force_new_context, **page_load_params(self.profile))
+            )
+            self._create_agent(llm, pooled.browser, browser_context)
+
+            # Агент виконується в циклі пулу, де живе браузер
+            return pool.run(self._run_with_pause_check())
+        finally:
+            if browser_context is not None:
+                pool.run(browser_context.close())
+            pool.run(pool.release(pooled))
+
+    async def _run_with_pause_check(self):
+        """Запуск агента з можливістю паузи та негайної зупинки.
+
+        Агент виконується окремою задачею; зупинка скасовує її одразу, разом
+        із запитом до моделі чи дією в браузері, що виконуються в цей момент.
+        Так само запуск переривається після тайм-ауту профілю.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._resume_event = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        self._sync_events()
+
+        task = asyncio.ensure_future(self._run_agent())
+        stop_waiter = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task, stop_waiter}, timeout=self.profile['timeout'],
+                                             return_when=asyncio.FIRST_COMPLETED)
+                # Призупинений запуск за тайм-аутом не переривається
+                if done or not self._is_paused:
+                    break
+            self._timed_out = not done
+        finally:
+            stop_waiter.cancel()
+            if not task.done():
+                await self._cancel_agent_task(task)
+
+        if self._timed_out:
+            self._report_error(f"Помилка під час виконання: перевищено час виконання ({self.profile['timeout']} с)")
+            return None
+        if self._is_stopped or not task.done() or task.cancelled():
+            self._report_error(f"Помилка під час виконання: {STOPPED_MESSAGE}")
+            return None
+        try:
+            return task.result()
+        except Exception as e:
+            self._report_error(f"Помилка під час виконання: {str(e)}")
+            return None
+
+    def _report_error(self, message):
+        self.error = message
+        self.on_error(message)
+
+    async def _run_agent(self):
+        if self.lite_mode is not None:
+            await self._block_heavy_resources()
+        try:
+            return await self._run_agent_steps()
+        finally:
+            if self.resource_blocker is not None:
+                await self.resource_blocker.uninstall()
+                self.on_log(self.resource_blocker.summary())
+            if self.state_compressor is not None and self.state_compressor.summary():
+                self.on_log(self.state_compressor.summary())
+
+    async def _block_heavy_resources(self):
+        """Увімкнути блокування ресурсів до першого переходу на сторінку"""
+        from webmorpher.lite_mode import ResourceBlocker
+
+        self.resource_blocker = ResourceBlocker(**self.lite_mode)
+        session = await self.agent.browser_context.get_session()
+        await self.resource_blocker.install(session.context)
+
+    async def _run_agent_steps(self):
+        replayed = []
+        resumed = 0
+        if self.checkpoints is not None:
+            if self.resume_checkpoint:
+                resumed = await self._resume_from_checkpoint()
+            if self.checkpoint_id is None:
+                self.checkpoint_id = uuid.uuid4().hex
+            self.checkpoints.claim(self.checkpoint_id)
+        if self.trace_store is not None and not resumed:
+            history, replayed = await self._replay_trace()
+            if history is not None:
+                return history
+
+        # Запускаємо агента; продовжений запуск має лише решту кроків профілю
+        result = await self.agent.run(max_steps=max(1, self.profile['max_steps'] - resumed),
+                                      on_step_start=self._on_step_start, on_step_end=self._on_step_end)
+        if self.trace_store is not None and not self._is_stopped:
+            self._record_trace(result, replayed)
+        return result
+
+    def _limit_step_time(self, agent, timeout):
+        """Перервати крок агента, що триває довше timeout секунд, і зарахувати його як невдалий"""
+        from browser_use.agent.views import ActionResult
+
+        step = agent.step
+
+        async def step_with_timeout(step_info=None):
+            task = asyncio.ensure_future(step(step_info))
+            try:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=timeout)
+                    if done:
+                        return task.result()
+                    if not self._is_paused:
+                        break
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            await self._cancel_agent_task(task)
+            if task.done() and not task.cancelled():
+                # Скасований крок завершується InterruptedError, він вже не потрібен
+                task.exception()
+            self.on_log(f"⏱️ Крок перервано: довше {timeout} с")
+            agent.state.consecutive_failures += 1
+            agent.state.last_result = [ActionResult(error=f"Step timed out after {timeout} seconds",
+                                                    include_in_memory=True)]
+
+        agent.step = step_with_timeout
+
+    async def _cancel_agent_task(self, task):
+        """Скасувати задачу агента, чекаючи не довше STOP_TIMEOUT секунд"""
+        # browser-use перехоплює CancelledError під час запиту до моделі,
+        # тому скасування повторюється, доки задача не завершиться
+        deadline = self._loop.time() + STOP_TIMEOUT
+        while not task.done() and self._loop.time() < deadline:
+            task.cancel()
+            await asyncio.wait({task}, timeout=min(0.5, max(0, deadline - self._loop.time())))
+        if not task.done():
+            self.on_log(f"⚠️ Агент не завершився за {STOP_TIMEOUT} с, ресурси звільняються примусово")
+
+    async def _replay_trace(self):
+        """Відтворення запису програми; повертає (історія або None, відтворені кроки)"""
+        from webmorpher.replay import ReplayDiverged, TraceReplayer
+
+        trace = self.trace_store.load(self.task)
+        if trace is None:
+            self.on_log("📼 Запису дій ще немає: виконуємо з моделлю та запишемо успішний запуск")
+            return None, []
+
+        self.on_log(f"📼 Відтворення записаних дій ({len(trace['steps'])} кроків)...")
+        replayer = TraceReplayer(self.agent, trace, before_step=self._wait_if_paused, on_log=self.on_log)
+        try:
+            history = await replayer.replay()
+        except ReplayDiverged as e:
+            self.on_log(f"🔀 Сторінка не відповідає запису ({e}), передаємо керування моделі")
+            return None, trace['steps'][:replayer.completed]
+
+        if not history.is_done():
+            # Запис без завершального кроку або з витягом даних: модель завершує завдання сама
+            self.on_log("🔀 Запис відтворено, але завдання не завершене, передаємо керування моделі")
+            return None, trace['steps'][:replayer.completed]
+        return history, trace['steps']
+
+    async def _resume_from_checkpoint(self):
+        """Відновити стан агента з контрольної точки; повертає кількість виконаних кроків"""
+        from webmorpher.checkpoint import fast_forward_trace, restore
+        from webmorpher.replay import ReplayDiverged, TraceReplayer
+
+        checkpoint = self.checkpoints.load(self.task, self.checkpoint_id)
+        if checkpoint is None:
+            self.on_log("💾 Збереженого стану немає: виконуємо з початку")
+            self.checkpoint_id = None
+            return 0
+        # Продовжений запуск надалі оновлює точку перерваного
+        self.checkpoint_id = checkpoint['run_id']
+        self.checkpoints.claim(self.checkpoint_id)
+        try:
+            restore(self.agent, checkpoint)
+        except Exception as e:
+            self.on_log(f"Не вдалося відновити збережений стан ({e}), виконуємо з початку")
+            self.checkpoints.delete(self.task, self.checkpoint_id)
+            return 0
+
+        steps = len(self.agent.state.history.history)
+        trace = fast_forward_trace(self.task, self.agent.state.history)
+        self.on_log(f"💾 Продовження з кроку {steps + 1}: виконані кроки повторюються без моделі")
+        if trace['steps']:
+            replayer = TraceReplayer(self.agent, trace, before_step=self._wait_if_paused, on_log=self.on_log)
+            try:
+                await replayer.replay()
+            except ReplayDiverged as e:
+                self.on_log(f"🔀 Сторінка відрізняється від збереженої ({e}), модель продовжить з поточної сторінки")
+        return steps
+
+    def _record_trace(self, history, prefix):
+        """Зберегти запис успішного запуску"""
+        from webmorpher.replay import record_trace
+
+        if history is None or not history.is_done() or history.is_successful() is False:
+            return
+        try:
+            self.trace_store.save(self.task, record_trace(self.task, history, prefix))
+            self.on_log("📼 Дії записано: наступні запуски відтворять їх без моделі")
+        except Exception as e:
+            self.on_log(f"Не вдалося зберегти запис дій: {e}")
+
+    async def _on_step_start(self, agent):
+        self._step_started = time.monotonic()
+        if self.router is not None:
+            switched = self.router.route(agent)
+            if switched is not None and self.router.fast is not None:
+                self.on_log(f"🧭 Модель кроку: {switched[0]} ({REASON_LABELS[switched[1]]})")
+
+    async def _on_step_end(self, agent):
+        if self._step_started is not None:
+            metrics.STEP_DURATION.observe(time.monotonic() - self._step_started)
+            self._step_started = None
+        if self.checkpoints is not None:
+            await self._save_checkpoint(agent)
+
+    async def _save_checkpoint(self, agent):
+        """Зберегти стан після кроку: перерваний запуск продовжиться з цього місця"""
+        from webmorpher.checkpoint import capture
+
+        try:
+            if self.checkpoint_id is None:
+                self.checkpoint_id = uuid.uuid4().hex
+            checkpoint = capture(agent, self.task)
+            # Запис файлу не затримує цикл агента
+            await asyncio.to_thread(self.checkpoints.save, self.task, self.checkpoint_id, checkpoint)
+        except Exception as e:
+            self.on_log(f"Не вдалося зберегти стан запуску: {e}")
+
+    async def _on_new_step(self, state, output, step_index):
+        """Колбек для логування кроків агента"""
+        if self.record is not None:
+            self.record.on_step(step_index, getattr(state, 'url', None), output)
+
+        # Додаємо інформацію з AgentBrain
+        if hasattr(output, 'current_state'):
+            brain = output.current_state
+            if brain.next_goal:
+                self.on_log(f"🎯 Наступна ціль: {brain.next_goal}")
+            if brain.evaluation_previous_goal:
+                self.on_log(f"✓ Результат: {brain.evaluation_previous_goal}")
+
+        # Стандартні статуси
+        action_type = getattr(output, 'action_type', None)
+        content = getattr(output, 'content', None)
+
+        if action_type == "thinking":
+            self.on_log(f"🤔 Модель думає: {content}")
+        elif action_type == "browser_action":
+            self.on_log(f"🌐 Браузер: {content}")
+        elif action_type == "agent_action":
+            self.on_log(f"🤖 Агент: {content}")
+        elif action_type == "error":
+            self.on_log(f"❌ Помилка: {content}")
+        elif content:
+            self.on_log(f"{action_type}: {content}")
+
+        await self._wait_if_paused()
+
+    async def _wait_if_paused(self):
+        """Чекати під час паузи; зупинка перериває виконання"""
+        # Пауза чекає на подію, а не опитує прапорець
+        if self._resume_event is not None:
+            await self._resume_event.wait()
+
+        # Якщо зупинено, піднімаємо виключення для зупинки агента
+        if self._is_stopped:
+            raise Exception(STOPPED_MESSAGE)
+
+    def pause(self):
+        """Призупинення виконання"""
+        self._is_paused = True
+        self._notify_loop()
+        self.on_log("⏸️ Виконання призупинено...")
+
+    def resume(self):
+        """Відновлення виконання"""
+        self._is_paused = False
+        self._notify_loop()
+        self.on_log("▶️ Виконання відновлено...")
+
+    def stop(self):
+        """Зупинка виконання"""
+        self._is_stopped = True
+        self._is_paused = False
+        if self.agent is not None:
+            # Агент перевіряє цей прапорець між кроками та діями
+            self.agent.state.stopped = True
+        self._notify_loop()
+        self.on_log("⏹️ Виконання зупинено!")
+
+    def _notify_loop(self):
+        """Передати зміну прапорців у цикл агента (викликається з будь-якого потоку)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._sync_events)
+        except RuntimeError:
+            # Цикл вже закрито
+            pass
+
+    def _sync_events(self):
+        if self._resume_event is None:
+            return
+        if self._is_paused and not self._is_stopped:
+            self._resume_event.clear()
+        else:
+            self._resume_event.set()
+        if self._is_stopped:
+            self._stop_event.set()
@@ -0,0 +1,83 @@
+"""Інкрементальний повнотекстовий індекс програм для миттєвого пошуку.
+
+Індекс відображає слова назви та коду на id програм. Зміна програми
+переіндексовує лише її, тому пошук не перебирає тексти всіх програм.
+"""
+import re
+from bisect import bisect_left, insort
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Множина слів тексту в нижньому регістрі"""
+    return set(_WORD.findall((text or '').casefold()))
+
+
+class ProgramIndex:
+    """Інвертований індекс: слово -> id програм.
+
+    Слова запиту шукаються за префіксом ("бро" знаходить "браузер"),
+    програма відповідає запиту, якщо містить усі його слова.
+    """
+
+    def __init__(self, programs=()):
+        self._postings = {}
+        # Відсортовані слова для пошуку за префіксом
+        self._words = []
+        self._documents = {}
+        for program in programs:
+            self.add(program)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, program):
+        """Проіндексувати програму (або переіндексувати, якщо вона вже є)"""
+        key = program['id']
+        words = tokenize(program.get('name')) | tokenize(program.get('code'))
+        old_words = self._documents.get(key, set())
+        for word in old_words - words:
+            self._unlink(word, key)
+        for word in words - old_words:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                insort(self._words, word)
+            postings.add(key)
+        self._documents[key] = words
+
+    update = add
+
+    def remove(self, key):
+        for word in self._documents.pop(key, set()):
+            self._unlink(word, key)
+
+    def _unlink(self, word, key):
+        postings = self._postings[word]
+        postings.discard(key)
+        if not postings:
+            del self._postings[word]
+            del self._words[bisect_left(self._words, word)]
+
+    def search(self, query):
+        """id програм, що містять усі слова запиту; None для порожнього запиту"""
+        terms = tokenize(query)
+        if not terms:
+            return None
+        result = None
+        # Спочатку найдовші (найвибірковіші) слова
+        for term in sorted(terms, key=len, reverse=True):
+            matches = self._prefix_matches(term)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result
+
+    def _prefix_matches(self, term):
+        matches = set()
+        position = bisect_left(self._words, term)
+        while position < len(self._words) and self._words[position].startswith(term):
+            matches |= self._postings[self._words[position]]
+            position += 1
+        return matches
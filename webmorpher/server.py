@@ -0,0 +1,273 @@
+"""Локальний HTTP сервер завдань: інші сервіси додають програми в чергу WebMorpher.
+
+Ендпоінти (JSON):
+
+    GET    /health                 стан сервера, кількість завдань за станом та вузли виконавців
+    POST   /jobs                   {"program": "Назва", "values": {...}} або {"task": "...", "name": "..."},
+                                   необов'язково "options": {"headless", "lite", "llm_cache", "replay",
+                                   "state_diff", "resume", "model", "max_steps", "timeout"}
+    GET    /jobs?status=&limit=    список завдань
+    GET    /jobs/<id>              завдання з результатом
+    POST   /jobs/<id>/cancel       скасувати (також DELETE /jobs/<id>)
+    GET    /jobs/<id>/events       події завдання як Server-Sent Events: status, log, result
+
+Завдання виконують workers потоків зі спільними ресурсами (теплі браузери,
+кеш моделі), тож кілька клієнтів користуються одним запущеним екземпляром.
+З workers=0 сервер лише приймає завдання, а виконують їх вузли
+(webmorpher.worker) зі спільною чергою.
+Якщо задано token, запити мають містити заголовок Authorization: Bearer <token>.
+"""
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from webmorpher.batch import placeholders, render_task
+from webmorpher.jobs import FINISHED
+from webmorpher.worker import JobWorker
+
+# Параметри запуску, які клієнт може задати для завдання, та їх типи
+JOB_OPTIONS = {
+    "headless": bool,
+    "lite": bool,
+    "llm_cache": bool,
+    "replay": bool,
+    "state_diff": bool,
+    "resume": bool,
+    "model": str,
+    "max_steps": int,
+    "timeout": (int, float),
+}
+
+# Як часто потік подій надсилає коментар, щоб проксі не закривали з'єднання, с
+KEEPALIVE_INTERVAL = 15
+
+
+class JobRequestError(Exception):
+    """Некоректний запит клієнта (HTTP статус та повідомлення)"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class JobServer:
+    """HTTP API та потоки виконавців над чергою JobQueue.
+
+    run_job(program, options, on_log, on_agent_run) виконує програму та
+    повертає словник результату (як webmorpher.cli.run_program);
+    find_program(name) повертає збережену програму або None.
+    """
+
+    def __init__(self, queue, run_job, find_program, host="127.0.0.1", port=8765, workers=1, token=None,
+                 poll_interval=1.0, node=None):
+        self.queue = queue
+        self.find_program = find_program
+        self.workers = max(0, workers)
+        self.token = token
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._threads = []
+        self.worker = JobWorker(queue, run_job, node, self.workers, poll_interval) if self.workers else None
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        """Запустити виконавців та HTTP сервер у фонових потоках"""
+        if self.worker is not None:
+            self.worker.start()
+        http_thread = threading.Thread(target=self._server.serve_forever, name="webmorpher-jobs-http", daemon=True)
+        http_thread.start()
+        self._threads.append(http_thread)
+        return self
+
+    def shutdown(self):
+        """Зупинити сервер; виконувані завдання повертаються в чергу"""
+        self._stopping.set()
+        if self.worker is not None:
+            self.worker.shutdown()
+        with self.queue.changed:
+            self.queue.changed.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # Завдання
+
+    def submit(self, request):
+        """Додати завдання з тіла запиту POST /jobs"""
+        if not isinstance(request, dict):
+            raise JobRequestError(400, "Очікувався JSON об'єкт")
+        options = request.get('options') or {}
+        if not isinstance(options, dict) or set(options) - set(JOB_OPTIONS):
+            raise JobRequestError(400, f"Дозволені параметри: {', '.join(JOB_OPTIONS)}")
+        for name, value in options.items():
+            # bool — підклас int, тож true не стане кількістю кроків
+            if not isinstance(value, JOB_OPTIONS[name]) or (isinstance(value, bool) and JOB_OPTIONS[name] is not bool):
+                raise JobRequestError(400, f"Некоректне значення параметра {name}: {json.dumps(value)}")
+        for name in ('program', 'task', 'name'):
+            if request.get(name) is not None and not isinstance(request[name], str):
+                raise JobRequestError(400, f"{name} має бути рядком")
+        values = request.get('values') or {}
+        if not isinstance(values, dict):
+            raise JobRequestError(400, "values має бути JSON об'єктом")
+
+        if request.get('program'):
+            program = self.find_program(request['program'])
+            if program is None:
+                raise JobRequestError(404, f"Програму не знайдено: {request['program']}")
+            program = dict(program)
+        elif isinstance(request.get('task'), str) and request['task'].strip():
+            program = {'name': request.get('name') or "Завдання API", 'code': request['task']}
+        else:
+            raise JobRequestError(400, "Вкажіть program або task")
+
+        try:
+            program['code'] = render_task(program.get('code', ""), values)
+        except KeyError as e:
+            raise JobRequestError(400, f"Немає значення для {{{{{e.args[0]}}}}} "
+                                       f"(підстановки: {', '.join(placeholders(program.get('code')))})")
+        program.pop('id', None)
+        return self.queue.submit(program, options)
+
+    def cancel(self, job_id):
+        job = self.queue.get(job_id)
+        if job is None:
+            raise JobRequestError(404, "Завдання не знайдено")
+        if job['status'] in FINISHED:
+            raise JobRequestError(409, f"Завдання вже завершено ({job['status']})")
+        job = self.queue.cancel(job_id)
+        # Завдання інших вузлів зупиняються під час їхнього сигналу життя
+        if self.worker is not None:
+            self.worker.cancel(job_id)
+        return job
+
+    # HTTP
+
+    def _authorized(self, headers):
+        if not self.token:
+            return True
+        expected = f"Bearer {self.token}".encode('utf-8')
+        return hmac.compare_digest(headers.get('Authorization', "").encode('utf-8'), expected)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Відповідь уже надсилається як потік подій
+            streaming = False
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def _dispatch(self, method):
+                url = urlsplit(self.path)
+                parts = [part for part in url.path.split('/') if part]
+                query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                try:
+                    if parts != ["health"] and not server._authorized(self.headers):
+                        raise JobRequestError(401, "Потрібен заголовок Authorization: Bearer <token>")
+                    if method == "GET" and parts == ["health"]:
+                        self._send_json(200, {'status': "ok", 'jobs': server.queue.counts(),
+                                              'nodes': server.queue.nodes()})
+                    elif method == "POST" and parts == ["jobs"]:
+                        self._send_json(201, server.submit(self._read_json()))
+                    elif method == "GET" and parts == ["jobs"]:
+                        self._send_json(200, server.queue.jobs(query.get('status'), int(query.get('limit', 100))))
+                    elif method == "GET" and len(parts) == 2 and parts[0] == "jobs":
+                        self._send_json(200, self._job(parts[1]))
+                    elif (method == "POST" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel") or \
+                            (method == "DELETE" and len(parts) == 2 and parts[0] == "jobs"):
+                        self._send_json(200, server.cancel(parts[1]))
+                    elif method == "GET" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+                        self._stream_events(parts[1], int(self.headers.get('Last-Event-ID') or query.get('after', 0)))
+                    else:
+                        raise JobRequestError(404, "Невідомий ендпоінт")
+                except JobRequestError as e:
+                    self._send_json(e.status, {'error': str(e)})
+                except ValueError as e:
+                    self._send_json(400, {'error': str(e)})
+                except Exception as e:
+                    # Клієнт отримує JSON відповідь замість обірваного з'єднання;
+                    # у потік подій, що вже почався, відповідь не дописується
+                    if self.streaming:
+                        return
+                    self._send_json(500, {'error': f"Внутрішня помилка сервера: {e}"})
+
+            def _job(self, job_id):
+                job = server.queue.get(job_id)
+                if job is None:
+                    raise JobRequestError(404, "Завдання не знайдено")
+                return job
+
+            def _read_json(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    return json.loads(self.rfile.read(length) or b"null")
+                except ValueError:
+                    raise JobRequestError(400, "Тіло запиту не є JSON")
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_events(self, job_id, after):
+                """Події завдання до його завершення (Server-Sent Events)"""
+                self._job(job_id)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                self.streaming = True
+                idle = 0.0
+                try:
+                    while True:
+                        events = server.queue.events(job_id, after)
+                        for event in events:
+                            data = json.dumps(event['data'], ensure_ascii=False)
+                            self.wfile.write(f"id: {event['seq']}\nevent: {event['kind']}\ndata: {data}\n\n"
+                                             .encode('utf-8'))
+                            after = event['seq']
+                        if events:
+                            self.wfile.flush()
+                            idle = 0.0
+                        job = server.queue.get(job_id)
+                        if job is None or (job['status'] in FINISHED and not server.queue.events(job_id, after)):
+                            return
+                        if server._stopping.is_set():
+                            return
+                        server.queue.wait(server.poll_interval)
+                        idle += server.poll_interval
+                        if idle >= KEEPALIVE_INTERVAL:
+                            self.wfile.write(b": keep-alive\n\n")
+                            self.wfile.flush()
+                            idle = 0.0
+                except (BrokenPipeError, ConnectionResetError):
+                    # Клієнт закрив з'єднання
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
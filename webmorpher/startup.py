@@ -0,0 +1,38 @@
+"""Вимірювання часу запуску додатку (режим --profile-startup)"""
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Збирає тривалість фаз імпорту та ініціалізації.
+
+    Фази записуються завжди (це дешево), а звіт виводиться лише коли
+    профілювання увімкнено.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Виміряти тривалість фази"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def mark(self, name):
+        """Позначка: скільки часу минуло від початку запуску"""
+        self.phases.append((f"[{name}]", time.perf_counter() - self.started))
+
+    def report(self, stream=None):
+        """Вивести таблицю фаз"""
+        stream = stream or sys.stderr
+        print("Профіль запуску WebMorpher:", file=stream)
+        for name, duration in self.phases:
+            print(f"  {duration * 1000:9.1f} мс  {name}", file=stream)
+        print(f"  {(time.perf_counter() - self.started) * 1000:9.1f} мс  [загалом]", file=stream)
@@ -0,0 +1,251 @@
+"""Стиснення стану сторінки, який агент надсилає моделі на кожному кроці.
+
+browser-use на кожному кроці серіалізує всі інтерактивні елементи сторінки,
+навіть якщо остання дія змінила лише невелику її частину. StateCompressor
+порівнює поточний стан з останнім повним станом:
+
+- елементи, що змінилися або з'явилися, передаються повністю та позначаються
+  як нові (*[n]*), як це робить сам browser-use;
+- незмінені елементи з текстом передаються коротко, без атрибутів (індекс
+  лишається, тож модель може з ними працювати);
+- незмінений текст поза елементами передається скороченим.
+
+browser-use прибирає повідомлення зі станом з розмови після кожного кроку,
+тому повний стан, відносно якого стискаються наступні, лишається в розмові
+(attach): атрибути незмінених елементів модель бачить у ньому.
+
+Повний стан надсилається, якщо змінилася адреса сторінки, попередня дія
+завершилася помилкою, змінилася більша частина сторінки (max_changed_ratio),
+стиснення майже нічого не дає або минуло full_every кроків від останнього
+повного стану.
+
+Пороги задаються секцією "state_diff" конфігурації:
+
+    {"max_changed_ratio": 0.5, "full_every": 5, "min_saving": 0.2}
+"""
+import re
+from difflib import SequenceMatcher
+
+from webmorpher import metrics
+
+# Початок рядка інтерактивного елемента: відступ, [12] або *[12]*, тег
+_ELEMENT_START = re.compile(r'^(\t*)\*?\[(\d+)\]\*?<')
+# Тіло елемента: <тег атрибути>текст />
+_ELEMENT_BODY = re.compile(r"^<(?P<tag>[\w:-]+)(?P<attrs>(?:\s+[\w:-]+='.*?')*)\s*(?:>(?P<text>.*))?\s*/>$",
+                           re.DOTALL)
+COMPACT_TEXT_LENGTH = 60
+
+NOTE = ("(Page state is compressed relative to the last full page state above: elements marked *[n]* changed or "
+        "appeared and are shown in full; other elements and text are unchanged and shown shortened, "
+        "without attributes.)")
+
+
+def _shorten(text):
+    text = " ".join(text.split())
+    if len(text) > COMPACT_TEXT_LENGTH:
+        text = text[:COMPACT_TEXT_LENGTH - 1].rstrip() + "…"
+    return text
+
+
+class _Entry:
+    """Інтерактивний елемент або рядок тексту серіалізованого стану"""
+
+    __slots__ = ('raw', 'indent', 'index', 'body', 'signature')
+
+    def __init__(self, raw, indent="", index=None, body=None):
+        self.raw = raw
+        self.indent = indent
+        self.index = index
+        self.body = body
+        # Елемент порівнюється без індексу: індекси зсуваються, коли на сторінці з'являються нові елементи
+        self.signature = f"{indent}{body}" if index is not None else raw
+
+    def full(self):
+        return f"{self.indent}*[{self.index}]*{self.body}"
+
+    def compact(self):
+        if self.index is None:
+            indent = self.raw[:len(self.raw) - len(self.raw.lstrip('\t'))]
+            return f"{indent}{_shorten(self.raw)}"
+        match = _ELEMENT_BODY.match(self.body)
+        if match is None or not (match.group('text') or "").strip():
+            # Без тексту атрибути (name, placeholder) — єдиний опис елемента
+            return f"{self.indent}[{self.index}]{self.body}"
+        return f"{self.indent}[{self.index}]<{match.group('tag')}>{_shorten(match.group('text'))} />"
+
+
+def parse_state(text):
+    """Записи серіалізованого стану; текст елемента може займати кілька рядків"""
+    entries = []
+    lines = text.split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        match = _ELEMENT_START.match(line)
+        if match is None:
+            entries.append(_Entry(line))
+            i += 1
+            continue
+        block = [line]
+        while not block[-1].rstrip().endswith('/>') and i + 1 < len(lines):
+            i += 1
+            block.append(lines[i])
+        raw = '\n'.join(block)
+        body = raw[match.end() - 1:]
+        entries.append(_Entry(raw, match.group(1), int(match.group(2)), body))
+        i += 1
+    return entries
+
+
+class StateCompressor:
+    """Різниця між станами сторінки на сусідніх кроках агента"""
+
+    def __init__(self, max_changed_ratio=0.5, full_every=5, min_saving=0.2):
+        self.max_changed_ratio = max_changed_ratio
+        self.full_every = full_every
+        self.min_saving = min_saving
+        # Останній повний стан, відносно якого стискаються наступні
+        self._previous_url = None
+        self._previous = None
+        self._since_full = 0
+        # Повідомлення з останнім повним станом і те, що лишилося в розмові
+        self._full_message = None
+        self._kept_message = None
+        # Статистика запуску
+        self.full_states = 0
+        self.diff_states = 0
+        self.original_chars = 0
+        self.sent_chars = 0
+
+    def compress(self, url, text, failed=False):
+        """Текст стану для моделі: стиснутий або text без змін"""
+        entries = parse_state(text)
+        previous, previous_url = self._previous, self._previous_url
+
+        compressed = None
+        if previous is not None and url == previous_url and not failed and self._since_full + 1 < self.full_every:
+            compressed = self._diff(previous, entries)
+            if compressed is not None and len(compressed) > len(text) * (1 - self.min_saving):
+                compressed = None
+
+        if compressed is None:
+            self._previous, self._previous_url = [entry.signature for entry in entries], url
+            self.full_states += 1
+            self._since_full = 0
+            sent = text
+        else:
+            self.diff_states += 1
+            self._since_full += 1
+            sent = compressed
+        self.original_chars += len(text)
+        self.sent_chars += len(sent)
+        metrics.STATE_CHARS.inc(len(text), kind="original")
+        metrics.STATE_CHARS.inc(len(sent), kind="sent")
+        return sent
+
+    def _diff(self, previous, entries):
+        """Стиснутий стан або None, якщо змінилася більша частина сторінки"""
+        matcher = SequenceMatcher(None, previous, [entry.signature for entry in entries], autojunk=False)
+        changed = set()
+        for tag, _, _, j1, j2 in matcher.get_opcodes():
+            if tag in ('replace', 'insert'):
+                changed.update(range(j1, j2))
+        elements = [i for i, entry in enumerate(entries) if entry.index is not None]
+        changed_elements = sum(1 for i in elements if i in changed)
+        if elements and changed_elements > len(elements) * self.max_changed_ratio:
+            return None
+
+        lines = []
+        for i, entry in enumerate(entries):
+            if i in changed:
+                lines.append(entry.full() if entry.index is not None else entry.raw)
+            elif entry.index is not None or entry.raw.strip():
+                lines.append(entry.compact())
+        return '\n'.join([NOTE] + lines)
+
+    def reset(self):
+        """Наступний стан надіслати повністю"""
+        self._previous = self._previous_url = None
+        self._full_message = None
+
+    def attach(self, agent):
+        """Стискати стан у повідомленнях, які агент browser-use надсилає моделі.
+
+        Після кроку browser-use прибирає повідомлення зі станом; повний стан
+        повертається в розмову перед відповіддю моделі (замість попереднього
+        збереженого), щоб стиснуті стани посилалися на те, що модель бачить.
+        """
+        manager = agent._message_manager
+        add_state_message = manager.add_state_message
+        remove_last_state_message = manager._remove_last_state_message
+        add_model_output = manager.add_model_output
+        removed = []
+
+        def add_compressed_state_message(state, result=None, step_info=None, use_vision=True):
+            removed.clear()
+            add_state_message(state, result, step_info, use_vision)
+            self._compress_last_message(manager, state, result)
+
+        def remove_state_message():
+            messages = manager.state.history.messages
+            last = messages[-1] if messages else None
+            remove_last_state_message()
+            if last is not None and last is self._full_message and (not messages or messages[-1] is not last):
+                removed.append(last)
+
+        def add_model_output_after_state(model_output):
+            if removed:
+                self._keep_message(manager, removed.pop())
+            add_model_output(model_output)
+
+        manager.add_state_message = add_compressed_state_message
+        manager._remove_last_state_message = remove_state_message
+        manager.add_model_output = add_model_output_after_state
+
+    def _keep_message(self, manager, managed):
+        """Лишити повний стан у розмові замість попереднього"""
+        history = manager.state.history
+        for i, message in enumerate(history.messages):
+            if message is self._kept_message:
+                history.current_tokens -= message.metadata.tokens
+                del history.messages[i]
+                break
+        history.messages.append(managed)
+        history.current_tokens += managed.metadata.tokens
+        self._kept_message = managed
+
+    def _compress_last_message(self, manager, state, result):
+        elements_text = state.element_tree.clickable_elements_to_string(
+            include_attributes=manager.settings.include_attributes
+        )
+        if not elements_text:
+            return
+        if not any(message is self._full_message for message in manager.state.history.messages[:-1]):
+            # Повний стан не лишився в розмові (модель не відповіла, історію обрізано)
+            self.reset()
+        failed = any(getattr(r, 'error', None) for r in result or [])
+        compressed = self.compress(state.url, elements_text, failed)
+        if compressed is elements_text:
+            self._full_message = manager.state.history.messages[-1]
+            return
+
+        managed = manager.state.history.messages[-1]
+        content = managed.message.content
+        if isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and 'text' in part:
+                    part['text'] = part['text'].replace(elements_text, compressed)
+        else:
+            managed.message.content = content.replace(elements_text, compressed)
+        # Кількість токенів історії використовується для обрізання довгих розмов
+        tokens = manager._count_tokens(managed.message)
+        manager.state.history.current_tokens += tokens - managed.metadata.tokens
+        managed.metadata.tokens = tokens
+
+    def summary(self):
+        """Рядок для логу запуску"""
+        if not self.original_chars:
+            return None
+        share = self.sent_chars / self.original_chars
+        return (f"🗜️ Стан сторінки: надіслано {share:.0%} символів "
+                f"({self.diff_states} кроків зі змінами, {self.full_states} повних)")
@@ -0,0 +1,182 @@
+"""Сховище програм і налаштувань WebMorpher у SQLite.
+
+Кожна програма — окремий рядок, тому створення, редагування чи видалення
+змінює лише його, а не переписує весь файл. Записи виконуються в
+транзакціях у режимі WAL. Під час першого відкриття дані імпортуються з
+~/.webmorpher_config.json; після цього програми зберігаються лише в сховищі.
+"""
+import json
+import os
+import sqlite3
+import time
+
+from webmorpher.config import CONFIG_FILE, read_config
+
+# Поля програми, що зберігаються в окремих стовпцях; решта — в options
+_PROGRAM_COLUMNS = ('id', 'name', 'code')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS programs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    code TEXT NOT NULL DEFAULT '',
+    options TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS programs_name ON programs(name);
+CREATE INDEX IF NOT EXISTS programs_position ON programs(position);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def store_path_for(config_path):
+    """Файл сховища поруч із файлом конфігурації"""
+    return f"{os.path.splitext(config_path)[0]}.sqlite"
+
+
+def open_store(config_path=CONFIG_FILE):
+    """Відкрити сховище для файлу конфігурації, імпортувавши його за потреби"""
+    store = ConfigStore(store_path_for(config_path))
+    store.migrate_from_json(config_path)
+    return store
+
+
+class ConfigStore:
+    """Програми та налаштування в SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    # --- Налаштування ---
+
+    def settings(self):
+        """Усі налаштування як словник"""
+        rows = self._conn.execute("SELECT name, value FROM settings").fetchall()
+        return {row['name']: json.loads(row['value']) for row in rows}
+
+    def get_setting(self, name, default=None):
+        row = self._conn.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_settings(self, values):
+        """Записати кілька налаштувань в одній транзакції"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)",
+                [(name, json.dumps(value, ensure_ascii=False)) for name, value in values.items()]
+            )
+
+    # --- Програми ---
+
+    def programs(self):
+        """Усі програми в порядку створення"""
+        rows = self._conn.execute("SELECT id, name, code, options FROM programs ORDER BY position").fetchall()
+        return [self._program_from_row(row) for row in rows]
+
+    def find_program(self, name):
+        """Програма за назвою (індексований пошук) або None"""
+        row = self._conn.execute(
+            "SELECT id, name, code, options FROM programs WHERE name = ? ORDER BY position LIMIT 1", (name,)
+        ).fetchone()
+        return self._program_from_row(row) if row else None
+
+    def program_count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM programs").fetchone()[0]
+
+    def add_program(self, program):
+        """Додати програму в кінець списку; у словник записується її id"""
+        with self._conn:
+            position = self._conn.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM programs").fetchone()[0]
+            cursor = self._conn.execute(
+                "INSERT INTO programs (position, name, code, options, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (position, *self._program_values(program), time.time())
+            )
+        program['id'] = cursor.lastrowid
+        return program
+
+    def update_program(self, program):
+        """Оновити рядок програми за її id"""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE programs SET name = ?, code = ?, options = ?, updated_at = ? WHERE id = ?",
+                (*self._program_values(program), time.time(), program['id'])
+            )
+
+    def delete_program(self, program_id):
+        with self._conn:
+            self._conn.execute("DELETE FROM programs WHERE id = ?", (program_id,))
+
+    def _program_values(self, program):
+        options = {key: value for key, value in program.items() if key not in _PROGRAM_COLUMNS}
+        return program.get('name', ''), program.get('code', ''), json.dumps(options, ensure_ascii=False)
+
+    def _program_from_row(self, row):
+        program = {'id': row['id'], 'name': row['name'], 'code': row['code']}
+        program.update(json.loads(row['options']))
+        return program
+
+    # --- Міграція ---
+
+    def migrate_from_json(self, config_path):
+        """Імпорт з JSON; True, якщо щось було імпортовано.
+
+        Програми імпортуються один раз. Налаштування (browser_pool,
+        cdp_endpoints тощо) імпортуються знову, якщо JSON файл змінено
+        вручну після попереднього імпорту, але лише ті ключі, значення яких
+        у JSON змінилося: решта могла бути змінена в GUI після імпорту.
+        """
+        migrated = self._conn.execute("SELECT 1 FROM meta WHERE name = 'migrated_from'").fetchone()
+        mtime = os.path.getmtime(config_path) if os.path.exists(config_path) else None
+        if migrated and mtime == self._get_meta('json_mtime'):
+            return False
+        config = read_config(config_path)
+        programs = [] if migrated else config.pop('programs', [])
+        config.pop('programs', None)
+        # Значення JSON на момент попереднього імпорту
+        imported = self._get_meta('json_settings')
+        if imported is None and migrated:
+            # Сховище імпортоване до появи цього знімка: попередні значення
+            # JSON невідомі, тож додаються лише нові ключі
+            current = self.settings()
+            imported = {name: value for name, value in config.items() if name in current}
+        imported = imported or {}
+        changed = {name: value for name, value in config.items()
+                   if name not in imported or imported[name] != value}
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)",
+                [(name, json.dumps(value, ensure_ascii=False)) for name, value in changed.items()]
+            )
+            self._conn.executemany(
+                "INSERT INTO programs (position, name, code, options, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(position, *self._program_values(program), now) for position, program in enumerate(programs, 1)]
+            )
+            self._set_meta('migrated_from', os.path.abspath(config_path))
+            self._set_meta('json_mtime', mtime)
+            self._set_meta('json_settings', config)
+        return bool(changed or programs)
+
+    def _get_meta(self, name):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row['value']) if row else None
+
+    def _set_meta(self, name, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
@@ -0,0 +1,147 @@
+"""Виконавець завдань з черги JobQueue: потоки HTTP сервера або окремий вузол.
+
+Вузол бере завдання зі спільної черги, виконує їх тією самою логікою, що й
+GUI та командний рядок, і записує в чергу лог, результат та сигнали життя.
+Кілька вузлів на різних машинах працюють з одним файлом черги на спільному
+диску; скасування, яке надійшло на іншому вузлі, вузол помічає під час
+чергового сигналу життя.
+"""
+import threading
+
+from webmorpher.jobs import CANCELLED, FAILED, LOG_EVENT, SUCCEEDED, default_node
+
+# Як часто вузол надсилає сигнал життя та перевіряє скасування, с
+HEARTBEAT_INTERVAL = 5.0
+
+
+class JobWorker:
+    """workers потоків, що виконують завдання черги від імені вузла node.
+
+    run_job(program, options, on_log, on_agent_run) виконує програму та
+    повертає словник результату (як webmorpher.cli.run_program).
+    """
+
+    def __init__(self, queue, run_job, node=None, workers=1, poll_interval=1.0,
+                 heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.queue = queue
+        self.run_job = run_job
+        self.node = node or default_node()
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stopping = threading.Event()
+        self._threads = []
+        # Виконувані завдання: id -> AgentRun (для скасування) або None, поки
+        # запуск ще не створено; оренду продовжують лише цих завдань
+        self._running = {}
+        self._running_lock = threading.Lock()
+
+    def start(self):
+        """Повернути в чергу завдання, перервані попередньою зупинкою вузла, та запустити потоки"""
+        self.queue.requeue_interrupted(self.node)
+        self._heartbeat()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"webmorpher-job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._beat, name="webmorpher-job-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def shutdown(self):
+        """Зупинити виконавців; виконувані завдання повертаються в чергу"""
+        self._stopping.set()
+        with self._running_lock:
+            runs = list(self._running.values())
+        for agent_run in runs:
+            if agent_run is not None:
+                agent_run.stop()
+        with self.queue.changed:
+            self.queue.changed.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.queue.node_stopped(self.node)
+
+    @property
+    def running(self):
+        with self._running_lock:
+            return list(self._running)
+
+    def cancel(self, job_id):
+        """Зупинити завдання, якщо його виконує цей вузол"""
+        with self._running_lock:
+            agent_run = self._running.get(job_id)
+        if agent_run is not None:
+            agent_run.stop()
+
+    def _beat(self):
+        while not self._stopping.wait(self.heartbeat_interval):
+            try:
+                self._heartbeat()
+                # Завдання вузлів, що зникли, підхоплює будь-який живий вузол
+                self.queue.requeue_expired()
+            except Exception as e:
+                # Спільний диск може бути тимчасово недоступний
+                print(f"Помилка сигналу життя вузла {self.node}: {e}")
+
+    def _heartbeat(self):
+        for job_id in self.queue.heartbeat(self.node, self.workers, self.running):
+            self.cancel(job_id)
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.queue.claim(self.node)
+            except Exception as e:
+                print(f"Помилка отримання завдання з черги: {e}")
+                job = None
+            if job is None:
+                self.queue.wait(self.poll_interval)
+                continue
+            try:
+                self._execute(job)
+            except Exception as e:
+                # Наприклад, черга заблокована іншим вузлом: завдання без
+                # продовження оренди поверне в чергу requeue_expired
+                print(f"Помилка виконання завдання {job['id']}: {e}")
+            finally:
+                with self._running_lock:
+                    self._running.pop(job['id'], None)
+
+    def _execute(self, job):
+        job_id = job['id']
+        with self._running_lock:
+            self._running[job_id] = None
+
+        def on_log(message):
+            self.queue.add_event(job_id, LOG_EVENT, {'message': message})
+
+        def on_agent_run(agent_run):
+            with self._running_lock:
+                self._running[job_id] = agent_run
+            # Скасування могло надійти до створення запуску
+            if self.queue.get(job_id)['cancel_requested'] or self._stopping.is_set():
+                agent_run.stop()
+
+        result = None
+        error = None
+        try:
+            result = self.run_job(job['program'], job['options'], on_log, on_agent_run)
+        except Exception as e:
+            error = str(e)
+        finally:
+            with self._running_lock:
+                self._running.pop(job_id, None)
+
+        if self.queue.get(job_id)['cancel_requested']:
+            self.queue.finish(job_id, CANCELLED, result, error, node=self.node)
+        elif self._stopping.is_set():
+            # Вузол зупиняється: завдання виконає інший вузол або цей після перезапуску
+            self.queue.requeue(job_id, self.node)
+        elif result is not None and result.get('success'):
+            self.queue.finish(job_id, SUCCEEDED, result, node=self.node)
+        else:
+            self.queue.finish(job_id, FAILED, result, error or "; ".join((result or {}).get('errors', [])) or None,
+                              node=self.node)